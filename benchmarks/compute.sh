@@ -611,4 +611,79 @@ control-flow() {
   done
 }
 
+ysh-locals() {
+  ### Time proc and func locals, to compare two builds
+  #
+  # Proc and func locals have slots, and before they were looked up by name in
+  # the var_stack.  Globals are still looked up by name.
+  #
+  # Usage:
+  #   benchmarks/compute.sh ysh-locals _tmp/before/ysh _bin/cxx-opt/ysh
+
+  local before=${1:-_bin/cxx-opt/ysh}
+  local after=${2:-_bin/cxx-opt/ysh}
+  local n=${3:-500}
+
+  for func in proc_locals func_locals globals; do
+    echo "=== $func"
+    for ysh in $before $after; do
+      echo "--- $ysh"
+      # TIMEFORMAT above
+      time $ysh benchmarks/compute/ysh_locals.ysh $func $n
+      echo
+    done
+  done
+}
+
+int-allocs() {
+  ### Count GC allocations in integer-heavy scripts, to compare two builds
+  #
+  # Small integers share preallocated value.Int instances, and OSH arithmetic
+  # is evaluated without boxing intermediate results.
+  #
+  # Usage:
+  #   benchmarks/compute.sh int-allocs _tmp/before/osh _bin/cxx-opt/osh
+
+  local before=${1:-_bin/cxx-opt/osh}
+  local after=${2:-_bin/cxx-opt/osh}
+
+  bubble_sort-testdata > /dev/null
+
+  for sh in $before $after; do
+    echo "--- $sh"
+
+    echo 'fib 200 44'
+    OILS_GC_STATS=1 $sh benchmarks/compute/fib.sh 200 44 2>&1 >/dev/null |
+      grep 'num allocated'
+
+    echo 'bubble_sort int 200'
+    OILS_GC_STATS=1 $sh benchmarks/compute/bubble_sort.sh int \
+      < $BASE_DIR/tmp/bubble_sort/testdata-200.txt 2>&1 >/dev/null |
+      grep 'num allocated'
+
+    echo 'ysh_locals.ysh proc_locals 300'
+    OILS_GC_STATS=1 $sh -o ysh:all benchmarks/compute/ysh_locals.ysh \
+      proc_locals 300 2>&1 >/dev/null | grep 'num allocated'
+
+    echo
+  done
+}
+
+dict-bench() {
+  ### Dict<BigStr*, V> lookups/sec and probe lengths, then word_freq
+
+  local osh=${1:-_bin/cxx-opt/osh}
+  local bench=_bin/cxx-opt/mycpp/demo/dict_bench
+
+  ninja $osh $bench
+
+  DICT_BENCH_ITERS=${DICT_BENCH_ITERS:-200} $bench
+
+  # assoc array with many distinct keys
+  echo '=== word_freq'
+  # TIMEFORMAT above
+  time word_freq-one word_freq $osh 10 configure > /dev/null
+  time assoc_array-one word_freq $osh 10 10000 > /dev/null
+}
+
 "$@"
@@ -331,6 +331,83 @@ run-tasks() {
   # TODO: OILS_GC_STATS_FD and tsv_column_from_files.py
 }
 
+gc-stat() {
+  ### Print one value from an OILS_GC_STATS file, like 'max gc millis'
+  local name=$1
+  local path=$2
+
+  awk -F '=' -v name="$name" '
+  { key = $1; gsub(/^ +| +$/, "", key) }
+  key == name { v = $2; gsub(/ /, "", v); print v }
+  ' $path
+}
+
+compare-generational() {
+  ### Compare GC pauses of the default collector with opt+gengc
+  #
+  # opt+gengc uses sticky mark bits and a write barrier, so most collections
+  # only trace and sweep objects allocated since the last one.
+  #
+  # Needs -D GC_TIMING, e.g. from _OIL_DEV=1 ./configure
+
+  local -a bins=( _bin/cxx-opt/osh _bin/cxx-opt+gengc/osh )
+  ninja "${bins[@]}"
+
+  local out_dir=$BASE_DIR/generational
+  mkdir -p $out_dir
+
+  local tsv_out=$out_dir/pauses.tsv
+  tsv-row workload sh_path elapsed_secs num_collections num_minor \
+    max_gc_millis total_gc_millis > $tsv_out
+
+  local -a workloads=(
+    'parse.configure-coreutils'
+    'ex.compute-fib'
+    'ex.bashcomp-parse-help'
+  )
+
+  local workload bin
+  for workload in "${workloads[@]}"; do
+    local -a argv
+    case $workload in
+      parse.configure-coreutils)
+        argv=( --ast-format none -n benchmarks/testdata/configure-coreutils )
+        ;;
+      ex.compute-fib)
+        argv=( benchmarks/compute/fib.sh 100 44 )
+        ;;
+      ex.bashcomp-parse-help)
+        argv=( benchmarks/parse-help/pure-excerpt.sh parse_help_file
+               benchmarks/parse-help/clang.txt )
+        ;;
+    esac
+
+    for bin in "${bins[@]}"; do
+      local stats=$out_dir/stats.txt
+      local start end
+      start=$(date +%s.%N)
+      OILS_GC_STATS_FD=99 $bin "${argv[@]}" > /dev/null 99>$stats
+      end=$(date +%s.%N)
+
+      local num_minor
+      num_minor=$(gc-stat 'num minor' $stats)
+
+      tsv-row $workload $bin \
+        $(python3 -c "print('%.3f' % ($end - $start))") \
+        $(gc-stat 'num collections' $stats) \
+        ${num_minor:-0} \
+        $(gc-stat 'max gc millis' $stats) \
+        $(gc-stat 'total gc millis' $stats) >> $tsv_out
+    done
+  done
+
+  if command -v pretty-tsv; then
+    pretty-tsv $tsv_out
+  else
+    cat $tsv_out
+  fi
+}
+
 fd-demo() {
   local out=_tmp/gc/demo.txt
 
@@ -384,7 +461,7 @@ more-variants() {
 }
 
 build-binaries() {
-  local -a bin=( _bin/cxx-opt{,+bumpleak,+bumproot,+bumpsmall,+nopool}/osh )
+  local -a bin=( _bin/cxx-opt{,+bumpleak,+bumproot,+bumpsmall,+nopool,+gengc}/osh )
 
   if test -n "${TCMALLOC:-}"; then
     bin+=( _bin/cxx-opt+tcmalloc/osh )
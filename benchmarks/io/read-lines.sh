@@ -38,5 +38,35 @@ echo $i
 
 }
 
+# Count read() and lseek() syscalls.  When stdin is a regular file, OSH reads
+# it in chunks and seeks back, like bash.  With a pipe, it has to read one
+# byte at a time.
+
+syscalls() {
+  local sh=${1:-bin/osh}
+
+  local tmp=_tmp/read-lines.txt
+  mkdir -p _tmp
+  big-stream > $tmp
+  wc -l $tmp
+
+  local code='
+i=0
+while read -r line; do
+  i=$(( i + 1 ))
+done
+echo $i
+'
+
+  echo "=== $sh < file"
+  strace -c -f -e trace=read,lseek -- $sh -c "$code" < $tmp
+
+  echo "=== cat file | $sh"
+  cat $tmp | strace -c -f -e trace=read,lseek -- $sh -c "$code"
+
+  echo "=== $sh mapfile < file"
+  strace -c -f -e trace=read,lseek -- $sh -c 'mapfile L; echo ${#L[@]}' < $tmp
+}
+
 "$@"
 
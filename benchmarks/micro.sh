@@ -42,4 +42,101 @@ printf-loop-complex() {
   done | wc -l
 }
 
+
+# Indexed arrays are stored densely until there's a gap, e.g. from a[i*1000]=x
+# or unset 'a[i]'.  After that they're a dict with the max index, so these
+# workloads should all be linear in N.  See core/bash_impl.py.
+#
+#   ./micro.sh array-dense 20000 | array-sparse | array-holes | array-list
+
+array-dense() {
+  local n=${1:-10000}
+  time {
+    local -a a=()
+    for (( i = 0; i < n; ++i )); do
+      a+=($i)
+    done
+    echo "dense: ${#a[@]} ${a[n-1]}"
+  }
+}
+
+array-sparse() {
+  local n=${1:-10000}
+  time {
+    local -a a=()
+    for (( i = 0; i < n; ++i )); do
+      a[i*1000000]=$i
+    done
+    echo "sparse: ${#a[@]} ${a[-1]}"
+  }
+}
+
+array-holes() {
+  local n=${1:-10000}
+  time {
+    local -a a=()
+    for (( i = 0; i < n; ++i )); do
+      a+=($i)
+    done
+    for (( i = 0; i < n; i += 2 )); do
+      unset 'a[i]'
+    done
+    for (( i = 0; i < n; ++i )); do
+      a+=(x)
+    done
+    echo "holes: ${#a[@]} ${a[-1]}"
+  }
+}
+
+# List a sparse array many times.  Its sorted keys are cached, so they're only
+# sorted once.
+array-list() {
+  local n=${1:-10000}
+  time {
+    local -a a=()
+    for (( i = 0; i < n; ++i )); do
+      a[n-i]=$i
+    done
+    local total=0
+    for (( i = 0; i < 100; ++i )); do
+      set -- "${a[@]}"
+      (( total += $# ))
+    done
+    echo "list: $total"
+  }
+}
+
+# Split a few MB with unquoted $text and read -a.  When IFS is only whitespace,
+# osh/split.py slices fields in one pass; IFS=: uses its state machine.
+#
+#   bin/osh benchmarks/micro.sh word-split 500000
+
+word-split() {
+  local n=${1:-500000}
+  local lines colons
+  lines=$(seq $n)
+  colons=$(seq -s : $n)
+  echo "${#lines} bytes"
+
+  # subshells so that IFS is restored
+  time (
+    set -- $lines
+    echo "default IFS: $#"
+  )
+  time (
+    IFS=$'\n'
+    set -- $lines
+    echo "IFS=newline: $#"
+  )
+  time (
+    IFS=:
+    set -- $colons
+    echo "IFS=colon: $#"
+  )
+  time (
+    read -r -d '' -a words <<< "$lines" || true
+    echo "read -a: ${#words[@]}"
+  )
+}
+
 "$@"
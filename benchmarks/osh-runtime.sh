@@ -518,6 +518,36 @@ soil-run() {
   benchmarks/report.sh stage3 $BASE_DIR
 }
 
+#
+# Micro-benchmarks
+#
+
+spawn-vs-fork() {
+  ### Compare posix_spawn() with OILS_NO_SPAWN=1, for small and large heaps
+
+  local sh=${1:-$OSH_CPP_NINJA_BUILD}
+  local n=${2:-1000}
+
+  # The fork() cost grows with the size of the heap, because the page tables
+  # are copied.  posix_spawn() doesn't copy them.
+  local code='
+heap_size=$1
+n=$2
+big=()
+for (( i = 0; i < heap_size; ++i )); do big[i]="item $i"; done
+for (( i = 0; i < n; ++i )); do /bin/true; done
+'
+
+  local heap_size
+  for heap_size in 0 100000; do
+    echo "=== $sh heap_size=$heap_size n=$n spawn"
+    time $sh -c "$code" dummy $heap_size $n
+
+    echo "=== $sh heap_size=$heap_size n=$n OILS_NO_SPAWN=1"
+    time OILS_NO_SPAWN=1 $sh -c "$code" dummy $heap_size $n
+  done
+}
+
 #
 # Debugging
 #
@@ -7,6 +7,11 @@
 #
 # Example:
 #   benchmarks/regcomp-cache/run.sh match-many
+#   benchmarks/regcomp-cache/run.sh compare 300 300 3
+#
+# OSH caches compiled regexes (cpp/regex_cache_shared.c).  The 'compare'
+# function runs with the cache enabled and disabled, and shows the hit/miss
+# counters printed with OILS_REGEX_CACHE_STATS=1.
 
 set -o nounset
 set -o pipefail
@@ -65,14 +70,35 @@ compare() {
   # with bash
   { time $0 match-many "$@"; } >$dir/bash-stdout.txt 2>$dir/bash-time.txt
 
-  # with OSH
-  { time $bin $0 match-many "$@"; } >$dir/osh-stdout.txt 2>$dir/osh-time.txt
+  # with OSH, and the default cache size.  Stats are printed to stderr.
+  { time OILS_REGEX_CACHE_STATS=1 \
+      $bin $0 match-many "$@"; } >$dir/osh-stdout.txt 2>$dir/osh-time.txt
+
+  # with OSH, and the cache disabled
+  { time OILS_REGEX_CACHE_STATS=1 OILS_REGEX_CACHE_SIZE=0 \
+      $bin $0 match-many "$@"; } >$dir/osh-nocache-stdout.txt \
+                                 2>$dir/osh-nocache-time.txt
 
   # should have equal output except for version
-  diff $dir/*-stdout.txt || true
+  diff $dir/bash-stdout.txt $dir/osh-stdout.txt || true
+  diff $dir/osh-stdout.txt $dir/osh-nocache-stdout.txt || true
+
+  # show timings and cache counters
+  head -n 20 $dir/*-time.txt
+}
 
-  # show timings
-  head $dir/*-time.txt
+cache-sizes() {
+  ### Show how hit rate varies with OILS_REGEX_CACHE_SIZE
+
+  local bin=${1:-_bin/cxx-opt/osh}
+  shift || true
+
+  for size in 0 10 100 300 1000; do
+    echo "=== OILS_REGEX_CACHE_SIZE=$size"
+    { time OILS_REGEX_CACHE_STATS=1 OILS_REGEX_CACHE_SIZE=$size \
+        $bin $0 match-many "$@" >/dev/null; } 2>&1
+    echo
+  done
 }
 
 
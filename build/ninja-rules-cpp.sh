@@ -178,6 +178,11 @@ setglobal_compile_flags() {
     *+nopool)
       flags="$flags -D NO_POOL_ALLOC"
       ;;
+
+    *+gengc)
+      # sticky mark bits and a write barrier; see mycpp/mark_sweep_heap.h
+      flags="$flags -D GC_GENERATIONAL"
+      ;;
   esac
 
   # needed to strip unused symbols
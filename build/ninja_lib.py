@@ -70,6 +70,10 @@ GC_PERF_VARIANTS = [
 
     ('cxx', 'opt+nopool'),
 
+    # Generational mark-sweep
+    ('cxx', 'opt+gengc'),
+    ('cxx', 'asan+gengc'),
+
     # TODO: should be binary with different files
     ('cxx', 'opt+cheney'),
 
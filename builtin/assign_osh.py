@@ -11,6 +11,7 @@ from _devbuild.gen.runtime_asdl import (
 from _devbuild.gen.value_asdl import (value, value_e, value_t, LeftName)
 from _devbuild.gen.syntax_asdl import loc, loc_t, word_t
 
+from core import bash_impl
 from core import error
 from core.error import e_usage
 from core import state
@@ -131,7 +132,8 @@ def _PrintVariables(mem, cmd_val, attrs, print_flags, builtin=_OTHER):
         if flag_x == '+' and cell.exported:
             continue
 
-        if flag_a and val.tag() != value_e.BashArray:
+        if flag_a and val.tag() not in (value_e.BashArray,
+                                        value_e.SparseArray):
             continue
         if flag_A and val.tag() != value_e.BashAssoc:
             continue
@@ -145,7 +147,7 @@ def _PrintVariables(mem, cmd_val, attrs, print_flags, builtin=_OTHER):
                 flags.append('r')
             if cell.exported:
                 flags.append('x')
-            if val.tag() == value_e.BashArray:
+            if val.tag() in (value_e.BashArray, value_e.SparseArray):
                 flags.append('a')
             elif val.tag() == value_e.BashAssoc:
                 flags.append('A')
@@ -164,35 +166,29 @@ def _PrintVariables(mem, cmd_val, attrs, print_flags, builtin=_OTHER):
         elif val.tag() == value_e.BashArray:
             array_val = cast(value.BashArray, val)
 
-            # mycpp rewrite: None in array_val.strs
-            has_holes = False
-            for s in array_val.strs:
-                if s is None:
-                    has_holes = True
-                    break
-
-            if has_holes:
-                # Note: Arrays with unset elements are printed in the form:
-                #   declare -p arr=(); arr[3]='' arr[4]='foo' ...
-                decl.append("=()")
-                first = True
-                for i, element in enumerate(array_val.strs):
-                    if element is not None:
-                        if first:
-                            decl.append(";")
-                            first = False
-                        decl.extend([
-                            " ", name, "[",
-                            str(i), "]=",
-                            j8_lite.MaybeShellEncode(element)
-                        ])
-            else:
-                body = []  # type: List[str]
-                for element in array_val.strs:
-                    if len(body) > 0:
-                        body.append(" ")
-                    body.append(j8_lite.MaybeShellEncode(element))
-                decl.extend(["=(", ''.join(body), ")"])
+            body = []  # type: List[str]
+            for element in array_val.strs:
+                if len(body) > 0:
+                    body.append(" ")
+                body.append(j8_lite.MaybeShellEncode(element))
+            decl.extend(["=(", ''.join(body), ")"])
+
+        elif val.tag() == value_e.SparseArray:
+            sparse_val = cast(value.SparseArray, val)
+
+            # Note: Arrays with unset elements are printed in the form:
+            #   declare -p arr=(); arr[3]='' arr[4]='foo' ...
+            decl.append("=()")
+            first = True
+            for i in bash_impl.SparseArray_Keys(sparse_val):
+                if first:
+                    decl.append(";")
+                    first = False
+                decl.extend([
+                    " ", name, "[",
+                    str(i), "]=",
+                    j8_lite.MaybeShellEncode(sparse_val.d[i])
+                ])
 
         elif val.tag() == value_e.BashAssoc:
             assoc_val = cast(value.BashAssoc, val)
@@ -448,7 +444,8 @@ class NewVar(vm._AssignBuiltin):
             if rval is None and (arg.a or arg.A):
                 old_val = self.mem.GetValue(pair.var_name)
                 if arg.a:
-                    if old_val.tag() != value_e.BashArray:
+                    if old_val.tag() not in (value_e.BashArray,
+                                             value_e.SparseArray):
                         rval = value.BashArray([])
                 elif arg.A:
                     if old_val.tag() != value_e.BashAssoc:
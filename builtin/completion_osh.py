@@ -100,6 +100,7 @@ class SpecBuilder(object):
             word_ev,  # type: NormalWordEvaluator
             splitter,  # type: SplitContext
             comp_lookup,  # type: Lookup
+            search_path,  # type: state.SearchPath
             help_data,  # type: Dict[str, str]
             errfmt  # type: ui.ErrorFormatter
     ):
@@ -108,12 +109,14 @@ class SpecBuilder(object):
         Args:
           cmd_ev: CommandEvaluator for compgen -F
           parse_ctx, word_ev, splitter: for compgen -W
+          search_path: for compgen -A command
         """
         self.cmd_ev = cmd_ev
         self.parse_ctx = parse_ctx
         self.word_ev = word_ev
         self.splitter = splitter
         self.comp_lookup = comp_lookup
+        self.search_path = search_path
 
         self.help_data = help_data
         # lazily initialized
@@ -179,7 +182,7 @@ class SpecBuilder(object):
                 actions.append(completion.FileSystemAction(False, True, False))
 
                 # Look on the file system.
-                a = completion.ExternalCommandAction(cmd_ev.mem)
+                a = completion.ExternalCommandAction(self.search_path)
 
             elif name == 'directory':
                 a = completion.FileSystemAction(True, False, False)
@@ -12,6 +12,7 @@ from core import num
 from core import ui
 from core import vm
 from data_lang import j8
+from data_lang import packle
 from frontend import match
 from frontend import typed_args
 from mycpp import mops
@@ -237,9 +238,9 @@ class Str_(vm._Callable):
 
 class List_(vm._Callable):
 
-    def __init__(self):
-        # type: () -> None
-        pass
+    def __init__(self, small_ints):
+        # type: (num.SmallInts) -> None
+        self.small_ints = small_ints
 
     def Call(self, rd):
         # type: (typed_args.Reader) -> value_t
@@ -261,7 +262,7 @@ class List_(vm._Callable):
 
             elif case(value_e.Range):
                 val = cast(value.Range, UP_val)
-                it = val_ops.RangeIterator(val)
+                it = val_ops.RangeIterator(val, self.small_ints)
 
             else:
                 raise error.TypeErr(val,
@@ -466,4 +467,49 @@ class FromJson8(vm._Callable):
         return val
 
 
+class ToPackle(vm._Callable):
+
+    def __init__(self):
+        # type: () -> None
+        pass
+
+    def Call(self, rd):
+        # type: (typed_args.Reader) -> value_t
+
+        val = rd.PosValue()
+        rd.Done()
+
+        buf = mylib.BufWriter()
+        try:
+            packle.Encode(val, buf)
+        except error.Encode as e:
+            raise error.Structured(4, e.Message(), rd.LeftParenToken())
+
+        return value.Str(buf.getvalue())
+
+
+class FromPackle(vm._Callable):
+
+    def __init__(self):
+        # type: () -> None
+        pass
+
+    def Call(self, rd):
+        # type: (typed_args.Reader) -> value_t
+
+        s = rd.PosStr()
+        rd.Done()
+
+        try:
+            val = packle.Decode(s)
+        except error.Decode as e:
+            props = {
+                'start_pos': num.ToBig(e.start_pos),
+                'end_pos': num.ToBig(e.end_pos),
+            }  # type: Dict[str, value_t]
+            raise error.Structured(4, e.Message(), rd.LeftParenToken(), props)
+
+        return val
+
+
 # vim: sw=2
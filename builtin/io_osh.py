@@ -123,21 +123,15 @@ class MapFile(vm._Builtin):
         if var_name is None:
             var_name = 'MAPFILE'
 
-        lines = []  # type: List[str]
-        while True:
-            # bash uses this slow algorithm; YSH could provide read --all-lines
-            try:
-                line = read_osh.ReadLineSlowly(self.cmd_ev)
-            except pyos.ReadError as e:
-                self.errfmt.PrintMessage("mapfile: read() error: %s" %
-                                         posix.strerror(e.err_num))
-                return 1
-            if len(line) == 0:
-                break
+        # Unlike 'read', mapfile consumes all of stdin, so it reads big chunks
+        # rather than a byte at a time.
+        try:
             # note: at least on Linux, bash doesn't strip \r\n
-            if arg.t and line.endswith('\n'):
-                line = line[:-1]
-            lines.append(line)
+            lines = read_osh.ReadLines(self.cmd_ev, not arg.t)
+        except pyos.ReadError as e:
+            self.errfmt.PrintMessage("mapfile: read() error: %s" %
+                                     posix.strerror(e.err_num))
+            return 1
 
         state.BuiltinSetArray(self.mem, var_name, lines)
         return 0
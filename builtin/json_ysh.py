@@ -1,9 +1,9 @@
 from __future__ import print_function
 
 from _devbuild.gen import arg_types
-from _devbuild.gen.runtime_asdl import cmd_value
-from _devbuild.gen.syntax_asdl import loc, loc_t
-from _devbuild.gen.value_asdl import value, LeftName
+from _devbuild.gen.runtime_asdl import cmd_value, flow_e
+from _devbuild.gen.syntax_asdl import loc, loc_t, command_t
+from _devbuild.gen.value_asdl import value, value_t, LeftName
 from builtin import read_osh
 from core import error
 from core.error import e_usage
@@ -11,16 +11,18 @@ from core import pyos
 from core import state
 from core import vm
 from data_lang import j8
+from data_lang import packle
 from frontend import flag_util
 from frontend import args
 from frontend import typed_args
 from mycpp import mops
 from mycpp import mylib
 from mycpp.mylib import log
+from osh import cmd_eval
 
 import posix_ as posix
 
-from typing import TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.ui import ErrorFormatter
 
@@ -34,18 +36,78 @@ class Json(vm._Builtin):
 
     --pretty=0 writes it on a single line
     --indent=2 controls multiline indentation
+
+    json read (&x) { echo $x } runs the block for each item of a top-level
+    list, so the whole list is never in memory.
     """
 
-    def __init__(self, mem, errfmt, is_j8):
-        # type: (state.Mem, ErrorFormatter, bool) -> None
+    def __init__(self, mem, errfmt, is_j8, cmd_ev):
+        # type: (state.Mem, ErrorFormatter, bool, cmd_eval.CommandEvaluator) -> None
         self.mem = mem
         self.errfmt = errfmt
+        self.cmd_ev = cmd_ev
 
         self.is_j8 = is_j8
         self.name = 'j8' if is_j8 else 'json'  # for error messages
 
         self.stdout_ = mylib.Stdout()
 
+    def _RunBlock(self, block, place, val, blame_loc):
+        # type: (command_t, value.Place, value_t, loc_t) -> bool
+        """Set the place and run the block.  Returns True to stop reading."""
+        self.mem.SetPlace(place, val, blame_loc)
+        try:
+            unused = self.cmd_ev.EvalLoopBlock(block)
+        except vm.IntControlFlow as e:
+            action = e.HandleLoop()
+            if action == flow_e.Break:
+                return True
+            elif action == flow_e.Raise:
+                raise
+        return False
+
+    def _Read(self, arg_jr, place, block, blame_loc):
+        # type: (arg_types.json_read, value.Place, Optional[command_t], loc_t) -> None
+        """Parse stdin as it's read.  Raises error.Decode, pyos.ReadError."""
+        if arg_jr.lines:
+            lines_p = j8.J8LinesParser('')
+            lines_p.StreamFrom(0)
+            if block is None:
+                lines = lines_p.Parse()
+                items = [value.Str(line) for line in lines]  # type: List[value_t]
+                self.mem.SetPlace(place, value.List(items), blame_loc)
+                return
+
+            with cmd_eval.ctx_LoopLevel(self.cmd_ev):
+                while True:
+                    line = lines_p.NextLine()
+                    if line is None:
+                        break
+                    if self._RunBlock(block, place, value.Str(line),
+                                      blame_loc):
+                        break
+            return
+
+        p = j8.Parser('', self.is_j8)
+        p.StreamFrom(0)
+        if block is None:
+            val = p.ParseValue()
+            self.mem.SetPlace(place, val, blame_loc)
+            return
+
+        with cmd_eval.ctx_LoopLevel(self.cmd_ev):
+            top = p.StartItems()
+            if top is not None:  # not a list, so run the block once
+                unused = self._RunBlock(block, place, top, blame_loc)
+                return
+
+            while True:
+                item = p.NextItem()
+                if item is None:
+                    break
+                if self._RunBlock(block, place, item, blame_loc):
+                    break
+
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
         arg_r = args.Reader(cmd_val.argv, locs=cmd_val.arg_locs)
@@ -94,13 +156,14 @@ class Json(vm._Builtin):
 
         elif action == 'read':
             attrs = flag_util.Parse('json_read', arg_r)
-            #arg_jr = arg_types.json_read(attrs.attrs)
+            arg_jr = arg_types.json_read(attrs.attrs)
 
-            if cmd_val.typed_args:  # json read (&x)
-                rd = typed_args.ReaderForProc(cmd_val)
-                place = rd.PosPlace()
-                rd.Done()
+            rd = typed_args.ReaderForProc(cmd_val)
+            block = rd.OptionalBlock()
 
+            if cmd_val.pos_args is not None and len(cmd_val.pos_args):
+                # json read (&x)
+                place = rd.PosPlace()
                 blame_loc = cmd_val.typed_args.left  # type: loc_t
 
             else:  # json read
@@ -111,26 +174,99 @@ class Json(vm._Builtin):
                 place = value.Place(LeftName(var_name, blame_loc),
                                     self.mem.TopNamespace())
 
+            rd.Done()
+
             if not arg_r.AtEnd():
                 e_usage('read got too many args', arg_r.Location())
 
+            # stdin is parsed as it's read, rather than read all at once
             try:
-                contents = read_osh.ReadAll()
+                self._Read(arg_jr, place, block, blame_loc)
             except pyos.ReadError as e:  # different paths for read -d, etc.
                 # don't quote code since YSH errexit will likely quote
                 self.errfmt.PrintMessage("read error: %s" %
                                          posix.strerror(e.err_num))
                 return 1
-
-            p = j8.Parser(contents, self.is_j8)
-            try:
-                val = p.ParseValue()
             except error.Decode as err:
                 # TODO: Need to show position info
                 self.errfmt.Print_('%s read: %s' % (self.name, err.Message()),
                                    blame_loc=action_loc)
                 return 1
 
+        else:
+            raise error.Usage(_JSON_ACTION_ERROR, action_loc)
+
+        return 0
+
+
+class Packle(vm._Builtin):
+    """Packle read and write.
+
+    packle write (x) writes binary to stdout, and packle read (&x) reads all
+    of stdin.  Unlike json read, there's no streaming.
+    """
+
+    def __init__(self, mem, errfmt):
+        # type: (state.Mem, ErrorFormatter) -> None
+        self.mem = mem
+        self.errfmt = errfmt
+        self.stdout_ = mylib.Stdout()
+
+    def Run(self, cmd_val):
+        # type: (cmd_value.Argv) -> int
+        arg_r = args.Reader(cmd_val.argv, locs=cmd_val.arg_locs)
+        arg_r.Next()  # skip 'packle'
+
+        action, action_loc = arg_r.Peek2()
+        if action is None:
+            raise error.Usage(_JSON_ACTION_ERROR, loc.Missing)
+        arg_r.Next()
+
+        if not arg_r.AtEnd():
+            e_usage('%s got too many args' % action, arg_r.Location())
+
+        if action == 'write':
+            rd = typed_args.ReaderForProc(cmd_val)
+            val = rd.PosValue()
+            rd.Done()
+
+            buf = mylib.BufWriter()
+            try:
+                packle.Encode(val, buf)
+            except error.Encode as e:
+                self.errfmt.PrintMessage('packle write: %s' % e.Message(),
+                                         action_loc)
+                return 1
+
+            self.stdout_.write(buf.getvalue())
+
+        elif action == 'read':
+            rd = typed_args.ReaderForProc(cmd_val)
+            if cmd_val.pos_args is not None and len(cmd_val.pos_args):
+                # packle read (&x)
+                place = rd.PosPlace()
+                blame_loc = cmd_val.typed_args.left  # type: loc_t
+
+            else:  # packle read
+                blame_loc = cmd_val.arg_locs[0]
+                place = value.Place(LeftName('_reply', blame_loc),
+                                    self.mem.TopNamespace())
+            rd.Done()
+
+            try:
+                contents = read_osh.ReadAll()
+            except pyos.ReadError as e:
+                self.errfmt.PrintMessage("read error: %s" %
+                                         posix.strerror(e.err_num))
+                return 1
+
+            try:
+                val = packle.Decode(contents)
+            except error.Decode as err:
+                self.errfmt.Print_('packle read: %s' % err.Message(),
+                                   blame_loc=action_loc)
+                return 1
+
             self.mem.SetPlace(place, val, blame_loc)
 
         else:
@@ -4,9 +4,11 @@ meta_osh.py - Builtins that call back into the interpreter.
 """
 from __future__ import print_function
 
+import time as time_
+
 from _devbuild.gen import arg_types
 from _devbuild.gen.runtime_asdl import cmd_value, CommandStatus
-from _devbuild.gen.syntax_asdl import source, loc
+from _devbuild.gen.syntax_asdl import source, loc, command_t
 from _devbuild.gen.value_asdl import value
 from core import alloc
 from core import dev
@@ -14,6 +16,7 @@ from core import error
 from core import executor
 from core import main_loop
 from core import process
+from core import pyos
 from core.error import e_usage
 from core import pyutil  # strerror
 from core import state
@@ -23,6 +26,7 @@ from frontend import flag_util
 from frontend import consts
 from frontend import reader
 from frontend import typed_args
+from mycpp import mylib
 from mycpp.mylib import log, print_stderr
 from pylib import os_path
 from osh import cmd_eval
@@ -81,16 +85,117 @@ class Eval(vm._Builtin):
             # code_str could be EMPTY, so just use the first one
             eval_loc = cmd_val.arg_locs[0]
 
+        cache = self.parse_ctx.parse_cache
+        cache_key = None  # type: Optional[str]
+        parsed = None  # type: Optional[main_loop.ParsedFile]
+        generation = 0
+        if cache is not None:
+            cache_key = cache.Key('e', code_str, eval_loc)
+            entry = cache.Get(cache_key, eval_loc)
+            if entry is not None:
+                with dev.ctx_Tracer(self.tracer, 'eval', None):
+                    return main_loop.BatchParsed(
+                        self.cmd_ev,
+                        entry.nodes,
+                        cmd_flags=cmd_eval.RaiseControlFlow)
+            parsed = main_loop.ParsedFile()
+            generation = cache.generation
+
         line_reader = reader.StringLineReader(code_str, self.arena)
         c_parser = self.parse_ctx.MakeOshParser(line_reader)
 
         src = source.ArgvWord('eval', eval_loc)
         with dev.ctx_Tracer(self.tracer, 'eval', None):
             with alloc.ctx_SourceCode(self.arena, src):
-                return main_loop.Batch(self.cmd_ev,
-                                       c_parser,
-                                       self.errfmt,
-                                       cmd_flags=cmd_eval.RaiseControlFlow)
+                status = main_loop.Batch(self.cmd_ev,
+                                         c_parser,
+                                         self.errfmt,
+                                         cmd_flags=cmd_eval.RaiseControlFlow,
+                                         parsed=parsed)
+
+        # Like SourceCache.Put(): the code must have been parsed to the end,
+        # and aliases and parse options must not have changed while running it
+        if (cache is not None and parsed is not None and parsed.complete and
+                cache.generation == generation and
+                cache.Key('e', code_str, eval_loc) == cache_key):
+            cache.Put(cache_key, eval_loc).nodes = parsed.nodes
+        return status
+
+
+class _CachedFile(object):
+
+    def __init__(self, key, nodes):
+        # type: (str, List[command_t]) -> None
+        self.key = key
+        self.nodes = nodes
+
+
+class SourceCache(object):
+    """The parsed top-level commands of sourced files.
+
+    Enabled with OILS_SOURCE_CACHE=1.  An entry is valid for a key made of the
+    file's device, inode, mtime, and size, and the parse options.
+
+    Files aren't cached if:
+
+    - they were modified in the last second, because mtime has 1 second
+      resolution.
+    - they weren't parsed to the end, e.g. because of a syntax error or
+      'return'.
+    - aliases are defined at the start or end, since they're expanded at parse
+      time.
+    - parse options are different at the end.
+    """
+
+    def __init__(self, aliases, mutable_opts):
+        # type: (Dict[str, str], state.MutableOpts) -> None
+        self.aliases = aliases
+        self.mutable_opts = mutable_opts
+
+        self.files = {}  # type: Dict[str, _CachedFile]
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def Key(self, path):
+        # type: (str) -> Optional[str]
+        """Returns None if the file can't be cached now."""
+        if len(self.aliases):
+            return None
+
+        try:
+            file_key, mtime = pyos.MakeFileCacheKey(path)
+        except (IOError, OSError) as e:
+            return None
+
+        if mtime + 1 > time_.time():
+            return None
+
+        return '%s %s' % (file_key, self.mutable_opts.ParseOptsKey())
+
+    def Get(self, path, key):
+        # type: (str, str) -> Optional[List[command_t]]
+        entry = self.files.get(path)
+        if entry is not None:
+            if entry.key == key:
+                self.num_hits += 1
+                return entry.nodes
+
+            mylib.dict_erase(self.files, path)  # stale
+
+        self.num_misses += 1
+        return None
+
+    def Put(self, path, key, parsed):
+        # type: (str, str, main_loop.ParsedFile) -> None
+        """Called after the file is sourced."""
+        if not parsed.complete:
+            return
+
+        # The file, aliases, and parse options must not have changed
+        if self.Key(path) != key:
+            return
+
+        self.files[path] = _CachedFile(key, parsed.nodes)
 
 
 class Source(vm._Builtin):
@@ -104,6 +209,7 @@ class Source(vm._Builtin):
             tracer,  # type: dev.Tracer
             errfmt,  # type: ui.ErrorFormatter
             loader,  # type: pyutil._ResourceLoader
+            source_cache,  # type: Optional[SourceCache]
     ):
         # type: (...) -> None
         self.parse_ctx = parse_ctx
@@ -114,6 +220,7 @@ class Source(vm._Builtin):
         self.tracer = tracer
         self.errfmt = errfmt
         self.loader = loader
+        self.source_cache = source_cache
 
         self.mem = cmd_ev.mem
 
@@ -139,7 +246,7 @@ class Source(vm._Builtin):
 
             line_reader = reader.StringLineReader(contents, self.arena)
             c_parser = self.parse_ctx.MakeOshParser(line_reader)
-            return self._Exec(cmd_val, arg_r, path, c_parser)
+            return self._Exec(cmd_val, arg_r, path, c_parser, None, None)
 
         else:
             # 'source' respects $PATH
@@ -147,6 +254,17 @@ class Source(vm._Builtin):
             if resolved is None:
                 resolved = path
 
+            cache_key = None  # type: Optional[str]
+            parsed = None  # type: Optional[main_loop.ParsedFile]
+            if self.source_cache is not None:
+                cache_key = self.source_cache.Key(resolved)
+                if cache_key is not None:
+                    nodes = self.source_cache.Get(resolved, cache_key)
+                    if nodes is not None:
+                        return self._Exec(cmd_val, arg_r, path, None, None,
+                                          nodes)
+                    parsed = main_loop.ParsedFile()
+
             try:
                 # Shell can't use descriptors 3-9
                 f = self.fd_state.Open(resolved)
@@ -160,10 +278,24 @@ class Source(vm._Builtin):
             c_parser = self.parse_ctx.MakeOshParser(line_reader)
 
             with process.ctx_FileCloser(f):
-                return self._Exec(cmd_val, arg_r, path, c_parser)
+                status = self._Exec(cmd_val, arg_r, path, c_parser, parsed,
+                                    None)
+
+            if parsed is not None:
+                self.source_cache.Put(resolved, cache_key, parsed)
+            return status
 
-    def _Exec(self, cmd_val, arg_r, path, c_parser):
-        # type: (cmd_value.Argv, args.Reader, str, CommandParser) -> int
+    def _Exec(
+            self,
+            cmd_val,  # type: cmd_value.Argv
+            arg_r,  # type: args.Reader
+            path,  # type: str
+            c_parser,  # type: Optional[CommandParser]
+            parsed,  # type: Optional[main_loop.ParsedFile]
+            cached_nodes,  # type: Optional[List[command_t]]
+    ):
+        # type: (...) -> int
+        """Run the file with c_parser, or run nodes from the SourceCache."""
         call_loc = cmd_val.arg_locs[0]
 
         # A sourced module CAN have a new arguments array, but it always shares
@@ -179,11 +311,18 @@ class Source(vm._Builtin):
                     src = source.SourcedFile(path, call_loc)
                     with alloc.ctx_SourceCode(self.arena, src):
                         try:
-                            status = main_loop.Batch(
-                                self.cmd_ev,
-                                c_parser,
-                                self.errfmt,
-                                cmd_flags=cmd_eval.RaiseControlFlow)
+                            if cached_nodes is not None:
+                                status = main_loop.BatchParsed(
+                                    self.cmd_ev,
+                                    cached_nodes,
+                                    cmd_flags=cmd_eval.RaiseControlFlow)
+                            else:
+                                status = main_loop.Batch(
+                                    self.cmd_ev,
+                                    c_parser,
+                                    self.errfmt,
+                                    cmd_flags=cmd_eval.RaiseControlFlow,
+                                    parsed=parsed)
                         except vm.IntControlFlow as e:
                             if e.IsReturn():
                                 status = e.StatusCode()
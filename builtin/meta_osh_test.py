@@ -0,0 +1,75 @@
+#!/usr/bin/env python2
+from __future__ import print_function
+
+import os
+import time
+import unittest
+
+from _devbuild.gen.option_asdl import option_i
+from _devbuild.gen.syntax_asdl import command
+from builtin import meta_osh  # module under test
+from core import main_loop
+from core import state
+
+
+class SourceCacheTest(unittest.TestCase):
+
+    def testSourceCache(self):
+        path = '_tmp/source-cache.sh'
+        with open(path, 'w') as f:
+            f.write('echo hi\n')
+        # Not cached if it was modified in the last second
+        old = time.time() - 10
+        os.utime(path, (old, old))
+
+        mem = state.Mem('', [], None, [])
+        parse_opts, exec_opts, mutable_opts = state.MakeOpts(mem, None)
+        aliases = {}
+        cache = meta_osh.SourceCache(aliases, mutable_opts)
+
+        key = cache.Key(path)
+        self.assertNotEqual(None, key)
+        self.assertEqual(None, cache.Get(path, key))
+
+        # Incomplete parse isn't cached
+        parsed = main_loop.ParsedFile()
+        parsed.nodes.append(command.NoOp)
+        cache.Put(path, key, parsed)
+        self.assertEqual(None, cache.Get(path, key))
+
+        parsed.complete = True
+        cache.Put(path, key, parsed)
+        self.assertEqual(parsed.nodes, cache.Get(path, key))
+        self.assertEqual(1, cache.num_hits)
+        self.assertEqual(2, cache.num_misses)
+
+        # Parse options are part of the key
+        mutable_opts.SetAnyOption('ysh:upgrade', True)
+        self.assertTrue(mutable_opts.Get(option_i.parse_paren))
+        self.assertNotEqual(key, cache.Key(path))
+        mutable_opts.SetAnyOption('ysh:upgrade', False)
+        self.assertEqual(key, cache.Key(path))
+
+        # Aliases are expanded at parse time
+        aliases['ls'] = 'ls -l'
+        self.assertEqual(None, cache.Key(path))
+        del aliases['ls']
+
+        # Modifying the file changes the key, and evicts the entry
+        with open(path, 'a') as f:
+            f.write('echo bye\n')
+        os.utime(path, (old + 1, old + 1))
+        key2 = cache.Key(path)
+        self.assertNotEqual(key, key2)
+        self.assertEqual(None, cache.Get(path, key2))
+        self.assertEqual({}, cache.files)
+
+        # Recently modified
+        os.utime(path, None)
+        self.assertEqual(None, cache.Key(path))
+
+        self.assertEqual(None, cache.Key('_tmp/nonexistent'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ from __future__ import print_function
 from _devbuild.gen.runtime_asdl import (cmd_value, scope_e)
 from _devbuild.gen.syntax_asdl import command_t, loc, loc_t
 from _devbuild.gen.value_asdl import (value, value_e, value_t, LeftName)
+from core import bash_impl
 from core import error
 from core import state
 from core import vm
@@ -258,6 +259,9 @@ class Append(vm._Builtin):
             if case(value_e.BashArray):
                 val = cast(value.BashArray, UP_val)
                 val.strs.extend(arg_r.Rest())
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+                bash_impl.SparseArray_Append(val, arg_r.Rest())
             elif case(value_e.List):
                 val = cast(value.List, UP_val)
                 typed = [value.Str(s)
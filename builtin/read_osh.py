@@ -117,10 +117,14 @@ def _AppendParts(
 
 
 #
-# Three read() wrappers for 'read' builtin that RunPendingTraps: _ReadN,
-# _ReadPortion, and ReadLineSlowly
+# read() wrappers for 'read' and 'mapfile' builtins that RunPendingTraps:
+# _ReadN, _ReadPortion, and ReadLines
 #
 
+# How much to read() at once when stdin is seekable.  Unconsumed bytes are
+# "given back" with lseek().
+_SEEKABLE_CHUNK_SIZE = 4096
+
 
 def _ReadN(num_bytes, cmd_ev):
     # type: (int, CommandEvaluator) -> str
@@ -155,6 +159,12 @@ def _ReadPortion(delim_byte, max_chars, cmd_ev):
 
     The delimiter is not included in the result.
     """
+    # Like bash: when stdin is a regular file, read a chunk and then seek back
+    # to just after the delimiter, so the next process sees the right offset.
+    # Pipes and terminals can't be "unread", so we read a byte at a time.
+    if pyos.SeekCur(STDIN_FILENO, 0) == 0:
+        return _ReadPortionSeekable(delim_byte, max_chars, cmd_ev)
+
     eof = False
     ch_array = []  # type: List[int]
     bytes_read = 0
@@ -185,40 +195,101 @@ def _ReadPortion(delim_byte, max_chars, cmd_ev):
     return pyutil.ChArrayToString(ch_array), eof
 
 
+def _ReadPortionSeekable(delim_byte, max_chars, cmd_ev):
+    # type: (int, int, CommandEvaluator) -> Tuple[str, bool]
+    """Like _ReadPortion, but reads in chunks.
+
+    Bytes after the delimiter are given back with lseek(), so stdin must be
+    seekable.
+    """
+    delim = chr(delim_byte)
+    chunks = []  # type: List[str]
+    parts = []  # type: List[str]
+    eof = False
+    bytes_read = 0
+    while True:
+        n = _SEEKABLE_CHUNK_SIZE
+        if max_chars >= 0:
+            if bytes_read >= max_chars:
+                break
+            n = min(n, max_chars - bytes_read)
+
+        num_bytes, err_num = pyos.Read(STDIN_FILENO, n, chunks)
+        if num_bytes < 0:
+            if err_num == EINTR:
+                cmd_ev.RunPendingTraps()
+                # retry after running traps
+                continue
+            else:
+                raise pyos.ReadError(err_num)
+
+        elif num_bytes == 0:  # EOF
+            eof = True
+            break
+
+        chunk = chunks.pop()
+        i = chunk.find(delim)
+        if i == -1:
+            parts.append(chunk)
+            bytes_read += num_bytes
+            continue
+
+        parts.append(chunk[:i])
+
+        # Give back everything after the delimiter
+        num_unread = num_bytes - i - 1
+        if num_unread:
+            err_num = pyos.SeekCur(STDIN_FILENO, -num_unread)
+            if err_num != 0:
+                raise pyos.ReadError(err_num)
+        break
+
+    return ''.join(parts), eof
+
+
 # sys.stdin.readline() in Python has its own buffering which is incompatible
 # with shell semantics.  dash, mksh, and zsh all read a single byte at a
 # time with read(0, 1).
-
-# TODO:
-# - ReadLineSlowly should have keep_newline (mapfile -t)
-#   - this halves memory usage!
+#
+# But mapfile always reads until EOF, so it can read big chunks, even from a
+# pipe.
 
 
-def ReadLineSlowly(cmd_ev):
-    # type: (CommandEvaluator) -> str
-    """Read a line from stdin."""
-    ch_array = []  # type: List[int]
+def ReadLines(cmd_ev, keep_newline):
+    # type: (CommandEvaluator, bool) -> List[str]
+    """Read all lines from stdin, for mapfile."""
+    chunks = []  # type: List[str]
     while True:
-        ch, err_num = pyos.ReadByte(0)
+        n, err_num = pyos.Read(STDIN_FILENO, 4096, chunks)
 
-        if ch < 0:
+        if n < 0:
             if err_num == EINTR:
                 cmd_ev.RunPendingTraps()
                 # retry after running traps
             else:
                 raise pyos.ReadError(err_num)
 
-        elif ch == pyos.EOF_SENTINEL:
+        elif n == 0:  # EOF
             break
 
-        else:
-            ch_array.append(ch)
+    contents = ''.join(chunks)
 
-        # TODO: Add option to omit newline
-        if ch == pyos.NEWLINE_CH:
+    lines = []  # type: List[str]
+    n = len(contents)
+    pos = 0
+    while pos < n:
+        i = contents.find('\n', pos)
+        if i == -1:
+            lines.append(contents[pos:])  # last line has no newline
             break
 
-    return pyutil.ChArrayToString(ch_array)
+        if keep_newline:
+            lines.append(contents[pos:i + 1])
+        else:
+            lines.append(contents[pos:i])
+        pos = i + 1
+
+    return lines
 
 
 def ReadAll():
@@ -414,6 +485,9 @@ class Read(vm._Builtin):
 
         bits = 0
         if self.stdin_.isatty():
+            # The user may be responding to output of shopt -s buffer_stdout
+            pyos.FlushStdout()
+
             # -d and -n should be unbuffered
             if arg.d is not None or mops.BigTruncate(arg.n) >= 0:
                 bits |= pyos.TERM_ICANON
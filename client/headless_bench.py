@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+headless_bench.py
+
+Compare running a command in warm headless shells with starting a new
+'osh -c' process for every run.
+
+Each client thread gets its own 'osh --headless' process, since shell state
+isn't shared.  It sends PARSE once, and then EXEC many times.
+"""
+import optparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import py_fanos
+from py_fanos import log
+
+
+CODE = b'''
+x=0
+for i in 1 2 3 4 5; do
+  x=$(( x + i ))
+done
+echo "x = $x"
+'''
+
+
+def StartServer(sh_binary):
+  """Returns the socket connected to a new 'osh --headless' process."""
+  left, right = socket.socketpair()
+
+  pid = os.fork()
+  if pid == 0:
+    left.close()
+    os.dup2(right.fileno(), 0)
+    os.dup2(right.fileno(), 1)
+    right.close()
+
+    # Discard the [FANOS] debug messages
+    devnull = os.open('/dev/null', os.O_WRONLY)
+    os.dup2(devnull, 2)
+
+    os.execv(sh_binary, [sh_binary, '--headless', '--norc'])
+
+  right.close()
+  return left, pid
+
+
+def Request(sock, msg, fds):
+  py_fanos.send(sock, msg, fds)
+  reply = py_fanos.recv(sock)
+  if reply is None or not reply.startswith(b'OK'):
+    raise RuntimeError('Unexpected reply %r' % reply)
+  return reply[3:]
+
+
+def HeadlessClient(sock, num_runs, fds):
+  handle = Request(sock, b'PARSE ' + CODE, [])
+  if handle == b'-1':
+    raise RuntimeError('Syntax error')
+
+  for _ in range(num_runs):
+    Request(sock, b'EXEC ' + handle, fds)
+
+  Request(sock, b'FREE ' + handle, [])
+
+
+def ForkClient(sh_binary, num_runs, fds):
+  for _ in range(num_runs):
+    subprocess.run([sh_binary, '-c', CODE], stdin=fds[0], stdout=fds[1],
+                   stderr=fds[2], check=True)
+
+
+def RunThreads(target, args_list):
+  """Run the clients concurrently, and return the elapsed time."""
+  threads = [threading.Thread(target=target, args=args) for args in args_list]
+
+  start = time.time()
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  return time.time() - start
+
+
+def main(argv):
+  p = optparse.OptionParser(__doc__)
+  p.add_option(
+      '--sh-binary', dest='sh_binary', default='bin/osh',
+      help='Which shell binary to launch')
+  p.add_option(
+      '--num-clients', dest='num_clients', type='int', default=4,
+      help='Number of concurrent clients')
+  p.add_option(
+      '--num-runs', dest='num_runs', type='int', default=50,
+      help='Number of times each client runs the code')
+
+  opts, _ = p.parse_args(argv[1:])
+
+  stdin_fd = os.open('/dev/null', os.O_RDONLY)
+  stdout_fd = os.open('/dev/null', os.O_WRONLY)
+  fds = [stdin_fd, stdout_fd, sys.stderr.fileno()]
+
+  total = opts.num_clients * opts.num_runs
+
+  # Startup isn't measured; that's the point of a warm server
+  servers = [StartServer(opts.sh_binary) for _ in range(opts.num_clients)]
+
+  elapsed = RunThreads(HeadlessClient,
+                       [(sock, opts.num_runs, fds) for sock, _ in servers])
+  log('headless: %d clients x %d runs in %.3f s (%.1f runs/s)',
+      opts.num_clients, opts.num_runs, elapsed, total / elapsed)
+
+  for sock, pid in servers:
+    sock.close()  # the server exits on EOF
+    os.waitpid(pid, 0)
+
+  elapsed = RunThreads(ForkClient,
+                       [(opts.sh_binary, opts.num_runs, fds)
+                        for _ in range(opts.num_clients)])
+  log('%s -c: %d clients x %d runs in %.3f s (%.1f runs/s)',
+      opts.sh_binary, opts.num_clients, opts.num_runs, elapsed,
+      total / elapsed)
+
+  return 0
+
+
+if __name__ == '__main__':
+  try:
+    sys.exit(main(sys.argv))
+  except RuntimeError as e:
+    print('FATAL: %s' % e, file=sys.stderr)
+    sys.exit(1)
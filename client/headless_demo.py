@@ -173,6 +173,14 @@ def main(argv):
 
   commands = [b'GETPID']
   #commands = [b'EVAL echo prompt ${PS1@P}']
+
+  # Parse once, and run twice.  The first PARSE returns handle 1.
+  commands.append(b'PARSE echo "parsed once, PID $$"')
+  commands.append(b'EXEC 1')
+  commands.append(b'EXEC 1')
+  commands.append(b'FREE 1')
+  commands.append(b'PARSE (')  # syntax error, returns -1
+
   commands.extend(b'EVAL ' + c for c in COMMANDS)
 
   for cmd in commands:
@@ -34,6 +34,21 @@ errors() {
   # Command doesn't have file descriptors
   client/headless_demo.py '4:ECMD,'
   echo status=$?
+
+  # Handle that PARSE didn't return
+  client/headless_demo.py '7:FREE 99,'
+  echo status=$?
+}
+
+bench() {
+  ### Compare a warm headless shell with starting 'osh -c' for every command
+
+  local sh=${1:-bin/osh}
+  local num_clients=${2:-4}
+  local num_runs=${3:-50}
+
+  client/headless_bench.py --sh-binary $sh \
+    --num-clients $num_clients --num-runs $num_runs
 }
 
 # Hm what is this suppose to do?  It waits for input
@@ -0,0 +1,169 @@
+"""bash_impl.py - Storage for bash's indexed arrays.
+
+Most arrays are value.BashArray, which is a List[str] with no unset entries:
+
+    a=(x y z)
+    a+=(w)
+
+Assigning past the end, or unsetting an entry that isn't the last, changes
+the array to value.SparseArray, which is a Dict[int, str] and the max index:
+
+    a[1000000]=x
+    unset 'a[1]'
+
+When the holes are filled or unset again, it changes back to a BashArray.
+The caller does that, since it owns the variable:
+
+    if bash_impl.SparseArray_IsDense(sparse_val):
+        cell.val = bash_impl.SparseArray_ToBashArray(sparse_val)
+
+Both representations have O(1) lookup, length, and append.  Listing the
+entries of a SparseArray sorts its keys, and the sorted keys are cached until
+an entry is added or removed.
+"""
+from __future__ import print_function
+
+from _devbuild.gen.value_asdl import value
+from mycpp import mylib
+
+from typing import List, Dict, Optional
+
+
+def BashArray_ToSparse(array_val):
+    # type: (value.BashArray) -> value.SparseArray
+    d = {}  # type: Dict[int, str]
+    keys = []  # type: List[int]
+    for i, s in enumerate(array_val.strs):
+        d[i] = s
+        keys.append(i)
+    return value.SparseArray(d, len(array_val.strs) - 1, keys)
+
+
+def SparseArray_IsDense(sparse_val):
+    # type: (value.SparseArray) -> bool
+    """True if every index up to the max is set, so it can be a BashArray."""
+    return len(sparse_val.d) == sparse_val.max_index + 1
+
+
+def SparseArray_ToBashArray(sparse_val):
+    # type: (value.SparseArray) -> value.BashArray
+    """Requires SparseArray_IsDense()."""
+    strs = []  # type: List[str]
+    for i in xrange(0, sparse_val.max_index + 1):
+        strs.append(sparse_val.d[i])
+    return value.BashArray(strs)
+
+
+def SparseArray_Keys(sparse_val):
+    # type: (value.SparseArray) -> List[int]
+    """Return the indices that are set, in increasing order.
+
+    The list is cached, so the caller must not modify it.
+    """
+    if sparse_val.sorted_keys is None:
+        keys = sparse_val.d.keys()
+        keys.sort()
+        sparse_val.sorted_keys = keys
+    return sparse_val.sorted_keys
+
+
+def SparseArray_Values(sparse_val):
+    # type: (value.SparseArray) -> List[str]
+    """Return the entries, in index order."""
+    strs = []  # type: List[str]
+    for i in SparseArray_Keys(sparse_val):
+        strs.append(sparse_val.d[i])
+    return strs
+
+
+def SparseArray_Length(sparse_val):
+    # type: (value.SparseArray) -> int
+    return len(sparse_val.d)
+
+
+def SparseArray_Get(sparse_val, index):
+    # type: (value.SparseArray, int) -> Optional[str]
+    """Like GetArrayItem(), a negative index counts from max_index + 1."""
+    if index < 0:
+        index += sparse_val.max_index + 1
+    return sparse_val.d.get(index)
+
+
+def SparseArray_Set(sparse_val, index, s):
+    # type: (value.SparseArray, int, str) -> bool
+    """Returns False if a negative index is out of range."""
+    if index < 0:
+        index += sparse_val.max_index + 1
+        if index < 0:
+            return False
+
+    if index > sparse_val.max_index:
+        if sparse_val.sorted_keys is not None:
+            sparse_val.sorted_keys.append(index)
+        sparse_val.max_index = index
+    elif index not in sparse_val.d:
+        sparse_val.sorted_keys = None  # filled a hole
+    sparse_val.d[index] = s
+    return True
+
+
+def SparseArray_Unset(sparse_val, index):
+    # type: (value.SparseArray, int) -> None
+    """Remove an entry.  It's not an error if it doesn't exist."""
+    if index < 0:
+        index += sparse_val.max_index + 1
+    if index not in sparse_val.d:
+        return
+
+    mylib.dict_erase(sparse_val.d, index)
+    if index != sparse_val.max_index:
+        sparse_val.sorted_keys = None
+        return
+
+    if sparse_val.sorted_keys is not None:
+        sparse_val.sorted_keys.pop()
+
+    # Like bash, a+=(x) appends after the max index that's still set.  Look
+    # down from the old one, unless that's slower than looking at every key.
+    n = len(sparse_val.d)
+    i = index - 1
+    while i >= 0 and index - i <= n:
+        if i in sparse_val.d:
+            sparse_val.max_index = i
+            return
+        i -= 1
+
+    new_max = -1
+    if n != 0 and i >= 0:
+        for k in sparse_val.d.keys():
+            if k > new_max:
+                new_max = k
+    sparse_val.max_index = new_max
+
+
+def SparseArray_Append(sparse_val, strs):
+    # type: (value.SparseArray, List[str]) -> None
+    """a+=(x y)"""
+    for s in strs:
+        sparse_val.max_index += 1
+        sparse_val.d[sparse_val.max_index] = s
+        if sparse_val.sorted_keys is not None:
+            sparse_val.sorted_keys.append(sparse_val.max_index)
+
+
+def SparseArray_Slice(sparse_val, begin, has_length, length):
+    # type: (value.SparseArray, int, bool, int) -> List[str]
+    """${a[@]:begin:length}
+
+    begin is an index, and length counts entries that are set.
+    """
+    if begin < 0:
+        begin += sparse_val.max_index + 1
+
+    strs = []  # type: List[str]
+    for i in SparseArray_Keys(sparse_val):
+        if has_length and len(strs) == length:  # length could be 0
+            break
+        if i >= begin:
+            strs.append(sparse_val.d[i])
+    return strs
@@ -0,0 +1,122 @@
+#!/usr/bin/env python2
+"""bash_impl_test.py: Tests for bash_impl.py."""
+
+import random
+import unittest
+
+from _devbuild.gen.value_asdl import value
+from core import bash_impl  # module under test
+
+
+class SparseArrayTest(unittest.TestCase):
+
+    def testToSparse(self):
+        sp = bash_impl.BashArray_ToSparse(value.BashArray(['a', 'b', 'c']))
+        self.assertEqual({0: 'a', 1: 'b', 2: 'c'}, sp.d)
+        self.assertEqual(2, sp.max_index)
+
+        sp = bash_impl.BashArray_ToSparse(value.BashArray([]))
+        self.assertEqual(-1, sp.max_index)
+
+    def testGetSet(self):
+        sp = value.SparseArray({}, -1, None)
+        self.assertEqual(False, bash_impl.SparseArray_Set(sp, -1, 'x'))
+
+        self.assertEqual(True, bash_impl.SparseArray_Set(sp, 1000000, 'x'))
+        self.assertEqual(1000000, sp.max_index)
+        self.assertEqual(1, bash_impl.SparseArray_Length(sp))
+
+        self.assertEqual(True, bash_impl.SparseArray_Set(sp, 5, 'y'))
+        self.assertEqual(1000000, sp.max_index)
+
+        self.assertEqual('x', bash_impl.SparseArray_Get(sp, -1))
+        self.assertEqual(None, bash_impl.SparseArray_Get(sp, -2))
+        self.assertEqual('y', bash_impl.SparseArray_Get(sp, 5))
+        self.assertEqual(None, bash_impl.SparseArray_Get(sp, -2000000))
+
+        # a[-1]=z
+        self.assertEqual(True, bash_impl.SparseArray_Set(sp, -1, 'z'))
+        self.assertEqual([5, 1000000], bash_impl.SparseArray_Keys(sp))
+        self.assertEqual(['y', 'z'], bash_impl.SparseArray_Values(sp))
+
+    def testUnset(self):
+        sp = value.SparseArray({0: 'a', 1: 'b', 2: 'c', 10: 'd'}, 10, None)
+
+        bash_impl.SparseArray_Unset(sp, 1)
+        self.assertEqual(10, sp.max_index)
+
+        # Doesn't exist
+        bash_impl.SparseArray_Unset(sp, 7)
+        self.assertEqual(3, bash_impl.SparseArray_Length(sp))
+
+        # The max index goes back to the last entry that's set
+        bash_impl.SparseArray_Unset(sp, -1)
+        self.assertEqual(2, sp.max_index)
+
+        bash_impl.SparseArray_Unset(sp, 2)
+        self.assertEqual(0, sp.max_index)
+
+        bash_impl.SparseArray_Unset(sp, 0)
+        self.assertEqual(-1, sp.max_index)
+        self.assertEqual(0, bash_impl.SparseArray_Length(sp))
+
+    def testAppend(self):
+        sp = value.SparseArray({3: 'a', 9: 'b'}, 9, None)
+        bash_impl.SparseArray_Unset(sp, 9)
+        bash_impl.SparseArray_Append(sp, ['x', 'y'])
+        self.assertEqual([3, 4, 5], bash_impl.SparseArray_Keys(sp))
+        self.assertEqual(['a', 'x', 'y'], bash_impl.SparseArray_Values(sp))
+
+    def testSlice(self):
+        sp = value.SparseArray({1: 'a', 5: 'b', 6: 'c', 9: 'd'}, 9, None)
+
+        self.assertEqual(['a', 'b', 'c', 'd'],
+                         bash_impl.SparseArray_Slice(sp, 0, False, 0))
+        # begin is an index
+        self.assertEqual(['b', 'c', 'd'],
+                         bash_impl.SparseArray_Slice(sp, 2, False, 0))
+        # length counts entries
+        self.assertEqual(['b', 'c'],
+                         bash_impl.SparseArray_Slice(sp, 2, True, 2))
+        self.assertEqual([], bash_impl.SparseArray_Slice(sp, 2, True, 0))
+        self.assertEqual(['c', 'd'],
+                         bash_impl.SparseArray_Slice(sp, -4, False, 0))
+
+    def testToBashArray(self):
+        sp = bash_impl.BashArray_ToSparse(value.BashArray(['a', 'b', 'c']))
+        bash_impl.SparseArray_Unset(sp, 0)
+        self.assertEqual(False, bash_impl.SparseArray_IsDense(sp))
+
+        # Filling the hole makes it dense again
+        bash_impl.SparseArray_Set(sp, 0, 'new')
+        self.assertEqual(True, bash_impl.SparseArray_IsDense(sp))
+        self.assertEqual(['new', 'b', 'c'],
+                         bash_impl.SparseArray_ToBashArray(sp).strs)
+
+        # So does unsetting the entries after a hole
+        sp = value.SparseArray({0: 'a', 5: 'b'}, 5, None)
+        bash_impl.SparseArray_Unset(sp, 5)
+        self.assertEqual(True, bash_impl.SparseArray_IsDense(sp))
+        self.assertEqual(['a'], bash_impl.SparseArray_ToBashArray(sp).strs)
+
+    def testSortedKeysCache(self):
+        sp = value.SparseArray({}, -1, None)
+        r = random.Random(42)
+        for i in xrange(1000):
+            index = r.randint(0, 30)
+            op = r.randint(0, 3)
+            if op == 0:
+                bash_impl.SparseArray_Set(sp, index, 'x')
+            elif op == 1:
+                bash_impl.SparseArray_Unset(sp, index)
+            elif op == 2:
+                bash_impl.SparseArray_Append(sp, ['y'] * (index % 3))
+            else:
+                bash_impl.SparseArray_Unset(sp, -1)
+
+            self.assertEqual(sorted(sp.d.keys()),
+                             bash_impl.SparseArray_Keys(sp))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,7 @@ from _devbuild.gen.syntax_asdl import (CompoundWord, word_part_e, word_t,
 from _devbuild.gen.runtime_asdl import (scope_e, comp_action_e, comp_action_t)
 from _devbuild.gen.types_asdl import redir_arg_type_e
 from _devbuild.gen.value_asdl import (value, value_e)
+from core import bash_impl
 from core import error
 from core import pyos
 from core import state
@@ -65,7 +66,7 @@ from typing import (Dict, Tuple, List, Iterator, Optional, Any, cast,
                     TYPE_CHECKING)
 if TYPE_CHECKING:
     from core.comp_ui import State
-    from core.state import Mem
+    from core.state import Mem, SearchPath
     from frontend.py_readline import Readline
     from core.util import _DebugFile
     from frontend.parse_lib import ParseContext
@@ -327,6 +328,10 @@ class Api(object):
         self.partial_argv = []  # type: List[str]
         # NOTE: COMP_WORDBREAKS is initialized in Mem().
 
+        # FileSystemAction records whether each path it yields is a directory,
+        # so RootCompleter doesn't stat() it again to add a slash.
+        self.path_is_dir = {}  # type: Dict[str, bool]
+
     # NOTE: to_complete could be 'cur'
     def Update(self, first, to_complete, prev, index, partial_argv):
         # type: (str, str, str, int, List[str]) -> None
@@ -493,21 +498,20 @@ class FileSystemAction(CompletionAction):
             log('dirname %r' % dirname)
 
         try:
-            names = posix.listdir(to_list)
+            # d_type says which entries are directories, usually without a
+            # stat() per entry
+            entries = pyos.ReadDir(to_list)
         except (IOError, OSError) as e:
             return  # nothing
 
-        for name in names:
-            path = os_path.join(dirname, name)
+        for entry in entries:
+            path = os_path.join(dirname, entry.name)
 
             if path.startswith(to_complete):
+                comp.path_is_dir[path] = entry.is_dir
+
                 if self.dirs_only:  # add_slash not used here
-                    # NOTE: There is a duplicate isdir() check later to add a trailing
-                    # slash.  Consolidate the checks for fewer stat() ops.  This is hard
-                    # because all the completion actions must obey the same interface.
-                    # We could have another type like candidate = File | Dir |
-                    # OtherString ?
-                    if path_stat.isdir(path):
+                    if entry.is_dir:
                         yield path
                     continue
 
@@ -517,7 +521,7 @@ class FileSystemAction(CompletionAction):
                     if not posix.access(path, X_OK):
                         continue
 
-                if self.add_slash and path_stat.isdir(path):
+                if self.add_slash and entry.is_dir:
                     path = path + '/'
                     yield path
                 else:
@@ -628,7 +632,11 @@ class ShellFuncAction(CompletionAction):
                          self.func.name)
             return
 
-        if val.tag() != value_e.BashArray:
+        if val.tag() == value_e.BashArray:
+            strs = cast(value.BashArray, val).strs
+        elif val.tag() == value_e.SparseArray:
+            strs = bash_impl.SparseArray_Values(cast(value.SparseArray, val))
+        else:
             print_stderr('osh error: COMPREPLY should be an array, got %s' %
                          ui.ValType(val))
             return
@@ -636,8 +644,7 @@ class ShellFuncAction(CompletionAction):
         if 0:
             self.debug('> %r' % val)  # CRASHES in C++
 
-        array_val = cast(value.BashArray, val)
-        for s in array_val.strs:
+        for s in strs:
             #self.debug('> %r' % s)
             yield s
 
@@ -666,30 +673,14 @@ class ExternalCommandAction(CompletionAction):
     This is PART of compgen -A command.
     """
 
-    def __init__(self, mem):
-        # type: (Mem) -> None
+    def __init__(self, search_path):
+        # type: (SearchPath) -> None
         """
         Args:
-          mem: for looking up Path
+          search_path: has a cached listing of each $PATH dir, which is
+            re-validated by its mtime
         """
-        self.mem = mem
-        # Should we list everything executable in $PATH here?  And then whenever
-        # $PATH is changed, regenerated it?
-        # Or we can cache directory listings?  What if the contents of the dir
-        # changed?
-        # Can we look at the dir timestamp?
-        #
-        # (dir, timestamp) -> list of entries perhaps?  And then every time you hit
-        # tab, do you have to check the timestamp?  It should be cached by the
-        # kernel, so yes.
-        # XXX(unused?) self.ext = []
-
-        # (dir, timestamp) -> list
-        # NOTE: This cache assumes that listing a directory is slower than statting
-        # it to get the mtime.  That may not be true on all systems?  Either way
-        # you are reading blocks of metadata.  But I guess /bin on many systems is
-        # huge, and will require lots of sys calls.
-        self.cache = {}  # type: Dict[Tuple[str, int], List[str]]
+        self.search_path = search_path
 
     def Print(self, f):
         # type: (mylib.BufWriter) -> None
@@ -698,47 +689,10 @@ class ExternalCommandAction(CompletionAction):
 
     def Matches(self, comp):
         # type: (Api) -> Iterator[str]
-        """TODO: Cache is never cleared.
-
-        - When we get a newer timestamp, we should clear the old one.
-        - When PATH is changed, we can remove old entries.
-        """
-        val = self.mem.GetValue('PATH')
-        if val.tag() != value_e.Str:
-            # No matches if not a string
-            return
-
-        val_s = cast(value.Str, val)
-        path_dirs = val_s.s.split(':')
-        #log('path: %s', path_dirs)
-
-        executables = []  # type: List[str]
-        for d in path_dirs:
-            try:
-                key = pyos.MakeDirCacheKey(d)
-            except (IOError, OSError) as e:
-                # There could be a directory that doesn't exist in the $PATH.
-                continue
-
-            dir_exes = self.cache.get(key)
-            if dir_exes is None:
-                entries = posix.listdir(d)
-                dir_exes = []
-                for name in entries:
-                    path = os_path.join(d, name)
-                    # TODO: Handle exception if file gets deleted in between listing and
-                    # check?
-                    if not posix.access(path, X_OK):
-                        continue
-                    dir_exes.append(name)  # append the name, not the path
-
-                self.cache[key] = dir_exes
-
-            executables.extend(dir_exes)
 
         # TODO: Shouldn't do the prefix / space thing ourselves.  readline does
         # that at the END of the line.
-        for word in executables:
+        for word in self.search_path.Executables():
             if word.startswith(comp.to_complete):
                 yield word
 
@@ -1362,7 +1316,11 @@ class RootCompleter(object):
             # compopt -o filenames is for user-defined actions.  Or any
             # FileSystemAction needs it.
             if action_kind == comp_action_e.FileSystem or opt_filenames:
-                if path_stat.isdir(candidate):
+                if candidate in comp.path_is_dir:
+                    is_dir = comp.path_is_dir[candidate]
+                else:
+                    is_dir = path_stat.isdir(candidate)
+                if is_dir:
                     s = line_until_word + ShellQuoteB(candidate) + '/'
                     yield s
                     continue
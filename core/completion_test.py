@@ -128,7 +128,7 @@ class CompletionTest(unittest.TestCase):
         parse_opts, exec_opts, mutable_opts = state.MakeOpts(mem, None)
         mem.exec_opts = exec_opts
 
-        a = completion.ExternalCommandAction(mem)
+        a = completion.ExternalCommandAction(state.SearchPath(mem))
         comp = self._CompApi([], 0, 'f')
         print(list(a.Matches(comp)))
 
@@ -185,6 +185,27 @@ class CompletionTest(unittest.TestCase):
         comp.Update('', '../o', '', 0, None)
         print(list(a.Matches(comp)))
 
+        # Directories come from d_type, and are recorded so RootCompleter
+        # doesn't stat() them again.  Symlinks to directories count.
+        os.system('rm -r -f /tmp/oil_comp_dirs')
+        os.system('mkdir -p /tmp/oil_comp_dirs/dir')
+        os.system('touch /tmp/oil_comp_dirs/file')
+        os.system('ln -s dir /tmp/oil_comp_dirs/link')
+        os.system('ln -s nonexistent /tmp/oil_comp_dirs/dangling')
+
+        a = completion.FileSystemAction(True, False, False)
+        comp = self._CompApi([], 0, '/tmp/oil_comp_dirs/')
+        self.assertEqual(
+            ['/tmp/oil_comp_dirs/dir', '/tmp/oil_comp_dirs/link'],
+            sorted(a.Matches(comp)))
+        self.assertEqual(
+            {
+                '/tmp/oil_comp_dirs/dangling': False,
+                '/tmp/oil_comp_dirs/dir': True,
+                '/tmp/oil_comp_dirs/file': False,
+                '/tmp/oil_comp_dirs/link': True,
+            }, comp.path_is_dir)
+
         EXEC_ONLY_CASES = [('i', ['install'])]
 
         a = completion.FileSystemAction(False, True, False)
@@ -204,7 +225,7 @@ class CompletionTest(unittest.TestCase):
                                               arena=arena)
         node = c_parser.ParseLogicalLine()
         proc = value.Proc(node.name, node.name_tok, proc_sig.Open, node.body,
-                          [], True)
+                          [], True, 0)
 
         cmd_ev = test_lib.InitCommandEvaluator(arena=arena)
 
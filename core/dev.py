@@ -3,16 +3,20 @@ dev.py - Devtools / introspection.
 """
 from __future__ import print_function
 
+import time as time_
+
 from _devbuild.gen.option_asdl import option_i, builtin_i, builtin_t
 from _devbuild.gen.runtime_asdl import (cmd_value, scope_e, trace, trace_e,
                                         trace_t)
-from _devbuild.gen.syntax_asdl import assign_op_e, Token
+from _devbuild.gen.syntax_asdl import assign_op_e, command_e, Token
 from _devbuild.gen.value_asdl import (value, value_e, value_t, sh_lvalue,
                                       sh_lvalue_e, LeftName)
 
+from core import bash_impl
 from core import error
 from core import optview
 from core import num
+from core import pyos
 from core import state
 from core import ui
 from data_lang import j8
@@ -28,7 +32,8 @@ import posix_ as posix
 
 from typing import List, Dict, Optional, Any, cast, TYPE_CHECKING
 if TYPE_CHECKING:
-    from _devbuild.gen.syntax_asdl import assign_op_t, CompoundWord
+    from _devbuild.gen.syntax_asdl import (assign_op_t, command_t,
+                                           CompoundWord, SourceLine)
     from _devbuild.gen.runtime_asdl import scope_t
     from _devbuild.gen.value_asdl import sh_lvalue_t
     from core import alloc
@@ -218,6 +223,15 @@ def _PrintShValue(val, buf):
             parts.append(')')
             result = ' '.join(parts)
 
+        elif case(value_e.SparseArray):
+            val = cast(value.SparseArray, UP_val)
+            parts = ['(']
+            for i in bash_impl.SparseArray_Keys(val):
+                parts.append('[%d]=%s' %
+                             (i, j8_lite.MaybeShellEncode(val.d[i])))
+            parts.append(')')
+            result = ' '.join(parts)
+
         elif case(value_e.BashAssoc):
             val = cast(value.BashAssoc, UP_val)
             parts = ['(']
@@ -290,8 +304,9 @@ class MultiTracer(object):
     PATH=$ORIG_PATH time-helper -x -e -- cc1 "$@"
     """
 
-    def __init__(self, shell_pid, out_dir, dumps, streams, fd_state):
-        # type: (int, str, str, str, process.FdState) -> None
+    def __init__(self, shell_pid, out_dir, dumps, streams, fd_state,
+                 profiler):
+        # type: (int, str, str, str, process.FdState, Profiler) -> None
         """
         out_dir could be auto-generated from root PID?
         """
@@ -300,6 +315,7 @@ class MultiTracer(object):
         self.dumps = dumps
         self.streams = streams
         self.fd_state = fd_state
+        self.profiler = profiler
 
         self.this_pid = shell_pid
 
@@ -321,6 +337,7 @@ class MultiTracer(object):
         self.this_pid = child_pid
         # each process keep track of direct children
         self.hist_argv0.clear()
+        self.profiler.OnNewProcess(child_pid)
 
     def EmitArgv0(self, argv0):
         # type: (str) -> None
@@ -336,6 +353,8 @@ class MultiTracer(object):
 
     def WriteDumps(self):
         # type: () -> None
+        self.profiler.WriteDump()
+
         if len(self.out_dir) == 0:
             return
 
@@ -374,6 +393,320 @@ class MultiTracer(object):
         print_stderr('[%d] Wrote metrics dump to %s' % (self.this_pid, path))
 
 
+class _ProfileEntry(object):
+    """Stats for one proc, func, or source line.
+
+    Lines only use count and excl_secs.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.count = 0
+        self.incl_secs = 0.0
+        self.excl_secs = 0.0
+        self.forks = 0
+        self.execs = 0
+        self.exec_secs = 0.0
+        self.gc_millis = 0.0
+
+
+class _ProfileFrame(object):
+    """A proc or func call that hasn't returned."""
+
+    def __init__(self, name, entry, start_secs, stack_key, caller_line,
+                 caller_src_line):
+        # type: (str, _ProfileEntry, float, str, _ProfileEntry, SourceLine) -> None
+        self.name = name
+        self.entry = entry
+        self.start_secs = start_secs
+        self.stack_key = stack_key  # e.g. '<main>;f;g'
+
+        # Restored when the call returns
+        self.caller_line = caller_line
+        self.caller_src_line = caller_src_line
+
+
+class _PendingExec(object):
+    """An external command that hasn't been reaped."""
+
+    def __init__(self, entry, start_secs):
+        # type: (_ProfileEntry, float) -> None
+        self.entry = entry
+        self.start_secs = start_secs
+
+
+class Profiler(object):
+    """A deterministic profiler for procs, funcs, and source lines.
+
+    OILS_PROFILE_DIR=_tmp/prof osh ./configure
+
+    Every shell process writes 2 files when it exits, like MultiTracer:
+
+    $PID.profile.json - For each proc or func: calls, inclusive and exclusive
+                        time, forks, external commands and the time until
+                        they're reaped, and GC time.  For each source line:
+                        the number of commands started, and exclusive time.
+
+    $PID.folded       - Exclusive microseconds for each call stack, in the
+                        format that flamegraph.pl, speedscope, etc. read.
+
+    Instead of sampling, we read the clock when each command starts, and when
+    a proc or func is called or returns.  The time between 2 readings is
+    charged to the current line and the proc on top of the stack.  Time spent
+    waiting for a child process is charged the same way.
+
+    Top level code is charged to the <main> entry.
+    """
+
+    def __init__(self, shell_pid, out_dir, fd_state):
+        # type: (int, str, process.FdState) -> None
+        self.out_dir = out_dir
+        self.enabled = len(out_dir) != 0
+        self.fd_state = fd_state
+        self.this_pid = shell_pid
+
+        self.funcs = {}  # type: Dict[str, _ProfileEntry]
+        self.lines = {}  # type: Dict[str, _ProfileEntry]
+        self.folded = {}  # type: Dict[str, float]
+        self.pending = {}  # type: Dict[int, _PendingExec]
+
+        self.stack = []  # type: List[_ProfileFrame]
+        # How many times each name is on the stack, so recursive calls don't
+        # count toward inclusive time twice
+        self.depth = {}  # type: Dict[str, int]
+
+        self.cur_line = None  # type: _ProfileEntry
+        self.cur_src_line = None  # type: SourceLine
+
+        self.start_secs = 0.0
+        self.last_secs = 0.0
+        self.last_gc_millis = 0.0
+
+        if self.enabled:
+            self._Reset()
+            self.PushFrame('<main>')
+
+    def _Reset(self):
+        # type: () -> None
+        self.start_secs = time_.time()
+        self.last_secs = self.start_secs
+        self.last_gc_millis = pyos.GcMillis()
+
+    def _Entry(self, name):
+        # type: (str) -> _ProfileEntry
+        entry = self.funcs.get(name)
+        if entry is None:
+            entry = _ProfileEntry()
+            self.funcs[name] = entry
+        return entry
+
+    def _Checkpoint(self):
+        # type: () -> None
+        """Charge the time since the last reading."""
+        now = time_.time()
+        gc_millis = pyos.GcMillis()
+        elapsed = now - self.last_secs
+
+        frame = self.stack[-1]
+        frame.entry.excl_secs += elapsed
+        frame.entry.gc_millis += gc_millis - self.last_gc_millis
+        self.folded[frame.stack_key] = (self.folded.get(frame.stack_key, 0.0) +
+                                        elapsed)
+        if self.cur_line:
+            self.cur_line.excl_secs += elapsed
+
+        self.last_secs = now
+        self.last_gc_millis = gc_millis
+
+    def OnCommand(self, node):
+        # type: (command_t) -> None
+        """Called before each command is executed."""
+        if node.tag() == command_e.Sentence:  # its child is counted
+            return
+        tok = location.TokenForCommand(node)
+        if tok is None or tok.line is None:
+            return
+
+        self._Checkpoint()
+
+        if tok.line is not self.cur_src_line:
+            key = '%s:%d' % (ui.GetLineSourceString(
+                tok.line), tok.line.line_num)
+            entry = self.lines.get(key)
+            if entry is None:
+                entry = _ProfileEntry()
+                self.lines[key] = entry
+            self.cur_line = entry
+            self.cur_src_line = tok.line
+
+        self.cur_line.count += 1
+
+    def PushFrame(self, name):
+        # type: (str) -> None
+        if not self.enabled:
+            return
+
+        if len(self.stack):
+            self._Checkpoint()
+            stack_key = '%s;%s' % (self.stack[-1].stack_key, name)
+        else:
+            stack_key = name
+
+        entry = self._Entry(name)
+        entry.count += 1
+        self.depth[name] = self.depth.get(name, 0) + 1
+
+        self.stack.append(
+            _ProfileFrame(name, entry, self.last_secs, stack_key,
+                          self.cur_line, self.cur_src_line))
+
+    def PopFrame(self):
+        # type: () -> None
+        if not self.enabled:
+            return
+
+        self._Checkpoint()
+        frame = self.stack.pop()
+
+        d = self.depth[frame.name] - 1
+        self.depth[frame.name] = d
+        if d == 0:
+            frame.entry.incl_secs += self.last_secs - frame.start_secs
+
+        self.cur_line = frame.caller_line
+        self.cur_src_line = frame.caller_src_line
+
+    def OnProcessStart(self, pid, why):
+        # type: (int, trace_t) -> None
+        if not self.enabled:
+            return
+
+        entry = self.stack[-1].entry
+        entry.forks += 1
+        if why.tag() == trace_e.External:
+            entry.execs += 1
+            self.pending[pid] = _PendingExec(entry, time_.time())
+
+    def OnProcessEnd(self, pid):
+        # type: (int) -> None
+        if not self.enabled:
+            return
+
+        p = self.pending.get(pid)
+        if p:
+            p.entry.exec_secs += time_.time() - p.start_secs
+            mylib.dict_erase(self.pending, pid)
+
+    def OnNewProcess(self, child_pid):
+        # type: (int) -> None
+        """In a forked child, start over, but keep the call stack.
+
+        So stacks in $PID.folded are prefixed by the procs that forked.
+        """
+        if not self.enabled:
+            return
+
+        self.this_pid = child_pid
+        self.funcs.clear()
+        self.lines.clear()
+        self.folded.clear()
+        self.pending.clear()
+        self._Reset()
+
+        for frame in self.stack:
+            frame.entry = self._Entry(frame.name)
+            frame.start_secs = self.start_secs
+            frame.caller_line = None
+            frame.caller_src_line = None
+        self.cur_line = None
+        self.cur_src_line = None
+
+    def _WriteFile(self, name, contents):
+        # type: (str, str) -> None
+        path = os_path.join(self.out_dir, '%d.%s' % (self.this_pid, name))
+        try:
+            f = self.fd_state.OpenForWrite(path)
+        except (IOError, OSError) as e:
+            # Ignore error, like MultiTracer
+            return
+        f.write(contents)
+        f.close()
+
+    def WriteDump(self):
+        # type: () -> None
+        if not self.enabled:
+            return
+
+        self._Checkpoint()
+
+        # Procs that haven't returned, e.g. because of 'exit'
+        open_incl = {}  # type: Dict[str, float]
+        for frame in self.stack:
+            if frame.name not in open_incl:
+                open_incl[frame.name] = self.last_secs - frame.start_secs
+
+        funcs = []  # type: List[value_t]
+        for name, entry in iteritems(self.funcs):
+            incl_secs = entry.incl_secs + open_incl.get(name, 0.0)
+            row = {
+                'name': value.Str(name),
+                'calls': num.ToBig(entry.count),
+                'incl_ms': value.Float(incl_secs * 1000.0),
+                'excl_ms': value.Float(entry.excl_secs * 1000.0),
+                'forks': num.ToBig(entry.forks),
+                'execs': num.ToBig(entry.execs),
+                'exec_ms': value.Float(entry.exec_secs * 1000.0),
+                'gc_ms': value.Float(entry.gc_millis),
+            }  # type: Dict[str, value_t]
+            funcs.append(value.Dict(row))
+
+        lines = []  # type: List[value_t]
+        for line, entry in iteritems(self.lines):
+            line_row = {
+                'line': value.Str(line),
+                'count': num.ToBig(entry.count),
+                'excl_ms': value.Float(entry.excl_secs * 1000.0),
+            }  # type: Dict[str, value_t]
+            lines.append(value.Dict(line_row))
+
+        wall_secs = self.last_secs - self.start_secs
+        j = {
+            'pid': num.ToBig(self.this_pid),
+            'wall_ms': value.Float(wall_secs * 1000.0),
+            'funcs': value.List(funcs),
+            'lines': value.List(lines),
+        }  # type: Dict[str, value_t]
+
+        buf = mylib.BufWriter()
+        j8.PrintMessage(value.Dict(j), buf, 2)
+        self._WriteFile('profile.json', buf.getvalue())
+
+        buf = mylib.BufWriter()
+        for stack_key, secs in iteritems(self.folded):
+            micros = mops.FromFloat(secs * 1000000.0)
+            if mops.Equal(micros, mops.ZERO):
+                continue
+            buf.write('%s %s\n' % (stack_key, mops.ToStr(micros)))
+        self._WriteFile('folded', buf.getvalue())
+
+
+class ctx_Profile(object):
+    """Records a proc or func call in the Profiler."""
+
+    def __init__(self, profiler, name):
+        # type: (Profiler, str) -> None
+        profiler.PushFrame(name)
+        self.profiler = profiler
+
+    def __enter__(self):
+        # type: () -> None
+        pass
+
+    def __exit__(self, type, value, traceback):
+        # type: (Any, Any, Any) -> None
+        self.profiler.PopFrame()
+
+
 class Tracer(object):
     """For OSH set -x, and YSH hierarchical, parsable tracing.
 
@@ -529,6 +862,8 @@ class Tracer(object):
                 assert len(why.argv) > 0
                 self.multi_trace.EmitArgv0(why.argv[0])
 
+        self.multi_trace.profiler.OnProcessStart(pid, why)
+
         buf = self._RichTraceBegin('|')
         if not buf:
             return
@@ -566,6 +901,8 @@ class Tracer(object):
 
     def OnProcessEnd(self, pid, status):
         # type: (int, int) -> None
+        self.multi_trace.profiler.OnProcessEnd(pid)
+
         buf = self._RichTraceBegin(';')
         if not buf:
             return
@@ -4,13 +4,30 @@ from __future__ import print_function
 from errno import EINTR
 
 from _devbuild.gen.id_kind_asdl import Id
-from _devbuild.gen.option_asdl import builtin_i
+from _devbuild.gen.option_asdl import builtin_i, option_i
 from _devbuild.gen.runtime_asdl import RedirValue, trace
 from _devbuild.gen.syntax_asdl import (
     command,
     command_e,
+    command_t,
+    condition,
+    condition_e,
     CommandSub,
     CompoundWord,
+    BraceGroup,
+    BracedVarSub,
+    DoubleQuoted,
+    SimpleVarSub,
+    Redir,
+    redir_loc_e,
+    redir_param_e,
+    rhs_word_e,
+    rhs_word_t,
+    suffix_op,
+    suffix_op_e,
+    word_e,
+    word_part_e,
+    word_part_t,
     loc,
     loc_t,
 )
@@ -21,12 +38,14 @@ from core import error
 from core import process
 from core.error import e_die, e_die_status
 from core import pyos
+from core import pyutil
 from core import state
 from core import ui
 from core import vm
 from frontend import consts
 from frontend import lexer
-from mycpp.mylib import log
+from mycpp.mylib import log, tagswitch
+from osh import word_
 
 import posix_ as posix
 
@@ -34,7 +53,6 @@ from typing import cast, Dict, List, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from _devbuild.gen.runtime_asdl import (cmd_value, CommandStatus,
                                             StatusArray)
-    from _devbuild.gen.syntax_asdl import command_t
     from builtin import trap_osh
     from core import optview
     from core import state
@@ -100,6 +118,124 @@ DEFAULT_PATH = [
 ]
 
 
+def _ReadAll(fd, chunks):
+    # type: (int, List[str]) -> None
+    """Read the output of a command sub until EOF."""
+    while True:
+        n, err_num = pyos.Read(fd, 4096, chunks)
+
+        if n < 0:
+            if err_num == EINTR:
+                pass  # retry
+            else:
+                # Like the top level IOError handler
+                e_die_status(
+                    2, 'osh I/O error (read): %s' % posix.strerror(err_num))
+
+        elif n == 0:  # EOF
+            break
+
+
+# Builtins that don't change shell state, so $(echo hi) can run without
+# forking.  'printf -v' and 'printf %(fmt)T' are checked separately.
+_PURE_BUILTINS = [
+    builtin_i.echo, builtin_i.printf, builtin_i.write, builtin_i.pwd,
+    builtin_i.true_, builtin_i.false_, builtin_i.test, builtin_i.bracket
+]
+
+# These variables differ in a subshell, or change when they're read
+_IMPURE_VARS = ['BASHPID', 'RANDOM']
+
+# Limit on nested function calls when checking a command sub body
+_MAX_PURE_DEPTH = 8
+
+
+def _IsPureWordPart(part):
+    # type: (word_part_t) -> bool
+    """Can evaluating this part change the state of the shell?
+
+    Returns False for ${x:=default}, $((i++)), nested command subs, etc.
+    Errors like ${x?} are OK: they're reported the same way in the shell
+    process.
+    """
+    UP_part = part
+    with tagswitch(part) as case:
+        if case(word_part_e.Literal, word_part_e.EscapedLiteral,
+                word_part_e.SingleQuoted, word_part_e.TildeSub):
+            return True
+
+        elif case(word_part_e.DoubleQuoted):
+            part = cast(DoubleQuoted, UP_part)
+            for p in part.parts:
+                if not _IsPureWordPart(p):
+                    return False
+            return True
+
+        elif case(word_part_e.SimpleVarSub):
+            part = cast(SimpleVarSub, UP_part)
+            if part.tok.id == Id.VSub_DollarName:
+                return lexer.LazyStr(part.tok) not in _IMPURE_VARS
+            return True
+
+        elif case(word_part_e.BracedVarSub):
+            part = cast(BracedVarSub, UP_part)
+            if part.var_name in _IMPURE_VARS:
+                return False
+            # ${!ref} and ${a[i++]} can evaluate arithmetic
+            if part.bracket_op is not None:
+                return False
+            if part.prefix_op is not None and part.prefix_op.id != Id.VSub_Pound:
+                return False
+            if part.suffix_op is None:
+                return True
+
+            op = part.suffix_op
+            UP_op = op
+            with tagswitch(op) as case2:
+                if case2(suffix_op_e.Unary):
+                    op = cast(suffix_op.Unary, UP_op)
+                    # ${x:=default} assigns
+                    if op.op.id in (Id.VTest_ColonEquals, Id.VTest_Equals):
+                        return False
+                    return _IsPureRhsWord(op.arg_word)
+
+                elif case2(suffix_op_e.PatSub):
+                    op = cast(suffix_op.PatSub, UP_op)
+                    return (_IsPureWord(op.pat) and
+                            _IsPureRhsWord(op.replace))
+
+                else:  # ${x@P} and ${x:i++} aren't pure
+                    return False
+
+        else:
+            return False
+
+
+def _IsPureWord(w):
+    # type: (CompoundWord) -> bool
+    for part in w.parts:
+        if not _IsPureWordPart(part):
+            return False
+    return True
+
+
+def _IsPureRhsWord(w):
+    # type: (rhs_word_t) -> bool
+    if w.tag() == rhs_word_e.Empty:
+        return True
+    return _IsPureWord(cast(CompoundWord, w))
+
+
+def _IsPureRedirect(r):
+    # type: (Redir) -> bool
+    """{fd}>out assigns a variable, so only descriptors are allowed."""
+    if r.loc.tag() != redir_loc_e.Fd:
+        return False
+    if r.arg.tag() != redir_param_e.Word:
+        return False
+    return _IsPureWord(cast(CompoundWord, r.arg))
+
+
 class ShellExecutor(vm._Executor):
     """An executor combined with the OSH language evaluators in osh/ to create
     a shell interpreter."""
@@ -203,7 +339,7 @@ class ShellExecutor(vm._Executor):
 
         builtin_func = self.builtins[builtin_id]
 
-        with vm.ctx_FlushStdout():
+        with vm.ctx_FlushStdout(self.exec_opts):
             # note: could be second word, like 'builtin read'
             with ui.ctx_Location(self.errfmt, cmd_val.arg_locs[0]):
                 try:
@@ -450,6 +586,176 @@ class ShellExecutor(vm._Executor):
 
         return p.RunProcess(self.waiter, trace.ForkWait)
 
+    def _IsPureCommand(self, node, depth):
+        # type: (command_t, int) -> bool
+        """Can this command sub body run in the shell process?
+
+        It must not change shell state, like variables, options, traps, or the
+        working directory.  So it can only call builtins in _PURE_BUILTINS,
+        and shell functions made of them.  Output to other files is OK, e.g.
+        echo error >&2.
+
+        This is checked at runtime because a name may refer to a function.
+        """
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(command_e.Simple):
+                node = cast(command.Simple, UP_node)
+                if (len(node.more_env) or node.typed_args or node.block or
+                        len(node.words) == 0):
+                    return False
+                for w in node.words:
+                    if w.tag() != word_e.Compound:
+                        return False
+                    if not _IsPureWord(cast(CompoundWord, w)):
+                        return False
+                for r in node.redirects:
+                    if not _IsPureRedirect(r):
+                        return False
+
+                ok, arg0, _ = word_.StaticEval(node.words[0])
+                if not ok:
+                    return False
+
+                # Same lookup order as RunSimpleCommand()
+                if consts.LookupSpecialBuiltin(arg0) != consts.NO_INDEX:
+                    return arg0 == ':'
+
+                proc_node = self.procs.get(arg0)
+                if proc_node is not None:
+                    if depth == _MAX_PURE_DEPTH:
+                        return False
+                    return self._IsPureCommand(proc_node.body, depth + 1)
+
+                if self.hay_state.Resolve(arg0):
+                    return False
+
+                builtin_id = consts.LookupNormalBuiltin(arg0)
+                if builtin_id not in _PURE_BUILTINS:
+                    return False
+
+                if builtin_id == builtin_i.printf and len(node.words) >= 2:
+                    # Rule out printf -v, which assigns a variable, and
+                    # %(fmt)T, which calls tzset()
+                    ok, arg1, _ = word_.StaticEval(node.words[1])
+                    if not ok or arg1.startswith('-') or '%(' in arg1:
+                        return False
+                return True
+
+            elif case(command_e.Sentence):
+                node = cast(command.Sentence, UP_node)
+                return self._IsPureCommand(node.child, depth)
+
+            elif case(command_e.CommandList):
+                node = cast(command.CommandList, UP_node)
+                return self._IsPureList(node.children, depth)
+
+            elif case(command_e.BraceGroup):
+                node = cast(BraceGroup, UP_node)
+                for r in node.redirects:
+                    if not _IsPureRedirect(r):
+                        return False
+                return self._IsPureList(node.children, depth)
+
+            elif case(command_e.AndOr):
+                node = cast(command.AndOr, UP_node)
+                return self._IsPureList(node.children, depth)
+
+            elif case(command_e.If):
+                node = cast(command.If, UP_node)
+                if len(node.redirects):
+                    return False
+                for if_arm in node.arms:
+                    if if_arm.cond.tag() != condition_e.Shell:
+                        return False
+                    cond = cast(condition.Shell, if_arm.cond)
+                    if not self._IsPureList(cond.commands, depth):
+                        return False
+                    if not self._IsPureList(if_arm.action, depth):
+                        return False
+                return self._IsPureList(node.else_action, depth)
+
+            elif case(command_e.ControlFlow):
+                node = cast(command.ControlFlow, UP_node)
+                # 'return' in a function, but not at the top level
+                if node.keyword.id != Id.ControlFlow_Return or depth == 0:
+                    return False
+                if node.arg_word is None:
+                    return True
+                if node.arg_word.tag() != word_e.Compound:
+                    return False
+                return _IsPureWord(cast(CompoundWord, node.arg_word))
+
+            else:
+                return False
+
+    def _IsPureList(self, children, depth):
+        # type: (List[command_t], int) -> bool
+        for child in children:
+            if not self._IsPureCommand(child, depth):
+                return False
+        return True
+
+    def _CanRunInShell(self, node):
+        # type: (command_t) -> bool
+        # Traps aren't inherited by the subshell, but they would run here
+        for hook_name in ['ERR', 'DEBUG', 'RETURN']:
+            if self.trap_state.GetHook(hook_name) is not None:
+                return False
+        # xtrace shows the process that runs the command sub
+        if self.exec_opts.xtrace():
+            return False
+        return self._IsPureCommand(node, 0)
+
+    def _RunCommandSubInShell(self, node, fd):
+        # type: (command_t, int) -> int
+        """Run a pure command sub body with stdout going to fd.
+
+        Like SubProgramThunk.Run(), but the status registers and $_ are
+        restored instead of being thrown away with the process.
+        """
+        last_arg = self.mem.last_arg
+
+        opt_nums = []  # type: List[int]
+        if not self.exec_opts.inherit_errexit():
+            opt_nums.append(option_i.errexit)
+
+        pyos.FlushStdout()
+        self.fd_state.PushStdoutToFile(fd)
+
+        io_errors = []  # type: List[error.IOError_OSError]
+        with vm.ctx_Redirect(self, 1, io_errors):
+            with state.ctx_Registers(self.mem):
+                with state.ctx_Option(self.mutable_opts, opt_nums, False):
+                    self.cmd_ev.ExecuteAndCatch(node)
+                status = self.mem.LastStatus()
+            pyos.FlushStdout()
+        if len(io_errors):
+            e_die("Fatal error popping redirect: %s" %
+                  pyutil.strerror(io_errors[0]))
+
+        self.mem.SetLastArgument(last_arg)
+        return status
+
+    def _ForkCommandSub(self, node, chunks):
+        # type: (command_t, List[str]) -> int
+        p = self._MakeProcess(node,
+                              inherit_errexit=self.exec_opts.inherit_errexit())
+        # Shell quirk: Command subs remain part of the shell's process group, so we
+        # don't use p.AddStateChange(process.SetPgid(...))
+
+        r, w = posix.pipe()
+        p.AddStateChange(process.StdoutToPipe(r, w))
+
+        p.StartProcess(trace.CommandSub)
+        #log('Command sub started %d', pid)
+
+        posix.close(w)  # not going to write
+        _ReadAll(r, chunks)
+        posix.close(r)
+
+        return p.Wait(self.waiter)
+
     def RunCommandSub(self, cs_part):
         # type: (CommandSub) -> str
 
@@ -465,50 +771,45 @@ class ShellExecutor(vm._Executor):
 
         node = cs_part.child
 
+        status = -1
+        stdout_str = ''
+
         # Hack for weird $(<file) construct
         if node.tag() == command_e.Simple:
             simple = cast(command.Simple, node)
             # Detect '< file'
             if (len(simple.words) == 0 and len(simple.redirects) == 1 and
                     simple.redirects[0].op.id == Id.Redir_Less):
-                # change it to __cat < file
-                # TODO: change to 'internal cat' (issue 1013)
-                tok = lexer.DummyToken(Id.Lit_Chars, '__cat')
-                cat_word = CompoundWord([tok])
-                # MUTATE the command.Simple node.  This will only be done the first
-                # time in the parent process.
-                simple.words.append(cat_word)
-
-        p = self._MakeProcess(node,
-                              inherit_errexit=self.exec_opts.inherit_errexit())
-        # Shell quirk: Command subs remain part of the shell's process group, so we
-        # don't use p.AddStateChange(process.SetPgid(...))
-
-        r, w = posix.pipe()
-        p.AddStateChange(process.StdoutToPipe(r, w))
-
-        p.StartProcess(trace.CommandSub)
-        #log('Command sub started %d', pid)
-
-        chunks = []  # type: List[str]
-        posix.close(w)  # not going to write
-        while True:
-            n, err_num = pyos.Read(r, 4096, chunks)
-
-            if n < 0:
-                if err_num == EINTR:
-                    pass  # retry
+                r = simple.redirects[0]
+                if len(simple.more_env) == 0 and _IsPureRedirect(r):
+                    # Read the file directly
+                    status, stdout_str = self.cmd_ev.ReadRedirectedFile(r)
                 else:
-                    # Like the top level IOError handler
+                    # change it to __cat < file
+                    # TODO: change to 'internal cat' (issue 1013)
+                    tok = lexer.DummyToken(Id.Lit_Chars, '__cat')
+                    cat_word = CompoundWord([tok])
+                    # MUTATE the command.Simple node.  This will only be done the first
+                    # time in the parent process.
+                    simple.words.append(cat_word)
+
+        if status == -1:
+            chunks = []  # type: List[str]
+            fd = -1
+            if self._CanRunInShell(node):
+                fd, _ = pyos.TempFile()  # on failure, fall back to fork()
+
+            if fd != -1:
+                status = self._RunCommandSubInShell(node, fd)
+                err_num = pyos.Rewind(fd)
+                if err_num != 0:
                     e_die_status(
-                        2,
-                        'osh I/O error (read): %s' % posix.strerror(err_num))
-
-            elif n == 0:  # EOF
-                break
-        posix.close(r)
-
-        status = p.Wait(self.waiter)
+                        2, 'osh I/O error (lseek): %s' % posix.strerror(err_num))
+                _ReadAll(fd, chunks)
+                posix.close(fd)
+            else:
+                status = self._ForkCommandSub(node, chunks)
+            stdout_str = ''.join(chunks)
 
         # OSH has the concept of aborting in the middle of a WORD.  We're not
         # waiting until the command is over!
@@ -532,7 +833,7 @@ class ShellExecutor(vm._Executor):
         # Runtime errors test case: # $("echo foo > $@")
         # Why rstrip()?
         # https://unix.stackexchange.com/questions/17747/why-does-shell-command-substitution-gobble-up-a-trailing-newline-char
-        return ''.join(chunks).rstrip('\n')
+        return stdout_str.rstrip('\n')
 
     def RunProcessSub(self, cs_part):
         # type: (CommandSub) -> str
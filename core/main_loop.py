@@ -6,6 +6,10 @@ Variants:
   main_loop.Headless()       calls Batch() like eval and source.
                                    We want 'echo 1\necho 2\n' to work, so we
                                    don't bother with "the PS2 problem".
+                             Its PARSE command saves the parsed code, and EXEC
+                             runs it with BatchParsed().
+  main_loop.BatchParsed()    calls ExecuteAndCatch() on nodes that Batch()
+                             recorded.  Used by the 'source' cache.
   main_loop.ParseWholeFile() calls ParseLogicalLine().  Used by osh -n.
 """
 from __future__ import print_function
@@ -15,6 +19,7 @@ from _devbuild.gen.syntax_asdl import (command, command_t, parse_result,
                                        parse_result_e)
 from core import error
 from core import process
+from core import pyos
 from core import ui
 from core import util
 from frontend import reader
@@ -25,7 +30,7 @@ from mycpp.mylib import log, print_stderr, probe, tagswitch
 import fanos
 import posix_ as posix
 
-from typing import cast, Any, List, TYPE_CHECKING
+from typing import cast, Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.comp_ui import _IDisplay
     from core.ui import ErrorFormatter
@@ -38,7 +43,7 @@ _ = log
 
 
 class ctx_Descriptors(object):
-    """Save and restore descriptor state for the headless EVAL command."""
+    """Save and restore descriptor state for headless commands."""
 
     def __init__(self, fds):
         # type: (List[int]) -> None
@@ -98,7 +103,11 @@ def ShowDescriptorState(label):
 
 
 class Headless(object):
-    """Main loop for headless mode."""
+    """Main loop for headless mode.
+
+    PARSE saves the parsed code under an integer handle, so a client can EXEC
+    it many times without lexing and parsing it again.
+    """
 
     def __init__(self, cmd_ev, parse_ctx, errfmt):
         # type: (CommandEvaluator, parse_lib.ParseContext, ErrorFormatter) -> None
@@ -106,6 +115,9 @@ class Headless(object):
         self.parse_ctx = parse_ctx
         self.errfmt = errfmt
 
+        self.parsed = {}  # type: Dict[int, ParsedFile]
+        self.next_handle = 1
+
     def Loop(self):
         # type: () -> int
         try:
@@ -130,6 +142,65 @@ class Headless(object):
 
         return ''  # result is always 'OK ' since there was no protocol error
 
+    def PARSE(self, arg):
+        # type: (str) -> str
+        """Parse code without running it.
+
+        Unlike EVAL, the whole string is parsed up front, so aliases it defines
+        don't apply to its own lines.
+
+        Returns a handle for EXEC, or -1 if there's a syntax error.
+        """
+        line_reader = reader.StringLineReader(arg, self.parse_ctx.arena)
+        c_parser = self.parse_ctx.MakeOshParser(line_reader)
+
+        parsed = ParsedFile()
+        while True:
+            try:
+                node = c_parser.ParseLogicalLine()
+                if node is None:  # EOF
+                    c_parser.CheckForPendingHereDocs()
+                    break
+            except error.Parse as e:
+                self.errfmt.PrettyPrintError(e)
+                return '-1'
+
+            parsed.nodes.append(node)
+            c_parser.arena.DiscardLines()
+
+        parsed.complete = True
+
+        handle = self.next_handle
+        self.next_handle += 1
+        self.parsed[handle] = parsed
+        return str(handle)
+
+    def _GetParsed(self, arg):
+        # type: (str) -> Tuple[int, ParsedFile]
+        try:
+            handle = int(arg)
+        except ValueError:
+            handle = -1
+
+        parsed = self.parsed.get(handle)
+        if parsed is None:
+            raise ValueError('Invalid handle %r' % arg)
+        return handle, parsed
+
+    def EXEC(self, arg):
+        # type: (str) -> str
+        """Run code saved by PARSE.  Returns the exit status."""
+        _, parsed = self._GetParsed(arg)
+        status = BatchParsed(self.cmd_ev, parsed.nodes)
+        return str(status)
+
+    def FREE(self, arg):
+        # type: (str) -> str
+        """Forget code saved by PARSE."""
+        handle, _ = self._GetParsed(arg)
+        mylib.dict_erase(self.parsed, handle)
+        return ''
+
     def _Loop(self):
         # type: () -> int
         fanos_log(
@@ -177,8 +248,24 @@ class Headless(object):
             # Note: lang == 'osh' or lang == 'ysh' puts this in different modes.
             # Do we also need 'complete --osh' and 'complete --ysh' ?
             elif command == 'PARSE':
-                # Just parse
-                reply = 'TODO:PARSE'
+                # Syntax errors go to the stderr we were passed, if any
+                if len(fd_out) == 3:
+                    with ctx_Descriptors(fd_out):
+                        reply = self.PARSE(arg)
+                elif len(fd_out) == 0:
+                    reply = self.PARSE(arg)
+                else:
+                    raise ValueError('Expected 0 or 3 file descriptors')
+
+            elif command == 'EXEC':
+                if len(fd_out) != 3:
+                    raise ValueError('Expected 3 file descriptors')
+
+                with ctx_Descriptors(fd_out):
+                    reply = self.EXEC(arg)
+
+            elif command == 'FREE':
+                reply = self.FREE(arg)
 
             else:
                 fanos_log('Invalid command %r' % command)
@@ -213,6 +300,7 @@ def Interactive(
 
         while True:  # ONLY EXECUTES ONCE
             quit = False
+            pyos.FlushStdout()  # in case of shopt -s buffer_stdout
             prompt_plugin.Run()
             try:
                 # may raise HistoryError or ParseError
@@ -311,8 +399,27 @@ def Interactive(
     return status
 
 
-def Batch(cmd_ev, c_parser, errfmt, cmd_flags=0):
-    # type: (CommandEvaluator, CommandParser, ui.ErrorFormatter, int) -> int
+class ParsedFile(object):
+    """The top-level commands of a file, recorded by Batch().
+
+    If 'complete' is set, every line was parsed, and BatchParsed() can run the
+    file again without lexing and parsing it.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.nodes = []  # type: List[command_t]
+        self.complete = False
+
+
+def Batch(
+        cmd_ev,  # type: CommandEvaluator
+        c_parser,  # type: CommandParser
+        errfmt,  # type: ui.ErrorFormatter
+        cmd_flags=0,  # type: int
+        parsed=None,  # type: Optional[ParsedFile]
+):
+    # type: (...) -> int
     """Loop for batch execution.
 
     Returns:
@@ -341,12 +448,17 @@ def Batch(cmd_ev, c_parser, errfmt, cmd_flags=0):
             node = c_parser.ParseLogicalLine()  # can raise ParseError
             if node is None:  # EOF
                 c_parser.CheckForPendingHereDocs()  # can raise ParseError
+                if parsed is not None:
+                    parsed.complete = True
                 break
         except error.Parse as e:
             errfmt.PrettyPrintError(e)
             status = 2
             break
 
+        if parsed is not None:
+            parsed.nodes.append(node)
+
         # After every "logical line", no lines will be referenced by the Arena.
         # Tokens in the LST still point to many lines, but lines with only comment
         # or whitespace won't be reachable, so the GC will free them.
@@ -375,6 +487,25 @@ def Batch(cmd_ev, c_parser, errfmt, cmd_flags=0):
     return status
 
 
+def BatchParsed(cmd_ev, nodes, cmd_flags=0):
+    # type: (CommandEvaluator, List[command_t], int) -> int
+    """Like Batch(), but runs commands that were already parsed."""
+    status = 0
+    for node in nodes:
+        probe('main_loop', 'Batch_execute_enter')
+        is_return, is_fatal = cmd_ev.ExecuteAndCatch(node, cmd_flags=cmd_flags)
+        status = cmd_ev.LastStatus()
+        if is_return or is_fatal:
+            break
+        probe('main_loop', 'Batch_execute_exit')
+
+        probe('main_loop', 'Batch_collect_enter')
+        mylib.MaybeCollect()  # manual GC point
+        probe('main_loop', 'Batch_collect_exit')
+
+    return status
+
+
 def ParseWholeFile(c_parser):
     # type: (CommandParser) -> command_t
     """Parse an entire shell script.
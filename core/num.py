@@ -4,12 +4,48 @@ from __future__ import print_function
 from _devbuild.gen.value_asdl import value
 from mycpp import mops
 
+from typing import List
+
+# Like CPython, share the value.Int instances for small integers
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+
 
 def ToBig(i):
     # type: (int) -> value.Int
     return value.Int(mops.IntWiden(i))
 
 
+class SmallInts(object):
+    """Preallocated value.Int instances for SMALL_INT_MIN to SMALL_INT_MAX.
+
+    value.Int is never mutated, so loop counters, list indices, and the results
+    of arithmetic can share them instead of allocating.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.ints = []  # type: List[value.Int]
+        for i in xrange(SMALL_INT_MIN, SMALL_INT_MAX + 1):
+            self.ints.append(value.Int(mops.IntWiden(i)))
+
+        self.min_big = mops.IntWiden(SMALL_INT_MIN)
+        self.max_big = mops.IntWiden(SMALL_INT_MAX)
+
+    def Int(self, big):
+        # type: (mops.BigInt) -> value.Int
+        if mops.Greater(self.min_big, big) or mops.Greater(big, self.max_big):
+            return value.Int(big)
+        return self.ints[mops.BigTruncate(big) - SMALL_INT_MIN]
+
+    def FromInt(self, i):
+        # type: (int) -> value.Int
+        """Like ToBig()."""
+        if SMALL_INT_MIN <= i and i <= SMALL_INT_MAX:
+            return self.ints[i - SMALL_INT_MIN]
+        return value.Int(mops.IntWiden(i))
+
+
 def Exponent(x, y):
     # type: (mops.BigInt, mops.BigInt) -> mops.BigInt
 
@@ -0,0 +1,31 @@
+#!/usr/bin/env python2
+"""num_test.py: Tests for num.py."""
+from __future__ import print_function
+
+import unittest
+
+from mycpp import mops
+from core import num  # module under test
+
+
+class SmallIntsTest(unittest.TestCase):
+
+    def testShared(self):
+        small_ints = num.SmallInts()
+
+        for i in [num.SMALL_INT_MIN, -1, 0, 1, 42, num.SMALL_INT_MAX]:
+            a = small_ints.Int(mops.IntWiden(i))
+            b = small_ints.FromInt(i)
+            self.assertIs(a, b)
+            self.assertEqual(i, mops.BigTruncate(a.i))
+
+        for i in [num.SMALL_INT_MIN - 1, num.SMALL_INT_MAX + 1, 1 << 40]:
+            a = small_ints.Int(mops.IntWiden(i))
+            b = small_ints.FromInt(i)
+            self.assertIsNot(a, b)
+            self.assertEqual(i, mops.BigTruncate(a.i))
+            self.assertEqual(i, mops.BigTruncate(b.i))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -496,6 +496,10 @@ class FdState(object):
         """Apply a group of redirects and remember to undo them."""
 
         #log('> fd_state.Push %s', redirects)
+
+        # Buffered output goes to the descriptor it was written under
+        pyos.FlushStdout()
+
         new_frame = _FdFrame()
         self.stack.append(new_frame)
         self.cur_frame = new_frame
@@ -527,8 +531,22 @@ class FdState(object):
         self._PushDup(r, redir_loc.Fd(0))
         return True
 
+    def PushStdoutToFile(self, fd):
+        # type: (int) -> None
+        """Save the current stdout and make it go to descriptor 'fd'.
+
+        For command subs that are run in the shell process, e.g. $(echo hi).
+        """
+        new_frame = _FdFrame()
+        self.stack.append(new_frame)
+        self.cur_frame = new_frame
+
+        self._PushDup(fd, redir_loc.Fd(1))
+
     def Pop(self, err_out):
         # type: (List[error.IOError_OSError]) -> None
+        pyos.FlushStdout()  # before restoring the old descriptors
+
         frame = self.stack.pop()
         #log('< Pop %s', frame)
         for rf in reversed(frame.saved):
@@ -563,6 +581,17 @@ class FdState(object):
         self.cur_frame.Forget()
 
 
+class SpawnAttrs(object):
+    """What a child process needs before exec(), for posix_spawn()."""
+
+    def __init__(self):
+        # type: () -> None
+        self.pgid = -1  # don't change it
+        self.dups = []  # type: List[int]  # pairs of (old fd, new fd)
+        self.closes = []  # type: List[int]
+        self.sig_defaults = []  # type: List[int]
+
+
 class ChildStateChange(object):
 
     def __init__(self):
@@ -574,6 +603,11 @@ class ChildStateChange(object):
         # type: () -> None
         raise NotImplementedError()
 
+    def AddToSpawn(self, attrs):
+        # type: (SpawnAttrs) -> None
+        """Describe Apply() for posix_spawn()."""
+        raise NotImplementedError()
+
     def ApplyFromParent(self, proc):
         # type: (Process) -> None
         """Noop for all state changes other than SetPgid for mycpp."""
@@ -599,6 +633,13 @@ class StdinFromPipe(ChildStateChange):
         posix.close(self.w)  # we're reading from the pipe, not writing
         #log('child CLOSE w %d pid=%d', self.w, posix.getpid())
 
+    def AddToSpawn(self, attrs):
+        # type: (SpawnAttrs) -> None
+        attrs.dups.append(self.r)
+        attrs.dups.append(0)
+        attrs.closes.append(self.r)
+        attrs.closes.append(self.w)
+
 
 class StdoutToPipe(ChildStateChange):
 
@@ -619,6 +660,13 @@ class StdoutToPipe(ChildStateChange):
         posix.close(self.r)  # we're writing to the pipe, not reading
         #log('child CLOSE r %d pid=%d', self.r, posix.getpid())
 
+    def AddToSpawn(self, attrs):
+        # type: (SpawnAttrs) -> None
+        attrs.dups.append(self.w)
+        attrs.dups.append(1)
+        attrs.closes.append(self.w)
+        attrs.closes.append(self.r)
+
 
 INVALID_PGID = -1
 # argument to setpgid() that means the process is its own leader
@@ -641,6 +689,10 @@ class SetPgid(ChildStateChange):
                 'osh: child %d failed to set its process group to %d: %s' %
                 (posix.getpid(), self.pgid, pyutil.strerror(e)))
 
+    def AddToSpawn(self, attrs):
+        # type: (SpawnAttrs) -> None
+        attrs.pgid = self.pgid
+
     def ApplyFromParent(self, proc):
         # type: (Process) -> None
         try:
@@ -660,17 +712,43 @@ class ExternalProgram(object):
             fd_state,  # type: FdState
             errfmt,  # type: ErrorFormatter
             debug_f,  # type: _DebugFile
+            use_spawn,  # type: bool
     ):
         # type: (...) -> None
         """
         Args:
           hijack_shebang: The path of an interpreter to run instead of the one
             specified in the shebang line.  May be empty.
+          use_spawn: Whether to try posix_spawn() before fork()
         """
         self.hijack_shebang = hijack_shebang
         self.fd_state = fd_state
         self.errfmt = errfmt
         self.debug_f = debug_f
+        self.use_spawn = use_spawn
+
+    def Spawn(self, argv0_path, cmd_val, environ, attrs):
+        # type: (str, cmd_value.Argv, Dict[str, str], SpawnAttrs) -> int
+        """Start a program with posix_spawn(), without forking the shell.
+
+        fork() copies the page tables of the shell, so it gets slower as the
+        heap grows.
+
+        Returns:
+          The PID, or -1 if the caller should fork() and call Exec().  That
+          path handles hijacking, files without a shebang line, and errors.
+        """
+        if not self.use_spawn or len(self.hijack_shebang):
+            return -1
+
+        probe('process', 'ExternalProgram_Spawn', argv0_path)
+        try:
+            return posix.spawn(argv0_path, cmd_val.argv, environ, attrs.pgid,
+                               attrs.dups, attrs.closes, attrs.sig_defaults)
+        except (IOError, OSError):
+            # e.g. ENOEXEC, ENOENT, or ENOSYS if the platform's posix_spawn()
+            # can't report exec() errors
+            return -1
 
     def Exec(self, argv0_path, cmd_val, environ):
         # type: (str, cmd_value.Argv, Dict[str, str]) -> None
@@ -710,6 +788,8 @@ class ExternalProgram(object):
                         #self.debug_f.log('Not hijacking %s (%r)', argv, line)
                         pass
 
+        # Otherwise output from shopt -s buffer_stdout would be lost
+        pyos.FlushStdout()
         try:
             posix.execve(argv0_path, argv, environ)
         except (IOError, OSError) as e:
@@ -760,6 +840,15 @@ class Thunk(object):
         """Returns a status code."""
         raise NotImplementedError()
 
+    def Spawn(self, attrs):
+        # type: (SpawnAttrs) -> int
+        """Start the thunk in a new process without fork(), if it doesn't need
+        to run shell code in the child.
+
+        Returns the PID, or -1 if the caller should fork() and Run() it.
+        """
+        return -1
+
     def UserString(self):
         # type: () -> str
         """Display for the 'jobs' list."""
@@ -795,6 +884,11 @@ class ExternalThunk(Thunk):
         """An ExternalThunk is run in parent for the exec builtin."""
         self.ext_prog.Exec(self.argv0_path, self.cmd_val, self.environ)
 
+    def Spawn(self, attrs):
+        # type: (SpawnAttrs) -> int
+        return self.ext_prog.Spawn(self.argv0_path, self.cmd_val, self.environ,
+                                   attrs)
+
 
 class SubProgramThunk(Thunk):
     """A subprogram that can be executed in another process."""
@@ -1038,48 +1132,72 @@ class Process(Job):
             posix.close(self.close_r)
             posix.close(self.close_w)
 
+    def _Spawn(self):
+        # type: () -> int
+        """Try to start this process with posix_spawn().
+
+        Returns the PID, or -1 if it must be forked.
+        """
+        attrs = SpawnAttrs()
+        for st in self.state_changes:
+            st.AddToSpawn(attrs)
+
+        # Reset the same signals as the forked child below
+        attrs.sig_defaults.extend([SIGPIPE, SIGQUIT, SIGTTOU, SIGTTIN])
+        if attrs.pgid == OWN_LEADER and self.parent_pipeline is None:
+            attrs.sig_defaults.append(SIGTSTP)
+
+        return self.thunk.Spawn(attrs)
+
     def StartProcess(self, why):
         # type: (trace_t) -> int
-        """Start this process with fork(), handling redirects."""
-        pid = posix.fork()
-        if pid < 0:
-            # When does this happen?
-            e_die('Fatal error in posix.fork()')
-
-        elif pid == 0:  # child
-            # Note: this happens in BOTH interactive and non-interactive shells.
-            # We technically don't need to do most of it in non-interactive, since we
-            # did not change state in InitInteractiveShell().
+        """Start this process with posix_spawn() or fork(), handling
+        redirects."""
+        # So the child doesn't inherit, and duplicate, buffered output
+        pyos.FlushStdout()
 
-            for st in self.state_changes:
-                st.Apply()
-
-            # Python sets SIGPIPE handler to SIG_IGN by default.  Child processes
-            # shouldn't have this.
-            # https://docs.python.org/2/library/signal.html
-            # See Python/pythonrun.c.
-            pyos.Sigaction(SIGPIPE, SIG_DFL)
-
-            # Respond to Ctrl-\ (core dump)
-            pyos.Sigaction(SIGQUIT, SIG_DFL)
-
-            # Only standalone children should get Ctrl-Z. Pipelines remain in the
-            # foreground because suspending them is difficult with our 'lastpipe'
-            # semantics.
-            pid = posix.getpid()
-            if posix.getpgid(0) == pid and self.parent_pipeline is None:
-                pyos.Sigaction(SIGTSTP, SIG_DFL)
-
-            # More signals from
-            # https://www.gnu.org/software/libc/manual/html_node/Launching-Jobs.html
-            # (but not SIGCHLD)
-            pyos.Sigaction(SIGTTOU, SIG_DFL)
-            pyos.Sigaction(SIGTTIN, SIG_DFL)
-
-            self.tracer.OnNewProcess(pid)
-            # clear foreground pipeline for subshells
-            self.thunk.Run()
-            # Never returns
+        pid = self._Spawn()
+        spawned = pid != -1
+        if not spawned:
+            pid = posix.fork()
+            if pid < 0:
+                # When does this happen?
+                e_die('Fatal error in posix.fork()')
+
+            elif pid == 0:  # child
+                # Note: this happens in BOTH interactive and non-interactive shells.
+                # We technically don't need to do most of it in non-interactive, since we
+                # did not change state in InitInteractiveShell().
+
+                for st in self.state_changes:
+                    st.Apply()
+
+                # Python sets SIGPIPE handler to SIG_IGN by default.  Child processes
+                # shouldn't have this.
+                # https://docs.python.org/2/library/signal.html
+                # See Python/pythonrun.c.
+                pyos.Sigaction(SIGPIPE, SIG_DFL)
+
+                # Respond to Ctrl-\ (core dump)
+                pyos.Sigaction(SIGQUIT, SIG_DFL)
+
+                # Only standalone children should get Ctrl-Z. Pipelines remain in the
+                # foreground because suspending them is difficult with our 'lastpipe'
+                # semantics.
+                pid = posix.getpid()
+                if posix.getpgid(0) == pid and self.parent_pipeline is None:
+                    pyos.Sigaction(SIGTSTP, SIG_DFL)
+
+                # More signals from
+                # https://www.gnu.org/software/libc/manual/html_node/Launching-Jobs.html
+                # (but not SIGCHLD)
+                pyos.Sigaction(SIGTTOU, SIG_DFL)
+                pyos.Sigaction(SIGTTIN, SIG_DFL)
+
+                self.tracer.OnNewProcess(pid)
+                # clear foreground pipeline for subshells
+                self.thunk.Run()
+                # Never returns
 
         #log('STARTED process %s, pid = %d', self, pid)
         self.tracer.OnProcessStart(pid, why)
@@ -1089,8 +1207,11 @@ class Process(Job):
 
         # SetPgid needs to be applied from the child and the parent to avoid
         # racing in calls to tcsetpgrp() in the parent. See APUE sec. 9.2.
-        for st in self.state_changes:
-            st.ApplyFromParent(self)
+        # posix_spawn() already did it before returning, and setpgid() on a
+        # child that has exec'd fails with EACCES.
+        if not spawned:
+            for st in self.state_changes:
+                st.ApplyFromParent(self)
 
         # Program invariant: We keep track of every child process!
         self.job_list.AddChildProcess(pid, self)
@@ -64,7 +64,9 @@ class ProcessTest(unittest.TestCase):
         self.trap_state = trap_osh.TrapState(signal_safe)
 
         fd_state = None
-        multi_trace = dev.MultiTracer(posix.getpid(), '', '', '', fd_state)
+        profiler = dev.Profiler(posix.getpid(), '', fd_state)
+        multi_trace = dev.MultiTracer(posix.getpid(), '', '', '', fd_state,
+                                      profiler)
         self.tracer = dev.Tracer(None, exec_opts, mutable_opts, mem,
                                  mylib.Stderr(), multi_trace)
         self.waiter = process.Waiter(self.job_list, exec_opts, self.trap_state,
@@ -73,7 +75,7 @@ class ProcessTest(unittest.TestCase):
         self.fd_state = process.FdState(errfmt, self.job_control,
                                         self.job_list, None, self.tracer, None)
         self.ext_prog = process.ExternalProgram('', self.fd_state, errfmt,
-                                                util.NullDebugFile())
+                                                util.NullDebugFile(), True)
 
     def _ExtProc(self, argv):
         arg_vec = cmd_value.Argv(argv, [loc.Missing] * len(argv), None, None,
@@ -120,6 +122,35 @@ class ProcessTest(unittest.TestCase):
         self.assertEqual('one', line1)
         self.assertEqual('one', line2)
 
+    def testStdinRedirectSeekable(self):
+        PATH = '_tmp/one-two-three.txt'
+        with open(PATH, 'w') as f:
+            f.write('one\ntwo\nthree\n')
+
+        r = RedirValue(Id.Redir_Less, runtime.NO_SPID, redir_loc.Fd(0),
+                       redirect_arg.Path(PATH))
+
+        class CommandEvaluator(object):
+
+            def RunPendingTraps(self):
+                pass
+
+        cmd_ev = CommandEvaluator()
+
+        err_out = []
+        self.fd_state.Push([r], err_out)
+        line1, _ = read_osh._ReadPortion(pyos.NEWLINE_CH, -1, cmd_ev)
+        line2, _ = read_osh._ReadPortion(pyos.NEWLINE_CH, 2, cmd_ev)
+
+        # The file is read in chunks, but the offset is just after what
+        # we consumed, so other processes see the rest.
+        rest = os.read(0, 100)
+        self.fd_state.Pop(err_out)
+
+        self.assertEqual('one', line1)
+        self.assertEqual('tw', line2)
+        self.assertEqual('o\nthree\n', rest)
+
     def testProcess(self):
         # 3 fds.  Does Python open it?  Shell seems to have it too.  Maybe it
         # inherits from the shell.
@@ -140,6 +171,39 @@ class ProcessTest(unittest.TestCase):
         # 12 file descriptors open!
         print('FDS AFTER', os.listdir('/dev/fd'))
 
+    def testSpawn(self):
+        errfmt = ui.ErrorFormatter()
+        for use_spawn in [True, False]:
+            self.ext_prog = process.ExternalProgram('', self.fd_state, errfmt,
+                                                    util.NullDebugFile(),
+                                                    use_spawn)
+
+            r, w = posix.pipe()
+            p = self._ExtProc(['echo', 'spawned'])
+            p.AddStateChange(process.StdoutToPipe(r, w))
+            why = trace.External(['echo'])
+            pid = p.StartProcess(why)
+            self.assertEqual(pid, p.pid)
+            posix.close(w)
+
+            self.assertEqual('spawned\n', posix.read(r, 100))
+            posix.close(r)
+            self.assertEqual(0, p.Wait(self.waiter))
+
+            attrs = process.SpawnAttrs()
+            pid = p.thunk.Spawn(attrs)
+            if use_spawn:
+                self.assertNotEqual(-1, pid)
+                posix.waitpid(pid, 0)
+            else:
+                self.assertEqual(-1, pid)
+
+        # Errors are left to the fork() path
+        self.ext_prog = process.ExternalProgram('', self.fd_state, errfmt,
+                                                util.NullDebugFile(), True)
+        p = self._ExtProc(['does-not-exist'])
+        self.assertEqual(-1, p.thunk.Spawn(process.SpawnAttrs()))
+
     def testPipeline(self):
         node = _CommandNode('uniq -c', self.arena)
         cmd_ev = test_lib.InitCommandEvaluator(arena=self.arena,
@@ -6,11 +6,13 @@ Like py{error,util}.py, it won't be translated to C++.
 from __future__ import print_function
 
 from errno import EINTR
+import fcntl
 import pwd
 import resource
 import signal
 import select
 import sys
+import tempfile
 import termios  # for read -n
 import time
 
@@ -109,6 +111,55 @@ def ReadByte(fd):
             return EOF_SENTINEL, 0
 
 
+def SeekCur(fd, delta):
+    # type: (int, int) -> int
+    """C-style wrapper around lseek(fd, delta, SEEK_CUR).
+
+    Returns:
+      0 on success
+      errno on failure, e.g. ESPIPE for pipes and terminals
+
+    With delta 0, this tests whether the fd is seekable, e.g. a regular file.
+    """
+    try:
+        posix.lseek(fd, delta, 1)  # SEEK_CUR
+    except OSError as e:
+        return e.errno
+    return 0
+
+
+def TempFile():
+    # type: () -> Tuple[int, int]
+    """Create an anonymous file that's removed when the descriptor is closed.
+
+    Returns:
+      (-1, errno) on failure
+      (fd, 0) on success.  The fd is open for reading and writing.
+    """
+    try:
+        f = tempfile.TemporaryFile()
+        fd = fcntl.fcntl(f.fileno(), fcntl.F_DUPFD, 0)  # type: int
+        f.close()
+    except (IOError, OSError) as e:
+        return -1, e.errno
+    return fd, 0
+
+
+def Rewind(fd):
+    # type: (int) -> int
+    """C-style wrapper around lseek(fd, 0, SEEK_SET).
+
+    Returns:
+      0 on success
+      errno on failure
+    """
+    try:
+        posix.lseek(fd, 0, 0)  # SEEK_SET
+    except OSError as e:
+        return e.errno
+    return 0
+
+
 if 0:
 
     def ReadLineBuffered():
@@ -204,6 +255,26 @@ def GetAllUsers():
     return users
 
 
+class DirEntry(object):
+
+    def __init__(self, name, is_dir):
+        # type: (str, bool) -> None
+        self.name = name
+        self.is_dir = is_dir
+
+
+def ReadDir(path):
+    # type: (str) -> List[DirEntry]
+    """Like posix.listdir(), but also says whether each entry is a directory.
+
+    Uses d_type from readdir(), so only symlinks and entries on file systems
+    that don't fill it in (DT_UNKNOWN) are stat()'d.  Raises OSError.
+    """
+    return [
+        DirEntry(name, is_dir) for name, is_dir in posix.listdir_typed(path)
+    ]
+
+
 def GetUserName(uid):
     # type: (int) -> str
     try:
@@ -221,6 +292,15 @@ def Time():
     return t, u.ru_utime, u.ru_stime
 
 
+def GcMillis():
+    # type: () -> float
+    """Total time spent in the Oils garbage collector.
+
+    Always 0.0 here.  The C++ version needs -D GC_TIMING.
+    """
+    return 0.0
+
+
 def PrintTimes():
     # type: () -> None
     utime, stime, cutime, cstime, elapsed = posix.times()
@@ -400,3 +480,16 @@ def MakeDirCacheKey(path):
     directory accesses."""
     st = posix.stat(path)
     return (path, int(st.st_mtime))
+
+
+def MakeFileCacheKey(path):
+    # type: (str) -> Tuple[str, int]
+    """Returns a pair (string identifying the file contents, last modified
+    time) that can be used to cache parsed files.
+
+    The string has the device, inode, mtime, and size of the file.
+    """
+    st = posix.stat(path)
+    mtime = int(st.st_mtime)
+    key = '%d:%d:%d:%d' % (st.st_dev, st.st_ino, mtime, st.st_size)
+    return (key, mtime)
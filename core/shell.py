@@ -385,6 +385,20 @@ def Main(
                                        ysh_grammar,
                                        do_lossless=do_lossless)
 
+    # For eval, dynamic arithmetic, and ${!ref}.  OILS_PARSE_CACHE_SIZE=0
+    # disables it.
+    parse_cache = None  # type: Optional[parse_lib.ParseCache]
+    cache_size = 100
+    cache_size_str = environ.get('OILS_PARSE_CACHE_SIZE')
+    if cache_size_str is not None:
+        try:
+            cache_size = int(cache_size_str)
+        except ValueError:
+            pass
+    if cache_size > 0:
+        parse_cache = parse_lib.ParseCache(mutable_opts, cache_size)
+        parse_ctx.Init_ParseCache(parse_cache)
+
     # Three ParseContext instances SHARE aliases.
     comp_arena = alloc.Arena()
     comp_arena.PushSource(source.Unused('completion'))
@@ -449,7 +463,10 @@ def Main(
     trace_dir = environ.get('OILS_TRACE_DIR', '')
     dumps = environ.get('OILS_TRACE_DUMPS', '')
     streams = environ.get('OILS_TRACE_STREAMS', '')
-    multi_trace = dev.MultiTracer(my_pid, trace_dir, dumps, streams, fd_state)
+    profiler = dev.Profiler(my_pid, environ.get('OILS_PROFILE_DIR', ''),
+                            fd_state)
+    multi_trace = dev.MultiTracer(my_pid, trace_dir, dumps, streams, fd_state,
+                                  profiler)
 
     tracer = dev.Tracer(parse_ctx, exec_opts, mutable_opts, mem, trace_f,
                         multi_trace)
@@ -476,7 +493,10 @@ def Main(
 
     interp = environ.get('OILS_HIJACK_SHEBANG', '')
     search_path = state.SearchPath(mem)
-    ext_prog = process.ExternalProgram(interp, fd_state, errfmt, debug_f)
+    # OILS_NO_SPAWN=1 always uses fork() and exec(), e.g. for benchmarks
+    use_spawn = len(environ.get('OILS_NO_SPAWN', '')) == 0
+    ext_prog = process.ExternalProgram(interp, fd_state, errfmt, debug_f,
+                                       use_spawn)
 
     splitter = split.SplitContext(mem)
     # TODO: This is instantiation is duplicated in osh/word_eval.py
@@ -594,8 +614,11 @@ def Main(
     b[builtin_i.runproc] = meta_osh.RunProc(shell_ex, procs, errfmt)
 
     # Meta builtins
+    source_cache = None  # type: Optional[meta_osh.SourceCache]
+    if len(environ.get('OILS_SOURCE_CACHE', '')):
+        source_cache = meta_osh.SourceCache(aliases, mutable_opts)
     source_builtin = meta_osh.Source(parse_ctx, search_path, cmd_ev, fd_state,
-                                     tracer, errfmt, loader)
+                                     tracer, errfmt, loader, source_cache)
     b[builtin_i.source] = source_builtin
     b[builtin_i.dot] = source_builtin
     b[builtin_i.eval] = meta_osh.Eval(parse_ctx, exec_opts, cmd_ev, tracer,
@@ -619,8 +642,8 @@ def Main(
     b[builtin_i.true_] = true_
     b[builtin_i.false_] = pure_osh.Boolean(1)
 
-    b[builtin_i.alias] = pure_osh.Alias(aliases, errfmt)
-    b[builtin_i.unalias] = pure_osh.UnAlias(aliases, errfmt)
+    b[builtin_i.alias] = pure_osh.Alias(aliases, parse_cache, errfmt)
+    b[builtin_i.unalias] = pure_osh.UnAlias(aliases, parse_cache, errfmt)
 
     b[builtin_i.getopts] = pure_osh.GetOpts(mem, errfmt)
 
@@ -661,8 +684,9 @@ def Main(
 
     b[builtin_i.times] = misc_osh.Times()
 
-    b[builtin_i.json] = json_ysh.Json(mem, errfmt, False)
-    b[builtin_i.json8] = json_ysh.Json(mem, errfmt, True)
+    b[builtin_i.json] = json_ysh.Json(mem, errfmt, False, cmd_ev)
+    b[builtin_i.json8] = json_ysh.Json(mem, errfmt, True, cmd_ev)
+    b[builtin_i.packle] = json_ysh.Packle(mem, errfmt)
 
     ### Process builtins
     b[builtin_i.exec_] = process_osh.Exec(mem, ext_prog, fd_state, search_path,
@@ -685,8 +709,8 @@ def Main(
 
     # Completion
     spec_builder = completion_osh.SpecBuilder(cmd_ev, parse_ctx, word_ev,
-                                              splitter, comp_lookup, help_data,
-                                              errfmt)
+                                              splitter, comp_lookup,
+                                              search_path, help_data, errfmt)
     complete_builtin = completion_osh.Complete(spec_builder, comp_lookup)
     b[builtin_i.complete] = complete_builtin
     b[builtin_i.compgen] = completion_osh.CompGen(spec_builder)
@@ -830,7 +854,7 @@ def Main(
     _SetGlobalFunc(mem, 'int', func_misc.Int())
     _SetGlobalFunc(mem, 'float', func_misc.Float())
     _SetGlobalFunc(mem, 'str', func_misc.Str_())
-    _SetGlobalFunc(mem, 'list', func_misc.List_())
+    _SetGlobalFunc(mem, 'list', func_misc.List_(mem.small_ints))
     _SetGlobalFunc(mem, 'dict', func_misc.Dict_())
 
     # TODO: This should be Python style splitting
@@ -847,6 +871,9 @@ def Main(
     _SetGlobalFunc(mem, 'fromJson8', func_misc.FromJson8(True))
     _SetGlobalFunc(mem, 'fromJson', func_misc.FromJson8(False))
 
+    _SetGlobalFunc(mem, 'toPackle', func_misc.ToPackle())
+    _SetGlobalFunc(mem, 'fromPackle', func_misc.FromPackle())
+
     mem.SetNamed(location.LName('_io'), global_io, scope_e.GlobalOnly)
     mem.SetNamed(location.LName('_guts'), global_guts, scope_e.GlobalOnly)
 
@@ -1114,5 +1141,9 @@ def Main(
 
     multi_trace.WriteDumps()
 
+    if parse_cache is not None and len(environ.get('OILS_PARSE_CACHE_STATS',
+                                                   '')):
+        print_stderr(parse_cache.Stats())
+
     # NOTE: We haven't closed the file opened with fd_state.Open
     return mut_status.i
@@ -20,6 +20,7 @@ from _devbuild.gen.value_asdl import (value, value_e, value_t, sh_lvalue,
                                       sh_lvalue_e, sh_lvalue_t, LeftName,
                                       y_lvalue_e, regex_match, regex_match_e,
                                       regex_match_t, RegexMatch)
+from core import bash_impl
 from core import error
 from core.error import e_usage, e_die
 from core import num
@@ -66,6 +67,15 @@ ClearExport = 1 << 3
 SetNameref = 1 << 4
 ClearNameref = 1 << 5
 
+# Mem.GetValue() computes these, even if there's a variable with the same
+# name.  So YSH locals with these names don't get slots; see ysh/resolve.py.
+# state_test.py checks that this list agrees with GetValue().
+COMPUTED_VARS = [
+    '_status', '_error', '_this_dir', 'PIPESTATUS', '_pipeline_status',
+    '_process_sub_status', 'BASH_REMATCH', 'FUNCNAME', 'BASH_SOURCE',
+    'BASH_LINENO', 'LINENO', 'BASHPID', '_', 'SECONDS'
+]
+
 
 def LookupExecutable(name, path_dirs, exec_required=True):
     # type: (str, List[str], bool) -> Optional[str]
@@ -94,34 +104,180 @@ def LookupExecutable(name, path_dirs, exec_required=True):
     return None
 
 
+class _DirListing(object):
+    """The names in one $PATH directory, as of its modification time."""
+
+    def __init__(self, mtime, names, racy):
+        # type: (int, List[str], bool) -> None
+        self.mtime = mtime
+        self.names = names  # in listdir() order
+
+        self.name_set = {}  # type: Dict[str, bool]
+        for name in names:
+            self.name_set[name] = True
+
+        # The directory was modified in the same second it was listed, so a
+        # later change may not be reflected in the mtime.  Like git's "racy
+        # clean" problem.  Re-list it next time.
+        self.racy = racy
+
+        # For completion; computed lazily because it does an access() per file
+        self.executables = None  # type: Optional[List[str]]
+
+
 class SearchPath(object):
-    """For looking up files in $PATH."""
+    """For looking up files in $PATH.
+
+    There are two levels of caching:
+
+    1. self.cache is the 'hash' table: name -> full path.  Like bash, it's
+       emptied when $PATH changes.
+    2. An index of $PATH: the parsed value, one listing per directory that's
+       re-validated by its mtime, and name -> first directory that has it.
+
+    The index is shared by command lookup, 'type -a', 'hash', and 'compgen -A
+    command'.  Relative directories in $PATH, and ones we can't list, aren't
+    indexed; they're checked with a syscall per name, as before.
+    """
 
     def __init__(self, mem):
         # type: (Mem) -> None
         self.mem = mem
         self.cache = {}  # type: Dict[str, str]
 
-    def _GetPath(self):
-        # type: () -> List[str]
+        self.path_str = None  # type: Optional[str]
+        self.path_dirs = []  # type: List[str]
 
-        # TODO: Could cache this to avoid split() allocating all the time.
+        self.listings = {}  # type: Dict[str, _DirListing]
+        # name -> index in path_dirs of the first listing that has it
+        self.first_dir = {}  # type: Dict[str, int]
+        # index in path_dirs of the first directory with no listing
+        self.first_unlisted = 0
+        self.index_stale = False
+
+    def _SyncPath(self):
+        # type: () -> None
+        """Re-parse $PATH if it changed, and evict stale entries."""
         val = self.mem.GetValue('PATH')
         UP_val = val
+        path_str = None  # type: Optional[str]
         if val.tag() == value_e.Str:
             val = cast(value.Str, UP_val)
-            return val.s.split(':')
+            path_str = val.s
+
+        if path_str == self.path_str:
+            return
+
+        self.path_str = path_str
+        if path_str is None:
+            self.path_dirs = []  # treat as empty path
         else:
-            return []  # treat as empty path
+            self.path_dirs = path_str.split(':')
+
+        # Names may now resolve to different paths
+        self.cache.clear()
+
+        in_path = {}  # type: Dict[str, bool]
+        for d in self.path_dirs:
+            in_path[d] = True
+        for d in self.listings.keys():
+            if d not in in_path:
+                mylib.dict_erase(self.listings, d)
+
+        self.index_stale = True
+
+    def _Refresh(self):
+        # type: () -> None
+        """Update the index if $PATH or any of its directories changed."""
+        self._SyncPath()
+
+        for d in self.path_dirs:
+            if not d.startswith('/'):
+                continue  # relative to the working directory; not indexed
+
+            listing = self.listings.get(d)
+            try:
+                key = pyos.MakeDirCacheKey(d)
+                mtime = key[1]
+                if listing is None or listing.racy or listing.mtime != mtime:
+                    # mtime has 1 second resolution
+                    racy = mtime + 1 > time_.time()
+                    names = posix.listdir(d)
+                    self.listings[d] = _DirListing(mtime, names, racy)
+                    self.index_stale = True
+            except (IOError, OSError) as e:
+                # There could be a directory that doesn't exist in the $PATH.
+                if listing is not None:
+                    mylib.dict_erase(self.listings, d)
+                    self.index_stale = True
+
+        if self.index_stale:
+            self._RebuildIndex()
+            self.index_stale = False
+
+    def _RebuildIndex(self):
+        # type: () -> None
+        self.first_dir.clear()
+
+        n = len(self.path_dirs)
+        self.first_unlisted = n
+
+        # Go backward, so the first directory with the name wins
+        i = n - 1
+        while i >= 0:
+            listing = self.listings.get(self.path_dirs[i])
+            if listing is None:
+                self.first_unlisted = i
+            else:
+                for name in listing.names:
+                    self.first_dir[name] = i
+            i -= 1
+
+    def _Find(self, name, exec_required, do_all):
+        # type: (str, bool, bool) -> List[str]
+        """Look up a name without a slash in the index.
+
+        Listings can be stale, so every candidate is checked on the file system.
+        """
+        self._Refresh()
+
+        results = []  # type: List[str]
+
+        n = len(self.path_dirs)
+        # Directories before 'start' are all listed, and don't have the name
+        start = min(self.first_dir.get(name, n), self.first_unlisted)
+        for i in xrange(start, n):
+            path_dir = self.path_dirs[i]
+            listing = self.listings.get(path_dir)
+            if listing is not None and name not in listing.name_set:
+                continue
+
+            full_path = os_path.join(path_dir, name)
+            if exec_required:
+                found = posix.access(full_path, X_OK)
+            else:
+                found = path_stat.exists(full_path)
+
+            if found:
+                results.append(full_path)
+                if not do_all:
+                    break
+
+        return results
 
     def LookupOne(self, name, exec_required=True):
         # type: (str, bool) -> Optional[str]
         """
         Returns the path itself (if relative path), the resolved path, or None.
         """
-        return LookupExecutable(name,
-                                self._GetPath(),
-                                exec_required=exec_required)
+        if len(name) == 0:  # special case for "$(true)"
+            return None
+
+        if '/' in name:
+            return name if path_stat.exists(name) else None
+
+        results = self._Find(name, exec_required, False)
+        return results[0] if len(results) else None
 
     def LookupReflect(self, name, do_all):
         # type: (str, bool) -> List[str]
@@ -137,19 +293,13 @@ class SearchPath(object):
             else:
                 return []
 
-        results = []  # type: List[str]
-        for path_dir in self._GetPath():
-            full_path = os_path.join(path_dir, name)
-            if path_stat.exists(full_path):
-                results.append(full_path)
-                if not do_all:
-                    return results
-
-        return results
+        return self._Find(name, False, do_all)
 
     def CachedLookup(self, name):
         # type: (str) -> Optional[str]
         #log('name %r', name)
+        self._SyncPath()  # may empty the cache
+
         if name in self.cache:
             return self.cache[name]
 
@@ -172,6 +322,51 @@ class SearchPath(object):
         # type: () -> List[str]
         return self.cache.values()
 
+    def Executables(self):
+        # type: () -> List[str]
+        """For compgen -A command: the executables in each $PATH dir."""
+        self._Refresh()
+
+        executables = []  # type: List[str]
+        for d in self.path_dirs:
+            listing = self.listings.get(d)
+            if listing is not None:
+                if listing.executables is None:
+                    listing.executables = _ListExecutables(d)
+                executables.extend(listing.executables)
+                continue
+
+            if d.startswith('/'):
+                continue  # couldn't be listed
+
+            # Relative directory: list it every time
+            executables.extend(_ListExecutables(d))
+
+        return executables
+
+
+def _ListExecutables(path_dir):
+    # type: (str) -> List[str]
+    """List the directory again, with the file types.
+
+    Only completion needs to know which entries are subdirectories, and
+    ReadDir() may stat() symlinks, so the index of $PATH uses listdir().
+    """
+    try:
+        entries = pyos.ReadDir(path_dir)
+    except (IOError, OSError) as e:
+        return []
+
+    result = []  # type: List[str]
+    for entry in entries:
+        if entry.is_dir:
+            continue  # access() would say a directory is executable
+
+        # The file may have been deleted since listing; then access() fails.
+        if posix.access(os_path.join(path_dir, entry.name), X_OK):
+            result.append(entry.name)  # append the name, not the path
+    return result
+
 
 class ctx_Source(object):
     """For source builtin."""
@@ -485,6 +680,17 @@ class MutableOpts(object):
         else:
             return overlay[-1]  # the top value
 
+    def ParseOptsKey(self):
+        # type: () -> str
+        """Returns a string like '0110' with the value of each parse option.
+
+        Used to cache parsed code.
+        """
+        chars = []  # type: List[str]
+        for opt_num in consts.PARSE_OPTION_NUMS:
+            chars.append('1' if self.Get(opt_num) else '0')
+        return ''.join(chars)
+
     def _Set(self, opt_num, b):
         # type: (int, bool) -> None
         """Used to disable errexit.
@@ -770,6 +976,10 @@ def _DumpVarFrame(frame):
                 cell_json['type'] = value.Str('BashArray')
                 cell_json['value'] = cell.val
 
+            elif case(value_e.SparseArray):
+                cell_json['type'] = value.Str('SparseArray')
+                cell_json['value'] = cell.val
+
             elif case(value_e.BashAssoc):
                 cell_json['type'] = value.Str('BashAssoc')
                 cell_json['value'] = cell.val
@@ -921,6 +1131,15 @@ def InitInteractive(mem):
         SetGlobalString(mem, 'PS1', r'\s-\v\$ ')
 
 
+def _NewSlots(num_slots):
+    # type: (int) -> Optional[List[Optional[Cell]]]
+    """The slots for a frame's locals.  See ysh/resolve.py."""
+    if num_slots <= 0:
+        return None
+    no_cell = None  # type: Optional[Cell]
+    return [no_cell] * num_slots
+
+
 class ctx_FuncCall(object):
     """For func calls."""
 
@@ -929,6 +1148,7 @@ class ctx_FuncCall(object):
 
         frame = NewDict()  # type: Dict[str, Cell]
         mem.var_stack.append(frame)
+        mem.slot_stack.append(_NewSlots(func.parsed.num_slots))
 
         mem.PushCall(func.name, func.parsed.name)
         self.mem = mem
@@ -940,7 +1160,7 @@ class ctx_FuncCall(object):
     def __exit__(self, type, value, traceback):
         # type: (Any, Any, Any) -> None
         self.mem.PopCall()
-        self.mem.var_stack.pop()
+        self.mem.PopFrame()
 
 
 class ctx_ProcCall(object):
@@ -971,6 +1191,7 @@ class ctx_ProcCall(object):
             frame['ARGV'] = _MakeArgvCell(argv)
 
         mem.var_stack.append(frame)
+        mem.slot_stack.append(_NewSlots(proc.num_slots))
 
         mem.PushCall(proc.name, proc.name_tok)
 
@@ -991,7 +1212,7 @@ class ctx_ProcCall(object):
         # type: (Any, Any, Any) -> None
         self.mutable_opts.PopDynamicScope()
         self.mem.PopCall()
-        self.mem.var_stack.pop()
+        self.mem.PopFrame()
 
         if self.sh_compat:
             self.mem.argv_stack.pop()
@@ -1116,6 +1337,12 @@ class Mem(object):
 
         self.var_stack = [frame]
 
+        # Parallel to var_stack.  For YSH procs and funcs, slots[i] is None,
+        # or it caches the Cell in the frame for the local that
+        # ysh/resolve.py numbered i.  Other frames have no slots.
+        no_slots = None  # type: Optional[List[Optional[Cell]]]
+        self.slot_stack = [no_slots]
+
         # The debug_stack isn't strictly necessary for execution.  We use it
         # for crash dumps and for 3 parallel arrays: BASH_SOURCE, FUNCNAME, and
         # BASH_LINENO.
@@ -1155,6 +1382,16 @@ class Mem(object):
         # For the ctx builtin
         self.ctx_stack = []  # type: List[Dict[str, value_t]]
 
+        # The environment for external commands, built by GetExported().  It's
+        # set to None when a mutation may change it:
+        # - assigning to, exporting, or unsetting an exported variable
+        # - popping a frame that has exported variables, e.g. FOO=bar cmd
+        self.exported_env = None  # type: Optional[Dict[str, str]]
+        self.num_env_rebuilds = 0
+
+        # Shared value.Int instances, for expression evaluators and loops
+        self.small_ints = num.SmallInts()
+
     def __repr__(self):
         # type: () -> str
         parts = []  # type: List[str]
@@ -1395,10 +1632,26 @@ class Mem(object):
         # We don't want the 'read' builtin to write to this frame!
         frame = NewDict()  # type: Dict[str, Cell]
         self.var_stack.append(frame)
+        self.slot_stack.append(None)
 
     def PopTemp(self):
         # type: () -> None
-        self.var_stack.pop()
+        self.PopFrame()
+
+    def PopFrame(self):
+        # type: () -> None
+        """Pop a temp, proc, or func frame.
+
+        Pushing a frame doesn't change the environment, because new frames
+        don't have exported variables.
+        """
+        frame = self.var_stack.pop()
+        self.slot_stack.pop()
+        if self.exported_env is not None:
+            for _, cell in iteritems(frame):
+                if cell.exported:
+                    self.exported_env = None
+                    break
 
     def TopNamespace(self):
         # type: () -> Dict[str, Cell]
@@ -1617,6 +1870,8 @@ class Mem(object):
                     cell = Cell(False, False, False, val)
                     frame[yval.name] = cell
                 else:
+                    if cell.exported:
+                        self.exported_env = None
                     cell.val = val
 
             elif case(y_lvalue_e.Container):
@@ -1637,11 +1892,57 @@ class Mem(object):
             if cell.readonly:
                 e_die("Can't assign to readonly value %r" % lval.name,
                       lval.blame_loc)
+            if cell.exported:
+                self.exported_env = None
             cell.val = val  # Mutate value_t
         else:
             cell = Cell(False, False, False, val)
             name_map[lval.name] = cell
 
+    def GetSlotCell(self, slot, name):
+        # type: (int, str) -> Optional[Cell]
+        """Get the cell of a proc or func local, using its slot.
+
+        Returns None if the caller should look up the name instead: the top
+        frame has no slots, or the name isn't a local yet, or it's a nameref.
+        """
+        slots = self.slot_stack[-1]
+        if slots is None:
+            return None
+
+        cell = slots[slot]
+        if cell is None:
+            cell = self.var_stack[-1].get(name)
+            if cell is None:
+                return None
+            slots[slot] = cell
+
+        if cell.nameref:
+            return None
+        return cell
+
+    def SetSlotLocal(self, slot, name, val, blame_loc):
+        # type: (int, str, value_t, loc_t) -> None
+        """Like SetNamed() with scope_e.LocalOnly, for var and setvar."""
+        cell = self.GetSlotCell(slot, name)
+        if cell and not cell.readonly and not cell.exported:
+            cell.val = val
+            return
+
+        # Error, or create the cell
+        self.SetNamed(LeftName(name, blame_loc), val, scope_e.LocalOnly)
+
+    def _ClearSlots(self, name_map):
+        # type: (Dict[str, Cell]) -> None
+        """Called when a cell is removed from name_map."""
+        for i in xrange(len(self.var_stack) - 1, -1, -1):
+            if self.var_stack[i] is name_map:
+                slots = self.slot_stack[i]
+                if slots is not None:
+                    for j in xrange(len(slots)):
+                        slots[j] = None
+                break
+
     def SetNamed(self, lval, val, which_scopes, flags=0):
         # type: (LeftName, value_t, scope_t, int) -> None
 
@@ -1662,6 +1963,9 @@ class Mem(object):
                 lval.name, which_scopes)
 
         if cell:
+            if cell.exported or flags & SetExport:
+                self.exported_env = None
+
             # Clear before checking readonly bit.
             # NOTE: Could be cell.flags &= flag_clear_mask
             if flags & ClearExport:
@@ -1693,6 +1997,9 @@ class Mem(object):
                 # set -o nounset; local foo; echo $foo  # It's still undefined!
                 val = value.Undef  # export foo, readonly foo
 
+            if flags & SetExport:
+                self.exported_env = None
+
             cell = Cell(bool(flags & SetExport), bool(flags & SetReadOnly),
                         bool(flags & SetNameref), val)
             name_map[cell_name] = cell
@@ -1794,16 +2101,29 @@ class Mem(object):
 
                         if 0 <= index and index < n:
                             strs[index] = rval.s
+                        elif index == n:
+                            strs.append(rval.s)
+                        elif index > n:
+                            # a[1000000]=x leaves a gap, so switch to the
+                            # sparse representation
+                            sparse_val = bash_impl.BashArray_ToSparse(cell_val)
+                            bash_impl.SparseArray_Set(sparse_val, index, rval.s)
+                            cell.val = sparse_val
                         else:
-                            # Fill it in with None.  It could look like this:
-                            # ['1', 2, 3, None, None, '4', None]
-                            # Then ${#a[@]} counts the entries that are not None.
-                            #
-                            # TODO: strict_array for Oil arrays won't auto-fill.
-                            n = index - len(strs) + 1
-                            for i in xrange(n):
-                                strs.append(None)
-                            strs[lval.index] = rval.s
+                            e_die("Index %d is out of range" % lval.index,
+                                  left_loc)
+                        return
+
+                    elif case2(value_e.SparseArray):
+                        sparse_val = cast(value.SparseArray, UP_cell_val)
+                        if not bash_impl.SparseArray_Set(
+                                sparse_val, lval.index, rval.s):
+                            e_die("Index %d is out of range" % lval.index,
+                                  left_loc)
+                        # The last hole was filled
+                        if bash_impl.SparseArray_IsDense(sparse_val):
+                            cell.val = bash_impl.SparseArray_ToBashArray(
+                                sparse_val)
                         return
 
                 # This could be an object, eggex object, etc.  It won't be
@@ -1841,10 +2161,14 @@ class Mem(object):
     def _BindNewArrayWithEntry(self, name_map, lval, val, flags):
         # type: (Dict[str, Cell], sh_lvalue.Indexed, value.Str, int) -> None
         """Fill 'name_map' with a new indexed array entry."""
-        no_str = None  # type: Optional[str]
-        items = [no_str] * lval.index
-        items.append(val.s)
-        new_value = value.BashArray(items)
+        if lval.index < 0:
+            e_die("Index %d is out of range" % lval.index, lval.blame_loc)
+
+        if lval.index == 0:
+            new_value = value.BashArray([val.s])  # type: value_t
+        else:
+            d = {lval.index: val.s}  # type: Dict[int, str]
+            new_value = value.SparseArray(d, lval.index, None)
 
         # arrays can't be exported; can't have BashAssoc flag
         readonly = bool(flags & SetReadOnly)
@@ -1863,6 +2187,8 @@ class Mem(object):
         Use case: SHELLOPTS.
         """
         cell = self.var_stack[0][name]
+        if cell.exported:  # e.g. SHELLOPTS
+            self.exported_env = None
         cell.val = new_val
 
     def GetValue(self, name, which_scopes=scope_e.Shopt):
@@ -1875,13 +2201,13 @@ class Mem(object):
         #log('which_scopes %s', which_scopes)
 
         # TODO: Optimize this by doing a single hash lookup:
-        # COMPUTED_VARS = {'PIPESTATUS': 1, 'FUNCNAME': 1, ...}
         # if name not in COMPUTED_VARS: ...
+        # If you add a case, add it to COMPUTED_VARS too.
 
         with str_switch(name) as case:
             # "Registers"
             if case('_status'):
-                return num.ToBig(self.TryStatus())
+                return self.small_ints.FromInt(self.TryStatus())
 
             elif case('_error'):
                 return self.TryError()
@@ -1902,12 +2228,15 @@ class Mem(object):
                 return value.BashArray(strs2)
 
             elif case('_pipeline_status'):
-                items = [num.ToBig(i)
+                items = [self.small_ints.FromInt(i)
                          for i in self.pipe_status[-1]]  # type: List[value_t]
                 return value.List(items)
 
             elif case('_process_sub_status'):  # YSH naming convention
-                items = [num.ToBig(i) for i in self.process_sub_status[-1]]
+                items = [
+                    self.small_ints.FromInt(i)
+                    for i in self.process_sub_status[-1]
+                ]
                 return value.List(items)
 
             elif case('BASH_REMATCH'):
@@ -2072,12 +2401,15 @@ class Mem(object):
             return False  # 'unset' builtin falls back on functions
         if cell.readonly:
             raise error.Runtime("Can't unset readonly variable %r" % var_name)
+        if cell.exported:
+            self.exported_env = None
 
         with tagswitch(lval) as case:
             if case(sh_lvalue_e.Var):  # unset x
                 # Make variables in higher scopes visible.
                 # example: test/spec.sh builtin-vars -r 24 (ble.sh)
                 mylib.dict_erase(name_map, cell_name)
+                self._ClearSlots(name_map)
 
                 # alternative that some shells use:
                 #   name_map[cell_name].val = value.Undef
@@ -2093,31 +2425,44 @@ class Mem(object):
 
                 val = cell.val
                 UP_val = val
-                if val.tag() != value_e.BashArray:
-                    raise error.Runtime("%r isn't an array" % var_name)
-
-                val = cast(value.BashArray, UP_val)
-                strs = val.strs
-
-                n = len(strs)
-                last_index = n - 1
-                index = lval.index
-                if index < 0:
-                    index += n
-
-                if index == last_index:
-                    # Special case: The array SHORTENS if you unset from the end.  You
-                    # can tell with a+=(3 4)
-                    strs.pop()
-                elif 0 <= index and index < last_index:
-                    strs[index] = None
-                else:
-                    # If it's not found, it's not an error.  In other words, 'unset'
-                    # ensures that a value doesn't exist, regardless of whether it
-                    # existed.  It's idempotent.
-                    # (Ousterhout specifically argues that the strict behavior was a
-                    # mistake for Tcl!)
-                    pass
+                with tagswitch(val) as case2:
+                    if case2(value_e.BashArray):
+                        val = cast(value.BashArray, UP_val)
+                        strs = val.strs
+
+                        n = len(strs)
+                        last_index = n - 1
+                        index = lval.index
+                        if index < 0:
+                            index += n
+
+                        if index == last_index:
+                            # Special case: The array SHORTENS if you unset from
+                            # the end.  You can tell with a+=(3 4)
+                            strs.pop()
+                        elif 0 <= index and index < last_index:
+                            # Leaves a hole, so switch to the sparse
+                            # representation
+                            sparse_val = bash_impl.BashArray_ToSparse(val)
+                            bash_impl.SparseArray_Unset(sparse_val, index)
+                            cell.val = sparse_val
+                        else:
+                            # If it's not found, it's not an error.  In other
+                            # words, 'unset' ensures that a value doesn't exist,
+                            # regardless of whether it existed.  It's
+                            # idempotent.  (Ousterhout specifically argues that
+                            # the strict behavior was a mistake for Tcl!)
+                            pass
+
+                    elif case2(value_e.SparseArray):
+                        val = cast(value.SparseArray, UP_val)
+                        bash_impl.SparseArray_Unset(val, lval.index)
+                        # The entries after the last hole were unset
+                        if bash_impl.SparseArray_IsDense(val):
+                            cell.val = bash_impl.SparseArray_ToBashArray(val)
+
+                    else:
+                        raise error.Runtime("%r isn't an array" % var_name)
 
             elif case(sh_lvalue_e.Keyed):  # unset 'A["K"]'
                 lval = cast(sh_lvalue.Keyed, UP_lval)
@@ -2159,6 +2504,8 @@ class Mem(object):
         cell, name_map = self._ResolveNameOnly(name, self.ScopesForReading())
         if cell:
             if flag & ClearExport:
+                if cell.exported:
+                    self.exported_env = None
                 cell.exported = False
             if flag & ClearNameref:
                 cell.nameref = False
@@ -2168,11 +2515,18 @@ class Mem(object):
 
     def GetExported(self):
         # type: () -> Dict[str, str]
-        """Get all the variables that are marked exported."""
-        # TODO: This is run on every SimpleCommand.  Should we have a dirty flag?
-        # We have to notice these things:
-        # - If an exported variable is changed.
-        # - If the set of exported variables changes.
+        """Get all the variables that are marked exported.
+
+        This is called for every external command, so the result is cached
+        until a mutation invalidates it.  Callers must not modify it.
+        """
+        if self.exported_env is None:
+            self.exported_env = self._BuildExported()
+            self.num_env_rebuilds += 1
+        return self.exported_env
+
+    def _BuildExported(self):
+        # type: () -> Dict[str, str]
 
         exported = {}  # type: Dict[str, str]
         # Search from globals up.  Names higher on the stack will overwrite names
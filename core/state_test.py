@@ -1,8 +1,11 @@
 #!/usr/bin/env python2
 """state_test.py: Tests for state.py."""
 
-import unittest
+import inspect
 import os.path
+import re
+import shutil
+import unittest
 
 from _devbuild.gen.id_kind_asdl import Id
 from _devbuild.gen.runtime_asdl import scope_e
@@ -14,6 +17,7 @@ from core import test_lib
 from core import state  # module under test
 from frontend import lexer
 from frontend import location
+from mycpp import mops
 from mycpp.mylib import NewDict
 
 
@@ -39,12 +43,13 @@ class MemTest(unittest.TestCase):
         mem.argv_stack.append(state._ArgFrame(argv))
         frame = NewDict()
         mem.var_stack.append(frame)
+        mem.slot_stack.append(None)
         mem.PushCall(name, tok)
 
     def _PopShellCall(self, mem):
         """ simulate shell function """
         mem.PopCall()
-        mem.var_stack.pop()
+        mem.PopFrame()
         mem.argv_stack.pop()
 
     def testGet(self):
@@ -83,6 +88,56 @@ class MemTest(unittest.TestCase):
         else:
             self.assertEqual(search_path.LookupOne('env'), '/usr/bin/env')
 
+    def testSearchPathIndex(self):
+        mem = _InitMem()
+        search_path = state.SearchPath(mem)
+
+        dir1 = os.path.abspath('_tmp/search-path/1')
+        dir2 = os.path.abspath('_tmp/search-path/2')
+        for d in (dir1, dir2):
+            if os.path.isdir(d):
+                shutil.rmtree(d)
+            os.makedirs(d)
+
+        def MakeExe(path):
+            with open(path, 'w') as f:
+                f.write('#!/bin/sh\n')
+            os.chmod(path, 0o755)
+
+        MakeExe(os.path.join(dir1, 'foo'))
+        MakeExe(os.path.join(dir2, 'foo'))
+        with open(os.path.join(dir2, 'data'), 'w') as f:
+            f.write('not executable\n')
+        # access() says directories are executable, but they aren't commands
+        os.mkdir(os.path.join(dir2, 'subdir'))
+
+        mem.SetValue(location.LName('PATH'), value.Str('%s:%s' % (dir1, dir2)),
+                     scope_e.GlobalOnly)
+
+        self.assertEqual(dir1 + '/foo', search_path.CachedLookup('foo'))
+        self.assertEqual([dir1 + '/foo', dir2 + '/foo'],
+                         search_path.LookupReflect('foo', True))
+        self.assertEqual(None, search_path.LookupOne('data'))
+        self.assertEqual(dir2 + '/data',
+                         search_path.LookupOne('data', exec_required=False))
+        self.assertEqual(['foo', 'foo'], search_path.Executables())
+
+        # A new file is found, even in the same second as the last listing
+        MakeExe(os.path.join(dir2, 'bar'))
+        self.assertEqual(dir2 + '/bar', search_path.LookupOne('bar'))
+
+        # A deleted file isn't found, even if the listing is stale
+        os.remove(os.path.join(dir1, 'foo'))
+        self.assertEqual(dir2 + '/foo', search_path.LookupOne('foo'))
+
+        # Changing $PATH evicts listings, and empties the 'hash' table
+        self.assertEqual([dir1 + '/foo'], search_path.CachedCommands())
+        mem.SetValue(location.LName('PATH'), value.Str(dir2),
+                     scope_e.GlobalOnly)
+        self.assertEqual(dir2 + '/bar', search_path.CachedLookup('bar'))
+        self.assertEqual([dir2 + '/bar'], search_path.CachedCommands())
+        self.assertEqual([dir2], search_path.listings.keys())
+
     def testPushTemp(self):
         mem = _InitMem()
 
@@ -234,11 +289,12 @@ class MemTest(unittest.TestCase):
         lhs = sh_lvalue.Indexed('a', 1, runtime.NO_SPID)
         # a[1]=2
         mem.SetValue(lhs, value.Str('2'), scope_e.Dynamic)
-        self.assertEqual([None, '2'], mem.var_stack[0]['a'].val.strs)
+        self.assertEqual({1: '2'}, mem.var_stack[0]['a'].val.d)
 
         # a[1]=3
         mem.SetValue(lhs, value.Str('3'), scope_e.Dynamic)
-        self.assertEqual([None, '3'], mem.var_stack[0]['a'].val.strs)
+        self.assertEqual({1: '3'}, mem.var_stack[0]['a'].val.d)
+        self.assertEqual(1, mem.var_stack[0]['a'].val.max_index)
 
         # a[1]=(x y z)  # illegal but doesn't parse anyway
         if 0:
@@ -280,6 +336,35 @@ class MemTest(unittest.TestCase):
         val = mem.GetValue('undef', scope_e.Dynamic)
         test_lib.AssertAsdlEqual(self, value.Undef, val)
 
+        # Small statuses share value.Int instances
+        mem.SetTryStatus(1)
+        val = mem.GetValue('_status')
+        self.assertEqual(1, mops.BigTruncate(val.i))
+        self.assertTrue(val is mem.GetValue('_status'))
+
+        mem.SetPipeStatus([0, 1000])
+        items = mem.GetValue('_pipeline_status').items
+        self.assertTrue(items[0] is mem.small_ints.FromInt(0))
+        self.assertEqual(1000, mops.BigTruncate(items[1].i))
+
+    def testComputedVars(self):
+        # COMPUTED_VARS lists the cases of GetValue()
+        src = inspect.getsource(state.Mem.GetValue)
+        cases = re.findall(r"case\('([^']*)'\)", src)
+        self.assertEqual(sorted(cases), sorted(state.COMPUTED_VARS))
+
+        # A variable with the same name doesn't change the computed value
+        mem = _InitMem()
+        tok = lexer.DummyToken(Id.Lit_Chars, 'x')
+        tok.line = SourceLine(1, 'x', source.Interactive)
+        mem.SetTokenForLine(tok)
+        for name in state.COMPUTED_VARS:
+            mem.SetValue(location.LName(name), value.Str('shadow'),
+                         scope_e.GlobalOnly)
+            val = mem.GetValue(name)
+            self.assertFalse(
+                val.tag() == value_e.Str and val.s == 'shadow', name)
+
     def testExportThenAssign(self):
         """Regression Test."""
         mem = _InitMem()
@@ -297,6 +382,64 @@ class MemTest(unittest.TestCase):
         e = mem.GetExported()
         self.assertEqual('u', e['U'])
 
+    def testGetExportedCache(self):
+        mem = _InitMem()
+
+        mem.SetValue(location.LName('E'),
+                     value.Str('1'),
+                     scope_e.Dynamic,
+                     flags=state.SetExport)
+        mem.SetValue(location.LName('x'), value.Str('x'), scope_e.Dynamic)
+
+        e = mem.GetExported()
+        self.assertEqual({'E': '1'}, e)
+        n = mem.num_env_rebuilds
+
+        # Not rebuilt when nothing changed, or an unexported var changed
+        self.assertEqual(e, mem.GetExported())
+        mem.SetValue(location.LName('x'), value.Str('y'), scope_e.Dynamic)
+        self.assertEqual(e, mem.GetExported())
+        self.assertEqual(n, mem.num_env_rebuilds)
+
+        # Assigning to an exported var
+        mem.SetValue(location.LName('E'), value.Str('2'), scope_e.Dynamic)
+        self.assertEqual({'E': '2'}, mem.GetExported())
+        self.assertEqual(n + 1, mem.num_env_rebuilds)
+
+        # export x
+        mem.SetValue(location.LName('x'),
+                     None,
+                     scope_e.Dynamic,
+                     flags=state.SetExport)
+        self.assertEqual({'E': '2', 'x': 'y'}, mem.GetExported())
+
+        # export -n x
+        mem.ClearFlag('x', state.ClearExport)
+        self.assertEqual({'E': '2'}, mem.GetExported())
+
+        # FOO=bar cmd
+        mem.PushTemp()
+        self.assertEqual({'E': '2'}, mem.GetExported())
+        mem.SetValue(location.LName('FOO'),
+                     value.Str('bar'),
+                     scope_e.LocalOnly,
+                     flags=state.SetExport)
+        self.assertEqual({'E': '2', 'FOO': 'bar'}, mem.GetExported())
+        mem.PopTemp()
+        self.assertEqual({'E': '2'}, mem.GetExported())
+
+        # Popping a frame without exported vars doesn't rebuild
+        n = mem.num_env_rebuilds
+        mem.PushTemp()
+        mem.SetValue(location.LName('y'), value.Str('y'), scope_e.LocalOnly)
+        mem.PopTemp()
+        self.assertEqual({'E': '2'}, mem.GetExported())
+        self.assertEqual(n, mem.num_env_rebuilds)
+
+        # unset E
+        mem.Unset(location.LName('E'), scope_e.Dynamic)
+        self.assertEqual({}, mem.GetExported())
+
     def testUnset(self):
         mem = _InitMem()
         # unset a
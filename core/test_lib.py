@@ -245,8 +245,8 @@ def InitCommandEvaluator(parse_ctx=None,
         builtin_i.compopt: completion_osh.CompOpt(compopt_state, errfmt),
         builtin_i.compadjust: completion_osh.CompAdjust(mem),
 
-        builtin_i.alias: pure_osh.Alias(aliases, errfmt),
-        builtin_i.unalias: pure_osh.UnAlias(aliases, errfmt),
+        builtin_i.alias: pure_osh.Alias(aliases, None, errfmt),
+        builtin_i.unalias: pure_osh.UnAlias(aliases, None, errfmt),
     }
 
     debug_f = util.DebugFile(sys.stderr)
@@ -256,7 +256,7 @@ def InitCommandEvaluator(parse_ctx=None,
     search_path = state.SearchPath(mem)
 
     ext_prog = \
-        ext_prog or process.ExternalProgram('', fd_state, errfmt, debug_f)
+        ext_prog or process.ExternalProgram('', fd_state, errfmt, debug_f, True)
 
     cmd_deps.dumper = dev.CrashDumper('', fd_state)
     cmd_deps.debug_f = debug_f
@@ -278,7 +278,9 @@ def InitCommandEvaluator(parse_ctx=None,
                                        assign_builtins, arena, cmd_deps,
                                        trap_state, signal_safe)
 
-    multi_trace = dev.MultiTracer(posix.getpid(), '', '', '', fd_state)
+    profiler = dev.Profiler(posix.getpid(), '', fd_state)
+    multi_trace = dev.MultiTracer(posix.getpid(), '', '', '', fd_state,
+                                  profiler)
     tracer = dev.Tracer(parse_ctx, exec_opts, mutable_opts, mem, debug_f,
                         multi_trace)
     waiter = process.Waiter(job_list, exec_opts, trap_state, tracer)
@@ -301,8 +303,8 @@ def InitCommandEvaluator(parse_ctx=None,
     except ImportError:
         TOPICS = None  # minimal dev build
     spec_builder = completion_osh.SpecBuilder(cmd_ev, parse_ctx, word_ev,
-                                              splitter, comp_lookup, TOPICS,
-                                              errfmt)
+                                              splitter, comp_lookup,
+                                              search_path, TOPICS, errfmt)
 
     # Add some builtins that depend on the executor!
     complete_builtin = completion_osh.Complete(spec_builder, comp_lookup)
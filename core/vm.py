@@ -23,6 +23,7 @@ if TYPE_CHECKING:
     from osh.cmd_eval import CommandEvaluator
     from osh import prompt
     from core import dev
+    from core import optview
     from core import state
 
 _ = log
@@ -147,6 +148,7 @@ def InitCircularDeps(
     cmd_ev.expr_ev = expr_ev
     cmd_ev.word_ev = word_ev
     cmd_ev.tracer = tracer
+    cmd_ev.profiler = tracer.multi_trace.profiler
 
     shell_ex.cmd_ev = cmd_ev
 
@@ -321,9 +323,9 @@ class ctx_ProcessSub(object):
 
 class ctx_FlushStdout(object):
 
-    def __init__(self):
-        # type: () -> None
-        pass
+    def __init__(self, exec_opts):
+        # type: (optview.Exec) -> None
+        self.exec_opts = exec_opts
 
     def __enter__(self):
         # type: () -> None
@@ -332,5 +334,11 @@ class ctx_FlushStdout(object):
     def __exit__(self, type, value, traceback):
         # type: (Any, Any, Any) -> None
 
+        # With shopt -s buffer_stdout, output is coalesced until
+        # process.FdState or the Process class flushes it.  Check the option
+        # on exit, since the builtin may be 'shopt' itself.
+        if self.exec_opts.buffer_stdout():
+            return
+
         # This function can't be translated, so it's in pyos
         pyos.FlushStdout()
@@ -163,7 +163,12 @@ def NinjaGraph(ru):
                   srcs=['cpp/fanos.cc'],
                   deps=['//cpp/fanos_shared', '//mycpp/runtime'])
 
-    ru.cc_library('//cpp/libc', srcs=['cpp/libc.cc'], deps=['//mycpp/runtime'])
+    ru.cc_library('//cpp/regex_cache_shared',
+                  srcs=['cpp/regex_cache_shared.c'])
+
+    ru.cc_library('//cpp/libc',
+                  srcs=['cpp/libc.cc'],
+                  deps=['//cpp/regex_cache_shared', '//mycpp/runtime'])
 
     ru.cc_binary('cpp/libc_test.cc',
                  deps=['//cpp/libc'],
@@ -203,10 +208,13 @@ def NinjaGraph(ru):
                  deps=['//cpp/pylib'],
                  matrix=ninja_lib.COMPILERS_VARIANTS)
 
+    ru.cc_library('//cpp/spawn_shared', srcs=['cpp/spawn_shared.c'])
+
     ru.cc_library(
         '//cpp/stdlib',
         srcs=['cpp/stdlib.cc'],
         deps=[
+            '//cpp/spawn_shared',
             '//mycpp/runtime',
             # Annoying: because of the circular dep issue, we need to repeat
             # dependencies of //prebuilt/core/error.mycpp.  We don't want to depend
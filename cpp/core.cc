@@ -2,7 +2,8 @@
 
 #include "cpp/core.h"
 
-#include <ctype.h>  // ispunct()
+#include <ctype.h>   // ispunct()
+#include <dirent.h>  // opendir(), readdir(), dirfd()
 #include <errno.h>
 #include <math.h>  // fmod()
 #include <pwd.h>   // passwd
@@ -77,6 +78,36 @@ Tuple2<int, int> ReadByte(int fd) {
   }
 }
 
+int SeekCur(int fd, int delta) {
+  if (::lseek(fd, delta, SEEK_CUR) < 0) {
+    return errno;
+  }
+  return 0;
+}
+
+Tuple2<int, int> TempFile() {
+  // tmpfile() removes the file when it's closed.  We keep a dup of the
+  // descriptor instead of the FILE*.
+  FILE* f = ::tmpfile();
+  if (f == nullptr) {
+    return Tuple2<int, int>(-1, errno);
+  }
+  int fd = ::dup(fileno(f));
+  int err_num = errno;
+  fclose(f);
+  if (fd < 0) {
+    return Tuple2<int, int>(-1, err_num);
+  }
+  return Tuple2<int, int>(fd, 0);
+}
+
+int Rewind(int fd) {
+  if (::lseek(fd, 0, SEEK_SET) < 0) {
+    return errno;
+  }
+  return 0;
+}
+
 Dict<BigStr*, BigStr*>* Environ() {
   auto d = Alloc<Dict<BigStr*, BigStr*>>();
 
@@ -160,6 +191,58 @@ List<PasswdEntry*>* GetAllUsers() {
 #endif
 }
 
+// Whether a directory entry is a directory, following symlinks like stat().
+// d_type avoids the stat() for most entries.
+static bool EntryIsDir(DIR* dirp, struct dirent* ep) {
+#ifdef DT_UNKNOWN
+  if (ep->d_type == DT_DIR) {
+    return true;
+  }
+  if (ep->d_type != DT_UNKNOWN && ep->d_type != DT_LNK) {
+    return false;
+  }
+#endif
+  struct stat st;
+  // A dangling symlink, or the entry was removed
+  if (fstatat(dirfd(dirp), ep->d_name, &st, 0) != 0) {
+    return false;
+  }
+  return S_ISDIR(st.st_mode);
+}
+
+List<DirEntry*>* ReadDir(BigStr* path) {
+  DIR* dirp = opendir(path->data());
+  if (dirp == nullptr) {
+    throw Alloc<OSError>(errno);
+  }
+
+  auto* ret = NewList<DirEntry*>();
+  while (true) {
+    errno = 0;
+    struct dirent* ep = readdir(dirp);
+    if (ep == nullptr) {
+      if (errno != 0) {
+        int err_num = errno;
+        closedir(dirp);
+        throw Alloc<OSError>(err_num);
+      }
+      break;  // no more files
+    }
+    // Skip . and ..
+    int name_len = strlen(ep->d_name);
+    if (ep->d_name[0] == '.' &&
+        (name_len == 1 || (ep->d_name[1] == '.' && name_len == 2))) {
+      continue;
+    }
+    bool is_dir = EntryIsDir(dirp, ep);
+    ret->append(Alloc<DirEntry>(StrFromC(ep->d_name, name_len), is_dir));
+  }
+
+  closedir(dirp);
+
+  return ret;
+}
+
 BigStr* GetUserName(int uid) {
   BigStr* result = kEmptyString;
 
@@ -205,6 +288,14 @@ Tuple3<double, double, double> Time() {
   return Tuple3<double, double, double>(real, user, sys);
 }
 
+double GcMillis() {
+#if defined(MARK_SWEEP) && defined(GC_TIMING)
+  return gHeap.total_gc_millis_;
+#else
+  return 0.0;
+#endif
+}
+
 static void PrintClock(clock_t ticks, long ticks_per_sec) {
   double seconds = static_cast<double>(ticks) / ticks_per_sec;
   printf("%ldm%.3fs", static_cast<long>(seconds) / 60, fmod(seconds, 60));
@@ -273,6 +364,21 @@ Tuple2<BigStr*, int>* MakeDirCacheKey(BigStr* path) {
   return Alloc<Tuple2<BigStr*, int>>(path, st.st_mtime);
 }
 
+Tuple2<BigStr*, int>* MakeFileCacheKey(BigStr* path) {
+  struct stat st;
+  if (::stat(path->data(), &st) == -1) {
+    throw Alloc<OSError>(errno);
+  }
+
+  char buf[100];
+  int n = snprintf(buf, sizeof(buf), "%lu:%lu:%ld:%ld",
+                   static_cast<unsigned long>(st.st_dev),
+                   static_cast<unsigned long>(st.st_ino),
+                   static_cast<long>(st.st_mtime),
+                   static_cast<long>(st.st_size));
+  return Alloc<Tuple2<BigStr*, int>>(StrFromC(buf, n), st.st_mtime);
+}
+
 Tuple2<int, void*> PushTermAttrs(int fd, int mask) {
   struct termios* term_attrs =
       static_cast<struct termios*>(malloc(sizeof(struct termios)));
@@ -38,6 +38,9 @@ const int UNTRAPPED_SIGWINCH = -1;
 Tuple2<int, int> WaitPid(int waitpid_options);
 Tuple2<int, int> Read(int fd, int n, List<BigStr*>* chunks);
 Tuple2<int, int> ReadByte(int fd);
+int SeekCur(int fd, int delta);
+Tuple2<int, int> TempFile();
+int Rewind(int fd);
 BigStr* ReadLineBuffered();
 Dict<BigStr*, BigStr*>* Environ();
 int Chdir(BigStr* dest_dir);
@@ -79,12 +82,35 @@ class PasswdEntry {
 
 List<PasswdEntry*>* GetAllUsers();
 
+class DirEntry {
+ public:
+  DirEntry(BigStr* name, bool is_dir) : name(name), is_dir(is_dir) {
+  }
+
+  static constexpr ObjHeader obj_header() {
+    return ObjHeader::ClassFixed(field_mask(), sizeof(DirEntry));
+  }
+
+  BigStr* name;
+  bool is_dir;
+
+  static constexpr uint32_t field_mask() {
+    return maskbit(offsetof(DirEntry, name));
+  }
+};
+
+List<DirEntry*>* ReadDir(BigStr* path);
+
 BigStr* GetUserName(int uid);
 
 BigStr* OsType();
 
 Tuple3<double, double, double> Time();
 
+// Total time spent in the garbage collector.  0.0 unless the binary was built
+// with -D GC_TIMING.
+double GcMillis();
+
 void PrintTimes();
 
 bool InputAvailable(int fd);
@@ -159,6 +185,7 @@ class SignalSafe {
     DCHECK(empty_list->capacity_ == kMaxPendingSignals);
 
     empty_list_ = empty_list;
+    WriteBarrier(this);
   }
 
   // Main thread wants to get the last signal received.
@@ -237,6 +264,8 @@ void RegisterSignalInterest(int sig_num);
 
 Tuple2<BigStr*, int>* MakeDirCacheKey(BigStr* path);
 
+Tuple2<BigStr*, int>* MakeFileCacheKey(BigStr* path);
+
 }  // namespace pyos
 
 namespace pyutil {
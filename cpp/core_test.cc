@@ -346,6 +346,33 @@ TEST passwd_test() {
   PASS();
 }
 
+TEST read_dir_test() {
+  List<pyos::DirEntry*>* entries = pyos::ReadDir(StrFromC("/"));
+  ASSERT(len(entries) > 0);
+
+  bool found_etc = false;
+  for (ListIter<pyos::DirEntry*> it(entries); !it.Done(); it.Next()) {
+    pyos::DirEntry* entry = it.Value();
+    ASSERT(!str_equals(entry->name, StrFromC(".")));
+    ASSERT(!str_equals(entry->name, StrFromC("..")));
+    if (str_equals(entry->name, StrFromC("etc"))) {
+      ASSERT(entry->is_dir);
+      found_etc = true;
+    }
+  }
+  ASSERT(found_etc);
+
+  int ec = -1;
+  try {
+    pyos::ReadDir(StrFromC("nonexistent_ZZ"));
+  } catch (IOError_OSError* e) {
+    ec = e->errno_;
+  }
+  ASSERT(ec == ENOENT);
+
+  PASS();
+}
+
 TEST dir_cache_key_test() {
   struct stat st;
   ASSERT(::stat("/", &st) == 0);
@@ -365,6 +392,28 @@ TEST dir_cache_key_test() {
   PASS();
 }
 
+TEST file_cache_key_test() {
+  struct stat st;
+  ASSERT(::stat("/", &st) == 0);
+
+  Tuple2<BigStr*, int>* key = pyos::MakeFileCacheKey(StrFromC("/"));
+  ASSERT(key->at1() == st.st_mtime);
+
+  // Same file, same key
+  Tuple2<BigStr*, int>* key2 = pyos::MakeFileCacheKey(StrFromC("/"));
+  ASSERT(str_equals(key->at0(), key2->at0()));
+
+  int ec = -1;
+  try {
+    pyos::MakeFileCacheKey(StrFromC("nonexistent_ZZ"));
+  } catch (IOError_OSError* e) {
+    ec = e->errno_;
+  }
+  ASSERT(ec == ENOENT);
+
+  PASS();
+}
+
 // Test the theory that LeakSanitizer tests for reachability from global
 // variables.
 struct Node {
@@ -407,7 +456,9 @@ int main(int argc, char** argv) {
   RUN_TEST(signal_safe_test);
 
   RUN_TEST(passwd_test);
+  RUN_TEST(read_dir_test);
   RUN_TEST(dir_cache_key_test);
+  RUN_TEST(file_cache_key_test);
   RUN_TEST(asan_global_leak_test);
 
   gHeap.CleanProcessExit();
@@ -237,6 +237,95 @@ void WriteString(BigStr* s, int options, mylib::BufWriter* buf) {
 
 }  // namespace pyj8
 
+namespace pypackle {
+
+void WriteOp(int op, int arg, int num_bytes, mylib::BufWriter* buf) {
+  buf->EnsureMoreSpace(1 + num_bytes);
+  uint8_t* out = buf->LengthPointer();
+
+  *out++ = op;
+  // little endian; a 4 byte arg is two's complement
+  uint32_t u = static_cast<uint32_t>(arg);
+  for (int i = 0; i < num_bytes; ++i) {
+    *out++ = u & 0xff;
+    u >>= 8;
+  }
+
+  buf->SetLengthFrom(out);
+}
+
+void WriteLong(int op, mops::BigInt i, mylib::BufWriter* buf) {
+  buf->EnsureMoreSpace(10);
+  uint8_t* out = buf->LengthPointer();
+
+  *out++ = op;
+  *out++ = 8;
+  uint64_t u = static_cast<uint64_t>(i);
+  for (int j = 0; j < 8; ++j) {
+    *out++ = u & 0xff;
+    u >>= 8;
+  }
+
+  buf->SetLengthFrom(out);
+}
+
+void WriteFloat(int op, double f, mylib::BufWriter* buf) {
+  buf->EnsureMoreSpace(9);
+  uint8_t* out = buf->LengthPointer();
+
+  *out++ = op;
+  uint64_t u;
+  memcpy(&u, &f, sizeof(u));
+  for (int shift = 56; shift >= 0; shift -= 8) {  // big endian
+    *out++ = (u >> shift) & 0xff;
+  }
+
+  buf->SetLengthFrom(out);
+}
+
+int ReadInt(BigStr* s, int pos, int num_bytes) {
+  DCHECK(pos + num_bytes <= len(s));
+  const uint8_t* p = reinterpret_cast<const uint8_t*>(s->data_ + pos);
+
+  uint32_t u = 0;
+  for (int i = num_bytes - 1; i >= 0; --i) {
+    u = (u << 8) | p[i];
+  }
+  // 1 and 2 byte ints are unsigned, and fit in an int
+  return static_cast<int32_t>(u);
+}
+
+mops::BigInt ReadLong(BigStr* s, int pos, int num_bytes) {
+  DCHECK(num_bytes <= 8);
+  DCHECK(pos + num_bytes <= len(s));
+  if (num_bytes == 0) {
+    return 0;
+  }
+  const uint8_t* p = reinterpret_cast<const uint8_t*>(s->data_ + pos);
+
+  // sign extend from the last byte
+  uint64_t u = (p[num_bytes - 1] & 0x80) ? ~static_cast<uint64_t>(0) : 0;
+  for (int i = num_bytes - 1; i >= 0; --i) {
+    u = (u << 8) | p[i];
+  }
+  return static_cast<mops::BigInt>(u);
+}
+
+double ReadFloat(BigStr* s, int pos) {
+  DCHECK(pos + 8 <= len(s));
+  const uint8_t* p = reinterpret_cast<const uint8_t*>(s->data_ + pos);
+
+  uint64_t u = 0;
+  for (int i = 0; i < 8; ++i) {  // big endian
+    u = (u << 8) | p[i];
+  }
+  double f;
+  memcpy(&f, &u, sizeof(f));
+  return f;
+}
+
+}  // namespace pypackle
+
 namespace j8 {
 
 int HeapValueId(value_asdl::value_t* val) {
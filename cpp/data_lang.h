@@ -23,6 +23,23 @@ void WriteString(BigStr* s, int options, mylib::BufWriter* buf);
 
 }  // namespace pyj8
 
+// Byte-level functions for data_lang/packle
+namespace pypackle {
+
+void WriteOp(int op, int arg, int num_bytes, mylib::BufWriter* buf);
+
+void WriteLong(int op, mops::BigInt i, mylib::BufWriter* buf);
+
+void WriteFloat(int op, double f, mylib::BufWriter* buf);
+
+int ReadInt(BigStr* s, int pos, int num_bytes);
+
+mops::BigInt ReadLong(BigStr* s, int pos, int num_bytes);
+
+double ReadFloat(BigStr* s, int pos);
+
+}  // namespace pypackle
+
 namespace j8 {
 
 int HeapValueId(value_asdl::value_t* val);
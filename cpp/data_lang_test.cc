@@ -124,6 +124,43 @@ TEST heap_id_test() {
   PASS();
 }
 
+TEST packle_test() {
+  auto buf = Alloc<mylib::BufWriter>();
+
+  pypackle::WriteOp('K', 200, 1, buf);
+  pypackle::WriteOp('M', 0x1234, 2, buf);
+  pypackle::WriteOp('J', -2, 4, buf);
+  pypackle::WriteLong(0x8a, mops::BigInt(-(1LL << 40)), buf);
+  pypackle::WriteFloat('G', 1.5, buf);
+
+  BigStr* s = buf->getvalue();
+  ASSERT_EQ_FMT(1 + 1 + 1 + 2 + 1 + 4 + 10 + 9, len(s), "%d");
+
+  // Opcodes and little endian args
+  ASSERT_EQ('K', s->data_[0]);
+  ASSERT_EQ_FMT(200, pypackle::ReadInt(s, 1, 1), "%d");
+  ASSERT_EQ('M', s->data_[2]);
+  ASSERT(memcmp("\x34\x12", s->data_ + 3, 2) == 0);
+  ASSERT_EQ_FMT(0x1234, pypackle::ReadInt(s, 3, 2), "%d");
+  ASSERT_EQ_FMT(-2, pypackle::ReadInt(s, 6, 4), "%d");
+
+  // LONG1 has a length byte, then 8 bytes of two's complement
+  ASSERT_EQ(8, s->data_[11]);
+  ASSERT(pypackle::ReadLong(s, 12, 8) == -(1LL << 40));
+
+  // Fewer bytes are sign extended
+  BigStr* b = StrFromC("\xff\x7f");
+  ASSERT(pypackle::ReadLong(b, 0, 1) == -1);
+  ASSERT(pypackle::ReadLong(b, 0, 2) == 0x7fff);
+  ASSERT(pypackle::ReadLong(b, 0, 0) == 0);
+
+  // BINFLOAT is big endian
+  ASSERT(memcmp("\x3f\xf8\0\0\0\0\0\0", s->data_ + 21, 8) == 0);
+  ASSERT_EQ(1.5, pypackle::ReadFloat(s, 21));
+
+  PASS();
+}
+
 GREATEST_MAIN_DEFS();
 
 int main(int argc, char** argv) {
@@ -135,6 +172,7 @@ int main(int argc, char** argv) {
   RUN_TEST(WriteString_test);
   RUN_TEST(compare_c_test);
   RUN_TEST(heap_id_test);
+  RUN_TEST(packle_test);
 
   gHeap.CleanProcessExit();
 
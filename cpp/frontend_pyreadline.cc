@@ -224,6 +224,7 @@ void Readline::write_history_file(BigStr* path) {
 void Readline::set_completer(completion::ReadlineCallback* completer) {
 #if HAVE_READLINE
   completer_ = completer;
+  WriteBarrier(this);
 #else
   assert(0);  // not implemented
 #endif
@@ -232,6 +233,7 @@ void Readline::set_completer(completion::ReadlineCallback* completer) {
 void Readline::set_completer_delims(BigStr* delims) {
 #if HAVE_READLINE
   completer_delims_ = StrFromC(delims->data(), len(delims));
+  WriteBarrier(this);
   rl_completer_word_break_characters = completer_delims_->data();
 #else
   assert(0);  // not implemented
@@ -242,6 +244,7 @@ void Readline::set_completion_display_matches_hook(
     comp_ui::_IDisplay* display) {
 #if HAVE_READLINE
   display_ = display;
+  WriteBarrier(this);
 #else
   assert(0);  // not implemented
 #endif
@@ -11,6 +11,8 @@
 #include <unistd.h>  // gethostname()
 #include <wchar.h>
 
+#include "cpp/regex_cache_shared.h"
+
 namespace libc {
 
 BigStr* gethostname() {
@@ -108,12 +110,11 @@ List<BigStr*>* glob(BigStr* pat) {
 List<int>* regex_search(BigStr* pattern, int cflags, BigStr* str, int eflags,
                         int pos) {
   cflags |= REG_EXTENDED;
-  regex_t pat;
-  int status = regcomp(&pat, pattern->data_, cflags);
-  if (status != 0) {
-    char error_desc[50];
-    regerror(status, &pat, error_desc, 50);
-
+  int status;
+  char error_desc[50];
+  regex_t* pat =
+      regex_cache_get(pattern->data_, cflags, &status, error_desc, 50);
+  if (pat == nullptr) {
     char error_message[80];
     snprintf(error_message, 80, "Invalid regex %s (%s)", pattern->data_,
              error_desc);
@@ -121,7 +122,7 @@ List<int>* regex_search(BigStr* pattern, int cflags, BigStr* str, int eflags,
     throw Alloc<ValueError>(StrFromC(error_message));
   }
 
-  int num_groups = pat.re_nsub + 1;  // number of captures
+  int num_groups = pat->re_nsub + 1;  // number of captures
 
   List<int>* indices = NewList<int>();
   indices->reserve(num_groups * 2);
@@ -129,7 +130,7 @@ List<int>* regex_search(BigStr* pattern, int cflags, BigStr* str, int eflags,
   const char* s = str->data_;
   regmatch_t* pmatch =
       static_cast<regmatch_t*>(malloc(sizeof(regmatch_t) * num_groups));
-  bool match = regexec(&pat, s + pos, num_groups, pmatch, eflags) == 0;
+  bool match = regexec(pat, s + pos, num_groups, pmatch, eflags) == 0;
   if (match) {
     int i;
     for (i = 0; i < num_groups; i++) {
@@ -148,7 +149,6 @@ List<int>* regex_search(BigStr* pattern, int cflags, BigStr* str, int eflags,
   }
 
   free(pmatch);
-  regfree(&pat);
 
   if (!match) {
     return nullptr;
@@ -167,20 +167,22 @@ const int NMATCH = 2;
 // Odd: This a Tuple2* not Tuple2 because it's Optional[Tuple2]!
 Tuple2<int, int>* regex_first_group_match(BigStr* pattern, BigStr* str,
                                           int pos) {
-  regex_t pat;
   regmatch_t m[NMATCH];
 
   // Could have been checked by regex_parse for [[ =~ ]], but not for glob
   // patterns like ${foo/x*/y}.
 
-  if (regcomp(&pat, pattern->data_, REG_EXTENDED) != 0) {
+  int status;
+  char error_desc[50];
+  regex_t* pat =
+      regex_cache_get(pattern->data_, REG_EXTENDED, &status, error_desc, 50);
+  if (pat == nullptr) {
     throw Alloc<RuntimeError>(
         StrFromC("Invalid regex syntax (func_regex_first_group_match)"));
   }
 
   // Match at offset 'pos'
-  int result = regexec(&pat, str->data_ + pos, NMATCH, m, 0 /*flags*/);
-  regfree(&pat);
+  int result = regexec(pat, str->data_ + pos, NMATCH, m, 0 /*flags*/);
 
   if (result != 0) {
     return nullptr;
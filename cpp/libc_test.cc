@@ -3,6 +3,7 @@
 #include <regex.h>   // regcomp()
 #include <unistd.h>  // gethostname()
 
+#include "cpp/regex_cache_shared.h"
 #include "mycpp/runtime.h"
 #include "vendor/greatest.h"
 
@@ -121,6 +122,64 @@ TEST regex_test() {
   PASS();
 }
 
+TEST regex_cache_test() {
+  regex_cache_clear();
+  regex_cache_set_capacity(2);
+
+  RegexCacheStats stats;
+  regex_cache_stats(&stats);
+  int hits = stats.hits;
+  int misses = stats.misses;
+  int evictions = stats.evictions;
+
+  int status;
+  char err[50];
+  regex_t* a = regex_cache_get("a+", REG_EXTENDED, &status, err, 50);
+  ASSERT(a != nullptr);
+  ASSERT_EQ(a, regex_cache_get("a+", REG_EXTENDED, &status, err, 50));
+
+  // Same pattern with different flags is a different entry
+  regex_t* a2 =
+      regex_cache_get("a+", REG_EXTENDED | REG_ICASE, &status, err, 50);
+  ASSERT(a2 != nullptr);
+  ASSERT(a != a2);
+
+  // Evicts the least recently used entry
+  ASSERT(regex_cache_get("b+", REG_EXTENDED, &status, err, 50) != nullptr);
+
+  regex_cache_stats(&stats);
+  ASSERT_EQ_FMT(2, stats.size, "%d");
+  ASSERT_EQ_FMT(1, stats.hits - hits, "%d");
+  ASSERT_EQ_FMT(3, stats.misses - misses, "%d");
+  ASSERT_EQ_FMT(1, stats.evictions - evictions, "%d");
+
+  // Invalid patterns aren't cached
+  ASSERT_EQ(nullptr, regex_cache_get("(", REG_EXTENDED, &status, err, 50));
+  ASSERT(status != 0);
+  log("err = %s", err);
+
+  // Capacity 0 disables caching
+  regex_cache_set_capacity(0);
+  regex_cache_stats(&stats);
+  ASSERT_EQ_FMT(0, stats.size, "%d");
+  hits = stats.hits;
+  ASSERT(regex_cache_get("a+", REG_EXTENDED, &status, err, 50) != nullptr);
+  ASSERT(regex_cache_get("a+", REG_EXTENDED, &status, err, 50) != nullptr);
+  regex_cache_stats(&stats);
+  ASSERT_EQ_FMT(hits, stats.hits, "%d");
+
+  // The libc functions still work with the cache disabled
+  BigStr* s = StrFromC("xaay");
+  List<int>* indices = libc::regex_search(StrFromC("(a+)"), 0, s, 0);
+  ASSERT_EQ_FMT(4, len(indices), "%d");
+  ASSERT_EQ_FMT(1, indices->at(2), "%d");
+  ASSERT_EQ_FMT(3, indices->at(3), "%d");
+
+  regex_cache_set_capacity(REGEX_CACHE_DEFAULT_SIZE);
+
+  PASS();
+}
+
 TEST libc_glob_test() {
   // This depends on the file system
   auto files = libc::glob(StrFromC("*.testdata"));
@@ -259,6 +318,7 @@ int main(int argc, char** argv) {
   RUN_TEST(realpath_test);
   RUN_TEST(libc_test);
   RUN_TEST(regex_test);
+  RUN_TEST(regex_cache_test);
   RUN_TEST(libc_glob_test);
   RUN_TEST(for_test_coverage);
 
@@ -0,0 +1,248 @@
+#include "cpp/regex_cache_shared.h"
+
+#include <stdio.h>   // fprintf
+#include <stdlib.h>  // getenv(), malloc(), atexit()
+#include <string.h>  // strcmp(), strlen()
+
+// Entries are in a hash table for lookup, and in a doubly-linked list ordered
+// from most recently used (head) to least recently used (tail) for eviction.
+struct RegexCacheEntry {
+  char* pattern;
+  int cflags;
+  unsigned int hash;
+  regex_t re;
+
+  struct RegexCacheEntry* prev;   // toward head
+  struct RegexCacheEntry* next;   // toward tail
+  struct RegexCacheEntry* chain;  // next entry in the same bucket
+};
+
+typedef struct RegexCacheEntry Entry;
+
+static int gInitialized = 0;
+static int gPrintStats = 0;
+
+static int gCapacity = REGEX_CACHE_DEFAULT_SIZE;
+static int gSize = 0;
+static int gHits = 0;
+static int gMisses = 0;
+static int gEvictions = 0;
+
+static Entry* gHead = NULL;
+static Entry* gTail = NULL;
+
+static Entry** gBuckets = NULL;
+static unsigned int gNumBuckets = 0;  // power of 2, or 0 before first insert
+
+static unsigned int HashKey(const char* pattern, int cflags) {
+  // FNV-1a
+  unsigned int h = 2166136261u;
+  for (const unsigned char* p = (const unsigned char*)pattern; *p; ++p) {
+    h ^= *p;
+    h *= 16777619u;
+  }
+  h ^= (unsigned int)cflags;
+  h *= 16777619u;
+  return h;
+}
+
+static void Unlink(Entry* e) {
+  if (e->prev) {
+    e->prev->next = e->next;
+  } else {
+    gHead = e->next;
+  }
+  if (e->next) {
+    e->next->prev = e->prev;
+  } else {
+    gTail = e->prev;
+  }
+  e->prev = NULL;
+  e->next = NULL;
+}
+
+static void PushFront(Entry* e) {
+  e->prev = NULL;
+  e->next = gHead;
+  if (gHead) {
+    gHead->prev = e;
+  } else {
+    gTail = e;
+  }
+  gHead = e;
+}
+
+static void RemoveFromBucket(Entry* e) {
+  Entry** slot = &gBuckets[e->hash & (gNumBuckets - 1)];
+  while (*slot != e) {
+    slot = &(*slot)->chain;
+  }
+  *slot = e->chain;
+}
+
+static void FreeEntry(Entry* e) {
+  regfree(&e->re);
+  free(e->pattern);
+  free(e);
+}
+
+static void EvictTail(void) {
+  Entry* e = gTail;
+  Unlink(e);
+  RemoveFromBucket(e);
+  FreeEntry(e);
+  gSize--;
+  gEvictions++;
+}
+
+// Size the bucket array for the capacity, so chains stay short.
+static void Rehash(void) {
+  unsigned int n = 8;
+  while (n < (unsigned int)gCapacity * 2) {
+    n *= 2;
+  }
+  if (n == gNumBuckets) {
+    return;
+  }
+
+  free(gBuckets);
+  gBuckets = (Entry**)calloc(n, sizeof(Entry*));
+  gNumBuckets = n;
+
+  for (Entry* e = gHead; e; e = e->next) {
+    Entry** slot = &gBuckets[e->hash & (n - 1)];
+    e->chain = *slot;
+    *slot = e;
+  }
+}
+
+static void PrintStats(FILE* f) {
+  fprintf(f, "regex cache capacity  = %10d\n", gCapacity);
+  fprintf(f, "regex cache size      = %10d\n", gSize);
+  fprintf(f, "regex cache hits      = %10d\n", gHits);
+  fprintf(f, "regex cache misses    = %10d\n", gMisses);
+  fprintf(f, "regex cache evictions = %10d\n", gEvictions);
+}
+
+static void AtExit(void) {
+  if (gPrintStats) {
+    PrintStats(stderr);
+  }
+  regex_cache_clear();
+}
+
+static void EnsureInit(void) {
+  if (gInitialized) {
+    return;
+  }
+  gInitialized = 1;
+
+  char* e = getenv("OILS_REGEX_CACHE_SIZE");
+  if (e) {
+    char* end;
+    long n = strtol(e, &end, 10);
+    if (*e && *end == '\0' && n >= 0) {
+      gCapacity = (int)n;
+    }
+  }
+
+  e = getenv("OILS_REGEX_CACHE_STATS");
+  if (e && strlen(e)) {  // env var set and non-empty
+    gPrintStats = 1;
+  }
+
+  atexit(AtExit);
+}
+
+regex_t* regex_cache_get(const char* pattern, int cflags, int* status,
+                         char* err_buf, int err_len) {
+  EnsureInit();
+
+  unsigned int hash = HashKey(pattern, cflags);
+
+  if (gCapacity > 0 && gNumBuckets) {
+    Entry* e = gBuckets[hash & (gNumBuckets - 1)];
+    for (; e; e = e->chain) {
+      if (e->hash == hash && e->cflags == cflags &&
+          strcmp(e->pattern, pattern) == 0) {
+        gHits++;
+        if (e != gHead) {
+          Unlink(e);
+          PushFront(e);
+        }
+        *status = 0;
+        return &e->re;
+      }
+    }
+  }
+
+  gMisses++;
+
+  Entry* e = (Entry*)malloc(sizeof(Entry));
+  *status = regcomp(&e->re, pattern, cflags);
+  if (*status != 0) {
+    regerror(*status, &e->re, err_buf, err_len);
+    free(e);
+    return NULL;
+  }
+
+  // With capacity 0, we still hold on to the last pattern so the caller can
+  // use it.  It's evicted on the next call.
+  int max_size = gCapacity > 0 ? gCapacity : 1;
+  while (gSize >= max_size) {
+    EvictTail();
+  }
+
+  if (gNumBuckets == 0) {
+    Rehash();
+  }
+
+  size_t n = strlen(pattern);
+  e->pattern = (char*)malloc(n + 1);
+  memcpy(e->pattern, pattern, n + 1);
+  e->cflags = cflags;
+  e->hash = hash;
+
+  Entry** slot = &gBuckets[hash & (gNumBuckets - 1)];
+  e->chain = *slot;
+  *slot = e;
+  PushFront(e);
+  gSize++;
+
+  return &e->re;
+}
+
+void regex_cache_set_capacity(int capacity) {
+  EnsureInit();
+
+  gCapacity = capacity;
+  while (gSize > gCapacity) {
+    EvictTail();
+  }
+  if (gNumBuckets) {
+    Rehash();
+  }
+}
+
+void regex_cache_stats(struct RegexCacheStats* out) {
+  EnsureInit();
+
+  out->capacity = gCapacity;
+  out->size = gSize;
+  out->hits = gHits;
+  out->misses = gMisses;
+  out->evictions = gEvictions;
+}
+
+void regex_cache_clear(void) {
+  while (gTail) {
+    Entry* e = gTail;
+    Unlink(e);
+    FreeEntry(e);
+  }
+  gSize = 0;
+
+  free(gBuckets);
+  gBuckets = NULL;
+  gNumBuckets = 0;
+}
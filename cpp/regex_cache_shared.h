@@ -0,0 +1,48 @@
+#ifndef REGEX_CACHE_SHARED_H
+#define REGEX_CACHE_SHARED_H
+
+// A bounded cache of compiled POSIX regexes, keyed by (pattern, cflags).
+//
+// This library is shared between cpp/ and pyext/, so that [[ $x =~ pat ]],
+// ${x//pat/rep}, and eggex matching all avoid calling regcomp() and
+// regfree() on every evaluation.
+//
+// Environment variables, read on first use:
+//
+//   OILS_REGEX_CACHE_SIZE=N   max number of compiled patterns (default 100).
+//                             0 disables caching: every lookup is a miss.
+//   OILS_REGEX_CACHE_STATS=1  print hit/miss counters to stderr on exit
+
+#include <regex.h>
+
+#define REGEX_CACHE_DEFAULT_SIZE 100
+
+struct RegexCacheStats {
+  int capacity;
+  int size;  // number of patterns currently cached
+  int hits;
+  int misses;
+  int evictions;
+};
+
+// Return a compiled regex for (pattern, cflags).
+//
+// The regex_t is owned by the cache.  It stays valid until the next call to
+// regex_cache_get() or regex_cache_set_capacity(), so callers must not
+// regfree() it or hold it across calls.
+//
+// If the pattern is invalid, returns NULL, sets *status to the regcomp()
+// error code, and writes the regerror() description to err_buf.
+regex_t* regex_cache_get(const char* pattern, int cflags, int* status,
+                         char* err_buf, int err_len);
+
+// Change the maximum number of entries, evicting the least recently used
+// ones.  Overrides OILS_REGEX_CACHE_SIZE.
+void regex_cache_set_capacity(int capacity);
+
+void regex_cache_stats(struct RegexCacheStats* out);
+
+// Free all entries.  Used at exit so ASAN doesn't report leaks.
+void regex_cache_clear(void);
+
+#endif  // REGEX_CACHE_SHARED_H
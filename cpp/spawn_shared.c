@@ -0,0 +1,89 @@
+#include "cpp/spawn_shared.h"
+
+#include <errno.h>
+#include <signal.h>
+#include <spawn.h>
+
+// glibc 2.24 implements posix_spawn() with clone(CLONE_VM | CLONE_VFORK), and
+// returns the error if exec() fails.  Older versions used fork(), and the child
+// exits with status 127, so we can't tell that apart from the program failing.
+// macOS and FreeBSD report exec() errors too.
+#if (defined(__GLIBC__) &&                                      \
+     (__GLIBC__ > 2 || (__GLIBC__ == 2 && __GLIBC_MINOR__ >= 24))) || \
+    defined(__APPLE__) || defined(__FreeBSD__)
+#define HAVE_RELIABLE_SPAWN 1
+#endif
+
+int spawn_run(const char* path, char* const* argv, char* const* envp,
+              const struct SpawnAttrs* attrs, pid_t* pid) {
+#ifndef HAVE_RELIABLE_SPAWN
+  (void)path;
+  (void)argv;
+  (void)envp;
+  (void)attrs;
+  (void)pid;
+  return ENOSYS;
+#else
+  posix_spawn_file_actions_t actions;
+  posix_spawnattr_t spawn_attr;
+  short flags = 0;
+  int err;
+
+  err = posix_spawn_file_actions_init(&actions);
+  if (err != 0) {
+    return err;
+  }
+  err = posix_spawnattr_init(&spawn_attr);
+  if (err != 0) {
+    posix_spawn_file_actions_destroy(&actions);
+    return err;
+  }
+
+  for (int i = 0; i < attrs->num_dups; ++i) {
+    err = posix_spawn_file_actions_adddup2(&actions, attrs->dups[2 * i],
+                                           attrs->dups[2 * i + 1]);
+    if (err != 0) {
+      goto done;
+    }
+  }
+  for (int i = 0; i < attrs->num_closes; ++i) {
+    err = posix_spawn_file_actions_addclose(&actions, attrs->closes[i]);
+    if (err != 0) {
+      goto done;
+    }
+  }
+
+  if (attrs->pgid != -1) {
+    flags |= POSIX_SPAWN_SETPGROUP;
+    err = posix_spawnattr_setpgroup(&spawn_attr, attrs->pgid);
+    if (err != 0) {
+      goto done;
+    }
+  }
+
+  if (attrs->num_sig_defaults) {
+    sigset_t sigs;
+    sigemptyset(&sigs);
+    for (int i = 0; i < attrs->num_sig_defaults; ++i) {
+      sigaddset(&sigs, attrs->sig_defaults[i]);
+    }
+    flags |= POSIX_SPAWN_SETSIGDEF;
+    err = posix_spawnattr_setsigdefault(&spawn_attr, &sigs);
+    if (err != 0) {
+      goto done;
+    }
+  }
+
+  err = posix_spawnattr_setflags(&spawn_attr, flags);
+  if (err != 0) {
+    goto done;
+  }
+
+  err = posix_spawn(pid, path, &actions, &spawn_attr, argv, envp);
+
+done:
+  posix_spawnattr_destroy(&spawn_attr);
+  posix_spawn_file_actions_destroy(&actions);
+  return err;
+#endif
+}
@@ -0,0 +1,36 @@
+#ifndef SPAWN_SHARED_H
+#define SPAWN_SHARED_H
+
+// Start an external program with posix_spawn() rather than fork() and exec().
+//
+// fork() copies the page tables of the shell, so its cost grows with the size
+// of the heap.  posix_spawn() is implemented like vfork() on the platforms we
+// use it on.
+//
+// This library is shared between cpp/ and pyext/.
+
+#include <sys/types.h>  // pid_t
+
+// The changes the child needs before exec(), applied in this order.
+struct SpawnAttrs {
+  int pgid;  // -1 to leave it alone, 0 for its own process group
+
+  const int* dups;  // pairs of (old fd, new fd) for dup2()
+  int num_dups;     // number of pairs
+
+  const int* closes;  // descriptors to close() after the dups
+  int num_closes;
+
+  const int* sig_defaults;  // signals to reset to SIG_DFL
+  int num_sig_defaults;
+};
+
+// Returns 0 and sets *pid on success.  Otherwise returns an errno value,
+// including when exec() fails in the child, e.g. ENOENT or ENOEXEC.
+//
+// Returns ENOSYS on platforms where posix_spawn() may not report exec()
+// failures.  The caller should fall back to fork() and exec().
+int spawn_run(const char* path, char* const* argv, char* const* envp,
+              const struct SpawnAttrs* attrs, pid_t* pid);
+
+#endif  // SPAWN_SHARED_H
@@ -13,6 +13,7 @@
 #include <time.h>
 #include <unistd.h>
 
+#include "cpp/spawn_shared.h"
 #include "mycpp/runtime.h"
 // To avoid circular dependency with e_die()
 #include "prebuilt/core/error.mycpp.h"
@@ -85,8 +86,10 @@ mylib::File* fdopen(int fd, BigStr* c_mode) {
   return Alloc<mylib::CFile>(f);
 }
 
-void execve(BigStr* argv0, List<BigStr*>* argv,
-            Dict<BigStr*, BigStr*>* environ) {
+// Allocate a single buffer with NULL-terminated argv and envp arrays.  The
+// caller frees it.
+static char* MakeArgvEnvp(List<BigStr*>* argv, Dict<BigStr*, BigStr*>* environ,
+                          char*** argv_out, char*** envp_out) {
   int n_args = len(argv);
   int n_env = len(environ);
   int combined_size = 0;
@@ -101,9 +104,9 @@ void execve(BigStr* argv0, List<BigStr*>* argv,
   const int env_size = (n_env + 1) * sizeof(char*);
   combined_size += argv_size;
   combined_size += env_size;
-  char* combined_buf = static_cast<char*>(malloc(combined_size));
+  char* result = static_cast<char*>(malloc(combined_size));
+  char* combined_buf = result;
 
-  // never deallocated
   char** _argv = reinterpret_cast<char**>(combined_buf);
   combined_buf += argv_size;
 
@@ -134,6 +137,18 @@ void execve(BigStr* argv0, List<BigStr*>* argv,
   }
   envp[n_env] = nullptr;
 
+  *argv_out = _argv;
+  *envp_out = envp;
+  return result;
+}
+
+void execve(BigStr* argv0, List<BigStr*>* argv,
+            Dict<BigStr*, BigStr*>* environ) {
+  char** _argv;
+  char** envp;
+  // never deallocated
+  MakeArgvEnvp(argv, environ, &_argv, &envp);
+
   int ret = ::execve(argv0->data_, _argv, envp);
   if (ret == -1) {
     throw Alloc<OSError>(errno);
@@ -143,6 +158,37 @@ void execve(BigStr* argv0, List<BigStr*>* argv,
   FAIL(kShouldNotGetHere);
 }
 
+// List<int> stores its items contiguously, but has no slab when empty
+static const int* IntItems(List<int>* list) {
+  return len(list) ? list->slab_->items_ : nullptr;
+}
+
+int spawn(BigStr* argv0, List<BigStr*>* argv, Dict<BigStr*, BigStr*>* environ,
+          int pgid, List<int>* dups, List<int>* closes,
+          List<int>* sig_defaults) {
+  struct SpawnAttrs attrs;
+  attrs.pgid = pgid;
+  attrs.dups = IntItems(dups);
+  attrs.num_dups = len(dups) / 2;
+  attrs.closes = IntItems(closes);
+  attrs.num_closes = len(closes);
+  attrs.sig_defaults = IntItems(sig_defaults);
+  attrs.num_sig_defaults = len(sig_defaults);
+
+  char** _argv;
+  char** envp;
+  char* buf = MakeArgvEnvp(argv, environ, &_argv, &envp);
+
+  pid_t pid;
+  int err = spawn_run(argv0->data_, _argv, envp, &attrs, &pid);
+  free(buf);
+
+  if (err != 0) {
+    throw Alloc<OSError>(err);
+  }
+  return pid;
+}
+
 void kill(int pid, int sig) {
   if (::kill(pid, sig) != 0) {
     throw Alloc<OSError>(errno);
@@ -148,6 +148,12 @@ mylib::File* fdopen(int fd, BigStr* c_mode);
 void execve(BigStr* argv0, List<BigStr*>* argv,
             Dict<BigStr*, BigStr*>* environ);
 
+// Like execve(), but starts a child process with posix_spawn().  dups is a
+// flat list of (old fd, new fd) pairs.  Returns the PID.
+int spawn(BigStr* argv0, List<BigStr*>* argv, Dict<BigStr*, BigStr*>* environ,
+          int pgid, List<int>* dups, List<int>* closes,
+          List<int>* sig_defaults);
+
 void kill(int pid, int sig);
 void killpg(int pgid, int sig);
 
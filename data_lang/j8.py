@@ -33,12 +33,15 @@ Later:
     - NIL8 at least has no commas for [1 2 "hi"]
 """
 
+from errno import EINTR
+
 from _devbuild.gen.id_kind_asdl import Id, Id_t, Id_str
 from _devbuild.gen.value_asdl import (value, value_e, value_t, value_str)
 from _devbuild.gen.nil8_asdl import (nvalue, nvalue_t)
 
 from asdl import format as fmt
 from core import error
+from core import pyos
 from data_lang import pyj8
 # dependency issue: consts.py pulls in frontend/option_def.py
 from frontend import consts
@@ -418,10 +421,10 @@ class InstancePrinter(object):
             # BashArray and BashAssoc should be printed with pp line (x), e.g.
             # for spec tests.
             # - BashAssoc has a clear encoding.
-            # - BashArray could eventually be Dict[int, str].  But that's not
-            #   encodable in JSON, which has string keys!
-            #   So I think we can print it like ["a",null,'b"] and that won't
-            #   change.  That's what users expect.
+            # - SparseArray is a Dict[int, str].  But that's not encodable in
+            #   JSON, which has string keys!
+            #   So we print it like ["a",null,'b"], which is what users
+            #   expect.
             elif case(value_e.BashArray):
                 val = cast(value.BashArray, UP_val)
 
@@ -443,6 +446,29 @@ class InstancePrinter(object):
                 self._BracketIndent(level)
                 self.buf.write(']')
 
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+
+                # Unset entries are null, like BashArray used to have
+                self.buf.write('[')
+                self._MaybeNewline()
+                for i in xrange(0, val.max_index + 1):
+                    if i != 0:
+                        self.buf.write(',')
+                        self._MaybeNewline()
+
+                    self._ItemIndent(level)
+                    s = val.d.get(i)
+                    if s is None:
+                        self.buf.write('null')
+                    else:
+                        pyj8.WriteString(s, self.options, self.buf)
+
+                self._MaybeNewline()
+
+                self._BracketIndent(level)
+                self.buf.write(']')
+
             elif case(value_e.BashAssoc):
                 val = cast(value.BashAssoc, UP_val)
 
@@ -536,11 +562,24 @@ class PrettyPrinter(object):
         pass
 
 
+# Bytes to read at a time when streaming
+_CHUNK_SIZE = 64 * 1024
+
+# A token that ends this close to the end of the buffer may be a prefix of a
+# longer one, like 1.5 in 1.5e3, or \uD83D in a surrogate pair.  So we read
+# more before accepting it.
+_LOOKAHEAD = 16
+
+
 class LexerDecoder(object):
     """J8 lexer and string decoder.
 
     Similar interface as SimpleLexer, except we return an optional decoded
     string
+
+    After StreamFrom(fd), self.s is a window of the input, and more is read
+    when a token reaches its end.  Positions are relative to the window, and
+    self.num_dropped is the number of bytes before it.
     """
 
     def __init__(self, s, is_j8, lang_str):
@@ -550,6 +589,7 @@ class LexerDecoder(object):
         self.lang_str = lang_str
 
         self.pos = 0
+        self.tok_start = 0  # start of the last token returned
 
         # current line being lexed -- for error messages
         self.cur_line_num = 1
@@ -558,6 +598,56 @@ class LexerDecoder(object):
         # thousands of strings.
         self.decoded = mylib.BufWriter()
 
+        # For streaming
+        self.fd = -1  # -1 if we have the whole input
+        self.num_dropped = 0
+        self.keep_pos = -1  # if set, don't drop bytes after this position
+
+    def StreamFrom(self, fd):
+        # type: (int) -> None
+        """Read the input from a file descriptor, a chunk at a time."""
+        self.fd = fd
+
+    def _MaybeRefill(self, end_pos):
+        # type: (int) -> int
+        """Read another chunk if a token ends near the end of the window.
+
+        Bytes before self.pos (or self.keep_pos) are dropped, so positions
+        shift to the left.
+
+        Returns:
+          -1 if the token is complete, or the shift.  Then the caller must
+          match the token again.
+        """
+        if self.fd == -1 or end_pos + _LOOKAHEAD <= len(self.s):
+            return -1
+
+        chunks = []  # type: List[str]
+        while True:
+            n, err_num = pyos.Read(self.fd, _CHUNK_SIZE, chunks)
+            if n < 0:
+                if err_num == EINTR:
+                    continue  # retry, like read --all
+                raise pyos.ReadError(err_num)
+            break
+
+        if n == 0:  # EOF, so tokens can be accepted now
+            self.fd = -1
+            return 0
+
+        shift = self.pos
+        if self.keep_pos != -1 and self.keep_pos < shift:
+            shift = self.keep_pos
+
+        self.s = self.s[shift:] + chunks[0]
+        self.num_dropped += shift
+        self.pos -= shift
+        # Inside a long string, the start of the token may be dropped
+        self.tok_start = max(0, self.tok_start - shift)
+        if self.keep_pos != -1:
+            self.keep_pos -= shift
+        return shift
+
     def _Error(self, msg, end_pos):
         # type: (str, int) -> error.Decode
 
@@ -568,7 +658,11 @@ class LexerDecoder(object):
         # type: () -> Tuple[Id_t, int, Optional[str]]
         """ Returns a token and updates self.pos """
 
-        tok_id, end_pos = match.MatchJ8Token(self.s, self.pos)
+        while True:
+            tok_id, end_pos = match.MatchJ8Token(self.s, self.pos)
+            if self._MaybeRefill(end_pos) == -1:
+                break
+        self.tok_start = self.pos
 
         if not self.is_j8:
             if tok_id in (Id.Left_BSingleQuote, Id.Left_USingleQuote):
@@ -595,7 +689,11 @@ class LexerDecoder(object):
         # type: () -> Tuple[Id_t, int, Optional[str]]
         """ Like Next(), but for J8 Lines """
 
-        tok_id, end_pos = match.MatchJ8LinesToken(self.s, self.pos)
+        while True:
+            tok_id, end_pos = match.MatchJ8LinesToken(self.s, self.pos)
+            if self._MaybeRefill(end_pos) == -1:
+                break
+        self.tok_start = self.pos
 
         if tok_id in (Id.Left_DoubleQuote, Id.Left_BSingleQuote,
                       Id.Left_USingleQuote):
@@ -628,6 +726,15 @@ class LexerDecoder(object):
             else:
                 tok_id, str_end = match.MatchJ8StrToken(self.s, str_pos)
 
+            if self.fd != -1:
+                # Drop the part of a long string that's already decoded.
+                # Errors then point into the string, not at its start.
+                self.pos = str_pos
+                shift = self._MaybeRefill(str_end)
+                if shift != -1:
+                    str_pos -= shift
+                    continue
+
             #log('String tok %s', Id_str(tok_id))
 
             if tok_id == Id.Eol_Tok:
@@ -726,7 +833,7 @@ class _Parser(object):
 
     def __init__(self, s, is_j8):
         # type: (str, bool) -> None
-        self.s = s
+        self.s = s  # the whole input, or '' when streaming
         self.is_j8 = is_j8
         self.lang_str = "J8" if is_j8 else "JSON"
 
@@ -739,10 +846,9 @@ class _Parser(object):
     def _Next(self):
         # type: () -> None
 
-        # This isn't the start of a J8_Bool token, it's the END of the token before it
         while True:
-            self.start_pos = self.end_pos
             self.tok_id, self.end_pos, self.decoded = self.lexer.Next()
+            self.start_pos = self.lexer.tok_start
             if self.tok_id not in (Id.Ignored_Space, Id.Ignored_Newline,
                                    Id.Ignored_Comment):
                 break
@@ -765,12 +871,17 @@ class _Parser(object):
     def _NextForLines(self):
         # type: () -> None
         """Like _Next, but use the J8 Lines lexer."""
-        self.start_pos = self.end_pos
         self.tok_id, self.end_pos, self.decoded = self.lexer.NextForLines()
+        self.start_pos = self.lexer.tok_start
+
+    def StreamFrom(self, fd):
+        # type: (int) -> None
+        """Parse input read from a file descriptor, rather than a string."""
+        self.lexer.StreamFrom(fd)
 
     def _ParseError(self, msg):
         # type: (str) -> error.Decode
-        return error.Decode(msg, self.s, self.start_pos, self.end_pos,
+        return error.Decode(msg, self.lexer.s, self.start_pos, self.end_pos,
                             self.lexer.cur_line_num)
 
 
@@ -780,6 +891,7 @@ class Parser(_Parser):
     def __init__(self, s, is_j8):
         # type: (str, bool) -> None
         _Parser.__init__(self, s, is_j8)
+        self.num_items = 0  # for NextItem()
 
     def _ParsePair(self):
         # type: () -> Tuple[str, value_t]
@@ -866,18 +978,18 @@ class Parser(_Parser):
             return value.Null
 
         elif self.tok_id == Id.J8_Bool:
-            #log('%r %d', self.s[self.start_pos], self.start_pos)
-            b = value.Bool(self.s[self.start_pos] == 't')
+            #log('%r %d', self.lexer.s[self.start_pos], self.start_pos)
+            b = value.Bool(self.lexer.s[self.start_pos] == 't')
             self._Next()
             return b
 
         elif self.tok_id == Id.J8_Int:
-            part = self.s[self.start_pos:self.end_pos]
+            part = self.lexer.s[self.start_pos:self.end_pos]
             self._Next()
             return value.Int(mops.FromStr(part))
 
         elif self.tok_id == Id.J8_Float:
-            part = self.s[self.start_pos:self.end_pos]
+            part = self.lexer.s[self.start_pos:self.end_pos]
             self._Next()
             return value.Float(float(part))
 
@@ -905,6 +1017,48 @@ class Parser(_Parser):
             raise self._ParseError('Unexpected trailing input')
         return obj
 
+    def StartItems(self):
+        # type: () -> Optional[value_t]
+        """Start parsing a value that may be a list, one item at a time.
+
+        Returns None if the value is a list; call NextItem() for its items.
+        Otherwise returns the whole value.  Raises error.Decode.
+        """
+        self._Next()
+        if self.tok_id != Id.J8_LBracket:
+            obj = self._ParseValue()
+            if self.tok_id != Id.Eol_Tok:
+                raise self._ParseError('Unexpected trailing input')
+            return obj
+
+        self._Next()
+        self.num_items = 0
+        return None
+
+    def NextItem(self):
+        # type: () -> Optional[value_t]
+        """Returns the next item of the list, or None after the last one.
+
+        Only the current item is in memory.  Raises error.Decode.
+        """
+        if self.num_items == 0:
+            if self.tok_id == Id.J8_RBracket:
+                self._Next()
+                if self.tok_id != Id.Eol_Tok:
+                    raise self._ParseError('Unexpected trailing input')
+                return None
+        else:
+            if self.tok_id == Id.J8_Comma:
+                self._Next()
+            else:
+                self._Eat(Id.J8_RBracket)
+                if self.tok_id != Id.Eol_Tok:
+                    raise self._ParseError('Unexpected trailing input')
+                return None
+
+        self.num_items += 1
+        return self._ParseValue()
+
 
 class Nil8Parser(_Parser):
     """
@@ -1133,6 +1287,7 @@ class J8LinesParser(_Parser):
     def __init__(self, s):
         # type: (str) -> None
         _Parser.__init__(self, s, True)
+        self.pending = []  # type: List[str]  # for NextLine()
 
     def _Show(self, s):
         # type: (str) -> None
@@ -1169,11 +1324,13 @@ class J8LinesParser(_Parser):
         # Unquoted line
         if self.tok_id == Id.Lit_Chars:
             # '  unquoted "" text on line  '   # read every token until end
-            string_start = self.start_pos
+            lexer = self.lexer
+            lexer.keep_pos = self.start_pos  # when streaming, keep the line
             while True:
                 # for stripping whitespace
                 prev_id = self.tok_id
-                prev_start = self.start_pos
+                # absolute position, since the streaming window can shift
+                prev_start = lexer.num_dropped + self.start_pos
 
                 self._NextForLines()
 
@@ -1185,11 +1342,13 @@ class J8LinesParser(_Parser):
                     break
 
             if prev_id == Id.WS_Space:
-                string_end = prev_start  # remove trailing whitespace
+                # remove trailing whitespace
+                string_end = prev_start - lexer.num_dropped
             else:
                 string_end = self.start_pos
 
-            out.append(self.s[string_start:string_end])
+            out.append(lexer.s[lexer.keep_pos:string_end])
+            lexer.keep_pos = -1
 
             self._NextForLines()  # past newline
             return
@@ -1199,16 +1358,29 @@ class J8LinesParser(_Parser):
     def Parse(self):
         # type: () -> List[str]
         """ Raises error.Decode. """
-        self._NextForLines()
-
         lines = []  # type: List[str]
-        while self.tok_id != Id.Eol_Tok:
-            self._ParseLine(lines)
+        while True:
+            line = self.NextLine()
+            if line is None:
+                break
+            lines.append(line)
+        return lines
 
-        if self.tok_id != Id.Eol_Tok:
-            raise self._ParseError('Unexpected trailing input in J8 Lines')
+    def NextLine(self):
+        # type: () -> Optional[str]
+        """Returns the next line, or None at the end of input.
 
-        return lines
+        Empty lines are skipped.  Raises error.Decode.
+        """
+        if self.tok_id == Id.Undefined_Tok:  # first call
+            self._NextForLines()
+
+        while self.tok_id != Id.Eol_Tok:
+            self._ParseLine(self.pending)
+            if len(self.pending):
+                return self.pending.pop()
+
+        return None
 
 
 def SplitJ8Lines(s):
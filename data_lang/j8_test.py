@@ -1,11 +1,14 @@
 #!/usr/bin/env python2
 from __future__ import print_function
 
+import os
+import tempfile
 import unittest
 
 from _devbuild.gen.syntax_asdl import Id, Id_str
 from core import error
 from data_lang import j8
+from mycpp import mylib
 from mycpp.mylib import log
 
 
@@ -212,6 +215,110 @@ class J8Test(unittest.TestCase):
             self.fail('Expected failure')
 
 
+def _Encode(val):
+    buf = mylib.BufWriter()
+    j8.PrintMessage(val, buf, -1)
+    return buf.getvalue()
+
+
+def _OpenString(s):
+    """Returns a file descriptor to read s from."""
+    f = tempfile.TemporaryFile()
+    f.write(s)
+    f.seek(0)
+    return os.dup(f.fileno())
+
+
+class StreamTest(unittest.TestCase):
+
+    """
+    The tests set the module global j8._CHUNK_SIZE to small values, so tokens
+    and strings are split across reads.  It's restored after each test, so
+    other tests read in full size chunks.
+    """
+
+    def setUp(self):
+        self.orig_chunk_size = j8._CHUNK_SIZE
+
+    def tearDown(self):
+        j8._CHUNK_SIZE = self.orig_chunk_size
+
+    def testParseValue(self):
+        CASES = [
+            '[1, 2.5e3, -0.125, true, false, null]',
+            '{"key": "value", "nested": [{"a": []}, {}]}',
+            r'"escapes \n \" \u00e9 \ud83d\ude00"',
+            "b'bytes \\yff \\u{1f600}' # comment\n",
+            '"%s"' % ('long string ' * 500),
+            '  123456789012345678  ',
+        ]
+        for s in CASES:
+            expected = _Encode(j8.Parser(s, True).ParseValue())
+            for chunk_size in [1, 3, 7, 100]:
+                j8._CHUNK_SIZE = chunk_size
+                fd = _OpenString(s)
+                p = j8.Parser('', True)
+                p.StreamFrom(fd)
+                self.assertEqual(expected, _Encode(p.ParseValue()))
+                os.close(fd)
+
+    def testParseError(self):
+        j8._CHUNK_SIZE = 4
+        fd = _OpenString('[1, 2, 3] x')
+        p = j8.Parser('', False)
+        p.StreamFrom(fd)
+        try:
+            p.ParseValue()
+        except error.Decode as e:
+            print(e)
+        else:
+            self.fail('Expected failure')
+        os.close(fd)
+
+    def testNextItem(self):
+        j8._CHUNK_SIZE = 5
+        fd = _OpenString('[1, {"a": 2}, "three"]')
+        p = j8.Parser('', False)
+        p.StreamFrom(fd)
+        self.assertEqual(None, p.StartItems())
+
+        items = []
+        while True:
+            item = p.NextItem()
+            if item is None:
+                break
+            items.append(item)
+        self.assertEqual(3, len(items))
+        self.assertEqual('three', items[2].s)
+        os.close(fd)
+
+        # Not a list
+        p = j8.Parser('{"a": 1}', False)
+        self.assertNotEqual(None, p.StartItems())
+
+        p = j8.Parser('[]', False)
+        self.assertEqual(None, p.StartItems())
+        self.assertEqual(None, p.NextItem())
+
+        p = j8.Parser('[1 2]', False)
+        self.assertEqual(None, p.StartItems())
+        p.NextItem()
+        self.assertRaises(error.Decode, p.NextItem)
+
+    def testLines(self):
+        s = 'one\n  two  three  \n\n"four\\n"\n  five'
+        expected = j8.J8LinesParser(s).Parse()
+        self.assertEqual(['one', 'two  three', 'four\n', 'five'], expected)
+
+        for chunk_size in [1, 2, 5, 100]:
+            j8._CHUNK_SIZE = chunk_size
+            fd = _OpenString(s)
+            p = j8.J8LinesParser('')
+            p.StreamFrom(fd)
+            self.assertEqual(expected, p.Parse())
+            os.close(fd)
+
+
 class YajlTest(unittest.TestCase):
     """
     Note on old tests for YAJL.  Differences
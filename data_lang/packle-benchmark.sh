@@ -0,0 +1,74 @@
+#!/usr/bin/env bash
+#
+# Compare the speed of packle and json8, on a large generated document.
+#
+# Usage:
+#   data_lang/packle-benchmark.sh <function name>
+#
+# Example:
+#   data_lang/packle-benchmark.sh compare bin/ysh 20000
+
+set -o nounset
+set -o pipefail
+set -o errexit
+
+# Only show real time
+TIMEFORMAT='%R'
+
+readonly BASE_DIR=_tmp/packle-benchmark
+
+gen-doc() {
+  ### Write a List of records, with strings, floats, and nested lists
+
+  local ysh=$1
+  local n=$2
+
+  $ysh -c '
+  var records = []
+  for i in (0 .. '$n') {
+    call records->append({
+      id: i,
+      name: "user-$i",
+      score: i / 7,
+      tags: ["a", "b", "c"],
+      active: i % 2 === 0,
+      bio: b'"'\yff\yfe'"' ++ "binary $i"
+    })
+  }
+  json8 write (records)
+  '
+}
+
+compare() {
+  local ysh=${1:-_bin/cxx-opt/ysh}
+  local n=${2:-20000}
+
+  mkdir -p $BASE_DIR
+
+  local json8=$BASE_DIR/doc.json8
+  local packle=$BASE_DIR/doc.packle
+
+  gen-doc $ysh $n > $json8
+  $ysh -c 'json8 read (&d) < '$json8'; packle write (d)' > $packle
+
+  ls -l $json8 $packle
+  echo
+
+  echo "json8 read"
+  time $ysh -c 'json8 read (&d) < '$json8
+  echo
+
+  echo "packle read"
+  time $ysh -c 'packle read (&d) < '$packle
+  echo
+
+  echo "json8 read, write"
+  time $ysh -c 'json8 read (&d) < '$json8'; json8 write (d) > /dev/null'
+  echo
+
+  echo "packle read, write"
+  time $ysh -c 'packle read (&d) < '$packle'; packle write (d) > /dev/null'
+  echo
+}
+
+"$@"
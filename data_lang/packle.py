@@ -0,0 +1,493 @@
+#!/usr/bin/env python2
+"""
+packle.py: Packle, a binary serialization format for YSH values
+
+Packle is a subset of protocol 4 of Python's pickle format, so Python's
+pickle.loads() can read it.  See doc/ref/chap-packle.md.
+
+- Strings are length-prefixed, so they're not escaped and unescaped.
+- Floats are exact, including NaN and Inf.
+- A List or Dict that's referenced more than once is written once, and
+  later references use the pickle "memo".  So graphs with shared references
+  and cycles are preserved.
+- Strings are memoized by value, e.g. so Dict keys in a List of records are
+  written once.
+"""
+
+from _devbuild.gen.value_asdl import (value, value_e, value_t)
+
+from core import error
+from data_lang import j8
+from data_lang import pypackle
+from data_lang import pyj8
+from mycpp import mops
+from mycpp import mylib
+from mycpp.mylib import tagswitch, switch, iteritems, NewDict, log
+
+from typing import cast, Dict, List
+
+_ = log
+
+# Opcodes, from Python's Lib/pickle.py
+PROTO = 0x80
+FRAME = 0x95
+STOP = 0x2e  # .
+
+NONE = 0x4e  # N
+NEWTRUE = 0x88
+NEWFALSE = 0x89
+
+BININT = 0x4a  # J, 4 byte signed
+BININT1 = 0x4b  # K, 1 byte unsigned
+BININT2 = 0x4d  # M, 2 byte unsigned
+LONG1 = 0x8a  # 1 byte length, then two's complement
+BINFLOAT = 0x47  # G
+
+SHORT_BINUNICODE = 0x8c  # 1 byte length
+BINUNICODE = 0x58  # X, 4 byte length
+SHORT_BINBYTES = 0x43  # C
+BINBYTES = 0x42  # B
+
+EMPTY_LIST = 0x5d  # ]
+EMPTY_DICT = 0x7d  # }
+MARK = 0x28  # (
+APPEND = 0x61  # a
+APPENDS = 0x65  # e
+SETITEM = 0x73  # s
+SETITEMS = 0x75  # u
+
+MEMOIZE = 0x94
+BINPUT = 0x71  # q
+LONG_BINPUT = 0x72  # r
+BINGET = 0x68  # h
+LONG_BINGET = 0x6a  # j
+
+PROTOCOL = 4
+
+# An int between these is written as BININT, and other ints as LONG1
+_INT32_MAX = 0x7fffffff
+_INT32_MIN = -_INT32_MAX - 1
+
+
+class Encoder(object):
+    """Write a value graph as Packle."""
+
+    def __init__(self, buf):
+        # type: (mylib.BufWriter) -> None
+        self.buf = buf
+
+        # j8.HeapValueId(val) -> memo index, for List and Dict
+        self.memo = {}  # type: Dict[int, int]
+        # Str -> memo index
+        self.str_memo = {}  # type: Dict[str, int]
+        self.memo_len = 0
+
+    def _Memoize(self):
+        # type: () -> int
+        pypackle.WriteOp(MEMOIZE, 0, 0, self.buf)
+        self.memo_len += 1
+        return self.memo_len - 1
+
+    def _Get(self, index):
+        # type: (int) -> None
+        if index < 256:
+            pypackle.WriteOp(BINGET, index, 1, self.buf)
+        else:
+            pypackle.WriteOp(LONG_BINGET, index, 4, self.buf)
+
+    def _Int(self, i):
+        # type: (mops.BigInt) -> None
+        if (mops.Greater(mops.IntWiden(_INT32_MIN), i) or
+                mops.Greater(i, mops.IntWiden(_INT32_MAX))):
+            pypackle.WriteLong(LONG1, i, self.buf)
+            return
+
+        n = mops.BigTruncate(i)
+        if 0 <= n and n < 256:
+            pypackle.WriteOp(BININT1, n, 1, self.buf)
+        elif 0 <= n and n < 65536:
+            pypackle.WriteOp(BININT2, n, 2, self.buf)
+        else:
+            pypackle.WriteOp(BININT, n, 4, self.buf)
+
+    def _Str(self, s):
+        # type: (str) -> None
+        if s in self.str_memo:
+            self._Get(self.str_memo[s])
+            return
+
+        n = len(s)
+        # Valid UTF-8 is read as a Python str, and anything else as bytes
+        if pyj8.PartIsUtf8(s, 0, n):
+            if n < 256:
+                pypackle.WriteOp(SHORT_BINUNICODE, n, 1, self.buf)
+            else:
+                pypackle.WriteOp(BINUNICODE, n, 4, self.buf)
+        else:
+            if n < 256:
+                pypackle.WriteOp(SHORT_BINBYTES, n, 1, self.buf)
+            else:
+                pypackle.WriteOp(BINBYTES, n, 4, self.buf)
+        self.buf.write(s)
+
+        self.str_memo[s] = self._Memoize()
+
+    def _MaybeNullStr(self, s):
+        # type: (str) -> None
+        if s is None:
+            pypackle.WriteOp(NONE, 0, 0, self.buf)
+        else:
+            self._Str(s)
+
+    def _List(self, val):
+        # type: (value.List) -> None
+        pypackle.WriteOp(EMPTY_LIST, 0, 0, self.buf)
+        self.memo[j8.HeapValueId(val)] = self._Memoize()
+
+        if len(val.items):
+            pypackle.WriteOp(MARK, 0, 0, self.buf)
+            for item in val.items:
+                self._Value(item)
+            pypackle.WriteOp(APPENDS, 0, 0, self.buf)
+
+    def _Dict(self, val):
+        # type: (value.Dict) -> None
+        pypackle.WriteOp(EMPTY_DICT, 0, 0, self.buf)
+        self.memo[j8.HeapValueId(val)] = self._Memoize()
+
+        if len(val.d):
+            pypackle.WriteOp(MARK, 0, 0, self.buf)
+            for k, v in iteritems(val.d):
+                self._Str(k)
+                self._Value(v)
+            pypackle.WriteOp(SETITEMS, 0, 0, self.buf)
+
+    def _Value(self, val):
+        # type: (value_t) -> None
+        UP_val = val
+        with tagswitch(val) as case:
+            if case(value_e.Null):
+                pypackle.WriteOp(NONE, 0, 0, self.buf)
+
+            elif case(value_e.Bool):
+                val = cast(value.Bool, UP_val)
+                pypackle.WriteOp(NEWTRUE if val.b else NEWFALSE, 0, 0,
+                                 self.buf)
+
+            elif case(value_e.Int):
+                val = cast(value.Int, UP_val)
+                self._Int(val.i)
+
+            elif case(value_e.Float):
+                val = cast(value.Float, UP_val)
+                pypackle.WriteFloat(BINFLOAT, val.f, self.buf)
+
+            elif case(value_e.Str):
+                val = cast(value.Str, UP_val)
+                self._Str(val.s)
+
+            elif case(value_e.List):
+                val = cast(value.List, UP_val)
+                heap_id = j8.HeapValueId(val)
+                if heap_id in self.memo:  # shared, or a cycle
+                    self._Get(self.memo[heap_id])
+                else:
+                    self._List(val)
+
+            elif case(value_e.Dict):
+                val = cast(value.Dict, UP_val)
+                heap_id = j8.HeapValueId(val)
+                if heap_id in self.memo:
+                    self._Get(self.memo[heap_id])
+                else:
+                    self._Dict(val)
+
+            # Like J8, BashArray and SparseArray are written as a List, with
+            # null for unset entries, and BashAssoc as a Dict.  They're not
+            # memoized.
+            elif case(value_e.BashArray):
+                val = cast(value.BashArray, UP_val)
+                pypackle.WriteOp(EMPTY_LIST, 0, 0, self.buf)
+                if len(val.strs):
+                    pypackle.WriteOp(MARK, 0, 0, self.buf)
+                    for s in val.strs:
+                        self._MaybeNullStr(s)
+                    pypackle.WriteOp(APPENDS, 0, 0, self.buf)
+
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+                pypackle.WriteOp(EMPTY_LIST, 0, 0, self.buf)
+                if val.max_index >= 0:
+                    pypackle.WriteOp(MARK, 0, 0, self.buf)
+                    for i in xrange(0, val.max_index + 1):
+                        self._MaybeNullStr(val.d.get(i))
+                    pypackle.WriteOp(APPENDS, 0, 0, self.buf)
+
+            elif case(value_e.BashAssoc):
+                val = cast(value.BashAssoc, UP_val)
+                pypackle.WriteOp(EMPTY_DICT, 0, 0, self.buf)
+                if len(val.d):
+                    pypackle.WriteOp(MARK, 0, 0, self.buf)
+                    for k2, v2 in iteritems(val.d):
+                        self._Str(k2)
+                        self._Str(v2)
+                    pypackle.WriteOp(SETITEMS, 0, 0, self.buf)
+
+            else:
+                raise error.Encode("Can't serialize object of type %s" %
+                                   j8.ValType(val))
+
+    def Encode(self, val):
+        # type: (value_t) -> None
+        """Raises error.Encode."""
+        pypackle.WriteOp(PROTO, PROTOCOL, 1, self.buf)
+        self._Value(val)
+        pypackle.WriteOp(STOP, 0, 0, self.buf)
+
+
+def Encode(val, buf):
+    # type: (value_t, mylib.BufWriter) -> None
+    """Raises error.Encode."""
+    Encoder(buf).Encode(val)
+
+
+class Decoder(object):
+    """Read Packle, and also pickles written by Python with the same opcodes.
+
+    It's a stack machine, like Python's pickle.Unpickler.
+    """
+
+    def __init__(self, s):
+        # type: (str) -> None
+        self.s = s
+        self.pos = 0
+        self.op_pos = 0  # start of the current opcode, for errors
+
+        self.stack = []  # type: List[value_t]
+        self.marks = []  # type: List[int]  # stack positions
+        self.memo = []  # type: List[value_t]
+
+    def _Error(self, msg):
+        # type: (str) -> error.Decode
+        return error.Decode(msg, self.s, self.op_pos, self.pos, 1)
+
+    def _Advance(self, n):
+        # type: (int) -> int
+        """Consume n bytes, and return the position of the first one."""
+        if n < 0 or self.pos + n > len(self.s):
+            raise self._Error('Unexpected end of Packle')
+        pos = self.pos
+        self.pos += n
+        return pos
+
+    def _ReadInt(self, num_bytes):
+        # type: (int) -> int
+        return pypackle.ReadInt(self.s, self._Advance(num_bytes), num_bytes)
+
+    def _ReadStr(self, num_bytes, is_unicode):
+        # type: (int, bool) -> value_t
+        n = self._ReadInt(num_bytes)
+        start = self._Advance(n)
+        end = start + n
+        if is_unicode and not pyj8.PartIsUtf8(self.s, start, end):
+            raise self._Error('Invalid UTF-8 in Packle string')
+        return value.Str(self.s[start:end])
+
+    def _Pop(self):
+        # type: () -> value_t
+        if len(self.stack) == 0 or (len(self.marks) and
+                                    len(self.stack) == self.marks[-1]):
+            raise self._Error('Packle stack underflow')
+        return self.stack.pop()
+
+    def _PopMark(self):
+        # type: () -> int
+        if len(self.marks) == 0:
+            raise self._Error('Packle has no MARK')
+        mark = self.marks.pop()
+        if mark == 0:
+            raise self._Error('Expected List or Dict before MARK')
+        return mark
+
+    def _Top(self):
+        # type: () -> value_t
+        if len(self.stack) == 0:
+            raise self._Error('Packle stack underflow')
+        return self.stack[-1]
+
+    def _Append(self, target, item):
+        # type: (value_t, value_t) -> None
+        if target.tag() != value_e.List:
+            raise self._Error('Expected List, got %s' % j8.ValType(target))
+        lst = cast(value.List, target)
+        lst.items.append(item)
+
+    def _SetItem(self, target, k, v):
+        # type: (value_t, value_t, value_t) -> None
+        if target.tag() != value_e.Dict:
+            raise self._Error('Expected Dict, got %s' % j8.ValType(target))
+        if k.tag() != value_e.Str:
+            raise self._Error('Expected Str key, got %s' % j8.ValType(k))
+        d = cast(value.Dict, target)
+        key = cast(value.Str, k)
+        d.d[key.s] = v
+
+    def _Put(self, index):
+        # type: (int) -> None
+        top = self._Top()
+        n = len(self.memo)
+        if index == n:
+            self.memo.append(top)
+        elif 0 <= index and index < n:
+            self.memo[index] = top
+        else:
+            raise self._Error('Packle memo index %d is out of order' % index)
+
+    def _Get(self, index):
+        # type: (int) -> None
+        if index < 0 or index >= len(self.memo):
+            raise self._Error('Packle memo index %d is undefined' % index)
+        self.stack.append(self.memo[index])
+
+    def Decode(self):
+        # type: () -> value_t
+        """Raises error.Decode."""
+        while True:
+            self.op_pos = self.pos
+            op = mylib.ByteAt(self.s, self._Advance(1))
+            if op == STOP:  # not in the switch, so break leaves the loop
+                break
+
+            with switch(op) as case:
+                if case(PROTO):
+                    version = self._ReadInt(1)
+                    if version < 2 or version > 5:
+                        raise self._Error('Unsupported pickle protocol %d' %
+                                          version)
+
+                elif case(FRAME):
+                    # Written by Python's pickle, but we don't need it
+                    unused = self._Advance(8)
+
+                elif case(NONE):
+                    self.stack.append(value.Null)
+
+                elif case(NEWTRUE):
+                    self.stack.append(value.Bool(True))
+
+                elif case(NEWFALSE):
+                    self.stack.append(value.Bool(False))
+
+                elif case(BININT1):
+                    self.stack.append(value.Int(mops.IntWiden(
+                        self._ReadInt(1))))
+
+                elif case(BININT2):
+                    self.stack.append(value.Int(mops.IntWiden(
+                        self._ReadInt(2))))
+
+                elif case(BININT):
+                    self.stack.append(value.Int(mops.IntWiden(
+                        self._ReadInt(4))))
+
+                elif case(LONG1):
+                    n = self._ReadInt(1)
+                    if n > 8:
+                        raise self._Error('Integer is too big')
+                    pos = self._Advance(n)
+                    self.stack.append(
+                        value.Int(pypackle.ReadLong(self.s, pos, n)))
+
+                elif case(BINFLOAT):
+                    pos = self._Advance(8)
+                    self.stack.append(
+                        value.Float(pypackle.ReadFloat(self.s, pos)))
+
+                elif case(SHORT_BINUNICODE):
+                    self.stack.append(self._ReadStr(1, True))
+
+                elif case(BINUNICODE):
+                    self.stack.append(self._ReadStr(4, True))
+
+                elif case(SHORT_BINBYTES):
+                    self.stack.append(self._ReadStr(1, False))
+
+                elif case(BINBYTES):
+                    self.stack.append(self._ReadStr(4, False))
+
+                elif case(EMPTY_LIST):
+                    items = []  # type: List[value_t]
+                    self.stack.append(value.List(items))
+
+                elif case(EMPTY_DICT):
+                    d = NewDict()  # type: Dict[str, value_t]
+                    self.stack.append(value.Dict(d))
+
+                elif case(MARK):
+                    self.marks.append(len(self.stack))
+
+                elif case(APPEND):
+                    item = self._Pop()
+                    self._Append(self._Top(), item)
+
+                elif case(APPENDS):
+                    mark = self._PopMark()
+                    target = self.stack[mark - 1]
+                    for i in xrange(mark, len(self.stack)):
+                        self._Append(target, self.stack[i])
+                    while len(self.stack) > mark:
+                        self.stack.pop()
+
+                elif case(SETITEM):
+                    v = self._Pop()
+                    k = self._Pop()
+                    self._SetItem(self._Top(), k, v)
+
+                elif case(SETITEMS):
+                    mark = self._PopMark()
+                    n = len(self.stack)
+                    if (n - mark) % 2 != 0:
+                        raise self._Error('Expected Dict key and value')
+                    target = self.stack[mark - 1]
+                    for i in xrange(mark, n, 2):
+                        self._SetItem(target, self.stack[i],
+                                      self.stack[i + 1])
+                    while len(self.stack) > mark:
+                        self.stack.pop()
+
+                elif case(MEMOIZE):
+                    self._Put(len(self.memo))
+
+                elif case(BINPUT):
+                    self._Put(self._ReadInt(1))
+
+                elif case(LONG_BINPUT):
+                    self._Put(self._ReadInt(4))
+
+                elif case(BINGET):
+                    self._Get(self._ReadInt(1))
+
+                elif case(LONG_BINGET):
+                    self._Get(self._ReadInt(4))
+
+                else:
+                    raise self._Error('Invalid Packle opcode 0x%s' %
+                                      mylib.hex_lower(op))
+
+        if len(self.marks):
+            raise self._Error('Packle has an unused MARK')
+        if len(self.stack) != 1:
+            raise self._Error('Expected 1 value in Packle, got %d' %
+                              len(self.stack))
+        if self.pos != len(self.s):
+            raise self._Error('Unexpected data after Packle STOP')
+        return self.stack[0]
+
+
+def Decode(s):
+    # type: (str) -> value_t
+    """Raises error.Decode."""
+    return Decoder(s).Decode()
+
+
+# vim: sw=4
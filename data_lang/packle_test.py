@@ -0,0 +1,129 @@
+#!/usr/bin/env python2
+"""packle_test.py: Tests for packle.py."""
+from __future__ import print_function
+
+import math
+import unittest
+
+from _devbuild.gen.value_asdl import value, value_e
+from core import error
+from data_lang import packle  # module under test
+from mycpp import mops
+from mycpp import mylib
+
+
+def _Encode(val):
+    buf = mylib.BufWriter()
+    packle.Encode(val, buf)
+    return buf.getvalue()
+
+
+def _Int(i):
+    return value.Int(mops.BigInt(i))
+
+
+class PackleTest(unittest.TestCase):
+
+    def _RoundTrip(self, val):
+        s = _Encode(val)
+        print(repr(s))
+        return packle.Decode(s)
+
+    def testAtoms(self):
+        self.assertEqual(value_e.Null,
+                         self._RoundTrip(value.Null).tag())
+        self.assertEqual(True, self._RoundTrip(value.Bool(True)).b)
+        self.assertEqual(False, self._RoundTrip(value.Bool(False)).b)
+
+        for f in [0.0, -1.5, 1e300, float('inf')]:
+            self.assertEqual(f, self._RoundTrip(value.Float(f)).f)
+        self.assertTrue(math.isnan(self._RoundTrip(value.Float(
+            float('nan'))).f))
+
+        for s in ['', 'hi', '\xce\xbc', '\xff\xfe', 'x' * 300]:
+            self.assertEqual(s, self._RoundTrip(value.Str(s)).s)
+
+    def testInts(self):
+        # Boundaries of BININT1, BININT2, BININT, and LONG1
+        for i in [
+                0, 255, 256, 65535, 65536, -1, 2**31 - 1, -2**31, 2**31,
+                -2**31 - 1, 2**63 - 1, -2**63
+        ]:
+            self.assertEqual(i, self._RoundTrip(_Int(i)).i.i)
+
+        self.assertEqual(len('\x80\x04K\x05.'), len(_Encode(_Int(5))))
+
+    def testSharedAndCycles(self):
+        shared = value.List([_Int(1)])
+        d = value.Dict({'a': shared, 'b': shared})
+        d.d['self'] = d
+
+        result = self._RoundTrip(d)
+        self.assertEqual(['a', 'b', 'self'], sorted(result.d.keys()))
+        self.assertTrue(result.d['a'] is result.d['b'])
+        self.assertTrue(result.d['self'] is result)
+        self.assertEqual(1, result.d['a'].items[0].i.i)
+
+    def testStrsAreMemoized(self):
+        records = value.List(
+            [value.Dict({'name': value.Str('x')}) for _ in xrange(10)])
+        s = _Encode(records)
+        self.assertEqual(1, s.count('name'))
+
+        result = packle.Decode(s)
+        self.assertEqual(10, len(result.items))
+        self.assertEqual('x', result.items[9].d['name'].s)
+
+    def testPythonPickles(self):
+        # pickle.dumps({'a': [1, -1, 2.5, None, True], 'b': x, 'c': x},
+        #              protocol=4), with x = [1]
+        s = ('\x80\x04\x95.\x00\x00\x00\x00\x00\x00\x00}\x94(\x8c\x01a\x94]'
+             '\x94(K\x01J\xff\xff\xff\xffG@\x04\x00\x00\x00\x00\x00\x00N\x88e'
+             '\x8c\x01b\x94]\x94K\x01a\x8c\x01c\x94h\x04u.')
+        result = packle.Decode(s)
+        a = result.d['a'].items
+        self.assertEqual(1, a[0].i.i)
+        self.assertEqual(-1, a[1].i.i)
+        self.assertEqual(2.5, a[2].f)
+        self.assertEqual(value_e.Null, a[3].tag())
+        self.assertEqual(True, a[4].b)
+        self.assertTrue(result.d['b'] is result.d['c'])
+
+        # pickle.dumps([u'\u03bc', 2**40], protocol=2) uses BINPUT
+        s = ('\x80\x02]q\x00(X\x02\x00\x00\x00\xce\xbcq\x01'
+             '\x8a\x06\x00\x00\x00\x00\x00\x01e.')
+        result = packle.Decode(s)
+        self.assertEqual('\xce\xbc', result.items[0].s)
+        self.assertEqual(2**40, result.items[1].i.i)
+
+    def testEncodeError(self):
+        self.assertRaises(error.Encode, _Encode, value.Range(1, 2))
+
+    def testDecodeErrors(self):
+        for s in [
+                '',
+                '\x80\x04',  # no STOP
+                '\x80\x09N.',  # protocol
+                '\x80\x04Z.',  # opcode
+                '\x80\x04K.',  # truncated
+                '\x80\x04N..',  # trailing data
+                '\x80\x04NN.',  # 2 values
+                '\x80\x04(N.',  # unused MARK
+                '\x80\x04Ne.',  # APPENDS without MARK
+                '\x80\x04(Ne.',  # MARK without List
+                '\x80\x04}(Nu.',  # odd SETITEMS
+                '\x80\x04}(K\x01K\x02u.',  # Int key
+                '\x80\x04h\x00.',  # undefined memo
+                '\x80\x04\x8c\x01\xff.',  # invalid UTF-8
+                '\x80\x04\x8a\x09\x00\x00\x00\x00\x00\x00\x00\x00\x00.',
+        ]:
+            try:
+                packle.Decode(s)
+            except error.Decode as e:
+                print('%r: %s' % (s, e.Message()))
+            else:
+                self.fail('Expected error.Decode for %r' % s)
+
+
+if __name__ == '__main__':
+    unittest.main()
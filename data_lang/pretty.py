@@ -98,6 +98,7 @@ from _devbuild.gen.pretty_asdl import doc, doc_e, DocFragment, Measure, Measured
 from _devbuild.gen.value_asdl import value, value_e, value_t, value_str
 from data_lang.j8 import ValueIdString, HeapValueId
 from core import ansi
+from core import bash_impl
 from frontend import match
 from mycpp import mops
 from mycpp.mylib import log, tagswitch, BufWriter, iteritems
@@ -481,6 +482,21 @@ class _DocConstructor:
         return self._SurroundedAndPrefixed("(", type_name, " ",
                                            self._Join(mdocs, "", " "), ")")
 
+    def _SparseArray(self, val):
+        # type: (value.SparseArray) -> MeasuredDoc
+        type_name = self._Styled(self.type_style, _Text("SparseArray"))
+        if len(val.d) == 0:
+            return _Concat([_Text("("), type_name, _Text(")")])
+        mdocs = []  # type: List[MeasuredDoc]
+        for index in bash_impl.SparseArray_Keys(val):
+            mdocs.append(
+                _Concat([
+                    _Text("[%d]=" % index),
+                    self._BashStringLiteral(val.d[index])
+                ]))
+        return self._SurroundedAndPrefixed("(", type_name, " ",
+                                           self._Join(mdocs, "", " "), ")")
+
     def _BashAssoc(self, vassoc):
         # type: (value.BashAssoc) -> MeasuredDoc
         type_name = self._Styled(self.type_style, _Text("BashAssoc"))
@@ -566,6 +582,10 @@ class _DocConstructor:
                 varray = cast(value.BashArray, val)
                 return self._BashArray(varray)
 
+            elif case(value_e.SparseArray):
+                sparse = cast(value.SparseArray, val)
+                return self._SparseArray(sparse)
+
             elif case(value_e.BashAssoc):
                 vassoc = cast(value.BashAssoc, val)
                 return self._BashAssoc(vassoc)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python2
+"""
+pypackle.py: Byte-level functions for data_lang/packle.py
+
+They're ported by hand to C++ in cpp/data_lang.cc, so that writing an opcode
+doesn't allocate a string.
+"""
+from __future__ import print_function
+
+import struct
+
+from mycpp import mops
+from mycpp import mylib
+from mycpp.mylib import log
+
+_ = log
+
+# e.g. for WriteOp(op, n, 2, buf)
+_INT_FORMATS = {1: '<B', 2: '<H', 4: '<i'}
+
+
+def WriteOp(op, arg, num_bytes, buf):
+    # type: (int, int, int, mylib.BufWriter) -> None
+    """Write an opcode, followed by its little endian argument.
+
+    num_bytes is 0, 1, 2, or 4.  A 4 byte arg is signed.
+    """
+    buf.write(chr(op))
+    if num_bytes:
+        buf.write(struct.pack(_INT_FORMATS[num_bytes], arg))
+
+
+def WriteLong(op, i, buf):
+    # type: (int, mops.BigInt, mylib.BufWriter) -> None
+    """Write LONG1 with 8 bytes of two's complement."""
+    buf.write(chr(op))
+    buf.write('\x08')
+    # Python ints don't wrap around, so mask like C++
+    buf.write(struct.pack('<Q', i.i & 0xffffffffffffffff))
+
+
+def WriteFloat(op, f, buf):
+    # type: (int, float, mylib.BufWriter) -> None
+    """Write BINFLOAT, which is a big endian IEEE 754 double."""
+    buf.write(chr(op))
+    buf.write(struct.pack('>d', f))
+
+
+def ReadInt(s, pos, num_bytes):
+    # type: (str, int, int) -> int
+    """Read a little endian int at s[pos].
+
+    1 and 2 byte ints are unsigned, and 4 byte ints are signed.  The caller
+    checks that there are enough bytes.
+    """
+    i = struct.unpack_from(_INT_FORMATS[num_bytes], s, pos)[0]  # type: int
+    return i
+
+
+def ReadLong(s, pos, num_bytes):
+    # type: (str, int, int) -> mops.BigInt
+    """Read the two's complement int of LONG1, where num_bytes <= 8."""
+    if num_bytes == 0:
+        return mops.ZERO
+    b = s[pos:pos + num_bytes]
+    # sign extend
+    fill = '\xff' if ord(b[-1]) & 0x80 else '\x00'
+    return mops.BigInt(struct.unpack('<q', b + fill * (8 - num_bytes))[0])
+
+
+def ReadFloat(s, pos):
+    # type: (str, int) -> float
+    f = struct.unpack_from('>d', s, pos)[0]  # type: float
+    return f
+
+
+# vim: sw=4
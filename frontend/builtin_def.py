@@ -50,7 +50,7 @@ _NORMAL_BUILTINS = [
     # YSH
     #
     'append',
-    'write', 'json', 'json8', 'pp',
+    'write', 'json', 'json8', 'packle', 'pp',
     'hay', 'haynode',
     'module', 'use',
     'error',
@@ -511,3 +511,7 @@ JSON_WRITE_SPEC.LongFlag('--indent',
                          help='Indent JSON by this amount')
 
 JSON_READ_SPEC = FlagSpec('json_read')
+JSON_READ_SPEC.LongFlag('--lines',
+                        args.Bool,
+                        default=False,
+                        help='Read J8 Lines into a List of Str')
@@ -11,6 +11,7 @@ lexer.py - Library for lexing.
 from _devbuild.gen.syntax_asdl import Token, WideToken, SourceLine
 from _devbuild.gen.types_asdl import lex_mode_t, lex_mode_e
 from _devbuild.gen.id_kind_asdl import Id_t, Id, Id_str
+from mycpp import mylib
 from mycpp.mylib import log
 from frontend import match
 
@@ -101,6 +102,10 @@ def LazyStr2(tok):
     return ''
 
 
+# Longer Lit_Chars tokens are usually arguments, not names
+MAX_INTERNED_LEN = 32
+
+
 def LazyStr(tok):
     # type: (Token) -> str
     """Materialize the tval on demand, with special case for $myvar.
@@ -119,9 +124,26 @@ def LazyStr(tok):
         else:
             tok.tval = TokenVal(tok)
 
+        # Variable, function, and command names are used as dict keys
+        if (tok.id in (Id.VSub_DollarName, Id.Lit_ArithVarLike) or
+                tok.id == Id.Lit_Chars and tok.length <= MAX_INTERNED_LEN):
+            tok.tval = mylib.Intern(tok.tval)
+
     return tok.tval
 
 
+def InternedTokenVal(tok):
+    # type: (Token) -> str
+    """Like TokenVal(), for names that will be looked up in a dict."""
+    return mylib.Intern(TokenVal(tok))
+
+
+def InternedSliceRight(tok, right_index):
+    # type: (Token, int) -> str
+    """Like TokenSliceRight(), for 'x=' and 'a['."""
+    return mylib.Intern(TokenSliceRight(tok, right_index))
+
+
 def DummyToken(id_, val):
     # type: (int, str) -> Token
 
@@ -211,6 +211,21 @@ class TokenFunctionsTest(unittest.TestCase):
         print(tok)
         self.assertEqual(False, lexer.IsPlusEquals(tok))
 
+    def testLazyStrInterns(self):
+        arena = test_lib.MakeArena('<lexer_test.py>')
+        _, lx = test_lib.InitLexer('myfunc myfunc', arena)
+
+        tok1 = lx.Read(lex_mode_e.ShCommand)
+        lx.Read(lex_mode_e.ShCommand)  # space
+        tok2 = lx.Read(lex_mode_e.ShCommand)
+        self.assertEqual(Id.Lit_Chars, tok2.id)
+
+        # Names from different tokens are the same object
+        s1 = lexer.LazyStr(tok1)
+        self.assertEqual('myfunc', s1)
+        self.assertIs(s1, lexer.LazyStr(tok2))
+        self.assertIs(s1, lexer.InternedTokenVal(tok2))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -295,6 +295,10 @@ def _Init(opt_def):
     # On in interactive shell
     opt_def.Add('redefine_module', default=False)
 
+    # Don't flush stdout after every builtin.  It's still flushed before
+    # fork(), exec(), redirects, 'read' from a terminal, and exit.
+    opt_def.Add('buffer_stdout')
+
     # For disabling strict_errexit while running traps.  Because we run in the
     # main loop, the value can be "off".  Prefix with _ because it's undocumented
     # and users shouldn't fiddle with it.  We need a stack so this is a
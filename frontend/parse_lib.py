@@ -4,13 +4,16 @@ parse_lib.py - Consolidate various parser instantiations here.
 
 from _devbuild.gen.id_kind_asdl import Id_t
 from _devbuild.gen.syntax_asdl import (Token, CompoundWord, expr_t, Redir,
-                                       ArgList, Proc, Func, command, pat_t)
+                                       ArgList, Proc, Func, command, pat_t,
+                                       command_t, arith_expr_t, BracedVarSub,
+                                       loc_t)
 from _devbuild.gen.types_asdl import lex_mode_e
 from _devbuild.gen import grammar_nt
 
 from asdl import format as fmt
 from core import state
 from frontend import lexer
+from frontend import location
 from frontend import reader
 from osh import tdop
 from osh import arith_parse
@@ -24,7 +27,7 @@ from ysh.expr_parse import ctx_PNodeAllocator
 
 _ = log
 
-from typing import Any, List, Tuple, Dict, TYPE_CHECKING
+from typing import Any, List, Optional, Tuple, Dict, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.alloc import Arena
     from core.util import _DebugFile
@@ -180,6 +183,154 @@ class Trail(_BaseTrail):
         self.tokens.append(token)
 
 
+class CachedParse(object):
+    """Code parsed at runtime.  Only one field is set, depending on the kind.
+
+    - nodes: the top-level commands of an 'eval' string
+    - anode: dynamic arithmetic, e.g. x='1+2'; echo $(( x )), or the LHS of
+      'unset' and 'printf -v'
+    - bvs: the ${!ref} of a var ref string
+
+    The source info of its tokens points to the call site, e.g. the 'eval'
+    word, so an entry is only reused at the same call site.
+    """
+
+    def __init__(self, blame_tok):
+        # type: (Optional[Token]) -> None
+        self.blame_tok = blame_tok
+        self.nodes = None  # type: List[command_t]
+        self.anode = None  # type: arith_expr_t
+        self.bvs = None  # type: BracedVarSub
+
+
+class _LruNode(object):
+    """An entry in the doubly-linked list of ParseCache."""
+
+    def __init__(self, key, val):
+        # type: (str, Optional[CachedParse]) -> None
+        self.key = key
+        self.val = val
+        self.prev = None  # type: Optional[_LruNode]
+        self.next = None  # type: Optional[_LruNode]
+
+
+class ParseCache(object):
+    """A bounded LRU cache of code that's parsed at runtime.
+
+    It's keyed by the kind of parse, the parse options, the call site, and the
+    code string.
+    Aliases are expanded at parse time, so the 'alias' and 'unalias' builtins
+    call Clear().
+    """
+
+    def __init__(self, mutable_opts, max_size):
+        # type: (state.MutableOpts, int) -> None
+        self.mutable_opts = mutable_opts
+        self.max_size = max_size
+
+        self.entries = {}  # type: Dict[str, _LruNode]
+        # Circular list with a sentinel.  head.next is the most recently used
+        # entry, and head.prev is the least recently used.
+        self.head = _LruNode('', None)
+        self.head.prev = self.head
+        self.head.next = self.head
+
+        # Incremented by Clear(), so callers can tell if an entry they're about
+        # to Put() may be stale
+        self.generation = 0
+
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+
+    def Key(self, kind, code_str, blame_loc):
+        # type: (str, str, loc_t) -> str
+        """
+        Args:
+          kind: 'e' for eval, 'a' for arithmetic, 'l' for the LHS of 'unset'
+            and 'printf -v', 'r' for var refs
+          blame_loc: the call site, which errors in the parsed code point to
+        """
+        tok = location.TokenFor(blame_loc)
+        if tok and tok.line:
+            site = '%d:%d' % (tok.line.line_num, tok.col)
+        else:
+            site = '-'
+        return '%s%s %s %s' % (kind, self.mutable_opts.ParseOptsKey(), site,
+                               code_str)
+
+    def _Unlink(self, node):
+        # type: (_LruNode) -> None
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def _PushFront(self, node):
+        # type: (_LruNode) -> None
+        node.prev = self.head
+        node.next = self.head.next
+        self.head.next.prev = node
+        self.head.next = node
+
+    def Get(self, key, blame_loc):
+        # type: (str, loc_t) -> Optional[CachedParse]
+        node = self.entries.get(key)
+        # Line and column aren't unique across files, so also check that it's
+        # the same call site.  Then Put() replaces the entry.
+        #
+        # A loc_t may be allocated for each call, e.g. loc.Arith, so compare
+        # tokens.
+        if (node is None or
+                node.val.blame_tok is not location.TokenFor(blame_loc)):
+            self.num_misses += 1
+            return None
+
+        self.num_hits += 1
+        self._Unlink(node)
+        self._PushFront(node)
+        return node.val
+
+    def Put(self, key, blame_loc):
+        # type: (str, loc_t) -> CachedParse
+        """Returns a new entry for the caller to fill in."""
+        val = CachedParse(location.TokenFor(blame_loc))
+
+        node = self.entries.get(key)
+        if node is not None:
+            node.val = val
+            self._Unlink(node)
+            self._PushFront(node)
+            return val
+
+        if len(self.entries) >= self.max_size:
+            lru = self.head.prev
+            self._Unlink(lru)
+            mylib.dict_erase(self.entries, lru.key)
+            self.num_evictions += 1
+
+        node = _LruNode(key, val)
+        self.entries[key] = node
+        self._PushFront(node)
+        return val
+
+    def Clear(self):
+        # type: () -> None
+        self.entries.clear()
+        self.head.prev = self.head
+        self.head.next = self.head
+        self.generation += 1
+
+    def Stats(self):
+        # type: () -> str
+        """For OILS_PARSE_CACHE_STATS."""
+        total = self.num_hits + self.num_misses
+        percent = 0
+        if total != 0:
+            percent = self.num_hits * 100 // total
+        return ('parse cache: %d hits, %d misses, %d evictions (%d%% hit rate)'
+                % (self.num_hits, self.num_misses, self.num_evictions,
+                   percent))
+
+
 if TYPE_CHECKING:
     AliasesInFlight = List[Tuple[str, int]]
 
@@ -219,10 +370,17 @@ class ParseContext(object):
         # Completion state lives here since it may span multiple parsers.
         self.trail = _BaseTrail()  # no-op by default
 
+        # For code parsed at runtime: eval, dynamic arithmetic, ${!ref}
+        self.parse_cache = None  # type: Optional[ParseCache]
+
     def Init_Trail(self, trail):
         # type: (_BaseTrail) -> None
         self.trail = trail
 
+    def Init_ParseCache(self, parse_cache):
+        # type: (ParseCache) -> None
+        self.parse_cache = parse_cache
+
     def MakeLexer(self, line_reader):
         # type: (_Reader) -> Lexer
         """Helper function.
@@ -0,0 +1,104 @@
+#!/usr/bin/env python2
+"""parse_lib_test.py: Tests for parse_lib.py."""
+from __future__ import print_function
+
+import unittest
+
+from _devbuild.gen.id_kind_asdl import Id
+from _devbuild.gen.option_asdl import option_i
+from _devbuild.gen.syntax_asdl import loc, source, SourceLine, Token
+from core import state
+from frontend import parse_lib  # module under test
+
+
+def _MakeCache(max_size):
+    mem = state.Mem('', [], None, [])
+    parse_opts, exec_opts, mutable_opts = state.MakeOpts(mem, None)
+    return parse_lib.ParseCache(mutable_opts, max_size), mutable_opts
+
+
+def _MakeToken(line_num, col):
+    line = SourceLine(line_num, 'eval "$code"', source.MainFile('foo.sh'))
+    return Token(Id.Lit_Chars, 4, col, line, None)
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def testLru(self):
+        cache, _ = _MakeCache(2)
+        m = loc.Missing
+
+        k1 = cache.Key('a', '1+2', m)
+        k2 = cache.Key('a', 'x*y', m)
+        k3 = cache.Key('e', 'echo hi', m)
+        self.assertEqual(None, cache.Get(k1, m))
+
+        cache.Put(k1, m).anode = 'one'
+        cache.Put(k2, m).anode = 'two'
+        self.assertEqual('one', cache.Get(k1, m).anode)
+
+        # k2 is the least recently used
+        cache.Put(k3, m).nodes = ['three']
+        self.assertEqual(None, cache.Get(k2, m))
+        self.assertEqual('one', cache.Get(k1, m).anode)
+        self.assertEqual(['three'], cache.Get(k3, m).nodes)
+
+        # Replacing an entry doesn't evict
+        cache.Put(k1, m).anode = 'uno'
+        self.assertEqual('uno', cache.Get(k1, m).anode)
+        self.assertEqual(2, len(cache.entries))
+
+        self.assertEqual(4, cache.num_hits)
+        self.assertEqual(2, cache.num_misses)
+        self.assertEqual(1, cache.num_evictions)
+
+    def testKey(self):
+        cache, mutable_opts = _MakeCache(10)
+        m = loc.Missing
+
+        k1 = cache.Key('a', '1+2', m)
+        self.assertNotEqual(k1, cache.Key('e', '1+2', m))
+
+        with state.ctx_Option(mutable_opts, [option_i.parse_paren], True):
+            self.assertNotEqual(k1, cache.Key('a', '1+2', m))
+        self.assertEqual(k1, cache.Key('a', '1+2', m))
+
+    def testCallSite(self):
+        cache, _ = _MakeCache(10)
+
+        # Errors in the parsed code point to the call site, so a different
+        # call site is a different key
+        tok2 = _MakeToken(2, 0)
+        tok4 = _MakeToken(4, 0)
+        k2 = cache.Key('e', 'nope_cmd', tok2)
+        k4 = cache.Key('e', 'nope_cmd', tok4)
+        self.assertNotEqual(k2, k4)
+
+        cache.Put(k2, tok2).nodes = ['two']
+        self.assertEqual(['two'], cache.Get(k2, tok2).nodes)
+        self.assertEqual(None, cache.Get(k4, tok4))
+
+        # Same line and column, e.g. in another file, isn't the same call site
+        other = _MakeToken(2, 0)
+        self.assertEqual(k2, cache.Key('e', 'nope_cmd', other))
+        self.assertEqual(None, cache.Get(k2, other))
+
+    def testClear(self):
+        cache, _ = _MakeCache(10)
+        m = loc.Missing
+
+        k1 = cache.Key('e', 'll', m)
+        cache.Put(k1, m).nodes = []
+        generation = cache.generation
+
+        cache.Clear()
+        self.assertEqual(None, cache.Get(k1, m))
+        self.assertNotEqual(generation, cache.generation)
+
+        # The list is still usable
+        cache.Put(k1, m).nodes = []
+        self.assertEqual([], cache.Get(k1, m).nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,6 +68,7 @@ def DefineTargets(ru):
         phony_prefix='mycpp-unit')
 
     for test_main in [
+            'mycpp/demo/dict_bench.cc',
             'mycpp/demo/gc_header.cc',
             'mycpp/demo/hash_table.cc',
             'mycpp/demo/target_lang.cc',
@@ -21,7 +21,6 @@ bool are_equal(Tuple2<BigStr*, int>* t1, Tuple2<BigStr*, int>* t2);
 bool are_equal(Tuple2<int, int>* t1, Tuple2<int, int>* t2);
 
 bool keys_equal(int left, int right);
-bool keys_equal(BigStr* left, BigStr* right);
 bool keys_equal(Tuple2<int, int>* t1, Tuple2<int, int>* t2);
 bool keys_equal(Tuple2<BigStr*, int>* t1, Tuple2<BigStr*, int>* t2);
 bool keys_equal(void* left, void* right);
@@ -32,6 +31,16 @@ enum class Kind;
 
 bool are_equal(id_kind_asdl::Kind left, id_kind_asdl::Kind right);
 
+// Dict keys are compared after their hashes match.  Keys are never nullptr,
+// and names are interned, so the pointers are often identical.
+inline bool keys_equal(BigStr* left, BigStr* right) {
+  if (left == right) {
+    return true;
+  }
+  return left->len_ == right->len_ &&
+         memcmp(left->data_, right->data_, left->len_) == 0;
+}
+
 inline int int_cmp(int a, int b) {
   if (a == b) {
     return 0;
@@ -1322,6 +1322,31 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
             op = '.' if is_return else '->'
             self.def_write(' = %s%sat%d();\n', temp_name, op, i)  # RHS
 
+            if isinstance(lval_item, MemberExpr):
+                self._write_barrier(lval_item)
+
+    def _write_barrier(self, lval):
+        """After obj.field = x, let a generational GC know that obj may point
+        to a new object.  WriteBarrier() is a no-op in other builds.
+        """
+        lval_type = self.types.get(lval)
+        if lval_type is not None and not GetCType(lval_type).endswith('*'):
+            return  # no pointer was stored
+
+        obj = lval.expr
+        if isinstance(obj, NameExpr):
+            if obj.name in self.imported_names:
+                return  # module::name isn't a field
+
+            # A new object is young, so constructors don't need it.  (GC only
+            # happens at mylib.MaybeCollect() points.)
+            if obj.name == 'self' and self.current_method_name == '__init__':
+                return
+
+        self.def_write_ind('WriteBarrier(')
+        self.accept(obj)
+        self.def_write(');\n')
+
     def visit_assignment_stmt(self, o: 'mypy.nodes.AssignmentStmt') -> T:
         # Declare constant strings.  They have to be at the top level.
         if self.decl and self.indent == 0 and len(o.lvalues) == 1:
@@ -1608,6 +1633,7 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
             self.def_write(' = ')
             self.accept(o.rvalue)
             self.def_write(';\n')
+            self._write_barrier(lval)
 
             if self.current_method_name in ('__init__', 'Reset'):
                 # Collect statements that look like self.foo = 1
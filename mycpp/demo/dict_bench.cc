@@ -0,0 +1,160 @@
+// Benchmarks for Dict<BigStr*, V>, which is used for variable frames, assoc
+// arrays, and YSH dicts.
+//
+// Prints lookups/sec and the distribution of probe lengths for a few key sets.
+//
+// Usage:
+//   DICT_BENCH_ITERS=1000 _bin/cxx-opt/mycpp/demo/dict_bench
+//
+// See benchmarks/compute.sh dict-bench.
+
+#include <stdlib.h>  // getenv()
+#include <time.h>    // clock_gettime(), CLOCK_PROCESS_CPUTIME_ID
+
+#include "mycpp/gc_dict.h"
+#include "mycpp/gc_mylib.h"
+#include "vendor/greatest.h"
+
+static int NumIters() {
+  char* s = getenv("DICT_BENCH_ITERS");
+  return s ? atoi(s) : 10;  // small by default, so ASAN runs are fast
+}
+
+static double CpuSeconds() {
+  struct timespec ts;
+  clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &ts);
+  return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+// How far from its initial bucket is each key in the dict?
+template <typename V>
+void ShowProbeLengths(Dict<BigStr*, V>* d) {
+  const int kMax = 8;
+  int counts[kMax + 1] = {0};
+  int total = 0;
+
+  int mask = d->index_len_ - 1;
+  for (int i = 0; i < d->len_; ++i) {
+    BigStr* key = d->keys_->items_[i];
+    int init_bucket = hash_key(key) & mask;
+    int slot = d->hash_and_probe(key);
+    int n = (slot - init_bucket) & mask;
+
+    total += n;
+    counts[n < kMax ? n : kMax]++;
+  }
+
+  log("  %d keys, %d slots, mean probe length %.3f", d->len_, d->index_len_,
+      static_cast<double>(total) / d->len_);
+  for (int n = 0; n <= kMax; ++n) {
+    if (counts[n]) {
+      log("    probe %s%d: %d", n == kMax ? ">=" : "", n, counts[n]);
+    }
+  }
+}
+
+// Look up copies of the keys, so that equality isn't just pointer equality.
+// Half of the lookups miss.
+void BenchLookups(const char* name, List<BigStr*>* keys) {
+  Dict<BigStr*, int>* d = nullptr;
+  List<BigStr*>* present = nullptr;
+  List<BigStr*>* absent = nullptr;
+  StackRoots _roots({&keys, &d, &present, &absent});
+
+  d = Alloc<Dict<BigStr*, int>>();
+  present = Alloc<List<BigStr*>>();
+  absent = Alloc<List<BigStr*>>();
+
+  int i = 0;
+  for (ListIter<BigStr*> it(keys); !it.Done(); it.Next()) {
+    BigStr* key = it.Value();
+    d->set(key, i++);
+    present->append(StrFromC(key->data_, len(key)));
+    absent->append(str_concat(key, StrFromC("!")));
+  }
+
+  log("%s", name);
+  ShowProbeLengths(d);
+
+  int n = NumIters();
+  int64_t num_found = 0;
+  double start = CpuSeconds();
+  for (int iter = 0; iter < n; ++iter) {
+    for (int j = 0; j < len(present); ++j) {
+      num_found += dict_contains(d, present->at(j));
+      num_found += dict_contains(d, absent->at(j));
+    }
+  }
+  double secs = CpuSeconds() - start;
+
+  int64_t num_lookups = static_cast<int64_t>(n) * len(keys) * 2;
+  log("  %ld lookups, %ld found, %.1f M lookups/sec", num_lookups, num_found,
+      secs > 0 ? num_lookups / secs / 1e6 : 0.0);
+}
+
+// Short names like x0, x1, ..., which are typical of variable frames
+List<BigStr*>* ShortKeys(int n) {
+  List<BigStr*>* keys = Alloc<List<BigStr*>>();
+  StackRoots _roots({&keys});
+  for (int i = 0; i < n; ++i) {
+    keys->append(StrFormat("x%d", i));
+  }
+  return keys;
+}
+
+// Longer keys that share a prefix, like paths in an assoc array
+List<BigStr*>* LongKeys(int n) {
+  List<BigStr*>* keys = Alloc<List<BigStr*>>();
+  StackRoots _roots({&keys});
+  for (int i = 0; i < n; ++i) {
+    keys->append(StrFormat("/usr/lib/python3/dist-packages/module_%d.py", i));
+  }
+  return keys;
+}
+
+TEST lookup_bench() {
+  BenchLookups("10 short keys", ShortKeys(10));
+  BenchLookups("1000 short keys", ShortKeys(1000));
+  BenchLookups("100000 short keys", ShortKeys(100000));
+  BenchLookups("1000 long keys", LongKeys(1000));
+
+  PASS();
+}
+
+// Hashing fresh strings, like words that are counted in an assoc array
+TEST hash_bench() {
+  const char* text =
+      "The quick brown fox jumps over the lazy dog, and then it runs away into "
+      "the forest where nobody can find it again.";
+  int text_len = strlen(text);
+
+  for (int str_len = 1; str_len <= 64; str_len *= 4) {
+    int n = NumIters() * 100000;
+    unsigned sum = 0;
+    double start = CpuSeconds();
+    for (int i = 0; i < n; ++i) {
+      sum += hash_bytes(text + (i % (text_len - str_len)), str_len);
+    }
+    double secs = CpuSeconds() - start;
+    log("hash %2d bytes: %.1f M hashes/sec (sum %u)", str_len,
+        secs > 0 ? n / secs / 1e6 : 0.0, sum);
+  }
+
+  PASS();
+}
+
+GREATEST_MAIN_DEFS();
+
+int main(int argc, char** argv) {
+  gHeap.Init();
+
+  GREATEST_MAIN_BEGIN();
+
+  RUN_TEST(lookup_bench);
+  RUN_TEST(hash_bench);
+
+  gHeap.CleanProcessExit();
+
+  GREATEST_MAIN_END();
+  return 0;
+}
@@ -20,6 +20,14 @@ extern BumpLeakHeap gHeap;
 extern MarkSweepHeap gHeap;
 #endif
 
+// Call after storing a pointer in an object that may already exist, e.g. a
+// field or a Slab item.  It's a no-op unless the heap has generations.
+inline void WriteBarrier(void* obj) {
+#if defined(MARK_SWEEP) && defined(GC_GENERATIONAL)
+  gHeap.RecordWrite(static_cast<RawObject*>(obj));
+#endif
+}
+
 #define VALIDATE_ROOTS 0
 
 #if VALIDATE_ROOTS
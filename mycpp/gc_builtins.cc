@@ -352,9 +352,8 @@ BigStr* str_concat(BigStr* a, BigStr* b) {
 //
 
 bool str_equals(BigStr* left, BigStr* right) {
-  // Fast path for identical strings.  String deduplication during GC could
-  // make this more likely.  String interning could guarantee it, allowing us
-  // to remove memcmp().
+  // Fast path for identical strings.  Names are interned by the lexer, which
+  // makes this more likely.
   if (left == right) {
     return true;
   }
@@ -363,6 +362,11 @@ bool str_equals(BigStr* left, BigStr* right) {
     return false;
   }
 
+  // Distinct interned strings have distinct contents
+  if (IsInterned(left) && IsInterned(right)) {
+    return false;
+  }
+
   // obj_len equal implies string lengths are equal
 
   if (left->len_ == right->len_) {
@@ -398,10 +402,6 @@ bool are_equal(BigStr* left, BigStr* right) {
   return str_equals(left, right);
 }
 
-bool keys_equal(BigStr* left, BigStr* right) {
-  return are_equal(left, right);
-}
-
 // Shouldn't be used?
 bool are_equal(void* left, void* right) {
   assert(0);
@@ -449,7 +449,7 @@ bool str_equals0(const char* c_string, BigStr* s) {
 }
 
 int hash(BigStr* s) {
-  return s->hash(fnv1);
+  return s->hash(hash_bytes);
 }
 
 int max(int a, int b) {
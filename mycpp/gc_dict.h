@@ -231,6 +231,7 @@ void Dict<K, V>::reserve(int num_desired) {
   // These are DENSE, while index_ is sparse.
   keys_ = NewSlab<K>(capacity_);
   values_ = NewSlab<V>(capacity_);
+  WriteBarrier(this);
 
   if (old_k != nullptr) {  // rehash if there were any entries
     len_ = 0;
@@ -312,7 +313,8 @@ int Dict<K, V>::hash_and_probe(K key) const {
   // probe until an empty one is found.
   unsigned h = hash_key(key);
   // faster % using & -- assuming index_len_ is power of 2
-  int init_bucket = h & (index_len_ - 1);
+  int mask = index_len_ - 1;
+  int init_bucket = h & mask;
 
   // If we see a tombstone along the probing path, stash it.
   int open_slot = -1;
@@ -320,8 +322,7 @@ int Dict<K, V>::hash_and_probe(K key) const {
   for (int i = 0; i < index_len_; ++i) {
     // Start at init_bucket and wrap araound
 
-    // faster % using & -- assuming index_len_ is power of 2
-    int slot = (i + init_bucket) & (index_len_ - 1);
+    int slot = (i + init_bucket) & mask;
 
     int kv_index = index_->items_[slot];
     DCHECK(kv_index < len_);
@@ -407,9 +408,15 @@ void Dict<K, V>::set(K key, V val) {
     index_->items_[pos] = len_;
     len_++;
     DCHECK(len_ <= capacity_);
+    if (std::is_pointer<K>()) {
+      WriteBarrier(keys_);
+    }
   } else {
     values_->items_[kv_index] = val;
   }
+  if (std::is_pointer<V>()) {
+    WriteBarrier(values_);
+  }
 }
 
 template <typename K, typename V>
@@ -686,6 +686,42 @@ TEST test_hash() {
   PASS();
 }
 
+TEST test_hash_bytes() {
+  // Every byte affects the hash, including the ones after the last full word
+  const char* s = "abcdefghijklmnop_xyz";
+  for (int n = 0; n <= 20; ++n) {
+    unsigned h = hash_bytes(s, n);
+    ASSERT_EQ_FMT(h, hash_bytes(s, n), "%u");
+    if (n > 0) {
+      ASSERT(h != hash_bytes(s, n - 1));
+    }
+  }
+  ASSERT(hash_bytes("abcdefgh1", 9) != hash_bytes("abcdefgh2", 9));
+  ASSERT(hash_bytes("1bcdefgh", 8) != hash_bytes("2bcdefgh", 8));
+
+  // Short keys that differ in their last byte shouldn't share low bits, since
+  // the index is indexed by them
+  BigStr* x1 = StrFromC("x1");
+  BigStr* x2 = StrFromC("x2");
+  ASSERT((hash_key(x1) & 0xff) != (hash_key(x2) & 0xff));
+
+  // Equal strings that aren't the same object
+  BigStr* x1_copy = StrFromC("x1");
+  ASSERT_EQ_FMT(hash_key(x1), hash_key(x1_copy), "%u");
+  ASSERT(keys_equal(x1, x1_copy));
+  ASSERT(!keys_equal(x1, x2));
+  ASSERT(!keys_equal(x1, StrFromC("x10")));
+
+  Dict<BigStr*, int>* d = NewDict<BigStr*, int>();
+  StackRoots _roots({&x1, &x2, &x1_copy, &d});
+  d->set(x1, 1);
+  d->set(x1_copy, 2);
+  ASSERT_EQ(1, len(d));
+  ASSERT_EQ(2, d->at(x1));
+
+  PASS();
+}
+
 GREATEST_MAIN_DEFS();
 
 int main(int argc, char** argv) {
@@ -710,6 +746,7 @@ int main(int argc, char** argv) {
   RUN_TEST(dict_iters_test);
 
   RUN_TEST(test_hash);
+  RUN_TEST(test_hash_bytes);
 
   gHeap.CleanProcessExit();
 
@@ -197,6 +197,9 @@ template <typename T>
 void List<T>::append(T item) {
   reserve(len_ + 1);
   slab_->items_[len_] = item;
+  if (std::is_pointer<T>()) {
+    WriteBarrier(slab_);
+  }
   ++len_;
 }
 
@@ -273,6 +276,7 @@ void List<T>::reserve(int num_desired) {
     memcpy(new_slab->items_, slab_->items_, len_ * sizeof(T));
   }
   slab_ = new_slab;
+  WriteBarrier(this);
 }
 
 // Implements L[i] = item
@@ -286,6 +290,9 @@ void List<T>::set(int i, T item) {
   DCHECK(i < capacity_);
 
   slab_->items_[i] = item;
+  if (std::is_pointer<T>()) {
+    WriteBarrier(slab_);
+  }
 }
 
 // Implements L[i]
@@ -396,9 +403,14 @@ inline bool _cmp(BigStr* a, BigStr* b) {
   return mylib::str_cmp(a, b) < 0;
 }
 
+inline bool _cmp(int a, int b) {
+  return a < b;
+}
+
 template <typename T>
 void List<T>::sort() {
-  std::sort(slab_->items_, slab_->items_ + len_, _cmp);
+  bool (*cmp)(T, T) = _cmp;  // pick the overload
+  std::sort(slab_->items_, slab_->items_ + len_, cmp);
 }
 
 // TODO: mycpp can just generate the constructor instead?
@@ -437,6 +437,13 @@ TEST test_list_sort() {
   ASSERT(str_equals(s->at(1), s2));
   ASSERT(str_equals(s->at(2), s3));
 
+  auto ints = NewList<int>(std::initializer_list<int>{1000000, -1, 5, 0});
+  ints->sort();
+  ASSERT_EQ(-1, ints->at(0));
+  ASSERT_EQ(0, ints->at(1));
+  ASSERT_EQ(5, ints->at(2));
+  ASSERT_EQ(1000000, ints->at(3));
+
   PASS();
 }
 
@@ -30,6 +30,10 @@ inline void MaybeCollect() {
   gHeap.MaybeCollect();
 }
 
+inline BigStr* Intern(BigStr* s) {
+  return gInternTable.Intern(s);
+}
+
 void print_stderr(BigStr* s);
 
 inline int ByteAt(BigStr* s, int i) {
@@ -2,6 +2,7 @@
 
 #include <ctype.h>  // isalpha(), isdigit()
 #include <stdarg.h>
+#include <stdlib.h>  // calloc(), free()
 
 #include <regex>
 
@@ -508,14 +509,6 @@ List<BigStr*>* BigStr::split(BigStr* sep) {
   return this->split(sep, len(this));
 }
 
-unsigned BigStr::hash(HashFunc h) {
-  if (!is_hashed_) {
-    hash_ = h(data_, len(this)) >> 1;
-    is_hashed_ = 1;
-  }
-  return hash_;
-}
-
 static inline BigStr* _StrFormat(const char* fmt, int fmt_len, va_list args) {
   auto beg = std::cregex_iterator(fmt, fmt + fmt_len, gStrFmtRegex);
   auto end = std::cregex_iterator();
@@ -643,3 +636,83 @@ BigStr* StrFormat(BigStr* fmt, ...) {
   va_end(args);
   return ret;
 }
+
+//
+// InternTable
+//
+
+const int kMinInternCapacity = 256;
+
+void InternTable::Insert(BigStr* s) {
+  int mask = capacity_ - 1;
+  int i = s->hash(hash_bytes) & mask;
+  while (slots_[i]) {
+    i = (i + 1) & mask;
+  }
+  slots_[i] = s;
+  len_++;
+}
+
+void InternTable::Grow() {
+  BigStr** old_slots = slots_;
+  int old_capacity = capacity_;
+
+  capacity_ = old_capacity == 0 ? kMinInternCapacity : old_capacity * 2;
+  slots_ = static_cast<BigStr**>(calloc(capacity_, sizeof(BigStr*)));
+  len_ = 0;
+
+  for (int i = 0; i < old_capacity; ++i) {
+    if (old_slots[i]) {
+      Insert(old_slots[i]);
+    }
+  }
+  free(old_slots);
+}
+
+BigStr* InternTable::Intern(BigStr* s) {
+  if (IsInterned(s)) {
+    return s;
+  }
+  // Keep the load factor under 1/2, since linear probing degrades quickly
+  if (len_ * 2 >= capacity_) {
+    Grow();
+  }
+
+  // The hash is cached on each string, so probing doesn't rehash
+  unsigned h = s->hash(hash_bytes);
+  int mask = capacity_ - 1;
+  int i = h & mask;
+  while (BigStr* t = slots_[i]) {
+    if (t->hash(hash_bytes) == h && t->len_ == s->len_ &&
+        memcmp(t->data_, s->data_, s->len_) == 0) {
+      return t;
+    }
+    i = (i + 1) & mask;
+  }
+
+  slots_[i] = s;
+  len_++;
+  ObjHeader::FromObject(s)->u_mask_npointers |= kInternedStr;
+  return s;
+}
+
+void InternTable::RemoveDead(bool (*is_live)(BigStr*)) {
+  if (len_ == 0) {
+    return;
+  }
+
+  // Removing entries would break probe sequences, so re-insert the live ones
+  BigStr** old_slots = slots_;
+  slots_ = static_cast<BigStr**>(calloc(capacity_, sizeof(BigStr*)));
+  len_ = 0;
+
+  for (int i = 0; i < capacity_; ++i) {
+    BigStr* s = old_slots[i];
+    if (s && is_live(s)) {
+      Insert(s);
+    }
+  }
+  free(old_slots);
+}
+
+InternTable gInternTable;
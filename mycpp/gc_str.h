@@ -104,6 +104,61 @@ inline int len(const BigStr* s) {
   return s->len_;
 }
 
+// The hash is cached, so dict probes don't rehash keys
+inline unsigned BigStr::hash(HashFunc h) {
+  if (!is_hashed_) {
+    hash_ = h(data_, len_) >> 1;
+    is_hashed_ = 1;
+  }
+  return hash_;
+}
+
+inline unsigned hash_key(BigStr* s) {
+  return s->hash(hash_bytes);
+}
+
+// A BigStr has no pointers, so this bit of ObjHeader::u_mask_npointers marks
+// strings returned by InternTable::Intern().
+const unsigned kInternedStr = 1;
+
+inline bool IsInterned(BigStr* s) {
+  return ObjHeader::FromObject(s)->u_mask_npointers & kInternedStr;
+}
+
+// A set of strings with distinct contents, so interned strings can be
+// compared by pointer.  The lexer interns variable and proc names, which are
+// then used as dict keys.
+//
+// The table isn't traced by the GC.  Instead, the mark-sweep heap calls
+// RemoveDead() after marking, so unreachable strings are dropped before
+// they're freed.
+class InternTable {
+ public:
+  InternTable() : slots_(nullptr), capacity_(0), len_(0) {
+  }
+
+  // Returns a string with the same contents as s, possibly s itself
+  BigStr* Intern(BigStr* s);
+
+  void RemoveDead(bool (*is_live)(BigStr*));
+
+  int len() {
+    return len_;
+  }
+
+ private:
+  void Insert(BigStr* s);
+  void Grow();
+
+  BigStr** slots_;  // open addressing with linear probing; nullptr is empty
+  int capacity_;    // power of 2
+  int len_;
+
+  DISALLOW_COPY_AND_ASSIGN(InternTable);
+};
+
+extern InternTable gInternTable;
+
 BigStr* StrFormat(const char* fmt, ...);
 BigStr* StrFormat(BigStr* fmt, ...);
 
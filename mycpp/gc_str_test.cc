@@ -1198,8 +1198,8 @@ unsigned coffee_hash(const char*, int) {
 TEST test_str_hash() {
   BigStr* s1 = StrFromC("a string");
   BigStr* s2 = StrFromC("a different string");
-  unsigned h1 = s1->hash(fnv1);
-  unsigned h2 = s2->hash(fnv1);
+  unsigned h1 = s1->hash(hash_bytes);
+  unsigned h2 = s2->hash(hash_bytes);
   ASSERT(h1 != h2);
 
   // flag bit should be set and we should return the cached hash.
@@ -1209,6 +1209,48 @@ TEST test_str_hash() {
   PASS();
 }
 
+TEST test_str_intern() {
+  BigStr* s1 = nullptr;
+  BigStr* s2 = nullptr;
+  BigStr* s3 = nullptr;
+  StackRoots _roots({&s1, &s2, &s3});
+
+  s1 = StrFromC("myvar");
+  s2 = StrFromC("myvar");
+  ASSERT(s1 != s2);
+  ASSERT(!IsInterned(s1));
+
+  int n = gInternTable.len();
+  ASSERT_EQ(s1, gInternTable.Intern(s1));
+  ASSERT(IsInterned(s1));
+  ASSERT_EQ(s1, gInternTable.Intern(s2));
+  ASSERT(!IsInterned(s2));
+  ASSERT_EQ(n + 1, gInternTable.len());
+
+  s3 = gInternTable.Intern(StrFromC("other"));
+  ASSERT_EQ(n + 2, gInternTable.len());
+  ASSERT(str_equals(s1, s2));
+  ASSERT(!str_equals(s1, s3));  // compared by pointer
+
+  // Interned strings that are otherwise unreachable are removed
+  gInternTable.Intern(StrFromC("garbage"));
+  ASSERT_EQ(n + 3, gInternTable.len());
+  gHeap.Collect();
+  ASSERT_EQ(n + 2, gInternTable.len());
+  ASSERT_EQ(s1, gInternTable.Intern(s2));
+  ASSERT_EQ(s3, gInternTable.Intern(StrFromC("other")));
+
+  // Many strings make the table grow
+  for (int i = 0; i < 1000; ++i) {
+    gInternTable.Intern(str(i));
+  }
+  ASSERT_EQ(s1, gInternTable.Intern(s2));
+  gHeap.Collect();
+  ASSERT_EQ(n + 2, gInternTable.len());
+
+  PASS();
+}
+
 GLOBAL_STR(kStrFoo, "foo");
 GLOBAL_STR(a, "a");
 GLOBAL_STR(XX, "XX");
@@ -1540,6 +1582,7 @@ int main(int argc, char** argv) {
   RUN_TEST(test_str_format);
 
   RUN_TEST(test_str_hash);
+  RUN_TEST(test_str_intern);
 
   // Duplicate
   RUN_TEST(str_replace_test);
@@ -1,5 +1,8 @@
 #include "mycpp/hash.h"
 
+#include <stdint.h>  // uint64_t
+#include <string.h>  // memcpy
+
 #include "mycpp/gc_str.h"
 #include "mycpp/gc_tuple.h"
 
@@ -16,8 +19,47 @@ unsigned fnv1(const char* data, int len) {
   return h;
 }
 
-unsigned hash_key(BigStr* s) {
-  return s->hash(fnv1);
+// Any constant works.  Hashes don't affect dict iteration order, which is
+// insertion order.
+const uint64_t kHashSeed = 0x9e3779b97f4a7c15ULL;
+
+unsigned hash_bytes(const char* data, int len) {
+  // MurmurHash64A by Austin Appleby, which is public domain.  FNV-1 does one
+  // multiply per byte, and clusters short keys like x1, x2, ... in a table
+  // indexed by the low bits.
+  const uint64_t m = 0xc6a4a7935bd1e995ULL;
+  const int r = 47;
+
+  uint64_t h = kHashSeed ^ (len * m);
+
+  const char* end = data + (len & ~7);
+  for (const char* p = data; p != end; p += 8) {
+    uint64_t k;
+    memcpy(&k, p, 8);  // unaligned load
+
+    k *= m;
+    k ^= k >> r;
+    k *= m;
+
+    h ^= k;
+    h *= m;
+  }
+
+  int rest = len & 7;
+  if (rest) {
+    uint64_t k = 0;
+    for (int i = rest - 1; i >= 0; --i) {
+      k = (k << 8) | static_cast<unsigned char>(end[i]);
+    }
+    h ^= k;
+    h *= m;
+  }
+
+  h ^= h >> r;
+  h *= m;
+  h ^= h >> r;
+
+  return static_cast<unsigned>(h);
 }
 
 unsigned hash_key(int n) {
@@ -29,11 +71,11 @@ unsigned hash_key(Tuple2<int, int>* t1) {
 }
 
 unsigned hash_key(Tuple2<BigStr*, int>* t1) {
-  return t1->at0()->hash(fnv1) + t1->at1();
+  return hash_key(t1->at0()) + t1->at1();
 }
 
 // e.g. for Dict<Token*, int>, hash the pointer itself, which means we use
 // object IDENTITY, not value.
 unsigned hash_key(void* p) {
-  return fnv1(reinterpret_cast<const char*>(&p), sizeof(void*));
+  return hash_bytes(reinterpret_cast<const char*>(&p), sizeof(void*));
 }
@@ -5,12 +5,15 @@ typedef unsigned (*HashFunc)(const char*, int);
 
 unsigned fnv1(const char* data, int len);
 
+// Hashes 8 bytes at a time.  Used for BigStr and pointers.
+unsigned hash_bytes(const char* data, int len);
+
 template <typename L, typename R>
 class Tuple2;
 
 class BigStr;
 
-unsigned hash_key(BigStr* s);
+// hash_key(BigStr*) is inline in gc_str.h
 unsigned hash_key(int n);
 unsigned hash_key(Tuple2<int, int>* t1);
 unsigned hash_key(Tuple2<BigStr*, int>* t1);
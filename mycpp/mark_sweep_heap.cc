@@ -10,6 +10,7 @@
 #include "_build/detected-cpp-config.h"  // for GC_TIMING
 #include "mycpp/gc_builtins.h"           // StringToInt()
 #include "mycpp/gc_slab.h"
+#include "mycpp/gc_str.h"  // gInternTable
 
 // TODO: Remove this guard when we have separate binaries
 #if MARK_SWEEP
@@ -48,7 +49,11 @@ int MarkSweepHeap::MaybeCollect() {
   #else
   int result = -1;
   if (num_live() > gc_threshold_) {
+    #ifdef GC_GENERATIONAL
+    result = collect_all_next_ ? Collect() : CollectYoung();
+    #else
     result = Collect();
+    #endif
   }
   #endif
 
@@ -106,7 +111,11 @@ void* MarkSweepHeap::Allocate(size_t num_bytes, int* obj_id, int* pool_id) {
   void* result = malloc(num_bytes);
   DCHECK(result != nullptr);
 
+  #ifdef GC_GENERATIONAL
+  young_objs_.push_back(static_cast<ObjHeader*>(result));
+  #else
   live_objs_.push_back(static_cast<ObjHeader*>(result));
+  #endif
 
   num_live_++;
   num_allocated_++;
@@ -211,62 +220,73 @@ void MarkSweepHeap::TraceChildren() {
   }
 }
 
-void MarkSweepHeap::Sweep() {
-  #ifndef NO_POOL_ALLOC
-  pool1_.Sweep();
-  pool2_.Sweep();
-  #endif
-
+// Free the unmarked objects in a list of malloc()'d objects, and compact it.
+void MarkSweepHeap::SweepMalloced(std::vector<ObjHeader*>* objs) {
   int last_live_index = 0;
-  int num_objs = live_objs_.size();
+  int num_objs = objs->size();
   for (int i = 0; i < num_objs; ++i) {
-    ObjHeader* obj = live_objs_[i];
+    ObjHeader* obj = (*objs)[i];
     DCHECK(obj);  // malloc() shouldn't have returned nullptr
 
     bool is_live = mark_set_.IsMarked(obj->obj_id);
 
-    // Compact live_objs_ and populate to_free_.  Note: doing the reverse could
+    // Compact the list and populate to_free_.  Note: doing the reverse could
     // be more efficient when many objects are dead.
     if (is_live) {
-      live_objs_[last_live_index++] = obj;
+      (*objs)[last_live_index++] = obj;
     } else {
       to_free_.push_back(obj);
       // free(obj);
       num_live_--;
     }
   }
-  live_objs_.resize(last_live_index);  // remove dangling objects
-
-  num_collections_++;
-  max_survived_ = std::max(max_survived_, num_live());
+  objs->resize(last_live_index);  // remove dangling objects
 }
 
-int MarkSweepHeap::Collect() {
-  #ifdef GC_TIMING
-  struct timespec start, end;
-  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &start) < 0) {
-    FAIL("clock_gettime failed");
-  }
+void MarkSweepHeap::Sweep() {
+  #ifndef NO_POOL_ALLOC
+  pool1_.Sweep();
+  pool2_.Sweep();
   #endif
 
-  int num_roots = roots_.size();
-  int num_globals = global_roots_.size();
+  #ifdef GC_GENERATIONAL
+  // A full collection sweeps young objects too
+  live_objs_.insert(live_objs_.end(), young_objs_.begin(), young_objs_.end());
+  young_objs_.clear();
+  #endif
+  SweepMalloced(&live_objs_);
 
-  if (gc_verbose_) {
-    log("");
-    log("%2d. GC with %d roots (%d global) and %d live objects",
-        num_collections_, num_roots + num_globals, num_globals, num_live());
+  num_collections_++;
+  max_survived_ = std::max(max_survived_, num_live());
+}
+
+bool MarkSweepHeap::IsMarked(RawObject* obj) {
+  ObjHeader* header = ObjHeader::FromObject(obj);
+  if (header->heap_tag == HeapTag::Global) {
+    return true;
   }
 
-  // Resize it
-  mark_set_.ReInit(greatest_obj_id_);
+  int obj_id = header->obj_id;
   #ifndef NO_POOL_ALLOC
-  pool1_.PrepareForGc();
-  pool2_.PrepareForGc();
+  if (header->pool_id == 1) {
+    return pool1_.IsMarked(obj_id);
+  }
+  if (header->pool_id == 2) {
+    return pool2_.IsMarked(obj_id);
+  }
   #endif
+  return mark_set_.IsMarked(obj_id);
+}
+
+extern MarkSweepHeap gHeap;
+
+static bool IsLiveStr(BigStr* s) {
+  return gHeap.IsMarked(reinterpret_cast<RawObject*>(s));
+}
 
-  // Mark roots.
+void MarkSweepHeap::MarkRoots() {
   // Note: It might be nice to get rid of double pointers
+  int num_roots = roots_.size();
   for (int i = 0; i < num_roots; ++i) {
     RawObject* root = *(roots_[i]);
     if (root) {
@@ -274,22 +294,16 @@ int MarkSweepHeap::Collect() {
     }
   }
 
+  int num_globals = global_roots_.size();
   for (int i = 0; i < num_globals; ++i) {
     RawObject* root = global_roots_[i];
     if (root) {
       MaybeMarkAndPush(root);
     }
   }
+}
 
-  // Traverse object graph.
-  TraceChildren();
-
-  Sweep();
-
-  if (gc_verbose_) {
-    log("    %d live after sweep", num_live());
-  }
-
+void MarkSweepHeap::UpdateThreshold() {
   // We know how many are live.  If the number of objects is close to the
   // threshold (above 75%), then set the threshold to 2 times the number of
   // live objects.  This is an ad hoc policy that removes observed "thrashing"
@@ -304,15 +318,67 @@ int MarkSweepHeap::Collect() {
           gc_threshold_);
     }
   }
+}
 
   #ifdef GC_TIMING
-  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &end) < 0) {
+static double ProcessMillis() {
+  struct timespec ts;
+  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &ts) < 0) {
     FAIL("clock_gettime failed");
   }
+  return ts.tv_sec * 1000.0 + ts.tv_nsec / 1e6;
+}
+  #endif
 
-  double start_secs = start.tv_sec + start.tv_nsec / 1e9;
-  double end_secs = end.tv_sec + end.tv_nsec / 1e9;
-  double gc_millis = (end_secs - start_secs) * 1000.0;
+int MarkSweepHeap::Collect() {
+  #ifdef GC_TIMING
+  double start_millis = ProcessMillis();
+  #endif
+
+  if (gc_verbose_) {
+    int num_globals = global_roots_.size();
+    log("");
+    log("%2d. GC with %d roots (%d global) and %d live objects",
+        num_collections_, static_cast<int>(roots_.size()) + num_globals,
+        num_globals, num_live());
+  }
+
+  // Resize it
+  mark_set_.ReInit(greatest_obj_id_);
+  #ifndef NO_POOL_ALLOC
+  pool1_.PrepareForGc();
+  pool2_.PrepareForGc();
+  #endif
+
+  #ifdef GC_GENERATIONAL
+  // All marks were cleared, so old objects that were written to are traced
+  // like any other object.
+  remembered_.clear();
+  #endif
+
+  MarkRoots();
+
+  // Traverse object graph.
+  TraceChildren();
+
+  // The intern table holds weak references
+  gInternTable.RemoveDead(IsLiveStr);
+
+  Sweep();
+
+  if (gc_verbose_) {
+    log("    %d live after sweep", num_live());
+  }
+
+  UpdateThreshold();
+
+  #ifdef GC_GENERATIONAL
+  collect_all_next_ = false;
+  full_threshold_ = num_live() * 2;
+  #endif
+
+  #ifdef GC_TIMING
+  double gc_millis = ProcessMillis() - start_millis;
 
   if (gc_verbose_) {
     log("    %.1f ms GC", gc_millis);
@@ -327,6 +393,83 @@ int MarkSweepHeap::Collect() {
   return num_live();  // for unit tests only
 }
 
+  #ifdef GC_GENERATIONAL
+int MarkSweepHeap::CollectYoung() {
+    #ifdef GC_TIMING
+  double start_millis = ProcessMillis();
+    #endif
+
+  int num_remembered = remembered_.size();
+  if (gc_verbose_) {
+    log("");
+    log("%2d. Minor GC with %d roots and %d remembered objects",
+        num_collections_, static_cast<int>(roots_.size()), num_remembered);
+  }
+  max_remembered_ = std::max(max_remembered_, num_remembered);
+
+  // Old objects stay marked, so tracing stops at them
+  mark_set_.Resize(greatest_obj_id_);
+    #ifndef NO_POOL_ALLOC
+  pool1_.PrepareForMinorGc();
+  pool2_.PrepareForMinorGc();
+    #endif
+
+  // The write barrier unmarked these, so they're traced again
+  for (int i = 0; i < num_remembered; ++i) {
+    MaybeMarkAndPush(static_cast<RawObject*>(remembered_[i]->ObjectAddress()));
+  }
+  remembered_.clear();
+
+  MarkRoots();
+  TraceChildren();
+
+  gInternTable.RemoveDead(IsLiveStr);
+
+    #ifndef NO_POOL_ALLOC
+  pool1_.Sweep();
+  pool2_.Sweep();
+    #endif
+
+  // Only young objects can be unmarked.  The survivors are now old.
+  SweepMalloced(&young_objs_);
+  live_objs_.insert(live_objs_.end(), young_objs_.begin(), young_objs_.end());
+  young_objs_.clear();
+
+  num_collections_++;
+  num_minor_collections_++;
+  max_survived_ = std::max(max_survived_, num_live());
+
+  if (gc_verbose_) {
+    log("    %d live after sweep", num_live());
+  }
+
+  if (num_live() > full_threshold_) {
+    collect_all_next_ = true;
+  }
+
+  UpdateThreshold();
+
+    #ifdef GC_TIMING
+  double gc_millis = ProcessMillis() - start_millis;
+
+  if (gc_verbose_) {
+    log("    %.1f ms minor GC", gc_millis);
+  }
+
+  total_gc_millis_ += gc_millis;
+  if (gc_millis > max_gc_millis_) {
+    max_gc_millis_ = gc_millis;
+  }
+  total_minor_millis_ += gc_millis;
+  if (gc_millis > max_minor_millis_) {
+    max_minor_millis_ = gc_millis;
+  }
+    #endif
+
+  return num_live();  // for unit tests only
+}
+  #endif
+
 void MarkSweepHeap::PrintStats(int fd) {
   dprintf(fd, "  num live         = %10d\n", num_live());
   // max survived_ can be less than num_live(), because leave off the last GC
@@ -354,12 +497,20 @@ void MarkSweepHeap::PrintStats(int fd) {
   dprintf(fd, "\n");
   dprintf(fd, "  num gc points    = %10d\n", num_gc_points_);
   dprintf(fd, "  num collections  = %10d\n", num_collections_);
+  #ifdef GC_GENERATIONAL
+  dprintf(fd, "  num minor        = %10d\n", num_minor_collections_);
+  dprintf(fd, "  max remembered   = %10d\n", max_remembered_);
+  #endif
   dprintf(fd, "\n");
   dprintf(fd, "   gc threshold    = %10d\n", gc_threshold_);
   dprintf(fd, "  num growths      = %10d\n", num_growths_);
   dprintf(fd, "\n");
   dprintf(fd, "  max gc millis    = %10.1f\n", max_gc_millis_);
   dprintf(fd, "total gc millis    = %10.1f\n", total_gc_millis_);
+  #ifdef GC_GENERATIONAL
+  dprintf(fd, "  max minor millis = %10.1f\n", max_minor_millis_);
+  dprintf(fd, "total minor millis = %10.1f\n", total_minor_millis_);
+  #endif
   dprintf(fd, "\n");
   dprintf(fd, "roots capacity     = %10d\n",
           static_cast<int>(roots_.capacity()));
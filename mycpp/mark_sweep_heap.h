@@ -42,6 +42,32 @@ class MarkSet {
     return bits_[byte_index] & (1 << bit_index);
   }
 
+  // For GC_GENERATIONAL, where a mark means the object is old.
+
+  // Like ReInit(), but keep the marks.  Called at the start of a minor
+  // collection.
+  void Resize(int max_obj_id) {
+    int max_byte_index = (max_obj_id >> 3) + 1;
+    if (max_byte_index > static_cast<int>(bits_.size())) {
+      bits_.resize(max_byte_index);  // new IDs are unmarked
+    }
+  }
+
+  // Called by the write barrier.  Objects allocated since the last collection
+  // may have IDs past the end of the bit vector.
+  bool IsMarkedOutsideGc(int obj_id) {
+    int byte_index = obj_id >> 3;
+    if (byte_index >= static_cast<int>(bits_.size())) {
+      return false;
+    }
+    return bits_[byte_index] & (1 << (obj_id & 0b111));
+  }
+
+  void Unmark(int obj_id) {
+    DCHECK(IsMarked(obj_id));
+    bits_[obj_id >> 3] &= ~(1 << (obj_id & 0b111));
+  }
+
   void Debug() {
     int n = bits_.size();
     dprintf(2, "[ ");
@@ -111,6 +137,23 @@ class Pool {
     mark_set_.ReInit(blocks_.size() * CellsPerBlock);
   }
 
+  // For a minor collection, cells that survived earlier ones stay marked.
+  void PrepareForMinorGc() {
+    DCHECK(!gc_underway_);
+    gc_underway_ = true;
+    mark_set_.Resize(blocks_.size() * CellsPerBlock);
+  }
+
+  bool IsOld(int cell_id) {
+    DCHECK(!gc_underway_);
+    return mark_set_.IsMarkedOutsideGc(cell_id);
+  }
+
+  void MakeYoung(int cell_id) {
+    DCHECK(!gc_underway_);
+    mark_set_.Unmark(cell_id);
+  }
+
   bool IsMarked(int cell_id) {
     DCHECK(gc_underway_);
     return mark_set_.IsMarked(cell_id);
@@ -216,13 +259,56 @@ class MarkSweepHeap {
   void* Reallocate(void* p, size_t num_bytes);
 #endif
   int MaybeCollect();
-  int Collect();
+  int Collect();  // always traces the whole heap
 
   void MaybeMarkAndPush(RawObject* obj);
   void TraceChildren();
 
+  // Whether a collection has marked obj.  Only valid between TraceChildren()
+  // and Sweep().
+  bool IsMarked(RawObject* obj);
+
   void Sweep();
 
+#ifdef GC_GENERATIONAL
+  // Sticky mark bits: objects that survive a collection keep their mark, and
+  // are "old".  A minor collection only traces from the roots and the
+  // remembered set, and only sweeps unmarked "young" objects.
+
+  int CollectYoung();
+
+  // Called after a pointer is stored in an existing object.  If the object
+  // is old, it may now point to a young object.  So unmark it, and remember
+  // it as a root for the next minor collection.
+  void RecordWrite(RawObject* obj) {
+    ObjHeader* header = ObjHeader::FromObject(obj);
+    if (header->heap_tag == HeapTag::Global) {
+      return;
+    }
+    int obj_id = header->obj_id;
+  #ifndef NO_POOL_ALLOC
+    if (header->pool_id == 1) {
+      if (pool1_.IsOld(obj_id)) {
+        pool1_.MakeYoung(obj_id);
+        remembered_.push_back(header);
+      }
+      return;
+    }
+    if (header->pool_id == 2) {
+      if (pool2_.IsOld(obj_id)) {
+        pool2_.MakeYoung(obj_id);
+        remembered_.push_back(header);
+      }
+      return;
+    }
+  #endif
+    if (mark_set_.IsMarkedOutsideGc(obj_id)) {
+      mark_set_.Unmark(obj_id);
+      remembered_.push_back(header);
+    }
+  }
+#endif
+
   void PrintStats(int fd);  // public for testing
 
   void CleanProcessExit();  // do one last GC, used in unit tests
@@ -259,6 +345,17 @@ class MarkSweepHeap {
   int num_gc_points_ = 0;        // manual collection points
   int num_collections_ = 0;
   int num_growths_;
+#ifdef GC_GENERATIONAL
+  int num_minor_collections_ = 0;
+  int max_remembered_ = 0;
+  double max_minor_millis_ = 0.0;
+  double total_minor_millis_ = 0.0;
+
+  // After a minor collection, collect everything next time if the old
+  // generation has grown past this, since it's accumulated dead objects.
+  int full_threshold_ = 0;
+  bool collect_all_next_ = true;  // the first collection traces everything
+#endif
   double max_gc_millis_ = 0.0;
   double total_gc_millis_ = 0.0;
 
@@ -276,6 +373,13 @@ class MarkSweepHeap {
 
   // Allocate() appends live objects, and Sweep() compacts it
   std::vector<ObjHeader*> live_objs_;
+#ifdef GC_GENERATIONAL
+  // With generations, Allocate() appends here instead, so a minor collection
+  // only sweeps these.  Survivors are moved to live_objs_.
+  std::vector<ObjHeader*> young_objs_;
+  // Old objects written to since the last collection
+  std::vector<ObjHeader*> remembered_;
+#endif
   // Allocate lazily frees these, and Sweep() replenishes it
   std::vector<ObjHeader*> to_free_;
 
@@ -285,6 +389,9 @@ class MarkSweepHeap {
   int greatest_obj_id_ = 0;
 
  private:
+  void MarkRoots();
+  void SweepMalloced(std::vector<ObjHeader*>* objs);
+  void UpdateThreshold();
   void FreeEverything();
   void MaybePrintStats();
 
@@ -1,6 +1,7 @@
 #include "mycpp/mark_sweep_heap.h"
 
 #include "mycpp/gc_alloc.h"  // gHeap
+#include "mycpp/gc_dict.h"
 #include "mycpp/gc_list.h"
 #include "vendor/greatest.h"
 
@@ -171,6 +172,81 @@ TEST cycle_collection_test() {
   PASS();
 }
 
+#ifdef GC_GENERATIONAL
+TEST minor_collection_test() {
+  List<BigStr *> *old_list = nullptr;
+  BigStr *s = nullptr;
+  StackRoots _roots({&old_list, &s});
+
+  old_list = NewList<BigStr *>();
+  gHeap.Collect();
+  int num_old = gHeap.num_live();
+
+  // Young garbage is freed
+  StrFromC("garbage");
+  NewList<BigStr *>();
+  ASSERT_EQ_FMT(num_old, gHeap.CollectYoung(), "%d");
+
+  // Tracing stops at the old list, so the string and the new slab are only
+  // found because append() remembers the list
+  s = StrFromC("young");
+  old_list->append(s);
+  s = nullptr;
+  ASSERT_EQ_FMT(num_old + 2, gHeap.CollectYoung(), "%d");
+  ASSERT(are_equal(old_list->at(0), StrFromC("young")));
+  num_old += 2;
+
+  // Now the slab is old, and set() remembers it
+  old_list->set(0, StrFromC("other"));
+  ASSERT_EQ_FMT(num_old + 1, gHeap.CollectYoung(), "%d");
+  ASSERT(are_equal(old_list->at(0), StrFromC("other")));
+  num_old += 1;
+
+  // Old garbage survives minor collections, until the next full one
+  old_list = nullptr;
+  ASSERT_EQ_FMT(num_old, gHeap.CollectYoung(), "%d");
+  ASSERT_EQ_FMT(num_old - 4, gHeap.Collect(), "%d");
+
+  PASS();
+}
+
+TEST minor_collection_dict_test() {
+  Dict<BigStr *, BigStr *> *d = nullptr;
+  StackRoots _roots({&d});
+
+  d = Alloc<Dict<BigStr *, BigStr *>>();
+  d->set(StrFromC("k"), StrFromC("v"));
+  gHeap.Collect();
+  int num_old = gHeap.num_live();
+
+  // New value for an old key
+  d->set(StrFromC("k"), StrFromC("v2"));
+  ASSERT_EQ_FMT(num_old + 1, gHeap.CollectYoung(), "%d");
+  ASSERT(are_equal(d->at(StrFromC("k")), StrFromC("v2")));
+
+  // New key and value
+  d->set(StrFromC("k2"), StrFromC("v3"));
+  ASSERT_EQ_FMT(num_old + 3, gHeap.CollectYoung(), "%d");
+  ASSERT(are_equal(d->at(StrFromC("k2")), StrFromC("v3")));
+
+  // Node isn't a mycpp class, so it calls the barrier by hand
+  Node *n1 = nullptr;
+  Node *n2 = nullptr;
+  StackRoots _roots2({&n1, &n2});
+  n1 = Alloc<Node>();
+  gHeap.CollectYoung();
+
+  n2 = Alloc<Node>();
+  n1->next_ = n2;
+  WriteBarrier(n1);
+  n2 = nullptr;
+  int num_live = gHeap.num_live();
+  ASSERT_EQ_FMT(num_live, gHeap.CollectYoung(), "%d");
+
+  PASS();
+}
+#endif
+
 TEST pool_sanity_check() {
   Pool<2, 32> p;
 
@@ -357,6 +433,10 @@ int main(int argc, char **argv) {
   RUN_TEST(string_collection_test);
   RUN_TEST(list_collection_test);
   RUN_TEST(cycle_collection_test);
+#ifdef GC_GENERATIONAL
+  RUN_TEST(minor_collection_test);
+  RUN_TEST(minor_collection_dict_test);
+#endif
 
   RUN_SUITE(pool_alloc);
 
@@ -37,6 +37,16 @@ def MaybeCollect():
     pass
 
 
+def Intern(s):
+    # type: (str) -> str
+    """Return a string equal to s that's shared by all equal interned strings.
+
+    Dict lookups with interned keys can then compare pointers.  In C++, the
+    table doesn't keep strings alive.
+    """
+    return intern(s)
+
+
 def NewDict():
     # type: () -> Dict[str, Any]
     """Make dictionaries ordered in Python, e.g. for JSON.
@@ -15,6 +15,7 @@ This just does head?  Last one wins.
 """
 from __future__ import print_function
 
+from errno import EINTR
 import sys
 
 from _devbuild.gen.id_kind_asdl import Id
@@ -36,6 +37,8 @@ from _devbuild.gen.syntax_asdl import (
     case_arg,
     case_arg_e,
     case_arg_t,
+    CaseArmPats,
+    CaseDispatch,
     BraceGroup,
     Proc,
     Func,
@@ -50,6 +53,8 @@ from _devbuild.gen.syntax_asdl import (
     pat,
     pat_e,
     word,
+    y_lhs,
+    y_lhs_e,
     Eggex,
 )
 from _devbuild.gen.runtime_asdl import (
@@ -64,13 +69,14 @@ from _devbuild.gen.runtime_asdl import (
 )
 from _devbuild.gen.types_asdl import redir_arg_type_e
 from _devbuild.gen.value_asdl import (value, value_e, value_t, y_lvalue,
-                                      y_lvalue_e, y_lvalue_t, LeftName)
+                                      y_lvalue_e, y_lvalue_t, sh_lvalue_e,
+                                      LeftName)
 
+from core import bash_impl
 from core import dev
 from core import error
 from core import executor
 from core.error import e_die, e_die_status
-from core import num
 from core import pyos  # Time().  TODO: rename
 from core import pyutil
 from core import state
@@ -81,7 +87,9 @@ from frontend import consts
 from frontend import lexer
 from frontend import location
 from osh import braces
+from osh import glob_
 from osh import sh_expr_eval
+from osh import word_
 from osh import word_eval
 from mycpp import mylib
 from mycpp.mylib import log, probe, switch, tagswitch
@@ -90,6 +98,7 @@ from ysh import func_proc
 from ysh import val_ops
 
 import posix_ as posix
+from posix_ import O_RDONLY
 import libc  # for fnmatch
 # Import this name directly because the C++ translation uses macros literally.
 from libc import FNM_CASEFOLD
@@ -165,9 +174,15 @@ def _HasManyStatuses(node):
     return True
 
 
-def PlusEquals(old_val, val):
-    # type: (value_t, value_t) -> value_t
-    """Implement s+=val, typeset s+=val, etc."""
+def PlusEquals(old_val, val, in_place=False):
+    # type: (value_t, value_t, bool) -> value_t
+    """Implement s+=val, typeset s+=val, etc.
+
+    If in_place is true, a+=(x y) appends to the existing array, so a loop of
+    appends is O(n) rather than O(n^2).  The caller must know that old_val is
+    the value of the cell being assigned.  Like a[i]=x, the append is visible
+    through other variables that share the array, e.g. after var b = a.
+    """
 
     UP_old_val = old_val
     UP_val = val
@@ -198,11 +213,35 @@ def PlusEquals(old_val, val):
                 old_val = cast(value.BashArray, UP_old_val)
                 to_append = cast(value.BashArray, UP_val)
 
-                # TODO: MUTATE the existing value for efficiency?
-                strs = []  # type: List[str]
-                strs.extend(old_val.strs)
-                strs.extend(to_append.strs)
-                val = value.BashArray(strs)
+                if in_place:
+                    old_val.strs.extend(to_append.strs)
+                    val = old_val
+                else:
+                    strs = []  # type: List[str]
+                    strs.extend(old_val.strs)
+                    strs.extend(to_append.strs)
+                    val = value.BashArray(strs)
+
+            else:
+                raise AssertionError()  # parsing should prevent this
+
+        elif case(value_e.SparseArray):
+            if tag == value_e.Str:
+                e_die("Can't append string to array")
+
+            elif tag == value_e.BashArray:
+                old_val = cast(value.SparseArray, UP_old_val)
+                to_append = cast(value.BashArray, UP_val)
+
+                if in_place:
+                    sparse_val = old_val
+                else:
+                    d = {}  # type: Dict[int, str]
+                    for index in old_val.d.keys():
+                        d[index] = old_val.d[index]
+                    sparse_val = value.SparseArray(d, old_val.max_index, None)
+                bash_impl.SparseArray_Append(sparse_val, to_append.strs)
+                val = sparse_val
 
             else:
                 raise AssertionError()  # parsing should prevent this
@@ -285,6 +324,7 @@ class CommandEvaluator(object):
         self.expr_ev = None  # type: expr_eval.ExprEvaluator
         self.word_ev = None  # type: word_eval.AbstractWordEvaluator
         self.tracer = None  # type: dev.Tracer
+        self.profiler = None  # type: dev.Profiler
 
         self.mem = mem
         # This is for shopt and set -o.  They are initialized by flags.
@@ -327,7 +367,7 @@ class CommandEvaluator(object):
             e_die("Assignment builtin %r not configured" % cmd_val.argv[0],
                   cmd_val.arg_locs[0])
 
-        with vm.ctx_FlushStdout():
+        with vm.ctx_FlushStdout(self.exec_opts):
             with ui.ctx_Location(self.errfmt, cmd_val.arg_locs[0]):
                 try:
                     status = builtin_func.Run(cmd_val)
@@ -499,6 +539,52 @@ class CommandEvaluator(object):
 
         raise AssertionError('for -Wreturn-type in C++')
 
+    def ReadRedirectedFile(self, r):
+        # type: (Redir) -> Tuple[int, str]
+        """Read the file for $(<file) without forking a __cat process.
+
+        Errors are reported like they are when the redirect is applied.
+
+        Returns:
+          (status, contents of the file)
+        """
+        try:
+            redir_val = self._EvalRedirect(r)
+        except error.RedirectEval as e:
+            self.errfmt.PrettyPrintError(e)
+            return 1, ''
+        except error.FailGlob as e:  # e.g. $(<foo-*)
+            if not e.HasLocation():
+                e.location = self.mem.GetFallbackLocation()
+            self.errfmt.PrettyPrintError(e, prefix='failglob: ')
+            return 1, ''
+
+        path = cast(redirect_arg.Path, redir_val.arg).filename
+        try:
+            fd = posix.open(path, O_RDONLY, 0)
+        except (IOError, OSError) as e:
+            self.errfmt.Print_("Can't open %r: %s" % (path, pyutil.strerror(e)),
+                               blame_loc=r.op)
+            return 1, ''
+
+        status = 0
+        chunks = []  # type: List[str]
+        while True:
+            n, err_num = pyos.Read(fd, 4096, chunks)
+            if n < 0:
+                if err_num == EINTR:
+                    continue  # retry
+                self.errfmt.Print_(
+                    'osh I/O error (read): %s' % posix.strerror(err_num),
+                    blame_loc=r.op)
+                status = 1
+                break
+            elif n == 0:  # EOF
+                break
+        posix.close(fd)
+
+        return status, ''.join(chunks)
+
     def _EvalRedirects(self, node):
         # type: (command_t) -> List[RedirValue]
         """Evaluate redirect nodes to concrete objects.
@@ -715,6 +801,11 @@ class CommandEvaluator(object):
             num_lhs = len(node.lhs)
             if num_lhs == 1:
                 lhs0 = node.lhs[0]
+                if lhs0.slot != -1 and flags == 0:  # proc or func local
+                    self.mem.SetSlotLocal(lhs0.slot, lhs0.name, right_val,
+                                          lhs0.left)
+                    return 0
+
                 lvals = [LeftName(lhs0.name, lhs0.left)]
                 rhs_vals = [right_val]
             else:
@@ -760,7 +851,15 @@ class CommandEvaluator(object):
 
             num_lhs = len(node.lhs)
             if num_lhs == 1:
-                lvals = [self.expr_ev.EvalLhsExpr(node.lhs[0], which_scopes)]
+                lhs0 = node.lhs[0]
+                if lhs0.tag() == y_lhs_e.Var:
+                    v = cast(y_lhs.Var, lhs0)
+                    if v.slot != -1:  # setvar of a proc or func local
+                        self.mem.SetSlotLocal(v.slot, v.name, right_val,
+                                              v.left)
+                        return
+
+                lvals = [self.expr_ev.EvalLhsExpr(lhs0, which_scopes)]
                 rhs_vals = [right_val]
             else:
                 items = val_ops.ToList(
@@ -824,7 +923,15 @@ class CommandEvaluator(object):
             # Checked in the parser
             assert len(node.lhs) == 1
 
-            aug_lval = self.expr_ev.EvalLhsExpr(node.lhs[0], which_scopes)
+            lhs0 = node.lhs[0]
+            if lhs0.tag() == y_lhs_e.Var:
+                v = cast(y_lhs.Var, lhs0)
+                if v.slot != -1:
+                    val = self.expr_ev.EvalExpr(node.rhs, loc.Missing)
+                    self.expr_ev.EvalAugmentedLocal(v, val, node.op)
+                    return
+
+            aug_lval = self.expr_ev.EvalLhsExpr(lhs0, which_scopes)
             val = self.expr_ev.EvalExpr(node.rhs, loc.Missing)
 
             self.expr_ev.EvalAugmented(aug_lval, val, node.op, which_scopes)
@@ -960,7 +1067,16 @@ class CommandEvaluator(object):
                 # do not respect set -u
                 old_val = sh_expr_eval.OldValue(lval, self.mem, None)
 
-                val = PlusEquals(old_val, rhs)
+                # Append in place only if we're going to write the same cell.
+                # Not for 'local a+=(x)' on a global, or a readonly array.
+                in_place = False
+                if lval.tag() == sh_lvalue_e.Var:
+                    cell = self.mem.GetCell(cast(LeftName, lval).name,
+                                            which_scopes)
+                    in_place = (cell is not None and cell.val is old_val and
+                                not cell.readonly)
+
+                val = PlusEquals(old_val, rhs, in_place=in_place)
 
             else:  # plain assignment
                 lval = self.arith_ev.EvalShellLhs(pair.lhs, which_scopes)
@@ -1005,7 +1121,7 @@ class CommandEvaluator(object):
         val = self.expr_ev.EvalExpr(node.e, loc.Missing)
 
         if node.keyword.id == Id.Lit_Equals:  # = f(x)
-            with vm.ctx_FlushStdout():
+            with vm.ctx_FlushStdout(self.exec_opts):
                 ui.PrettyPrintValue(val, mylib.Stdout())
 
         return 0
@@ -1216,7 +1332,7 @@ class CommandEvaluator(object):
 
                 elif case(value_e.Range):
                     val = cast(value.Range, UP_val)
-                    it2 = val_ops.RangeIterator(val)
+                    it2 = val_ops.RangeIterator(val, self.mem.small_ints)
 
                     if n == 1:
                         name1 = location.LName(node.iter_names[0])
@@ -1254,7 +1370,8 @@ class CommandEvaluator(object):
                 if name2:
                     self.mem.SetLocalName(name2, it2.SecondValue())
                 if i_name:
-                    self.mem.SetLocalName(i_name, num.ToBig(it2.Index()))
+                    self.mem.SetLocalName(
+                        i_name, self.mem.small_ints.FromInt(it2.Index()))
 
                 # increment index before handling continue, etc.
                 it2.Next()
@@ -1315,11 +1432,11 @@ class CommandEvaluator(object):
                 node.name, node.name_tok)
         self.procs[node.name] = value.Proc(node.name, node.name_tok,
                                            proc_sig.Open, node.body, None,
-                                           True)
+                                           True, 0)
 
     def _DoProc(self, node):
         # type: (Proc) -> None
-        proc_name = lexer.TokenVal(node.name)
+        proc_name = lexer.InternedTokenVal(node.name)
         if proc_name in self.procs and not self.exec_opts.redefine_proc_func():
             e_die(
                 "Proc %s was already defined (redefine_proc_func)" % proc_name,
@@ -1333,11 +1450,12 @@ class CommandEvaluator(object):
 
         # no dynamic scope
         self.procs[proc_name] = value.Proc(proc_name, node.name, node.sig,
-                                           node.body, proc_defaults, False)
+                                           node.body, proc_defaults, False,
+                                           node.num_slots)
 
     def _DoFunc(self, node):
         # type: (Func) -> None
-        name = lexer.TokenVal(node.name)
+        name = lexer.InternedTokenVal(node.name)
         lval = location.LName(name)
 
         # Check that we haven't already defined a function
@@ -1379,12 +1497,130 @@ class CommandEvaluator(object):
         assert status != -1, 'Should have been initialized'
         return status
 
+    def _CaseDispatch(self, node):
+        # type: (command.Case) -> Optional[CaseDispatch]
+        """Return the dispatch table for a shell-style case, building it on the
+        first call.
+
+        Returns None if any arm has YSH patterns.
+        """
+        if node.dispatch:
+            return node.dispatch
+
+        for case_arm in node.arms:
+            if case_arm.pattern.tag() != pat_e.Words:
+                return None
+
+        literals = {}  # type: Dict[str, int]
+        slow_arms = []  # type: List[int]
+        arms = []  # type: List[CaseArmPats]
+        for i, case_arm in enumerate(node.arms):
+            pat_words = cast(pat.Words, case_arm.pattern)
+
+            pats = []  # type: List[Optional[str]]
+            is_slow = False
+            for pat_word in pat_words.words:
+                ok, s, _ = word_.StaticEval(pat_word)
+                if not ok:  # e.g. $x or $(echo x), evaluated every time
+                    pats.append(None)
+                    is_slow = True
+                    continue
+
+                word_val = self.word_ev.EvalWordToString(
+                    pat_word, word_eval.QUOTE_FNMATCH)
+                pats.append(word_val.s)
+
+                if glob_.LooksLikeGlob(word_val.s):
+                    is_slow = True
+                elif s not in literals:  # first match wins
+                    literals[s] = i
+
+            if is_slow:
+                slow_arms.append(i)
+            arms.append(CaseArmPats(pats))
+
+        node.dispatch = CaseDispatch(literals, slow_arms, arms)
+        return node.dispatch
+
+    def _CaseArmMatches(self, node, d, i, to_match, fnmatch_flags):
+        # type: (command.Case, CaseDispatch, int, str, int) -> bool
+        pat_words = cast(pat.Words, node.arms[i].pattern)
+        pats = d.arms[i].pats
+        for j, pat_word in enumerate(pat_words.words):
+            p = pats[j]
+            if p is None:
+                word_val = self.word_ev.EvalWordToString(
+                    pat_word, word_eval.QUOTE_FNMATCH)
+                p = word_val.s
+
+            if libc.fnmatch(p, to_match, fnmatch_flags):
+                return True  # Stop at first pattern
+        return False
+
+    def _CaseFirstMatch(self, node, d, start, to_match, fnmatch_flags):
+        # type: (command.Case, CaseDispatch, int, str, int) -> int
+        """Return the index of the first arm at or after 'start' that matches,
+        or the number of arms if none do."""
+        n = len(node.arms)
+
+        if start == 0 and fnmatch_flags == 0:
+            # Fast path: look up constant strings, and only try the arms with
+            # globs or dynamic words that come BEFORE the constant match.
+            # The matching arm itself is also tried if it has dynamic words,
+            # so they're evaluated just as often as in the slow path.
+            first = d.literals.get(to_match, n)
+            for i in d.slow_arms:
+                if i > first:
+                    break
+                if self._CaseArmMatches(node, d, i, to_match, fnmatch_flags):
+                    return i
+            return first
+
+        # nocasematch, or after ;;&
+        for i in xrange(start, n):
+            if self._CaseArmMatches(node, d, i, to_match, fnmatch_flags):
+                return i
+        return n
+
+    def _DoShellCase(self, node, d, to_match, fnmatch_flags):
+        # type: (command.Case, CaseDispatch, str, int) -> int
+        status = 0  # If there are no arms, it should be zero?
+
+        n = len(node.arms)
+        i = self._CaseFirstMatch(node, d, 0, to_match, fnmatch_flags)
+        while i < n:
+            case_arm = node.arms[i]
+            status = self._ExecuteList(case_arm.action)
+
+            if case_arm.right is None:
+                break
+            id_ = case_arm.right.id
+            if id_ == Id.Op_SemiAmp:
+                # very weird semantic: run the next action, IGNORING its
+                # condition
+                i += 1
+            elif id_ == Id.Op_DSemiAmp:
+                # Keep going until next pattern
+                i = self._CaseFirstMatch(node, d, i + 1, to_match,
+                                         fnmatch_flags)
+            else:
+                break
+
+        return status
+
     def _DoCase(self, node):
         # type: (command.Case) -> int
 
         to_match = self._EvalCaseArg(node.to_match, node.case_kw)
         fnmatch_flags = FNM_CASEFOLD if self.exec_opts.nocasematch() else 0
 
+        if to_match.tag() == value_e.Str:
+            d = self._CaseDispatch(node)
+            if d:
+                to_match_str = cast(value.Str, to_match)
+                return self._DoShellCase(node, d, to_match_str.s,
+                                         fnmatch_flags)
+
         status = 0  # If there are no arms, it should be zero?
 
         done = False  # Should we try the next arm?
@@ -1726,6 +1962,9 @@ class CommandEvaluator(object):
         # Manual GC point before every statement
         mylib.MaybeCollect()
 
+        if self.profiler.enabled:
+            self.profiler.OnCommand(node)
+
         # This has to go around redirect handling because the process sub could be
         # in the redirect word:
         #     { echo one; echo two; } > >(tac)
@@ -2040,6 +2279,23 @@ class CommandEvaluator(object):
 
         return status
 
+    def EvalLoopBlock(self, block):
+        # type: (command_t) -> int
+        """Like EvalCommand(), but break and continue are raised to the caller.
+
+        For builtins that loop, e.g. json read (&x) { echo $x }
+        The caller should be in ctx_LoopLevel.
+        """
+        status = 0
+        try:
+            status = self._Execute(block)
+        except vm.IntControlFlow as e:
+            if e.IsReturn():
+                status = e.StatusCode()
+            else:
+                raise
+        return status
+
     def MaybeRunExitTrap(self, mut_status):
         # type: (IntParamBox) -> None
         """If an EXIT trap handler exists, run it.
@@ -2128,20 +2384,21 @@ class CommandEvaluator(object):
 
             # Redirects still valid for functions.
             # Here doc causes a pipe and Process(SubProgramThunk).
-            try:
-                status = self._Execute(proc.body)
-            except vm.IntControlFlow as e:
-                if e.IsReturn():
-                    status = e.StatusCode()
-                else:
-                    # break/continue used in the wrong place.
-                    e_die(
-                        'Unexpected %r (in proc call)' %
-                        lexer.TokenVal(e.token), e.token)
-            except error.FatalRuntime as e:
-                # Dump the stack before unwinding it
-                self.dumper.MaybeRecord(self, e)
-                raise
+            with dev.ctx_Profile(self.profiler, proc.name):
+                try:
+                    status = self._Execute(proc.body)
+                except vm.IntControlFlow as e:
+                    if e.IsReturn():
+                        status = e.StatusCode()
+                    else:
+                        # break/continue used in the wrong place.
+                        e_die(
+                            'Unexpected %r (in proc call)' %
+                            lexer.TokenVal(e.token), e.token)
+                except error.FatalRuntime as e:
+                    # Dump the stack before unwinding it
+                    self.dumper.MaybeRecord(self, e)
+                    raise
 
         return status
 
@@ -77,5 +77,35 @@ class VarOpTest(unittest.TestCase):
         print(part_vals)
 
 
+class CaseDispatchTest(unittest.TestCase):
+
+    def testDispatchTable(self):
+        arena = test_lib.MakeArena('<cmd_eval_test.py>')
+        code_str = """case $x in
+  a|b) echo 1 ;;
+  c*|'d*') echo 2 ;;
+  $y|a|e) echo 3 ;;
+esac"""
+        c_parser = test_lib.InitCommandParser(code_str, arena=arena)
+        node = c_parser._ParseCommandLine()
+
+        cmd_ev = test_lib.InitCommandEvaluator(arena=arena)
+        d = cmd_ev._CaseDispatch(node)
+        self.assertEqual({'a': 0, 'b': 0, 'd*': 1, 'e': 2}, d.literals)
+        self.assertEqual([1, 2], d.slow_arms)
+        self.assertEqual(['c*', 'd\\*'], d.arms[1].pats)
+        self.assertEqual([None, 'a', 'e'], d.arms[2].pats)
+
+        # Built once
+        self.assertIs(d, cmd_ev._CaseDispatch(node))
+
+        self.assertEqual(0, cmd_ev._CaseFirstMatch(node, d, 0, 'a', 0))
+        self.assertEqual(1, cmd_ev._CaseFirstMatch(node, d, 0, 'cc', 0))
+        self.assertEqual(1, cmd_ev._CaseFirstMatch(node, d, 0, 'd*', 0))
+        self.assertEqual(3, cmd_ev._CaseFirstMatch(node, d, 0, 'dd', 0))
+        # After ;;&
+        self.assertEqual(2, cmd_ev._CaseFirstMatch(node, d, 1, 'a', 0))
+
+
 if __name__ == '__main__':
     unittest.main()
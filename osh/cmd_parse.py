@@ -68,6 +68,7 @@ from mycpp.mylib import log
 from osh import braces
 from osh import bool_parse
 from osh import word_
+from ysh import resolve
 
 from typing import Optional, List, Dict, Any, Tuple, cast, TYPE_CHECKING
 if TYPE_CHECKING:
@@ -217,16 +218,16 @@ def _MakeAssignPair(parse_ctx, preparsed, arena):
 
     if left_token.id == Id.Lit_VarLike:  # s=1
         if lexer.IsPlusEquals(left_token):
-            var_name = lexer.TokenSliceRight(left_token, -2)
+            var_name = lexer.InternedSliceRight(left_token, -2)
             op = assign_op_e.PlusEqual
         else:
-            var_name = lexer.TokenSliceRight(left_token, -1)
+            var_name = lexer.InternedSliceRight(left_token, -1)
             op = assign_op_e.Equal
 
         lhs = sh_lhs.Name(left_token, var_name)
 
     elif left_token.id == Id.Lit_ArrayLhsOpen and parse_ctx.do_lossless:
-        var_name = lexer.TokenSliceRight(left_token, -1)
+        var_name = lexer.InternedSliceRight(left_token, -1)
         if lexer.IsPlusEquals(close_token):
             op = assign_op_e.PlusEqual
         else:
@@ -240,7 +241,7 @@ def _MakeAssignPair(parse_ctx, preparsed, arena):
         lhs = sh_lhs.UnparsedIndex(left_token, var_name, index_str)
 
     elif left_token.id == Id.Lit_ArrayLhsOpen:  # a[x++]=1
-        var_name = lexer.TokenSliceRight(left_token, -1)
+        var_name = lexer.InternedSliceRight(left_token, -1)
         if lexer.IsPlusEquals(close_token):
             op = assign_op_e.PlusEqual
         else:
@@ -300,7 +301,7 @@ def _AppendMoreEnv(preparsed_list, more_env):
         if lexer.IsPlusEquals(left_token):
             p_die('Expected = in environment binding, got +=', left_token)
 
-        var_name = lexer.TokenSliceRight(left_token, -1)
+        var_name = lexer.InternedSliceRight(left_token, -1)
 
         parts = preparsed.w.parts
         n = len(parts)
@@ -1727,7 +1728,7 @@ class CommandParser(object):
         arms_end.id = Id.Lit_RBrace
 
         return command.Case(case_kw, to_match, arms_start, arms, arms_end,
-                            None)
+                            None, None)
 
     def ParseOldCase(self, case_kw):
         # type: (Token) -> command.Case
@@ -1779,7 +1780,7 @@ class CommandParser(object):
 
         # no redirects yet
         return command.Case(case_kw, to_match, arms_start, arms, arms_end,
-                            None)
+                            None, None)
 
     def ParseCase(self):
         # type: () -> command.Case
@@ -2179,6 +2180,7 @@ class CommandParser(object):
                 node.body = self.ParseBraceGroup()
                 # No redirects for YSH procs (only at call site)
 
+        resolve.ResolveProc(node)
         return node
 
     def ParseYshFunc(self):
@@ -2219,6 +2221,7 @@ class CommandParser(object):
             with ctx_CmdMode(self, cmd_mode_e.Func):
                 node.body = self.ParseBraceGroup()
 
+        resolve.ResolveFunc(node)
         return node
 
     def ParseCoproc(self):
@@ -2424,10 +2427,10 @@ class CommandParser(object):
                             self._SetNext()  # Somehow this is necessary
                             # TODO: Use BareDecl here.  Well, do that when we
                             # treat it as const or lazy.
-                            return command.VarDecl(
-                                None,
-                                [NameType(tok, lexer.TokenVal(tok), None)],
-                                enode)
+                            return command.VarDecl(None, [
+                                NameType(tok, lexer.InternedTokenVal(tok),
+                                         None, -1)
+                            ], enode)
                         else:
                             self._SetNext()
                             self._GetWord()
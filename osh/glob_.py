@@ -354,11 +354,17 @@ def _GenerateERE(parts):
     return ''.join(out)
 
 
-def GlobToERE(pat):
-    # type: (str) -> Tuple[str, List[str]]
+def GlobToParts(pat):
+    # type: (str) -> Tuple[List[glob_part_t], List[str]]
+    """Parse a glob pattern, returning the parts and a list of warnings."""
     lexer = match.GlobLexer(pat)
     p = _GlobParser(lexer)
-    parts, warnings = p.Parse()
+    return p.Parse()
+
+
+def GlobToERE(pat):
+    # type: (str) -> Tuple[str, List[str]]
+    parts, warnings = GlobToParts(pat)
 
     # Vestigial: if there is nothing like * ? or [abc], then the whole string is
     # a literal, and we could use a more efficient mechanism.
@@ -16,6 +16,7 @@ from _devbuild.gen.syntax_asdl import (
     word_t,
     CompoundWord,
     Token,
+    word_part_e,
     loc,
     loc_t,
     source,
@@ -45,6 +46,7 @@ from _devbuild.gen.value_asdl import (
     RegexMatch,
 )
 from core import alloc
+from core import bash_impl
 from core import error
 from core.error import e_die, e_die_status, e_strict, e_usage
 from core import num
@@ -138,19 +140,20 @@ def OldValue(lval, mem, exec_opts):
         elif case(sh_lvalue_e.Indexed):
             lval = cast(sh_lvalue.Indexed, UP_lval)
 
-            array_val = None  # type: value.BashArray
+            s = None  # type: Optional[str]
             with tagswitch(val) as case2:
                 if case2(value_e.Undef):
-                    array_val = value.BashArray([])
+                    pass
                 elif case2(value_e.BashArray):
-                    tmp = cast(value.BashArray, UP_val)
                     # mycpp rewrite: add tmp.  cast() creates a new var in inner scope
-                    array_val = tmp
+                    tmp = cast(value.BashArray, UP_val)
+                    s = word_eval.GetArrayItem(tmp.strs, lval.index)
+                elif case2(value_e.SparseArray):
+                    sparse_val = cast(value.SparseArray, UP_val)
+                    s = bash_impl.SparseArray_Get(sparse_val, lval.index)
                 else:
                     e_die("Can't use [] on value of type %s" % ui.ValType(val))
 
-            s = word_eval.GetArrayItem(array_val.strs, lval.index)
-
             if s is None:
                 val = value.Str('')  # NOTE: Other logic is value.Undef?  0?
             else:
@@ -231,16 +234,28 @@ class UnsafeArith(object):
                       location)
             return LeftName(s, location)
 
-        a_parser = self.parse_ctx.MakeArithParser(s)
-
-        with alloc.ctx_SourceCode(self.arena,
-                                  source.ArgvWord('dynamic LHS', location)):
-            try:
-                anode = a_parser.Parse()
-            except error.Parse as e:
-                self.errfmt.PrettyPrintError(e)
-                # Exception for builtins 'unset' and 'printf'
-                e_usage('got invalid LHS expression', location)
+        cache = self.parse_ctx.parse_cache
+        anode = None  # type: arith_expr_t
+        if cache is not None:
+            cache_key = cache.Key('l', s, location)
+            entry = cache.Get(cache_key, location)
+            if entry is not None:
+                anode = entry.anode
+
+        if anode is None:
+            a_parser = self.parse_ctx.MakeArithParser(s)
+
+            with alloc.ctx_SourceCode(self.arena,
+                                      source.ArgvWord('dynamic LHS', location)):
+                try:
+                    anode = a_parser.Parse()
+                except error.Parse as e:
+                    self.errfmt.PrettyPrintError(e)
+                    # Exception for builtins 'unset' and 'printf'
+                    e_usage('got invalid LHS expression', location)
+
+            if cache is not None:
+                cache.Put(cache_key, location).anode = anode
 
         # Note: we parse '1+2', and then it becomes a runtime error because
         # it's not a valid LHS.  Could be a parse error.
@@ -276,6 +291,13 @@ class UnsafeArith(object):
         _ResolveNameOrRef currently gives you a 'cell'.  So it might not support
         sh_lvalue.Indexed?
         """
+        cache = self.parse_ctx.parse_cache
+        if cache is not None:
+            cache_key = cache.Key('r', ref_str, blame_tok)
+            entry = cache.Get(cache_key, blame_tok)
+            if entry is not None:
+                return entry.bvs
+
         line_reader = reader.StringLineReader(ref_str, self.arena)
         lexer = self.parse_ctx.MakeLexer(line_reader)
         w_parser = self.parse_ctx.MakeWordParser(lexer, line_reader)
@@ -291,6 +313,8 @@ class UnsafeArith(object):
                 # this affects builtins 'unset' and 'printf'
                 e_die("Invalid var ref expression", blame_tok)
 
+        if cache is not None:
+            cache.Put(cache_key, blame_tok).bvs = bvs_part
         return bvs_part
 
 
@@ -319,6 +343,8 @@ class ArithEvaluator(object):
         self.parse_ctx = parse_ctx
         self.errfmt = errfmt
 
+        self.small_ints = mem.small_ints
+
     def CheckCircularDeps(self):
         # type: () -> None
         assert self.word_ev is not None
@@ -400,17 +426,29 @@ class ArithEvaluator(object):
                     return mops.ZERO
 
                 # For compatibility: Try to parse it as an expression and evaluate it.
-                a_parser = self.parse_ctx.MakeArithParser(s)
-
-                # TODO: Fill in the variable name
-                with alloc.ctx_SourceCode(arena,
-                                          source.Variable(None, blame_loc)):
-                    try:
-                        node2 = a_parser.Parse()  # may raise error.Parse
-                    except error.Parse as e:
-                        self.errfmt.PrettyPrintError(e)
-                        e_die('Parse error in recursive arithmetic',
-                              e.location)
+                cache = self.parse_ctx.parse_cache
+                node2 = None  # type: arith_expr_t
+                if cache is not None:
+                    cache_key = cache.Key('a', s, blame_loc)
+                    entry = cache.Get(cache_key, blame_loc)
+                    if entry is not None:
+                        node2 = entry.anode
+
+                if node2 is None:
+                    a_parser = self.parse_ctx.MakeArithParser(s)
+
+                    # TODO: Fill in the variable name
+                    with alloc.ctx_SourceCode(arena,
+                                              source.Variable(None, blame_loc)):
+                        try:
+                            node2 = a_parser.Parse()  # may raise error.Parse
+                        except error.Parse as e:
+                            self.errfmt.PrettyPrintError(e)
+                            e_die('Parse error in recursive arithmetic',
+                                  e.location)
+
+                    if cache is not None:
+                        cache.Put(cache_key, blame_loc).anode = node2
 
                 # Prevent infinite recursion of $(( 1x )) -- it's a word that evaluates
                 # to itself, and you don't want to reparse it as a word.
@@ -482,11 +520,12 @@ class ArithEvaluator(object):
         val = OldValue(lval, self.mem, self.exec_opts)
 
         # BASH_LINENO, arr (array name without strict_array), etc.
-        if (val.tag() in (value_e.BashArray, value_e.BashAssoc) and
+        if (val.tag() in (value_e.BashArray, value_e.SparseArray,
+                          value_e.BashAssoc) and
                 lval.tag() == sh_lvalue_e.Var):
             named_lval = cast(LeftName, lval)
             if word_eval.ShouldArrayDecay(named_lval.name, self.exec_opts):
-                if val.tag() == value_e.BashArray:
+                if val.tag() in (value_e.BashArray, value_e.SparseArray):
                     lval = sh_lvalue.Indexed(named_lval.name, 0, loc.Missing)
                 elif val.tag() == value_e.BashAssoc:
                     lval = sh_lvalue.Keyed(named_lval.name, '0', loc.Missing)
@@ -504,16 +543,281 @@ class ArithEvaluator(object):
         val = value.Str(mops.ToStr(new_int))
         state.OshLanguageSetValue(self.mem, lval, val)
 
+    def _EvalUnaryAssign(self, node):
+        # type: (arith_expr.UnaryAssign) -> mops.BigInt
+        op_id = node.op_id
+        old_big, lval = self._EvalLhsAndLookupArith(node.child)
+
+        if op_id == Id.Node_PostDPlus:  # post-increment
+            new_big = mops.Add(old_big, mops.ONE)
+            result = old_big
+
+        elif op_id == Id.Node_PostDMinus:  # post-decrement
+            new_big = mops.Sub(old_big, mops.ONE)
+            result = old_big
+
+        elif op_id == Id.Arith_DPlus:  # pre-increment
+            new_big = mops.Add(old_big, mops.ONE)
+            result = new_big
+
+        elif op_id == Id.Arith_DMinus:  # pre-decrement
+            new_big = mops.Sub(old_big, mops.ONE)
+            result = new_big
+
+        else:
+            raise AssertionError(op_id)
+
+        self._Store(lval, new_big)
+        return result
+
+    def _EvalBinaryAssign(self, node):
+        # type: (arith_expr.BinaryAssign) -> mops.BigInt
+        op_id = node.op_id
+
+        if op_id == Id.Arith_Equal:
+            # Don't really need a span ID here, because tdop.CheckLhsExpr should
+            # have done all the validation.
+            lval = self.EvalArithLhs(node.left)
+            rhs_big = self.EvalToBigInt(node.right)
+
+            self._Store(lval, rhs_big)
+            return rhs_big
+
+        old_big, lval = self._EvalLhsAndLookupArith(node.left)
+        rhs_big = self.EvalToBigInt(node.right)
+
+        if op_id == Id.Arith_PlusEqual:
+            new_big = mops.Add(old_big, rhs_big)
+        elif op_id == Id.Arith_MinusEqual:
+            new_big = mops.Sub(old_big, rhs_big)
+        elif op_id == Id.Arith_StarEqual:
+            new_big = mops.Mul(old_big, rhs_big)
+
+        elif op_id == Id.Arith_SlashEqual:
+            if mops.Equal(rhs_big, mops.ZERO):
+                e_die('Divide by zero')  # TODO: location
+            new_big = num.IntDivide(old_big, rhs_big)
+
+        elif op_id == Id.Arith_PercentEqual:
+            if mops.Equal(rhs_big, mops.ZERO):
+                e_die('Divide by zero')  # TODO: location
+            new_big = num.IntRemainder(old_big, rhs_big)
+
+        elif op_id == Id.Arith_DGreatEqual:
+            new_big = mops.RShift(old_big, rhs_big)
+        elif op_id == Id.Arith_DLessEqual:
+            new_big = mops.LShift(old_big, rhs_big)
+        elif op_id == Id.Arith_AmpEqual:
+            new_big = mops.BitAnd(old_big, rhs_big)
+        elif op_id == Id.Arith_PipeEqual:
+            new_big = mops.BitOr(old_big, rhs_big)
+        elif op_id == Id.Arith_CaretEqual:
+            new_big = mops.BitXor(old_big, rhs_big)
+        else:
+            raise AssertionError(op_id)  # shouldn't get here
+
+        self._Store(lval, new_big)
+        return new_big
+
+    def _EvalUnary(self, node):
+        # type: (arith_expr.Unary) -> mops.BigInt
+        op_id = node.op_id
+
+        i = self.EvalToBigInt(node.child)
+
+        if op_id == Id.Node_UnaryPlus:  # +i
+            result = i
+        elif op_id == Id.Node_UnaryMinus:  # -i
+            result = mops.Sub(mops.ZERO, i)
+
+        elif op_id == Id.Arith_Bang:  # logical negation
+            if mops.Equal(i, mops.ZERO):
+                result = mops.ONE
+            else:
+                result = mops.ZERO
+        elif op_id == Id.Arith_Tilde:  # bitwise complement
+            result = mops.BitNot(i)
+        else:
+            raise AssertionError(op_id)  # shouldn't get here
+
+        return result
+
+    def _EvalBinary(self, node):
+        # type: (arith_expr.Binary) -> mops.BigInt
+        """All binary operators except a[i]"""
+        op_id = node.op.id
+
+        # Short-circuit evaluation for || and &&.
+        if op_id == Id.Arith_DPipe:
+            lhs_big = self.EvalToBigInt(node.left)
+            if mops.Equal(lhs_big, mops.ZERO):
+                rhs_big = self.EvalToBigInt(node.right)
+                if mops.Equal(rhs_big, mops.ZERO):
+                    result = mops.ZERO  # false
+                else:
+                    result = mops.ONE  # true
+            else:
+                result = mops.ONE  # true
+            return result
+
+        if op_id == Id.Arith_DAmp:
+            lhs_big = self.EvalToBigInt(node.left)
+            if mops.Equal(lhs_big, mops.ZERO):
+                result = mops.ZERO  # false
+            else:
+                rhs_big = self.EvalToBigInt(node.right)
+                if mops.Equal(rhs_big, mops.ZERO):
+                    result = mops.ZERO  # false
+                else:
+                    result = mops.ONE  # true
+            return result
+
+        if op_id == Id.Arith_Comma:
+            self.EvalToBigInt(node.left)  # throw away result
+            result = self.EvalToBigInt(node.right)
+            return result
+
+        # Rest are integers
+        lhs_big = self.EvalToBigInt(node.left)
+        rhs_big = self.EvalToBigInt(node.right)
+
+        if op_id == Id.Arith_Plus:
+            result = mops.Add(lhs_big, rhs_big)
+        elif op_id == Id.Arith_Minus:
+            result = mops.Sub(lhs_big, rhs_big)
+        elif op_id == Id.Arith_Star:
+            result = mops.Mul(lhs_big, rhs_big)
+        elif op_id == Id.Arith_Slash:
+            if mops.Equal(rhs_big, mops.ZERO):
+                e_die('Divide by zero', node.op)
+            result = num.IntDivide(lhs_big, rhs_big)
+
+        elif op_id == Id.Arith_Percent:
+            if mops.Equal(rhs_big, mops.ZERO):
+                e_die('Divide by zero', node.op)
+            result = num.IntRemainder(lhs_big, rhs_big)
+
+        elif op_id == Id.Arith_DStar:
+            if mops.Greater(mops.ZERO, rhs_big):
+                e_die("Exponent can't be a negative number",
+                      loc.Arith(node.right))
+            result = num.Exponent(lhs_big, rhs_big)
+
+        elif op_id == Id.Arith_DEqual:
+            result = mops.FromBool(mops.Equal(lhs_big, rhs_big))
+        elif op_id == Id.Arith_NEqual:
+            result = mops.FromBool(not mops.Equal(lhs_big, rhs_big))
+        elif op_id == Id.Arith_Great:
+            result = mops.FromBool(mops.Greater(lhs_big, rhs_big))
+        elif op_id == Id.Arith_GreatEqual:
+            result = mops.FromBool(
+                mops.Greater(lhs_big, rhs_big) or
+                mops.Equal(lhs_big, rhs_big))
+        elif op_id == Id.Arith_Less:
+            result = mops.FromBool(mops.Greater(rhs_big, lhs_big))
+        elif op_id == Id.Arith_LessEqual:
+            result = mops.FromBool(
+                mops.Greater(rhs_big, lhs_big) or
+                mops.Equal(lhs_big, rhs_big))
+
+        elif op_id == Id.Arith_Pipe:
+            result = mops.BitOr(lhs_big, rhs_big)
+        elif op_id == Id.Arith_Amp:
+            result = mops.BitAnd(lhs_big, rhs_big)
+        elif op_id == Id.Arith_Caret:
+            result = mops.BitXor(lhs_big, rhs_big)
+
+        # Note: how to define shift of negative numbers?
+        elif op_id == Id.Arith_DLess:
+            result = mops.LShift(lhs_big, rhs_big)
+        elif op_id == Id.Arith_DGreat:
+            result = mops.RShift(lhs_big, rhs_big)
+        else:
+            raise AssertionError(op_id)
+
+        return result
+
+    def _EvalIndex(self, node):
+        # type: (arith_expr.Binary) -> value_t
+        """a[i] and A['key']"""
+        # NOTE: Similar to bracket_op_e.ArrayIndex in osh/word_eval.py
+
+        left = self.Eval(node.left)
+        UP_left = left
+        with tagswitch(left) as case:
+            if case(value_e.BashArray):
+                array_val = cast(value.BashArray, UP_left)
+                index = mops.BigTruncate(self.EvalToBigInt(node.right))
+                s = word_eval.GetArrayItem(array_val.strs, index)
+
+            elif case(value_e.SparseArray):
+                sparse_val = cast(value.SparseArray, UP_left)
+                index = mops.BigTruncate(self.EvalToBigInt(node.right))
+                s = bash_impl.SparseArray_Get(sparse_val, index)
+
+            elif case(value_e.BashAssoc):
+                left = cast(value.BashAssoc, UP_left)
+                key = self.EvalWordToString(node.right)
+                s = left.d.get(key)
+
+            else:
+                # TODO: Add error context
+                e_die('Expected array or assoc in index expression, got %s' %
+                      ui.ValType(left))
+
+        if s is None:
+            return value.Undef
+        return value.Str(s)
+
     def EvalToBigInt(self, node):
         # type: (arith_expr_t) -> mops.BigInt
         """Used externally by ${a[i+1]} and ${a:start:len}.
 
         Also used internally.
         """
+        # Fast path: operators and integer literals are evaluated without
+        # boxing intermediate results in value.Int
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(arith_expr_e.UnaryAssign):
+                node = cast(arith_expr.UnaryAssign, UP_node)
+                return self._EvalUnaryAssign(node)
+
+            elif case(arith_expr_e.BinaryAssign):
+                node = cast(arith_expr.BinaryAssign, UP_node)
+                return self._EvalBinaryAssign(node)
+
+            elif case(arith_expr_e.Unary):
+                node = cast(arith_expr.Unary, UP_node)
+                return self._EvalUnary(node)
+
+            elif case(arith_expr_e.Binary):
+                node = cast(arith_expr.Binary, UP_node)
+                if node.op.id != Id.Arith_LBracket:
+                    return self._EvalBinary(node)
+
+            elif case(arith_expr_e.Word):
+                w = cast(CompoundWord, UP_node)
+                # 42, but not 0x2a, 052, or 8#52.  Those go through
+                # _StringToBigInt().
+                if len(w.parts) == 1:
+                    part0 = w.parts[0]
+                    if part0.tag() == word_part_e.Literal:
+                        tok = cast(Token, part0)
+                        if tok.id == Id.Lit_Digits:
+                            digits = lexer.TokenVal(tok)
+                            if len(digits) == 1 or digits[0] != '0':
+                                try:
+                                    return mops.FromStr(digits)
+                                except ValueError:
+                                    pass  # overflow is handled below
+
+        node = UP_node
         val = self.Eval(node)
 
         # BASH_LINENO, arr (array name without strict_array), etc.
-        if (val.tag() in (value_e.BashArray, value_e.BashAssoc) and
+        if (val.tag() in (value_e.BashArray, value_e.SparseArray,
+                          value_e.BashAssoc) and
                 node.tag() == arith_expr_e.VarSub):
             vsub = cast(Token, node)
             if word_eval.ShouldArrayDecay(lexer.LazyStr(vsub), self.exec_opts):
@@ -559,227 +863,21 @@ class ArithEvaluator(object):
 
             elif case(arith_expr_e.UnaryAssign):  # a++
                 node = cast(arith_expr.UnaryAssign, UP_node)
-
-                op_id = node.op_id
-                old_big, lval = self._EvalLhsAndLookupArith(node.child)
-
-                if op_id == Id.Node_PostDPlus:  # post-increment
-                    new_big = mops.Add(old_big, mops.ONE)
-                    result = old_big
-
-                elif op_id == Id.Node_PostDMinus:  # post-decrement
-                    new_big = mops.Sub(old_big, mops.ONE)
-                    result = old_big
-
-                elif op_id == Id.Arith_DPlus:  # pre-increment
-                    new_big = mops.Add(old_big, mops.ONE)
-                    result = new_big
-
-                elif op_id == Id.Arith_DMinus:  # pre-decrement
-                    new_big = mops.Sub(old_big, mops.ONE)
-                    result = new_big
-
-                else:
-                    raise AssertionError(op_id)
-
-                self._Store(lval, new_big)
-                return value.Int(result)
+                return self.small_ints.Int(self._EvalUnaryAssign(node))
 
             elif case(arith_expr_e.BinaryAssign):  # a=1, a+=5, a[1]+=5
                 node = cast(arith_expr.BinaryAssign, UP_node)
-                op_id = node.op_id
-
-                if op_id == Id.Arith_Equal:
-                    # Don't really need a span ID here, because tdop.CheckLhsExpr should
-                    # have done all the validation.
-                    lval = self.EvalArithLhs(node.left)
-                    rhs_big = self.EvalToBigInt(node.right)
-
-                    self._Store(lval, rhs_big)
-                    return value.Int(rhs_big)
-
-                old_big, lval = self._EvalLhsAndLookupArith(node.left)
-                rhs_big = self.EvalToBigInt(node.right)
-
-                if op_id == Id.Arith_PlusEqual:
-                    new_big = mops.Add(old_big, rhs_big)
-                elif op_id == Id.Arith_MinusEqual:
-                    new_big = mops.Sub(old_big, rhs_big)
-                elif op_id == Id.Arith_StarEqual:
-                    new_big = mops.Mul(old_big, rhs_big)
-
-                elif op_id == Id.Arith_SlashEqual:
-                    if mops.Equal(rhs_big, mops.ZERO):
-                        e_die('Divide by zero')  # TODO: location
-                    new_big = num.IntDivide(old_big, rhs_big)
-
-                elif op_id == Id.Arith_PercentEqual:
-                    if mops.Equal(rhs_big, mops.ZERO):
-                        e_die('Divide by zero')  # TODO: location
-                    new_big = num.IntRemainder(old_big, rhs_big)
-
-                elif op_id == Id.Arith_DGreatEqual:
-                    new_big = mops.RShift(old_big, rhs_big)
-                elif op_id == Id.Arith_DLessEqual:
-                    new_big = mops.LShift(old_big, rhs_big)
-                elif op_id == Id.Arith_AmpEqual:
-                    new_big = mops.BitAnd(old_big, rhs_big)
-                elif op_id == Id.Arith_PipeEqual:
-                    new_big = mops.BitOr(old_big, rhs_big)
-                elif op_id == Id.Arith_CaretEqual:
-                    new_big = mops.BitXor(old_big, rhs_big)
-                else:
-                    raise AssertionError(op_id)  # shouldn't get here
-
-                self._Store(lval, new_big)
-                return value.Int(new_big)
+                return self.small_ints.Int(self._EvalBinaryAssign(node))
 
             elif case(arith_expr_e.Unary):
                 node = cast(arith_expr.Unary, UP_node)
-                op_id = node.op_id
-
-                i = self.EvalToBigInt(node.child)
-
-                if op_id == Id.Node_UnaryPlus:  # +i
-                    result = i
-                elif op_id == Id.Node_UnaryMinus:  # -i
-                    result = mops.Sub(mops.ZERO, i)
-
-                elif op_id == Id.Arith_Bang:  # logical negation
-                    if mops.Equal(i, mops.ZERO):
-                        result = mops.ONE
-                    else:
-                        result = mops.ZERO
-                elif op_id == Id.Arith_Tilde:  # bitwise complement
-                    result = mops.BitNot(i)
-                else:
-                    raise AssertionError(op_id)  # shouldn't get here
-
-                return value.Int(result)
+                return self.small_ints.Int(self._EvalUnary(node))
 
             elif case(arith_expr_e.Binary):
                 node = cast(arith_expr.Binary, UP_node)
-                op_id = node.op.id
-
-                # Short-circuit evaluation for || and &&.
-                if op_id == Id.Arith_DPipe:
-                    lhs_big = self.EvalToBigInt(node.left)
-                    if mops.Equal(lhs_big, mops.ZERO):
-                        rhs_big = self.EvalToBigInt(node.right)
-                        if mops.Equal(rhs_big, mops.ZERO):
-                            result = mops.ZERO  # false
-                        else:
-                            result = mops.ONE  # true
-                    else:
-                        result = mops.ONE  # true
-                    return value.Int(result)
-
-                if op_id == Id.Arith_DAmp:
-                    lhs_big = self.EvalToBigInt(node.left)
-                    if mops.Equal(lhs_big, mops.ZERO):
-                        result = mops.ZERO  # false
-                    else:
-                        rhs_big = self.EvalToBigInt(node.right)
-                        if mops.Equal(rhs_big, mops.ZERO):
-                            result = mops.ZERO  # false
-                        else:
-                            result = mops.ONE  # true
-                    return value.Int(result)
-
-                if op_id == Id.Arith_LBracket:
-                    # NOTE: Similar to bracket_op_e.ArrayIndex in osh/word_eval.py
-
-                    left = self.Eval(node.left)
-                    UP_left = left
-                    with tagswitch(left) as case:
-                        if case(value_e.BashArray):
-                            array_val = cast(value.BashArray, UP_left)
-                            index = mops.BigTruncate(
-                                self.EvalToBigInt(node.right))
-                            s = word_eval.GetArrayItem(array_val.strs, index)
-
-                        elif case(value_e.BashAssoc):
-                            left = cast(value.BashAssoc, UP_left)
-                            key = self.EvalWordToString(node.right)
-                            s = left.d.get(key)
-
-                        else:
-                            # TODO: Add error context
-                            e_die(
-                                'Expected array or assoc in index expression, got %s'
-                                % ui.ValType(left))
-
-                    if s is None:
-                        val = value.Undef
-                    else:
-                        val = value.Str(s)
-
-                    return val
-
-                if op_id == Id.Arith_Comma:
-                    self.EvalToBigInt(node.left)  # throw away result
-                    result = self.EvalToBigInt(node.right)
-                    return value.Int(result)
-
-                # Rest are integers
-                lhs_big = self.EvalToBigInt(node.left)
-                rhs_big = self.EvalToBigInt(node.right)
-
-                if op_id == Id.Arith_Plus:
-                    result = mops.Add(lhs_big, rhs_big)
-                elif op_id == Id.Arith_Minus:
-                    result = mops.Sub(lhs_big, rhs_big)
-                elif op_id == Id.Arith_Star:
-                    result = mops.Mul(lhs_big, rhs_big)
-                elif op_id == Id.Arith_Slash:
-                    if mops.Equal(rhs_big, mops.ZERO):
-                        e_die('Divide by zero', node.op)
-                    result = num.IntDivide(lhs_big, rhs_big)
-
-                elif op_id == Id.Arith_Percent:
-                    if mops.Equal(rhs_big, mops.ZERO):
-                        e_die('Divide by zero', node.op)
-                    result = num.IntRemainder(lhs_big, rhs_big)
-
-                elif op_id == Id.Arith_DStar:
-                    if mops.Greater(mops.ZERO, rhs_big):
-                        e_die("Exponent can't be a negative number",
-                              loc.Arith(node.right))
-                    result = num.Exponent(lhs_big, rhs_big)
-
-                elif op_id == Id.Arith_DEqual:
-                    result = mops.FromBool(mops.Equal(lhs_big, rhs_big))
-                elif op_id == Id.Arith_NEqual:
-                    result = mops.FromBool(not mops.Equal(lhs_big, rhs_big))
-                elif op_id == Id.Arith_Great:
-                    result = mops.FromBool(mops.Greater(lhs_big, rhs_big))
-                elif op_id == Id.Arith_GreatEqual:
-                    result = mops.FromBool(
-                        mops.Greater(lhs_big, rhs_big) or
-                        mops.Equal(lhs_big, rhs_big))
-                elif op_id == Id.Arith_Less:
-                    result = mops.FromBool(mops.Greater(rhs_big, lhs_big))
-                elif op_id == Id.Arith_LessEqual:
-                    result = mops.FromBool(
-                        mops.Greater(rhs_big, lhs_big) or
-                        mops.Equal(lhs_big, rhs_big))
-
-                elif op_id == Id.Arith_Pipe:
-                    result = mops.BitOr(lhs_big, rhs_big)
-                elif op_id == Id.Arith_Amp:
-                    result = mops.BitAnd(lhs_big, rhs_big)
-                elif op_id == Id.Arith_Caret:
-                    result = mops.BitXor(lhs_big, rhs_big)
-
-                # Note: how to define shift of negative numbers?
-                elif op_id == Id.Arith_DLess:
-                    result = mops.LShift(lhs_big, rhs_big)
-                elif op_id == Id.Arith_DGreat:
-                    result = mops.RShift(lhs_big, rhs_big)
-                else:
-                    raise AssertionError(op_id)
-
-                return value.Int(result)
+                if node.op.id == Id.Arith_LBracket:
+                    return self._EvalIndex(node)
+                return self.small_ints.Int(self._EvalBinary(node))
 
             elif case(arith_expr_e.TernaryOp):
                 node = cast(arith_expr.TernaryOp, UP_node)
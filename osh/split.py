@@ -182,6 +182,12 @@ class SplitContext(object):
         Also used by the explicit shSplit() function.
         """
         sp = self._GetSplitter(ifs=ifs)
+
+        if sp.whitespace_only:
+            parts = sp.SplitWhitespace(s)
+            if parts is not None:
+                return parts
+
         spans = sp.Split(s, True)
         if 0:
             for span in spans:
@@ -221,6 +227,55 @@ class IfsSplitter(_BaseSplitter):
         self.ifs_whitespace = ifs_whitespace
         self.ifs_other = ifs_other
 
+        # Classify each byte once, rather than searching the IFS strings for
+        # every byte of every word.  When escapes aren't allowed, Split()
+        # treats Backslash as Black.
+        self.char_kinds = [char_kind_i.Black] * 256  # type: List[int]
+        self.char_kinds[ord('\\')] = char_kind_i.Backslash
+        for c in ifs_other:
+            self.char_kinds[ord(c)] = char_kind_i.DE_Gray
+        for c in ifs_whitespace:
+            self.char_kinds[ord(c)] = char_kind_i.DE_White
+
+        # True for the default IFS, and IFS=$'\n'
+        self.whitespace_only = len(ifs_other) == 0
+
+    def SplitWhitespace(self, s):
+        # type: (str) -> Optional[List[str]]
+        """Fast path for SplitForWordEval(), when IFS is only whitespace.
+
+        Fields are then runs of non-IFS bytes, so we slice them in one pass,
+        without the state machine or spans.
+
+        Returns None if s has a backslash, which Split() handles.
+        """
+        assert self.whitespace_only
+
+        char_kinds = self.char_kinds
+        n = len(s)
+        parts = []  # type: List[str]
+
+        i = 0
+        while i < n:
+            # Skip IFS whitespace
+            while i < n and char_kinds[mylib.ByteAt(s,
+                                                    i)] == char_kind_i.DE_White:
+                i += 1
+            if i == n:
+                break
+
+            start = i
+            while i < n:
+                kind = char_kinds[mylib.ByteAt(s, i)]
+                if kind == char_kind_i.DE_White:
+                    break
+                if kind == char_kind_i.Backslash:
+                    return None
+                i += 1
+            parts.append(s[start:i])
+
+        return parts
+
     def Split(self, s, allow_escape):
         # type: (str, bool) -> List[Span]
         """
@@ -234,8 +289,7 @@ class IfsSplitter(_BaseSplitter):
     TODO: This should be (frag, do_split) pairs, to avoid IFS='\'
     double-escaping issue.
     """
-        ws_chars = self.ifs_whitespace
-        other_chars = self.ifs_other
+        char_kinds = self.char_kinds
 
         n = len(s)
         # NOTE: in C, could reserve() this to len(s)
@@ -249,7 +303,8 @@ class IfsSplitter(_BaseSplitter):
         # This can't really be handled by the state machine.
 
         i = 0
-        while i < n and mylib.ByteInSet(mylib.ByteAt(s, i), ws_chars):
+        while i < n and char_kinds[mylib.ByteAt(s,
+                                                i)] == char_kind_i.DE_White:
             i += 1
 
         # Append an ignored span.
@@ -266,13 +321,8 @@ class IfsSplitter(_BaseSplitter):
             if i < n:
                 byte = mylib.ByteAt(s, i)
 
-                if mylib.ByteInSet(byte, ws_chars):
-                    ch = char_kind_i.DE_White
-                elif mylib.ByteInSet(byte, other_chars):
-                    ch = char_kind_i.DE_Gray
-                elif allow_escape and mylib.ByteEquals(byte, '\\'):
-                    ch = char_kind_i.Backslash
-                else:
+                ch = char_kinds[byte]
+                if ch == char_kind_i.Backslash and not allow_escape:
                     ch = char_kind_i.Black
 
             elif i == n:
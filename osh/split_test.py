@@ -25,6 +25,12 @@ def _RunSplitCases(test, sp, cases):
         test.assertEqual(expected_parts, parts,
                          '%r: %s != %s' % (s, expected_parts, parts))
 
+        # The fast path agrees, or defers to Split()
+        if allow_escape and sp.whitespace_only:
+            fast_parts = sp.SplitWhitespace(s)
+            if fast_parts is not None:
+                test.assertEqual(expected_parts, fast_parts)
+
 
 class SplitTest(unittest.TestCase):
 
@@ -159,6 +165,36 @@ class SplitTest(unittest.TestCase):
         sp = split.IfsSplitter('', '_-')
         _RunSplitCases(self, sp, CASES)
 
+    def testSplitWhitespace(self):
+        sp = split.IfsSplitter(split.DEFAULT_IFS, '')
+        self.assertEqual(True, sp.whitespace_only)
+
+        self.assertEqual([], sp.SplitWhitespace(''))
+        self.assertEqual([], sp.SplitWhitespace(' \n\t '))
+        self.assertEqual(['a', 'bc', 'd'], sp.SplitWhitespace(' a\tbc\n\nd'))
+        self.assertEqual(['*', 'x=1'], sp.SplitWhitespace('* x=1 '))
+
+        # Backslashes are escapes, so they need the state machine
+        self.assertEqual(None, sp.SplitWhitespace(r'a\ b'))
+
+        # IFS=''
+        sp = split.IfsSplitter('', '')
+        self.assertEqual(['a b'], sp.SplitWhitespace('a b'))
+        self.assertEqual([], sp.SplitWhitespace(''))
+
+        sp = split.IfsSplitter(' ', '_')
+        self.assertEqual(False, sp.whitespace_only)
+
+    def testBackslashInIfs(self):
+        CASES = [
+            (['a', 'b'], r'a\b', True),
+            (['a', 'b'], r'a\b', False),
+        ]
+
+        # IFS='\'
+        sp = split.IfsSplitter('', '\\')
+        _RunSplitCases(self, sp, CASES)
+
 
 if __name__ == '__main__':
     unittest.main()
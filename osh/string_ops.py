@@ -13,17 +13,19 @@ YSH:
 """
 
 from _devbuild.gen.id_kind_asdl import Id
-from _devbuild.gen.syntax_asdl import loc, Token, suffix_op
+from _devbuild.gen.syntax_asdl import (loc, Token, suffix_op, glob_part,
+                                       glob_part_e, glob_part_t)
 from core import pyutil
 from core import ui
 from core import error
 from core.error import e_die, e_strict
-from mycpp.mylib import log
+from mycpp import mylib
+from mycpp.mylib import log, tagswitch
 from osh import glob_
 
 import libc
 
-from typing import List, Tuple
+from typing import List, Tuple, cast
 
 _ = log
 
@@ -349,9 +351,10 @@ def EndsWithWhitespaceByteRange(s):
 # (2) Strip -- % %% # ## -
 #
 # a. Fast path for constant strings.
-# b. Convert to POSIX extended regex, to see if it matches at ALL.  If it
-# doesn't match, short circuit out?  We can't do this with fnmatch.
-# c. If it does match, call fnmatch() iteratively over prefixes / suffixes.
+# b. Parse the glob like GlobToERE() does, and run it over the string in one
+# pass with _GlobMatcher.  (A POSIX regex finds the leftmost-longest match, so
+# it can't find the shortest prefix or suffix.)
+# c. For extended globs, call fnmatch() iteratively over prefixes / suffixes.
 #
 # - # shortest prefix - [:1], [:2], [:3] until it matches
 # - ## longest prefix - [:-1] [:-2], [:3].  Works because fnmatch does not
@@ -367,6 +370,212 @@ def EndsWithWhitespaceByteRange(s):
 #   then the result back at the end.
 # - Compile time errors for [[:space:]] ?
 
+# The kinds of _GlobMatcher items
+_GLOB_CHAR = 0  # a literal character
+_GLOB_ANY = 1  # ?
+_GLOB_STAR = 2  # *
+_GLOB_CLASS = 3  # [a-z], matched with fnmatch()
+
+
+class _GlobMatcher(object):
+    """Finds the shortest or longest prefix or suffix of a string that matches
+    a glob, in a single pass.
+
+    The glob is a sequence of items, and the states are positions in that
+    sequence, like an NFA.  We step through the string one character at a time,
+    so matching takes O(len(s) * len(pat)) time, without slicing the string
+    for every prefix like the fnmatch() loop.
+
+    Suffixes are matched by running the reversed glob backward.
+    """
+
+    def __init__(self, parts, backward):
+        # type: (List[glob_part_t], bool) -> None
+        self.backward = backward
+        self.kinds = []  # type: List[int]
+        self.strs = []  # type: List[str]  # char for _GLOB_CHAR, etc.
+
+        # The lexer may split a multi-byte character into several literals
+        lits = []  # type: List[str]
+        for part in parts:
+            UP_part = part
+            if part.tag() != glob_part_e.Literal:
+                self._AddChars(''.join(lits))
+                del lits[:]
+
+            with tagswitch(part) as case:
+                if case(glob_part_e.Literal):
+                    part = cast(glob_part.Literal, UP_part)
+                    if part.id == Id.Glob_EscapedChar:
+                        lits.append(part.s[1:])
+                    elif part.id == Id.Glob_BadBackslash:
+                        lits.append('\\')
+                    else:
+                        lits.append(part.s)
+
+                elif case(glob_part_e.Operator):
+                    part = cast(glob_part.Operator, UP_part)
+                    if part.op_id == Id.Glob_QMark:
+                        self._Add(_GLOB_ANY, '')
+                    elif (len(self.kinds) == 0 or
+                          self.kinds[-1] != _GLOB_STAR):  # ** is *
+                        self._Add(_GLOB_STAR, '')
+
+                elif case(glob_part_e.CharClass):
+                    part = cast(glob_part.CharClass, UP_part)
+                    # The class is preserved literally, so fnmatch() gives the
+                    # same answer as it does for the whole pattern
+                    neg = '!' if part.negated else ''
+                    self._Add(_GLOB_CLASS,
+                              '[%s%s]' % (neg, ''.join(part.strs)))
+
+        self._AddChars(''.join(lits))
+
+        if backward:
+            self.kinds.reverse()
+            self.strs.reverse()
+
+        n = len(self.kinds) + 1
+        self.cur = [False] * n
+        self.next = [False] * n
+
+    def _Add(self, kind, s):
+        # type: (int, str) -> None
+        self.kinds.append(kind)
+        self.strs.append(s)
+
+    def _AddChars(self, lit):
+        # type: (str) -> None
+        n = len(lit)
+        i = 0
+        while i < n:
+            try:
+                end = NextUtf8Char(lit, i)
+            except error.Strict:
+                end = i + 1  # a byte that's not UTF-8 never matches
+            self._Add(_GLOB_CHAR, lit[i:end])
+            i = end
+
+    def _Close(self, states):
+        # type: (List[bool]) -> None
+        """* matches the empty string, so you can skip it."""
+        for k in xrange(len(self.kinds)):
+            if states[k] and self.kinds[k] == _GLOB_STAR:
+                states[k + 1] = True
+
+    def _Step(self, s, start, end):
+        # type: (str, int, int) -> bool
+        """Consume the character s[start:end].
+
+        Returns whether any state is still alive.
+        """
+        num_items = len(self.kinds)
+        for k in xrange(num_items + 1):
+            self.next[k] = False
+
+        ch = ''  # only sliced for char classes
+        alive = False
+        for k in xrange(num_items):
+            if not self.cur[k]:
+                continue
+
+            kind = self.kinds[k]
+            if kind == _GLOB_STAR:
+                self.next[k] = True
+                alive = True
+
+            elif kind == _GLOB_ANY:
+                self.next[k + 1] = True
+                alive = True
+
+            elif kind == _GLOB_CHAR:
+                lit = self.strs[k]
+                if len(lit) == end - start:
+                    j = 0
+                    while j < len(lit):
+                        if mylib.ByteAt(s, start + j) != mylib.ByteAt(lit, j):
+                            break
+                        j += 1
+                    if j == len(lit):
+                        self.next[k + 1] = True
+                        alive = True
+
+            else:  # _GLOB_CLASS
+                if len(ch) == 0:
+                    ch = s[start:end]
+                if libc.fnmatch(self.strs[k], ch):
+                    self.next[k + 1] = True
+                    alive = True
+
+        tmp = self.cur
+        self.cur = self.next
+        self.next = tmp
+        self._Close(self.cur)
+        return alive
+
+    def Match(self, s, longest):
+        # type: (str, bool) -> int
+        """Match a prefix of s, or a suffix if the matcher is backward.
+
+        Returns the end of the prefix or the start of the suffix, or -1 if
+        nothing matches.
+        """
+        num_items = len(self.kinds)
+        for k in xrange(num_items + 1):
+            self.cur[k] = False
+        self.cur[0] = True
+        self._Close(self.cur)
+
+        n = len(s)
+        pos = n if self.backward else 0
+        result = -1
+        while True:
+            if self.cur[num_items]:
+                result = pos
+                if not longest:
+                    break
+
+            if self.backward:
+                if pos == 0:
+                    break
+                start = PreviousUtf8Char(s, pos)
+                end = pos
+            else:
+                if pos == n:
+                    break
+                start = pos
+                end = NextUtf8Char(s, pos)
+
+            if not self._Step(s, start, end):
+                break  # nothing longer can match
+
+            pos = start if self.backward else end
+
+        return result
+
+
+def _CanSimulateGlob(arg, parts, warnings):
+    # type: (str, List[glob_part_t], List[str]) -> bool
+    """Can _GlobMatcher give the same answer as fnmatch()?"""
+
+    # libc.fnmatch() sets FNM_EXTMATCH, even if we didn't detect an extended
+    # glob statically, e.g. pat='@(a|b)'; echo ${x#$pat}
+    if '(' in arg:
+        return False
+
+    # The glob parser treats malformed brackets like [[] as literals, but
+    # fnmatch() may parse them as a char class
+    if len(warnings):
+        return False
+
+    # The glob parser doesn't treat []] and [!]] like fnmatch() does
+    for part in parts:
+        if part.tag() == glob_part_e.CharClass:
+            cc = cast(glob_part.CharClass, part)
+            if len(cc.strs) == 0:
+                return False
+    return True
+
 
 def DoUnarySuffixOp(s, op_tok, arg, is_extglob):
     # type: (str, Token, str, bool) -> str
@@ -427,15 +636,20 @@ def DoUnarySuffixOp(s, op_tok, arg, is_extglob):
         else:  # e.g. ^ ^^ , ,,
             raise AssertionError(id_)
 
-    # For patterns, do fnmatch() in a loop.
-    #
-    # TODO:
-    # - Another potential fast path:
-    #   v=aabbccdd
-    #   echo ${v#*b}  # strip shortest prefix
-    #
-    # If the whole thing doesn't match '*b*', then no test can succeed.  So we
-    # can fail early.  Conversely echo ${v%%c*} and '*c*'.
+    if not is_extglob and id_ in (Id.VOp1_Pound, Id.VOp1_DPound,
+                                  Id.VOp1_Percent, Id.VOp1_DPercent):
+        parts, warnings = glob_.GlobToParts(arg)
+        if _CanSimulateGlob(arg, parts, warnings):
+            if id_ in (Id.VOp1_Pound, Id.VOp1_DPound):  # prefix
+                m = _GlobMatcher(parts, False)
+                i = m.Match(s, id_ == Id.VOp1_DPound)
+                return s if i == -1 else s[i:]
+            else:  # suffix
+                m = _GlobMatcher(parts, True)
+                i = m.Match(s, id_ == Id.VOp1_DPercent)
+                return s if i == -1 else s[:i]
+
+    # Otherwise do fnmatch() in a loop.
     #
     # (Although honestly this whole construct is nuts and should be deprecated.)
 
@@ -6,9 +6,13 @@ from __future__ import print_function
 
 import unittest
 
+from _devbuild.gen.id_kind_asdl import Id
 from core import error
+from frontend import lexer
 from osh import string_ops  # module under test
 
+import libc
+
 
 class LibStrTest(unittest.TestCase):
 
@@ -169,6 +173,41 @@ class LibStrTest(unittest.TestCase):
             print('%d test %06r return %06r' % (i, s[i:], s[:i]))
         print()
 
+    def testUnarySuffixOpGlob(self):
+        ops = [
+            Id.VOp1_Pound, Id.VOp1_DPound, Id.VOp1_Percent, Id.VOp1_DPercent
+        ]
+        pats = [
+            '*', '?', 'a*', '*a', '*b*', 'a?c', '*[bc]', '[!a]*',
+            '[[:alpha:]]*', 'x*', '*\\*', '\\*', '**d', '?*?', 'a[', '[]]*'
+        ]
+        strs = ['', 'a', 'abcd', 'aabbccdd', 'a*b*c', '*', 'a[b']
+
+        for id_ in ops:
+            tok = lexer.DummyToken(id_, '')
+            for pat in pats:
+                for s in strs:
+                    # The fnmatch() loop is the reference implementation
+                    expected = string_ops.DoUnarySuffixOp(s, tok, pat, True)
+                    actual = string_ops.DoUnarySuffixOp(s, tok, pat, False)
+                    self.assertEqual(expected, actual,
+                                     '%s %r %r' % (id_, pat, s))
+
+        # ? matches a UTF-8 character, not a byte
+        s = 'x\xce\xbcy\xce\xbc'
+        tok = lexer.DummyToken(Id.VOp1_Percent, '')
+        self.assertEqual('x\xce\xbc',
+                         string_ops.DoUnarySuffixOp(s, tok, '??', False))
+        self.assertEqual(
+            'x\xce\xbcy',
+            string_ops.DoUnarySuffixOp(s, tok, '[\xce\xbc]', False))
+        tok = lexer.DummyToken(Id.VOp1_DPound, '')
+        self.assertEqual('\xce\xbc',
+                         string_ops.DoUnarySuffixOp(s, tok, '*y', False))
+
+        m = string_ops._GlobMatcher([], False)  # empty glob
+        self.assertEqual(0, m.Match('abc', True))
+
     def testPatSubAllMatches(self):
         s = 'oXooXoooX'
 
@@ -187,4 +226,6 @@ class LibStrTest(unittest.TestCase):
 
 
 if __name__ == '__main__':
+    # To simulate the OVM_MAIN patch in pythonrun.c
+    libc.cpython_reset_locale()
     unittest.main()
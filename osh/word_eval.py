@@ -48,6 +48,7 @@ from _devbuild.gen.value_asdl import (
     sh_lvalue,
     sh_lvalue_t,
 )
+from core import bash_impl
 from core import error
 from core import pyos
 from core import pyutil
@@ -112,6 +113,9 @@ def DecayArray(val):
     if val.tag() == value_e.BashArray:
         array_val = cast(value.BashArray, val)
         s = array_val.strs[0] if len(array_val.strs) else None
+    elif val.tag() == value_e.SparseArray:
+        sparse_val = cast(value.SparseArray, val)
+        s = sparse_val.d.get(0)
     elif val.tag() == value_e.BashAssoc:
         assoc_val = cast(value.BashAssoc, val)
         s = assoc_val.d['0'] if '0' in assoc_val.d else None
@@ -223,6 +227,10 @@ def _ValueToPartValue(val, quoted, part_loc):
             val = cast(value.BashArray, UP_val)
             return part_value.Array(val.strs)
 
+        elif case(value_e.SparseArray):
+            val = cast(value.SparseArray, UP_val)
+            return part_value.Array(bash_impl.SparseArray_Values(val))
+
         elif case(value_e.BashAssoc):
             val = cast(value.BashAssoc, UP_val)
             # bash behavior: splice values!
@@ -406,6 +414,16 @@ def _PerformSlice(
 
             result = value.BashArray(strs)
 
+        elif case(value_e.SparseArray):
+            val = cast(value.SparseArray, UP_val)
+            if has_length and length < 0:
+                e_die(
+                    "The length index of a array slice can't be negative: %d" %
+                    length, loc.WordPart(part))
+
+            result = value.BashArray(
+                bash_impl.SparseArray_Slice(val, begin, has_length, length))
+
         elif case(value_e.BashAssoc):
             e_die("Can't slice associative arrays", loc.WordPart(part))
 
@@ -636,6 +654,9 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 val = cast(value.BashArray, UP_val)
                 # TODO: allow undefined
                 is_falsey = len(val.strs) == 0
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+                is_falsey = bash_impl.SparseArray_Length(val) == 0
             elif case(value_e.BashAssoc):
                 val = cast(value.BashAssoc, UP_val)
                 is_falsey = len(val.d) == 0
@@ -750,11 +771,11 @@ class AbstractWordEvaluator(StringWordEvaluator):
 
             elif case(value_e.BashArray):
                 val = cast(value.BashArray, UP_val)
-                # There can be empty placeholder values in the array.
-                length = 0
-                for s in val.strs:
-                    if s is not None:
-                        length += 1
+                length = len(val.strs)
+
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+                length = bash_impl.SparseArray_Length(val)
 
             elif case(value_e.BashAssoc):
                 val = cast(value.BashAssoc, UP_val)
@@ -774,12 +795,16 @@ class AbstractWordEvaluator(StringWordEvaluator):
         with tagswitch(val) as case:
             if case(value_e.BashArray):
                 val = cast(value.BashArray, UP_val)
-                # translation issue: tuple indices not supported in list comprehensions
-                #indices = [str(i) for i, s in enumerate(val.strs) if s is not None]
                 indices = []  # type: List[str]
-                for i, s in enumerate(val.strs):
-                    if s is not None:
-                        indices.append(str(i))
+                for i in xrange(len(val.strs)):
+                    indices.append(str(i))
+                return value.BashArray(indices)
+
+            elif case(value_e.SparseArray):
+                val = cast(value.SparseArray, UP_val)
+                indices = []
+                for i in bash_impl.SparseArray_Keys(val):
+                    indices.append(str(i))
                 return value.BashArray(indices)
 
             elif case(value_e.BashAssoc):
@@ -810,7 +835,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 return self._VarRefValue(bvs_part, quoted, vsub_state,
                                          vtest_place)
 
-            elif case(value_e.BashArray):  # caught earlier but OK
+            elif case(value_e.BashArray, value_e.SparseArray):  # caught earlier but OK
                 e_die('Indirect expansion of array')
 
             elif case(value_e.BashAssoc):  # caught earlier but OK
@@ -846,10 +871,18 @@ class AbstractWordEvaluator(StringWordEvaluator):
                     # ${a[@]#prefix} is VECTORIZED on arrays.  YSH should have this too.
                     strs = []  # type: List[str]
                     for s in val.strs:
-                        if s is not None:
-                            strs.append(
-                                string_ops.DoUnarySuffixOp(
-                                    s, op.op, arg_val.s, has_extglob))
+                        strs.append(
+                            string_ops.DoUnarySuffixOp(s, op.op, arg_val.s,
+                                                       has_extglob))
+                    new_val = value.BashArray(strs)
+
+                elif case(value_e.SparseArray):
+                    val = cast(value.SparseArray, UP_val)
+                    strs = []
+                    for s in bash_impl.SparseArray_Values(val):
+                        strs.append(
+                            string_ops.DoUnarySuffixOp(s, op.op, arg_val.s,
+                                                       has_extglob))
                     new_val = value.BashArray(strs)
 
                 elif case(value_e.BashAssoc):
@@ -909,8 +942,14 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 array_val = cast(value.BashArray, val)
                 strs = []  # type: List[str]
                 for s in array_val.strs:
-                    if s is not None:
-                        strs.append(replacer.Replace(s, op))
+                    strs.append(replacer.Replace(s, op))
+                val = value.BashArray(strs)
+
+            elif case2(value_e.SparseArray):
+                sparse_val = cast(value.SparseArray, val)
+                strs = []
+                for s in bash_impl.SparseArray_Values(sparse_val):
+                    strs.append(replacer.Replace(s, op))
                 val = value.BashArray(strs)
 
             elif case2(value_e.BashAssoc):
@@ -956,7 +995,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 with tagswitch(val) as case2:
                     if case2(value_e.Str):
                         val = value.Str('')
-                    elif case2(value_e.BashArray):
+                    elif case2(value_e.BashArray, value_e.SparseArray):
                         val = value.BashArray([])
                     else:
                         raise NotImplementedError()
@@ -995,6 +1034,13 @@ class AbstractWordEvaluator(StringWordEvaluator):
                     # TODO: should use fastfunc.ShellEncode
                     tmp = [j8_lite.MaybeShellEncode(s) for s in array_val.strs]
                     result = value.Str(' '.join(tmp))
+                elif case(value_e.SparseArray):
+                    sparse_val = cast(value.SparseArray, UP_val)
+                    tmp = [
+                        j8_lite.MaybeShellEncode(s)
+                        for s in bash_impl.SparseArray_Values(sparse_val)
+                    ]
+                    result = value.Str(' '.join(tmp))
                 else:
                     e_die("Can't use @Q on %s" % ui.ValType(val), op)
 
@@ -1003,7 +1049,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
             # spec/ble-idioms.test.sh.
             chars = []  # type: List[str]
             with tagswitch(val) as case:
-                if case(value_e.BashArray):
+                if case(value_e.BashArray, value_e.SparseArray):
                     chars.append('a')
                 elif case(value_e.BashAssoc):
                     chars.append('A')
@@ -1039,7 +1085,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 elif case2(value_e.Str):
                     if self.exec_opts.strict_array():
                         e_die("Can't index string with @", loc.WordPart(part))
-                elif case2(value_e.BashArray):
+                elif case2(value_e.BashArray, value_e.SparseArray):
                     pass  # no-op
 
         elif op_id == Id.Arith_Star:
@@ -1052,7 +1098,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 elif case2(value_e.Str):
                     if self.exec_opts.strict_array():
                         e_die("Can't index string with *", loc.WordPart(part))
-                elif case2(value_e.BashArray):
+                elif case2(value_e.BashArray, value_e.SparseArray):
                     pass  # no-op
 
         else:
@@ -1088,6 +1134,18 @@ class AbstractWordEvaluator(StringWordEvaluator):
                 else:
                     val = value.Str(s)
 
+            elif case2(value_e.SparseArray):
+                sparse_val = cast(value.SparseArray, UP_val)
+                index = self.arith_ev.EvalToInt(anode)
+                vtest_place.index = a_index.Int(index)
+
+                s = bash_impl.SparseArray_Get(sparse_val, index)
+
+                if s is None:
+                    val = value.Undef
+                else:
+                    val = value.Str(s)
+
             elif case2(value_e.BashAssoc):
                 assoc_val = cast(value.BashAssoc, UP_val)
                 # Location could also be attached to bracket_op?  But
@@ -1152,8 +1210,7 @@ class AbstractWordEvaluator(StringWordEvaluator):
         """Decay $* to a string."""
         assert val.tag() == value_e.BashArray, val
         sep = self.splitter.GetJoinChar()
-        tmp = [s for s in val.strs if s is not None]
-        return value.Str(sep.join(tmp))
+        return value.Str(sep.join(val.strs))
 
     def _EmptyStrOrError(self, val, token):
         # type: (value_t, Token) -> value_t
@@ -1192,7 +1249,8 @@ class AbstractWordEvaluator(StringWordEvaluator):
         else:  # no bracket op
             var_name = vtest_place.name
             if (var_name is not None and
-                    val.tag() in (value_e.BashArray, value_e.BashAssoc) and
+                    val.tag() in (value_e.BashArray, value_e.SparseArray,
+                                  value_e.BashAssoc) and
                     not vsub_state.is_type_query):
                 if ShouldArrayDecay(var_name, self.exec_opts,
                                     not (part.prefix_op or part.suffix_op)):
@@ -1418,6 +1476,10 @@ class AbstractWordEvaluator(StringWordEvaluator):
                     raise AssertionError()
 
         # After applying suffixes, process join_array here.
+        if val.tag() == value_e.SparseArray:
+            val = value.BashArray(
+                bash_impl.SparseArray_Values(cast(value.SparseArray, val)))
+
         UP_val = val
         if val.tag() == value_e.BashArray:
             array_val = cast(value.BashArray, UP_val)
@@ -1484,7 +1546,8 @@ class AbstractWordEvaluator(StringWordEvaluator):
             var_name = lexer.LazyStr(token)
             # TODO: Special case for LINENO
             val = self.mem.GetValue(var_name)
-            if val.tag() in (value_e.BashArray, value_e.BashAssoc):
+            if val.tag() in (value_e.BashArray, value_e.SparseArray,
+                             value_e.BashAssoc):
                 if ShouldArrayDecay(var_name, self.exec_opts):
                     # for $BASH_SOURCE, etc.
                     val = DecayArray(val)
@@ -2060,10 +2123,10 @@ class AbstractWordEvaluator(StringWordEvaluator):
                         e_die('LHS array not allowed in assignment builtin', w)
 
                     if lexer.IsPlusEquals(left_token):
-                        var_name = lexer.TokenSliceRight(left_token, -2)
+                        var_name = lexer.InternedSliceRight(left_token, -2)
                         append = True
                     else:
-                        var_name = lexer.TokenSliceRight(left_token, -1)
+                        var_name = lexer.InternedSliceRight(left_token, -1)
                         append = False
 
                     if part_offset == len(w.parts):
@@ -75,6 +75,7 @@ from _devbuild.gen.syntax_asdl import (
     CompoundWord,
     word_part,
     word_part_t,
+    y_lhs,
     y_lhs_e,
     arith_expr_t,
     command,
@@ -384,7 +385,7 @@ class WordParser(WordEmitter):
 
         part = BracedVarSub.CreateNull()
         part.token = name_token
-        part.var_name = lexer.TokenVal(name_token)
+        part.var_name = lexer.InternedTokenVal(name_token)
         part.bracket_op = bracket_op
         return part
 
@@ -1255,8 +1256,8 @@ class WordParser(WordEmitter):
             UP_lhs = lhs
             with tagswitch(lhs) as case:
                 if case(y_lhs_e.Var):
-                    lhs = cast(Token, UP_lhs)
-                    var_checker.Check(kw_token.id, lexer.LazyStr(lhs), lhs)
+                    lhs = cast(y_lhs.Var, UP_lhs)
+                    var_checker.Check(kw_token.id, lhs.name, lhs.left)
 
                 # Note: this does not cover cases like
                 # setvar (a[0])[1] = v
@@ -21,6 +21,8 @@
 
 #include <Python.h>
 
+#include "cpp/regex_cache_shared.h"
+
 // Log messages to stderr.
 static void debug(const char* fmt, ...) {
 #ifdef LIBC_VERBOSE
@@ -173,12 +175,10 @@ func_regex_search(PyObject *self, PyObject *args) {
   }
 
   cflags |= REG_EXTENDED;
-  regex_t pat;
-  int status = regcomp(&pat, pattern, cflags);
-  if (status != 0) {
-    char error_desc[50];
-    regerror(status, &pat, error_desc, 50);
-
+  int status;
+  char error_desc[50];
+  regex_t* pat = regex_cache_get(pattern, cflags, &status, error_desc, 50);
+  if (pat == NULL) {
     char error_message[80];
     snprintf(error_message, 80, "Invalid regex %s (%s)", pattern, error_desc);
 
@@ -186,16 +186,15 @@ func_regex_search(PyObject *self, PyObject *args) {
     return NULL;
   }
 
-  int num_groups = pat.re_nsub + 1;
+  int num_groups = pat->re_nsub + 1;
   PyObject *ret = PyList_New(num_groups * 2);
 
   if (ret == NULL) {
-    regfree(&pat);
     return NULL;
   }
 
   regmatch_t *pmatch = (regmatch_t*) malloc(sizeof(regmatch_t) * num_groups);
-  int match = regexec(&pat, str + pos, num_groups, pmatch, eflags);
+  int match = regexec(pat, str + pos, num_groups, pmatch, eflags);
   if (match == 0) {
     int i;
     for (i = 0; i < num_groups; i++) {
@@ -214,7 +213,6 @@ func_regex_search(PyObject *self, PyObject *args) {
   }
 
   free(pmatch);
-  regfree(&pat);
 
   if (match != 0) {
     Py_RETURN_NONE;
@@ -239,16 +237,16 @@ func_regex_first_group_match(PyObject *self, PyObject *args) {
     return NULL;
   }
 
-  regex_t pat;
   regmatch_t m[NMATCH];
 
   // Could have been checked by regex_parse for [[ =~ ]], but not for glob
   // patterns like ${foo/x*/y}.
 
-  int status = regcomp(&pat, pattern, REG_EXTENDED);
-  if (status != 0) {
-    char error_string[80];
-    regerror(status, &pat, error_string, 80);
+  int status;
+  char error_string[80];
+  regex_t* pat = regex_cache_get(pattern, REG_EXTENDED, &status, error_string,
+                                 80);
+  if (pat == NULL) {
     PyErr_SetString(PyExc_RuntimeError, error_string);
     return NULL;
   }
@@ -256,8 +254,7 @@ func_regex_first_group_match(PyObject *self, PyObject *args) {
   debug("first_group_match pat %s str %s pos %d", pattern, str, pos);
 
   // Match at offset 'pos'
-  int result = regexec(&pat, str + pos, NMATCH, m, 0 /*flags*/);
-  regfree(&pat);
+  int result = regexec(pat, str + pos, NMATCH, m, 0 /*flags*/);
 
   if (result != 0) {
     Py_RETURN_NONE;  // no match
@@ -208,6 +208,28 @@ class LibcTest(unittest.TestCase):
     self.assertRaises(
         RuntimeError, libc.regex_first_group_match, r'*', 'abcd', 0)
 
+  def testRegexCache(self):
+    # More patterns than the default cache size, and repeated, so entries get
+    # evicted and recompiled
+    for _ in range(2):
+      for i in range(150):
+        pat = '(%d+)x' % i
+        s = 'a%dx' % i
+        self.assertEqual([1, 2 + len(str(i)), 1, 1 + len(str(i))],
+                         libc.regex_search(pat, 0, s, 0))
+        self.assertEqual((1, 1 + len(str(i))),
+                         libc.regex_first_group_match(pat, s, 0))
+
+    # Same pattern, different flags
+    self.assertEqual(None, libc.regex_search('(a)', 0, 'A', 0))
+    self.assertEqual([0, 1, 0, 1],
+                     libc.regex_search('(a)', libc.REG_ICASE, 'A', 0))
+    self.assertEqual(None, libc.regex_search('(a)', 0, 'A', 0))
+
+    # Errors aren't cached
+    for _ in range(2):
+      self.assertRaises(ValueError, libc.regex_search, r'*', 0, 'abcd', 0)
+
   def testRegexFirstGroupMatchError(self):
     # Helping to debug issue #291
     s = ''
@@ -43,6 +43,7 @@ FUNCS = [
     "chdir",
     "getcwd",
     "listdir",
+    "listdir_typed",
     "lstat",
     "readlink",
     "stat",
@@ -91,6 +92,19 @@ class PosixTest(unittest.TestCase):
     entries = posix_.listdir('.')
     self.assert_('doc' in entries)
 
+  def testListdirTyped(self):
+    entries = dict(posix_.listdir_typed('.'))
+    self.assertEqual(sorted(posix_.listdir('.')), sorted(entries))
+    self.assertEqual(True, entries['doc'])
+    self.assertEqual(False, entries['README.md'])
+
+    try:
+      posix_.listdir_typed('nonexistent_ZZ')
+    except OSError as e:
+      print(e)
+    else:
+      self.fail('Expected OSError')
+
   def testFunctionsExist(self):
     for name in FUNCS:
       func = getattr(posix_, name)
@@ -6,6 +6,8 @@
 #include "Python.h"
 #include "structseq.h"
 
+#include "cpp/spawn_shared.h"
+
 #ifdef __cplusplus
 extern "C" {
 #endif
@@ -914,6 +916,100 @@ posix_listdir(PyObject *self, PyObject *args)
     return d;
 }  /* end of posix_listdir */
 
+/* OVM_MAIN: Whether a directory entry is a directory, following symlinks like
+   stat().  d_type avoids the stat() for most entries. */
+static int
+entry_is_dir(DIR *dirp, struct dirent *ep)
+{
+    struct stat st;
+#ifdef DT_UNKNOWN
+    if (ep->d_type == DT_DIR)
+        return 1;
+    if (ep->d_type != DT_UNKNOWN && ep->d_type != DT_LNK)
+        return 0;
+#endif
+    /* A dangling symlink, or the entry was removed */
+    if (fstatat(dirfd(dirp), ep->d_name, &st, 0) != 0)
+        return 0;
+    return S_ISDIR(st.st_mode);
+}
+
+PyDoc_STRVAR_remove(posix_listdir_typed__doc__,
+"listdir_typed(path) -> list of (name, is_dir) pairs\n\n\
+Like listdir(), but also says whether each entry is a directory.\n\
+Entries are only stat()'d when d_type is a symlink or unknown.");
+
+static PyObject *
+posix_listdir_typed(PyObject *self, PyObject *args)
+{
+    char *name = NULL;
+    PyObject *d, *v;
+    DIR *dirp;
+    struct dirent *ep;
+    int is_dir;
+
+    errno = 0;
+    if (!PyArg_ParseTuple(args, "et:listdir_typed", Py_FileSystemDefaultEncoding, &name))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    dirp = opendir(name);
+    Py_END_ALLOW_THREADS
+    if (dirp == NULL) {
+        return posix_error_with_allocated_filename(name);
+    }
+    if ((d = PyList_New(0)) == NULL) {
+        Py_BEGIN_ALLOW_THREADS
+        closedir(dirp);
+        Py_END_ALLOW_THREADS
+        PyMem_Free(name);
+        return NULL;
+    }
+    for (;;) {
+        errno = 0;
+        Py_BEGIN_ALLOW_THREADS
+        ep = readdir(dirp);
+        Py_END_ALLOW_THREADS
+        if (ep == NULL) {
+            if (errno == 0) {
+                break;
+            } else {
+                Py_BEGIN_ALLOW_THREADS
+                closedir(dirp);
+                Py_END_ALLOW_THREADS
+                Py_DECREF(d);
+                return posix_error_with_allocated_filename(name);
+            }
+        }
+        if (ep->d_name[0] == '.' &&
+            (NAMLEN(ep) == 1 ||
+             (ep->d_name[1] == '.' && NAMLEN(ep) == 2)))
+            continue;
+        Py_BEGIN_ALLOW_THREADS
+        is_dir = entry_is_dir(dirp, ep);
+        Py_END_ALLOW_THREADS
+        v = Py_BuildValue("(s#N)", ep->d_name, (Py_ssize_t)NAMLEN(ep),
+                          PyBool_FromLong(is_dir));
+        if (v == NULL) {
+            Py_DECREF(d);
+            d = NULL;
+            break;
+        }
+        if (PyList_Append(d, v) != 0) {
+            Py_DECREF(v);
+            Py_DECREF(d);
+            d = NULL;
+            break;
+        }
+        Py_DECREF(v);
+    }
+    Py_BEGIN_ALLOW_THREADS
+    closedir(dirp);
+    Py_END_ALLOW_THREADS
+    PyMem_Free(name);
+
+    return d;
+}  /* end of posix_listdir_typed */
+
 PyDoc_STRVAR_remove(posix_mkdir__doc__,
 "mkdir(path [, mode=0777])\n\n\
 Create a directory.");
@@ -1264,6 +1360,147 @@ posix_execve(PyObject *self, PyObject *args)
 }
 #endif /* HAVE_EXECV */
 
+/* Oils addition: a simplified posix_spawn(), shared with the C++ translation.
+   See cpp/spawn_shared.h. */
+
+/* Convert a list of ints to a new array.  Returns 0 on failure. */
+static int
+int_list_to_array(PyObject *list, const char *what, int **out, int *n_out)
+{
+    Py_ssize_t i, n;
+    int *arr;
+
+    if (!PyList_Check(list)) {
+        PyErr_Format(PyExc_TypeError, "spawn() %s must be a list", what);
+        return 0;
+    }
+    n = PyList_Size(list);
+    arr = PyMem_NEW(int, n + 1);  /* + 1 so it's never zero-sized */
+    if (arr == NULL) {
+        PyErr_NoMemory();
+        return 0;
+    }
+    for (i = 0; i < n; i++) {
+        long v = PyInt_AsLong(PyList_GetItem(list, i));
+        if (v == -1 && PyErr_Occurred()) {
+            PyMem_DEL(arr);
+            return 0;
+        }
+        arr[i] = (int)v;
+    }
+    *out = arr;
+    *n_out = (int)n;
+    return 1;
+}
+
+static PyObject *
+posix_spawn_(PyObject *self, PyObject *args)
+{
+    char *path;
+    PyObject *argv, *env, *dups_obj, *closes_obj, *sigs_obj;
+    int pgid;
+    char **argvlist = NULL;
+    char **envlist = NULL;
+    int *dups = NULL, *closes = NULL, *sigs = NULL;
+    int n_dups = 0, n_closes = 0, n_sigs = 0;
+    PyObject *key, *val, *keys = NULL, *vals = NULL, *result = NULL;
+    Py_ssize_t i, argc, envc = 0, lastarg = 0;
+    struct SpawnAttrs attrs;
+    pid_t pid;
+    int err;
+
+    if (!PyArg_ParseTuple(args, "etO!O!iOOO:spawn",
+                          Py_FileSystemDefaultEncoding, &path,
+                          &PyList_Type, &argv, &PyDict_Type, &env,
+                          &pgid, &dups_obj, &closes_obj, &sigs_obj))
+        return NULL;
+
+    if (!int_list_to_array(dups_obj, "dups", &dups, &n_dups) ||
+        !int_list_to_array(closes_obj, "closes", &closes, &n_closes) ||
+        !int_list_to_array(sigs_obj, "sig_defaults", &sigs, &n_sigs))
+        goto fail;
+
+    argc = PyList_Size(argv);
+    argvlist = PyMem_NEW(char *, argc + 1);
+    if (argvlist == NULL) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+    for (i = 0; i < argc; i++) {
+        if (!PyArg_Parse(PyList_GetItem(argv, i),
+                         "et;spawn() arg 2 must contain only strings",
+                         Py_FileSystemDefaultEncoding,
+                         &argvlist[i]))
+            goto fail;
+        lastarg = i + 1;
+    }
+    argvlist[argc] = NULL;
+
+    envlist = PyMem_NEW(char *, PyDict_Size(env) + 1);
+    if (envlist == NULL) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+    keys = PyDict_Keys(env);
+    vals = PyDict_Values(env);
+    if (!keys || !vals)
+        goto fail;
+    for (i = 0; i < PyList_Size(keys); i++) {
+        char *p, *k, *v;
+        size_t len;
+
+        key = PyList_GetItem(keys, i);
+        val = PyList_GetItem(vals, i);
+        if (!PyArg_Parse(key, "s;spawn() arg 3 contains a non-string key",
+                         &k) ||
+            !PyArg_Parse(val, "s;spawn() arg 3 contains a non-string value",
+                         &v))
+            goto fail;
+
+        len = PyString_Size(key) + PyString_Size(val) + 2;
+        p = PyMem_NEW(char, len);
+        if (p == NULL) {
+            PyErr_NoMemory();
+            goto fail;
+        }
+        PyOS_snprintf(p, len, "%s=%s", k, v);
+        envlist[envc++] = p;
+    }
+    envlist[envc] = NULL;
+
+    attrs.pgid = pgid;
+    attrs.dups = dups;
+    attrs.num_dups = n_dups / 2;
+    attrs.closes = closes;
+    attrs.num_closes = n_closes;
+    attrs.sig_defaults = sigs;
+    attrs.num_sig_defaults = n_sigs;
+
+    err = spawn_run(path, argvlist, envlist, &attrs, &pid);
+    if (err != 0) {
+        errno = err;
+        posix_error();
+        goto fail;
+    }
+    result = PyInt_FromLong((long)pid);
+
+  fail:
+    if (envlist != NULL) {
+        while (--envc >= 0)
+            PyMem_DEL(envlist[envc]);
+        PyMem_DEL(envlist);
+    }
+    if (argvlist != NULL)
+        free_string_array(argvlist, lastarg);
+    Py_XDECREF(vals);
+    Py_XDECREF(keys);
+    PyMem_DEL(sigs);
+    PyMem_DEL(closes);
+    PyMem_DEL(dups);
+    PyMem_Free(path);
+    return result;
+}
+
 #ifdef HAVE_FORK
 PyDoc_STRVAR_remove(posix_fork__doc__,
 "fork() -> pid\n\n\
@@ -2071,6 +2308,53 @@ posix_read(PyObject *self, PyObject *args)
 }
 
 
+PyDoc_STRVAR_remove(posix_lseek__doc__,
+"lseek(fd, pos, how) -> newpos\n\n\
+Set the current position of a file descriptor.\n\
+Return the new cursor position in bytes, starting from the beginning.");
+
+static PyObject *
+posix_lseek(PyObject *self, PyObject *args)
+{
+    int fd, how;
+    off_t pos, res;
+    PyObject *posobj;
+    if (!PyArg_ParseTuple(args, "iOi:lseek", &fd, &posobj, &how))
+        return NULL;
+#ifdef SEEK_SET
+    /* Turn 0, 1, 2 into SEEK_{SET,CUR,END} */
+    switch (how) {
+    case 0: how = SEEK_SET; break;
+    case 1: how = SEEK_CUR; break;
+    case 2: how = SEEK_END; break;
+    }
+#endif /* SEEK_END */
+
+#if !defined(HAVE_LARGEFILE_SUPPORT)
+    pos = PyInt_AsLong(posobj);
+#else
+    pos = PyLong_Check(posobj) ?
+        PyLong_AsLongLong(posobj) : PyInt_AsLong(posobj);
+#endif
+    if (PyErr_Occurred())
+        return NULL;
+
+    if (!_PyVerify_fd(fd))
+        return posix_error();
+    Py_BEGIN_ALLOW_THREADS
+    res = lseek(fd, pos, how);
+    Py_END_ALLOW_THREADS
+    if (res < 0)
+        return posix_error();
+
+#if !defined(HAVE_LARGEFILE_SUPPORT)
+    return PyInt_FromLong(res);
+#else
+    return PyLong_FromLongLong(res);
+#endif
+}
+
+
 PyDoc_STRVAR_remove(posix_write__doc__,
 "write(fd, string) -> byteswritten\n\n\
 Write a string to a file descriptor.");
@@ -2,7 +2,8 @@
 from distutils.core import setup, Extension
 
 module = Extension('libc',
-                    sources = ['pyext/libc.c'],
+                    sources = ['cpp/regex_cache_shared.c', 'pyext/libc.c'],
+                    include_dirs = ['.'],
                     undef_macros = ['NDEBUG'])
 
 setup(name = 'libc',
@@ -5,7 +5,7 @@ from distutils.core import setup, Extension
 # module it's based on.
 
 module = Extension('posix_',
-                    sources = ['pyext/posixmodule.c'],
+                    sources = ['cpp/spawn_shared.c', 'pyext/posixmodule.c'],
                     # we deleted some entries from the method table; I don't
                     # want to see warnings about it
                     extra_compile_args = ['-Wno-unused-function'],
@@ -14,6 +14,6 @@ module = Extension('posix_',
 setup(name = 'posix_',
       version = '1.0',
       description = 'Our fork of the stdlib module',
-      # For posix_methods.def
-      include_dirs = ['build/oil-defs'],
+      # For posix_methods.def, and cpp/spawn_shared.h
+      include_dirs = ['build/oil-defs', '.'],
       ext_modules = [module])
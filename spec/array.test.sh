@@ -597,6 +597,62 @@ argv.py "${a[@]:15:2}"
 ## N-I mksh status: 1
 ## N-I mksh stdout-json: ""
 
+#### Large sparse index doesn't allocate every slot
+a[1000000]=x
+a[5]=y
+echo len=${#a[@]}
+echo keys=${!a[@]}
+echo "${a[@]}" "${a[-1]}" "${a[999999]-unset}"
+a+=(z)
+echo keys=${!a[@]}
+## STDOUT:
+len=2
+keys=5 1000000
+y x x unset
+keys=5 1000000 1000001
+## END
+
+#### unset makes holes, and append goes after the max index
+a=(0 1 2 3 4)
+unset 'a[1]'
+unset 'a[4]'
+echo len=${#a[@]} keys=${!a[@]}
+a+=(x y)
+echo keys=${!a[@]}
+argv.py "${a[@]}" "${a[@]:2}"
+unset 'a[6]'
+unset 'a[5]'
+a+=(z)
+echo keys=${!a[@]} "${a[*]}"
+## STDOUT:
+len=3 keys=0 2 3
+keys=0 2 3 4 5
+['0', '2', '3', 'x', 'y', '2', '3', 'x', 'y']
+keys=0 2 3 4 5 0 2 3 x z
+## END
+
+#### Assigning a negative index that's out of range
+a=(1 2 3)
+a[-1]=x
+a[-3]=y
+echo "${a[@]}"
+unset 'a[0]'
+a[-3]=z
+echo "${a[@]}"
+a[-4]=bad
+echo status=$?
+## status: 1
+## STDOUT:
+y 2 x
+z 2 x
+## END
+## OK bash status: 0
+## OK bash STDOUT:
+y 2 x
+z 2 x
+status=1
+## END
+
 #### Using an array itself as the index on LHS
 shopt -u strict_arith
 a[a]=42
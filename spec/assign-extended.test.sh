@@ -348,6 +348,37 @@ declare -a test_arr7=([3]="foo")
 ## N-I mksh stdout-json: ""
 ## N-I mksh status: 1
 
+#### declare -p after filling or unsetting the holes of an array
+a=(1 2 3)
+unset 'a[0]'
+a[0]=new
+declare -p a
+
+read -a b <<< 'x y z'
+unset 'b[1]'
+declare -p b
+b[1]=q
+declare -p b
+
+c=(a b)
+c[5]=c
+unset 'c[5]'
+declare -p c
+## STDOUT:
+declare -a a=(new 2 3)
+declare -a b=(); b[0]=x b[2]=z
+declare -a b=(x q z)
+declare -a c=(a b)
+## END
+## OK bash STDOUT:
+declare -a a=([0]="new" [1]="2" [2]="3")
+declare -a b=([0]="x" [2]="z")
+declare -a b=([0]="x" [1]="q" [2]="z")
+declare -a c=([0]="a" [1]="b")
+## END
+## N-I mksh stdout-json: ""
+## N-I mksh status: 127
+
 #### declare -p foo=bar doesn't make sense
 case $SH in (mksh) exit 0; esac
 
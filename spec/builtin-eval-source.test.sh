@@ -247,3 +247,87 @@ mkdir -p dir
 echo status=$?
 ## stdout: status=1
 ## OK dash/zsh/mksh stdout: status=0
+
+#### eval of the same string sees alias and function changes
+shopt -s expand_aliases  # bash
+
+f() { echo f1; }
+alias a='echo a1'
+for i in 1 2; do
+  eval 'a; f'
+  f() { echo f2; }
+  alias a='echo a2'
+done
+unalias a
+eval 'a' 2>/dev/null || echo status=$?
+
+## STDOUT:
+a1
+f1
+a2
+f2
+status=127
+## END
+
+#### eval of the same string with dynamic arithmetic and var refs
+x='i + 1'
+ref='a[i]'
+a=(zero one two)
+for i in 0 1 2; do
+  eval 'echo $(( x * 2 )) ${!ref}'
+done
+## STDOUT:
+2 zero
+4 one
+6 two
+## END
+## N-I dash status: 2
+## N-I dash STDOUT:
+## END
+
+#### errors in the same eval string point to each call site
+cd $TMP
+
+code='nope_cmd'
+eval "$code" 2>err.txt
+grep -o 'line [0-9]*' err.txt | head -n 1
+
+eval "$code" 2>err.txt
+grep -o 'line [0-9]*' err.txt | head -n 1
+
+## STDOUT:
+line 4
+line 7
+## END
+## BUG bash STDOUT:
+line 4
+line 4
+## END
+## N-I dash/mksh/zsh STDOUT:
+## END
+
+#### errors in the same dynamic arithmetic point to each call site
+cd $TMP
+
+x='1 / y'
+y=1
+echo $(( x ))
+
+y=0
+( echo $(( x )) ) 2>err.txt
+grep -o 'line [0-9]*' err.txt | head -n 1
+
+## STDOUT:
+1
+line 8
+## END
+## BUG bash STDOUT:
+1
+line 5
+## END
+## N-I dash status: 2
+## N-I dash STDOUT:
+## END
+## N-I mksh/zsh STDOUT:
+1
+## END
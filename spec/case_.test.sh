@@ -186,6 +186,86 @@ match
 ## END
 
 
+#### First matching arm wins, with constant, glob, and dynamic patterns
+f() {
+  case $1 in
+    a|b) echo "1 $1" ;;
+    c*) echo "2 $1" ;;
+    $pat) echo "3 $1" ;;
+    a|"c"|'*') echo "4 $1" ;;
+    \*) echo "5 $1" ;;
+    *) echo "6 $1" ;;
+  esac
+}
+pat=cx
+for x in a b c cx '*' z; do
+  f "$x"
+done
+pat=z
+f z
+## STDOUT:
+1 a
+1 b
+2 c
+2 cx
+4 *
+6 z
+3 z
+## END
+
+#### Dynamic patterns are evaluated in order until a match
+case b in
+  $(echo one >&2; echo x)) echo X ;;
+  $(echo two >&2; echo y)|b|$(echo three >&2)) echo B ;;
+  $(echo four >&2)) echo Z ;;
+esac
+## STDOUT:
+B
+## END
+## STDERR:
+one
+two
+## END
+
+#### ;;& and ;& with constant patterns
+case a in
+  a) echo 1 ;;&
+  b) echo 2 ;;&
+  a) echo 3 ;&
+  b) echo 4 ;;&
+  a) echo 5 ;;
+  a) echo 6 ;;
+esac
+## STDOUT:
+1
+3
+4
+5
+## END
+## N-I dash/mksh/zsh status: 2
+## N-I dash/mksh/zsh STDOUT:
+## END
+
+#### nocasematch with constant patterns
+shopt -s nocasematch
+f() {
+  case $1 in
+    foo) echo foo ;;
+    *) echo other ;;
+  esac
+}
+f FOO
+shopt -u nocasematch
+f FOO
+## STDOUT:
+foo
+other
+## END
+## N-I dash/mksh/zsh STDOUT:
+other
+other
+## END
+
 #### case \n bug regression
 
 case
@@ -283,3 +283,80 @@ echo -$()- ".$()."
 ## STDOUT:
 -- ..
 ## END
+
+#### Functions and builtins in command subs don't change the shell
+f() { echo "f $1"; return 3; }
+g() { x=g; echo g; }
+
+a=$(f 1)
+echo "$? $a"
+
+b=$(g)
+echo "$b x=$x"
+
+c=$(echo ${y:=default}; printf -v z %s z)
+echo "$c y=$y z=$z"
+
+false
+e=$(echo e)
+echo "$? $e"
+## STDOUT:
+3 f 1
+g x=
+default y= z=
+0 e
+## END
+
+#### Big output from a builtin in a command sub
+s=$(printf '%100000s' x)
+echo ${#s}
+## STDOUT:
+100000
+## END
+
+#### $(<file) with a missing file, and errexit
+echo hi > $TMP/cs-file.txt
+a=$(<$TMP/cs-file.txt)
+echo "$? $a"
+
+a=$(< $TMP/nonexistent.txt)
+echo "$? $a"
+
+set -o errexit
+a=$(< $TMP/nonexistent.txt)
+echo 'not reached'
+## status: 1
+## STDOUT:
+0 hi
+1 
+## END
+## N-I dash status: 2
+## N-I dash STDOUT:
+0 
+2 
+## END
+
+#### Command sub with errexit in a function
+f() { echo one; false; echo two; }
+
+a=$(f)
+echo "$? $a"
+
+set -o errexit
+a=$(f)
+echo "$? $a"
+
+shopt -s inherit_errexit
+a=$(f)
+echo 'not reached'
+## status: 1
+## STDOUT:
+0 one
+two
+0 one
+two
+## END
+## BUG dash STDOUT:
+0 one
+two
+## END
@@ -355,3 +355,18 @@ echo 4 ${x##*(foo|bar)'()'}
 4
 ## END
 ## N-I dash/zsh/ash stdout-json: ""
+
+#### malformed char class in pattern
+x='[[abc'
+echo ${x#[[]}
+echo ${x##[[]}
+
+y='a[b'
+echo ${y%[a[]b} ${y%[[]b}
+echo ${y%%[a[]b} ${y%%[[]b}
+## STDOUT:
+[abc
+[abc
+a a
+a a
+## END
@@ -153,7 +153,7 @@ pp line (assoc)
 
 ## STDOUT:
 (BashArray)   ["a","b","c"]
-(BashArray)   ["a","b","c",null,null,"z"]
+(SparseArray)   ["a","b","c",null,null,"z"]
 (BashAssoc)   {"k":"v","k2":"v2"}
 (BashAssoc)   {"k":"v","k2":"v2","k3":""}
 ## END
@@ -191,7 +191,12 @@ declare -a array
 array[3]=42
 pp cell array
 ## STDOUT:
-array = (Cell exported:F readonly:F nameref:F val:(value.BashArray strs:[_ _ _ 42]))
+array = (Cell
+  exported: F
+  readonly: F
+  nameref: F
+  val: (value.SparseArray d:[Dict 3 42] max_index:3 sorted_keys:[3])
+)
 ## END
 
 
@@ -162,3 +162,66 @@ status=1
 ## END
 
 
+
+#### OILS_PROFILE_DIR writes a profile and folded stacks for each process
+
+mkdir -p $TMP/prof
+rm -f $TMP/prof/*
+
+OILS_PROFILE_DIR=$TMP/prof $SH -o ysh:upgrade -c '
+f() {
+  g
+  g
+  /bin/true
+}
+g() {
+  echo g
+}
+func double(x) {
+  return (x * 2)
+}
+f
+( g )
+echo $[double(21)]
+'
+
+python3 -c '
+import glob, json, sys
+
+profiles = sorted(glob.glob(sys.argv[1] + "/*.profile.json"))
+print("%d profiles" % len(profiles))
+
+# The parent has the most calls
+funcs = {}
+for path in profiles:
+  with open(path) as f:
+    d = {e["name"]: e for e in json.load(f)["funcs"]}
+  if len(d) > len(funcs):
+    funcs = d
+
+for name in ["<main>", "f", "g", "double"]:
+  e = funcs[name]
+  print("%s calls=%d forks=%d execs=%d" %
+        (name, e["calls"], e["forks"], e["execs"]))
+print(funcs["f"]["incl_ms"] >= funcs["g"]["incl_ms"])
+' $TMP/prof
+
+cat $TMP/prof/*.folded | awk '{ print $1 }' | sort | uniq
+
+## STDOUT:
+g
+g
+g
+42
+2 profiles
+<main> calls=1 forks=1 execs=0
+f calls=1 forks=1 execs=1
+g calls=2 forks=0 execs=0
+double calls=1 forks=0 execs=0
+True
+<main>
+<main>;double
+<main>;f
+<main>;f;g
+<main>;g
+## END
@@ -163,6 +163,72 @@ pp cell y
 y = (Cell exported:F readonly:F nameref:F val:(value.Dict d:[Dict age (value.Int i:43)]))
 ## END
 
+#### json read with block runs it for each item of a List
+shopt -s ysh:upgrade
+
+echo '[1, {"a": 2}, "three", [4]]' | json read (&x) {
+  json write (x, space=0)
+}
+echo '{"a": 1}' | json read (&x) {
+  echo "once $[x.a]"
+}
+echo '[]' | json read (&x) {
+  echo never
+}
+## STDOUT:
+1
+{"a":2}
+"three"
+[4]
+once 1
+## END
+
+#### json read with block: break and continue
+shopt -s ysh:upgrade
+
+echo '[1, 2, 3, 4, 5]' | json read (&x) {
+  if (x === 2) { continue }
+  if (x === 4) { break }
+  echo $x
+}
+echo done
+## STDOUT:
+1
+3
+done
+## END
+
+#### json read with block: error after some items
+shopt -s ysh:upgrade
+
+try {
+  echo '[1, 2, 3 4]' | json read (&x) {
+    echo $x
+  }
+}
+echo status=$_status
+## STDOUT:
+1
+2
+3
+status=1
+## END
+
+#### json8 read --lines
+shopt -s ysh:upgrade
+
+printf 'one\n  two three  \n\n"four\\n"\n' | json8 read --lines (&x)
+json8 write (x, space=0)
+
+printf 'a\nb\n' | json8 read --lines (&line) {
+  echo "[$line]"
+}
+## STDOUT:
+["one","two three","four\n"]
+[a]
+[b]
+## END
+
 #### invalid JSON
 echo '{' | json read (&y)
 echo pipeline status = $?
@@ -389,6 +389,45 @@ pp line (g("a"))
 (Bool)   true
 ## END
 
+#### Method calls evaluate the receiver, then the method, then the args
+var mylist = [1, 2]
+
+func addTo(L, n) {
+  call L->append(n)
+  return (len(L))
+}
+echo $[mylist => addTo(3)]
+
+try { call mylist->nope() }
+echo status=$_status
+
+var notfunc = 42
+try { call mylist => notfunc() }
+echo status=$_status
+
+try { call mylist->append(4, 5) }
+echo status=$_status
+
+# the method is looked up before the args are evaluated
+func noisy() {
+  echo noisy
+  return (0)
+}
+try { call mylist->nope(noisy()) }
+echo status=$_status
+call mylist->append(noisy())
+pp line (mylist)
+
+## STDOUT:
+3
+status=3
+status=3
+status=3
+status=3
+noisy
+(List)   [1,2,3,0]
+## END
+
 #### List => indexOf()
 var items = [1, '2', 3, { 'a': 5 }]
 
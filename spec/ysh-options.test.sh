@@ -808,3 +808,41 @@ echo status=$?
 status=0
 status=0
 ## END
+
+#### buffer_stdout preserves order with processes and redirects
+shopt -s buffer_stdout
+
+echo one
+/bin/echo two
+echo -n three
+( echo ' four' )
+echo five > out.txt
+cat out.txt
+x=$(echo six; /bin/echo seven)
+echo $x
+{ echo eight; echo nine >&2; } 2>&1
+echo ten | cat
+
+## STDOUT:
+one
+two
+three four
+five
+six seven
+eight
+nine
+ten
+## END
+
+#### buffer_stdout output before exec and exit
+shopt -s buffer_stdout
+echo one
+$SH -c 'shopt -s buffer_stdout; echo two; exit 3'
+echo status=$?
+exec /bin/echo three
+## STDOUT:
+one
+two
+status=3
+three
+## END
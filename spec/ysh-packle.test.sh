@@ -0,0 +1,190 @@
+## our_shell: ysh
+## tags: dev-minimal
+
+#### usage errors
+
+try {
+  packle read zz
+}
+echo status=$_status
+
+packle write
+
+## status: 3
+## STDOUT:
+status=2
+## END
+
+#### toPackle() and fromPackle() round trip
+
+var d = {b: true, n: null, i: -42, f: 1.5, s: 'μ', bytes: b'\yff', items: [1, 2]}
+var d2 = fromPackle(toPackle(d))
+
+json8 write (d2)
+echo $[d2.bytes === d.bytes]
+
+## STDOUT:
+{
+  "b": true,
+  "n": null,
+  "i": -42,
+  "f": 1.5,
+  "s": "μ",
+  "bytes": b'\yff',
+  "items": [
+    1,
+    2
+  ]
+}
+true
+## END
+
+#### Integers and floats are exact
+
+for i in (0, 255, 256, 65535, 65536, -1, 2147483647, -2147483648, 2147483648) {
+  var i2 = fromPackle(toPackle(i))
+  write -- "$[i2 === i] $i2"
+}
+
+var big = 1 << 62
+echo $[fromPackle(toPackle(big)) === big]
+echo $[fromPackle(toPackle(-big)) === -big]
+
+echo $[fromPackle(toPackle(0.1))]
+echo $[fromPackle(toPackle(1e309))]
+echo $[fromPackle(toPackle(-1e309))]
+
+## STDOUT:
+true 0
+true 255
+true 256
+true 65535
+true 65536
+true -1
+true 2147483647
+true -2147483648
+true 2147483648
+true
+true
+0.1
+inf
+-inf
+## END
+
+#### Shared references and cycles are preserved
+
+var shared = [1, 2]
+var d = {a: shared, b: shared}
+setvar d.self = d
+
+var d2 = fromPackle(toPackle(d))
+call d2.a->append(3)
+json write (d2.b, space=0)
+echo $[d2.self is d2]
+echo $[d2.a is d2.b]
+
+## STDOUT:
+[1,2,3]
+true
+true
+## END
+
+#### packle write and read
+
+packle write ({name: 'x', items: [1, 2]}) | packle read (&d)
+json write (d, space=0)
+
+packle write (['default']) | packle read
+json write (_reply, space=0)
+
+## STDOUT:
+{"name":"x","items":[1,2]}
+["default"]
+## END
+
+#### packle write is binary, compatible with Python's pickle protocol 4
+
+packle write (300) | od -A n -t x1 | sed 's/ \+/ /g'
+packle write ('hi') | od -A n -t x1 | sed 's/ \+/ /g'
+packle write ([]) | od -A n -t x1 | sed 's/ \+/ /g'
+
+## STDOUT:
+ 80 04 4d 2c 01 2e
+ 80 04 8c 02 68 69 94 2e
+ 80 04 5d 94 2e
+## END
+
+#### Strings are memoized, e.g. for keys of records
+
+var records = []
+for i in (0 .. 100) {
+  call records->append({name: 'x', i})
+}
+var p = toPackle(records)
+
+# 'name' and 'x' are each written once, so it's smaller than JSON
+echo $[len(p) < len(toJson(records))]
+var r2 = fromPackle(p)
+echo $[len(r2)] $[r2[99].i]
+
+## STDOUT:
+true
+100 99
+## END
+
+#### BashArray and BashAssoc are written like json8
+
+declare -a array=(a b)
+declare -A assoc=([k]=v)
+
+json write (fromPackle(toPackle(array)), space=0)
+json write (fromPackle(toPackle(assoc)), space=0)
+
+## STDOUT:
+["a","b"]
+{"k":"v"}
+## END
+
+#### Encode error
+
+try {
+  call toPackle(len)
+}
+echo status=$[_error.status]
+echo "$[_error.message]" | egrep -o "Can't serialize"
+
+packle write (len)
+echo status=$?
+
+## status: 1
+## STDOUT:
+status=4
+Can't serialize
+## END
+
+#### Decode errors
+
+try {
+  call fromPackle('zz')
+}
+echo status=$[_error.status]
+echo "$[_error.message]" | egrep -o 'Invalid Packle opcode'
+echo "positions $[_error.start_pos] - $[_error.end_pos]"
+
+# truncated
+var p = toPackle([1, 2, 3])
+try {
+  call fromPackle(p[ : -2])
+}
+echo status=$[_error.status]
+
+echo 'zz' | packle read
+echo status=$?
+
+## status: 1
+## STDOUT:
+status=4
+Invalid Packle opcode
+positions 0 - 1
+status=4
+## END
@@ -48,7 +48,7 @@ do eiusmod.)
 ## STDOUT:
 (BashArray)   (BashArray)
 (BashArray)   (BashArray 'hello')
-(BashArray)   (BashArray 'world' null '*.py')
+(SparseArray)   (SparseArray [0]='world' [2]='*.py')
 (BashArray)
 (BashArray
     'Lorem'
@@ -635,6 +635,38 @@ matched bar
 ## END
 
 
+#### Eggex in a loop sees new values of splices and conversion funcs
+shopt --set ysh:all
+
+var letters = / [a-z]+ /
+var sep = '-'
+var conv = int
+for i in (0 .. 5) {
+  if ('ab-42' ~ / <capture @letters> [ @sep ':' ] <capture d+ : conv> /) {
+    echo "$i $[_group(1)] $[type(_group(2))]"
+  } else {
+    echo "$i no match"
+  }
+  if (i === 0) {
+    setvar conv = float
+  } elif (i === 1) {
+    setvar letters = / d+ /
+  } elif (i === 2) {
+    setvar letters = / [a-z]+ /
+    setvar sep = ':'
+  } else {
+    setvar sep = '-'
+  }
+}
+
+## STDOUT:
+0 ab Int
+1 ab Float
+2 no match
+3 no match
+4 ab Float
+## END
+
 #### Regex with [ (bug regression)
 shopt --set ysh:all
 
@@ -759,3 +759,68 @@ shvar IFS=z
 ['x', 'x ', 'x']
 ## END
 
+
+#### proc and func locals see writes by name
+shopt --set ysh:upgrade
+
+var x = 'global'
+
+proc p(n) {
+  echo x=$[x]
+  var x = 'local'
+  echo x=$[x]
+
+  # read and value.Place write to the frame by name
+  echo hi | read --all (&x)
+  echo x=$[x]
+
+  setvar n += 1
+  echo n=$[n]
+
+  # a block reads the same local
+  cd / {
+    setvar x = 'block'
+  }
+  echo x=$[x]
+
+  unset x
+  echo x=$[x]
+  setvar x = 'again'
+  echo x=$[x]
+}
+
+func f(a; b=2) {
+  var s = a + b
+  setvar s *= 10
+  return (s)
+}
+
+p 41
+echo f=$[f(1)]
+echo x=$[x]
+## STDOUT:
+x=global
+x=local
+x=hi
+
+n=42
+x=block
+x=global
+x=again
+f=30
+x=global
+## END
+
+#### Temp binding frame hides proc locals
+shopt --set ysh:upgrade
+
+proc p {
+  var x = 'local'
+  x=temp eval 'echo x=$x'
+  echo x=$[x]
+}
+p
+## STDOUT:
+x=temp
+x=local
+## END
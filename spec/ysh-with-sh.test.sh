@@ -184,6 +184,25 @@ for i, item in (array) {
 array=(); array[0]=a array[1]=b array[5]=c
 ## END
 
+#### Bash array shared by two vars: a+=() and a[i]= change both
+
+declare -a a=(1 2)
+var b = a
+
+# Like a[i]=x, appending modifies the array in place
+a+=(3)
+a[0]=x
+echo "${b[@]}"
+
+# A hole makes a new sparse array, so they're no longer shared
+unset 'a[1]'
+echo "${a[@]} / ${b[@]}"
+
+## STDOUT:
+x 2 3
+x 3 / x 2 3
+## END
+
 #### Slice bash array isn't allowed
 
 shopt --set parse_at
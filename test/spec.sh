@@ -861,6 +861,10 @@ ysh-options-assign() {
   run-file ysh-options-assign "$@"
 }
 
+ysh-packle() {
+  run-file ysh-packle "$@"
+}
+
 ysh-proc() {
   run-file ysh-proc "$@"
 }
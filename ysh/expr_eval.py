@@ -20,6 +20,7 @@ from _devbuild.gen.syntax_asdl import (
     expr,
     expr_e,
     expr_t,
+    y_lhs,
     y_lhs_e,
     y_lhs_t,
     Attribute,
@@ -34,6 +35,7 @@ from _devbuild.gen.syntax_asdl import (
     CharRange,
     ArgList,
     Eggex,
+    EggexCache,
 )
 from _devbuild.gen.runtime_asdl import (
     coerced_e,
@@ -61,6 +63,7 @@ from osh import braces
 from mycpp import mops
 from mycpp.mylib import log, NewDict, switch, tagswitch, print_stderr
 from ysh import func_proc
+from ysh import regex_translate
 from ysh import val_ops
 
 import libc
@@ -186,6 +189,8 @@ class ExprEvaluator(object):
         self.splitter = splitter
         self.errfmt = errfmt
 
+        self.small_ints = mem.small_ints
+
     def CheckCircularDeps(self):
         # type: () -> None
         assert self.shell_ex is not None
@@ -208,11 +213,7 @@ class ExprEvaluator(object):
             if case(y_lvalue_e.Local):  # setvar x += 1
                 lval = cast(LeftName, UP_lval)
                 lhs_val = self._LookupVar(lval.name, lval.blame_loc)
-                if op.id in (Id.Arith_PlusEqual, Id.Arith_MinusEqual,
-                             Id.Arith_StarEqual, Id.Arith_SlashEqual):
-                    new_val = self._ArithIntFloat(lhs_val, rhs_val, op)
-                else:
-                    new_val = self._ArithIntOnly(lhs_val, rhs_val, op)
+                new_val = self._ArithAugmented(lhs_val, rhs_val, op)
 
                 self.mem.SetNamed(lval, new_val, which_scopes)
 
@@ -245,11 +246,7 @@ class ExprEvaluator(object):
                             obj, "obj[index] expected List or Dict",
                             loc.Missing)
 
-                if op.id in (Id.Arith_PlusEqual, Id.Arith_MinusEqual,
-                             Id.Arith_StarEqual, Id.Arith_SlashEqual):
-                    new_val_ = self._ArithIntFloat(lhs_val_, rhs_val, op)
-                else:
-                    new_val_ = self._ArithIntOnly(lhs_val_, rhs_val, op)
+                new_val_ = self._ArithAugmented(lhs_val_, rhs_val, op)
 
                 with tagswitch(obj) as case:
                     if case(value_e.List):
@@ -264,6 +261,26 @@ class ExprEvaluator(object):
             else:
                 raise AssertionError()
 
+    def EvalAugmentedLocal(self, lhs, rhs_val, op):
+        # type: (y_lhs.Var, value_t, Token) -> None
+        """setvar x += 1, where x is a local with a slot."""
+        cell = self.mem.GetSlotCell(lhs.slot, lhs.name)
+        if cell is None or cell.val.tag() == value_e.Undef:
+            lval = LeftName(lhs.name, lhs.left)
+            self.EvalAugmented(lval, rhs_val, op, scope_e.LocalOnly)
+            return
+
+        new_val = self._ArithAugmented(cell.val, rhs_val, op)
+        self.mem.SetSlotLocal(lhs.slot, lhs.name, new_val, lhs.left)
+
+    def _ArithAugmented(self, lhs_val, rhs_val, op):
+        # type: (value_t, value_t, Token) -> value_t
+        if op.id in (Id.Arith_PlusEqual, Id.Arith_MinusEqual,
+                     Id.Arith_StarEqual, Id.Arith_SlashEqual):
+            return self._ArithIntFloat(lhs_val, rhs_val, op)
+        else:
+            return self._ArithIntOnly(lhs_val, rhs_val, op)
+
     def _EvalLeftLocalOrGlobal(self, lhs, which_scopes):
         # type: (expr_t, scope_t) -> value_t
         """Evaluate the LEFT MOST part, respecting setvar/setglobal.
@@ -280,6 +297,12 @@ class ExprEvaluator(object):
             if case(expr_e.Var):
                 lhs = cast(expr.Var, UP_lhs)
 
+                # Only setvar has slots
+                if lhs.slot != -1:
+                    cell = self.mem.GetSlotCell(lhs.slot, lhs.name)
+                    if cell and cell.val.tag() != value_e.Undef:
+                        return cell.val
+
                 # respect setvar/setglobal with which_scopes
                 return LookupVar(self.mem, lhs.name, which_scopes, lhs.left)
 
@@ -312,8 +335,8 @@ class ExprEvaluator(object):
         UP_lhs = lhs
         with tagswitch(lhs) as case:
             if case(y_lhs_e.Var):
-                lhs = cast(Token, UP_lhs)
-                return LeftName(lexer.LazyStr(lhs), lhs)
+                lhs = cast(y_lhs.Var, UP_lhs)
+                return LeftName(lhs.name, lhs.left)
 
             elif case(y_lhs_e.Subscript):
                 lhs = cast(Subscript, UP_lhs)
@@ -440,7 +463,7 @@ class ExprEvaluator(object):
             if case(Id.Arith_Minus):
                 c1, i1, f1 = _ConvertToNumber(val)
                 if c1 == coerced_e.Int:
-                    return value.Int(mops.Negate(i1))
+                    return self.small_ints.Int(mops.Negate(i1))
                 if c1 == coerced_e.Float:
                     return value.Float(-f1)
                 raise error.TypeErr(val, 'Negation expected Int or Float',
@@ -448,7 +471,7 @@ class ExprEvaluator(object):
 
             elif case(Id.Arith_Tilde):
                 i = _ConvertToInt(val, '~ expected Int', node.op)
-                return value.Int(mops.BitNot(i))
+                return self.small_ints.Int(mops.BitNot(i))
 
             elif case(Id.Expr_Not):
                 b = val_ops.ToBool(val)
@@ -487,11 +510,11 @@ class ExprEvaluator(object):
         if c == coerced_e.Int:
             with switch(op_id) as case:
                 if case(Id.Arith_Plus, Id.Arith_PlusEqual):
-                    return value.Int(mops.Add(i1, i2))
+                    return self.small_ints.Int(mops.Add(i1, i2))
                 elif case(Id.Arith_Minus, Id.Arith_MinusEqual):
-                    return value.Int(mops.Sub(i1, i2))
+                    return self.small_ints.Int(mops.Sub(i1, i2))
                 elif case(Id.Arith_Star, Id.Arith_StarEqual):
-                    return value.Int(mops.Mul(i1, i2))
+                    return self.small_ints.Int(mops.Mul(i1, i2))
                 elif case(Id.Arith_Slash, Id.Arith_SlashEqual):
                     if mops.Equal(i2, mops.ZERO):
                         raise error.Expr('Divide by zero', op)
@@ -535,36 +558,36 @@ class ExprEvaluator(object):
                     # Disallow this to remove confusion between modulus and remainder
                     raise error.Expr("Divisor can't be negative", op)
 
-                return value.Int(num.IntRemainder(i1, i2))
+                return self.small_ints.Int(num.IntRemainder(i1, i2))
 
             # a // b   setvar a //= b
             elif case(Id.Expr_DSlash, Id.Expr_DSlashEqual):
                 if mops.Equal(i2, mops.ZERO):
                     raise error.Expr('Divide by zero', op)
-                return value.Int(num.IntDivide(i1, i2))
+                return self.small_ints.Int(num.IntDivide(i1, i2))
 
             # a ** b   setvar a **= b (ysh only)
             elif case(Id.Arith_DStar, Id.Expr_DStarEqual):
                 # Same as sh_expr_eval.py
                 if mops.Greater(mops.ZERO, i2):
                     raise error.Expr("Exponent can't be a negative number", op)
-                return value.Int(num.Exponent(i1, i2))
+                return self.small_ints.Int(num.Exponent(i1, i2))
 
             # Bitwise
             elif case(Id.Arith_Amp, Id.Arith_AmpEqual):  # &
-                return value.Int(mops.BitAnd(i1, i2))
+                return self.small_ints.Int(mops.BitAnd(i1, i2))
 
             elif case(Id.Arith_Pipe, Id.Arith_PipeEqual):  # |
-                return value.Int(mops.BitOr(i1, i2))
+                return self.small_ints.Int(mops.BitOr(i1, i2))
 
             elif case(Id.Arith_Caret, Id.Arith_CaretEqual):  # ^
-                return value.Int(mops.BitXor(i1, i2))
+                return self.small_ints.Int(mops.BitXor(i1, i2))
 
             elif case(Id.Arith_DGreat, Id.Arith_DGreatEqual):  # >>
-                return value.Int(mops.RShift(i1, i2))
+                return self.small_ints.Int(mops.RShift(i1, i2))
 
             elif case(Id.Arith_DLess, Id.Arith_DLessEqual):  # <<
-                return value.Int(mops.LShift(i1, i2))
+                return self.small_ints.Int(mops.LShift(i1, i2))
 
             else:
                 raise AssertionError(op.id)
@@ -813,6 +836,12 @@ class ExprEvaluator(object):
     def _EvalFuncCall(self, node):
         # type: (expr.FuncCall) -> value_t
 
+        # Common case: call a method without making a bound func first
+        if node.func.tag() == expr_e.Attribute:
+            attr = cast(Attribute, node.func)
+            if attr.op.id != Id.Expr_Dot:
+                return self._EvalMethodCall(node, attr)
+
         func = self._EvalExpr(node.func)
         UP_func = func
 
@@ -942,51 +971,83 @@ class ExprEvaluator(object):
 
         return result
 
+    def _BuiltinMethod(self, o, name):
+        # type: (value_t, str) -> Optional[vm._Callable]
+        type_methods = self.methods.get(o.tag())
+        return type_methods.get(name) if type_methods is not None else None
+
+    def _ChainedFunc(self, o, node):
+        # type: (value_t, Attribute) -> value_t
+        """For o => f, when f isn't a builtin method of o."""
+
+        # If the operator is ->, fail because we don't have any
+        # user-defined methods
+        if node.op.id == Id.Expr_RArrow:
+            raise error.TypeErrVerbose(
+                'Method %r does not exist on type %s' %
+                (node.attr_name, ui.ValType(o)), node.attr)
+
+        # Operator is =>, so try function chaining.
+
+        # Instead of str(f()) => upper()
+        #         or str(f()).upper() as in Pythohn
+        #
+        # It's more natural to write
+        #     f() => str() => upper()
+
+        # Could improve error message: may give "Undefined variable"
+        val = self._LookupVar(node.attr_name, node.attr)
+
+        with tagswitch(val) as case:
+            if case(value_e.Func, value_e.BuiltinFunc):
+                return val
+            else:
+                raise error.TypeErr(val,
+                                    'Fat arrow => expects method or function',
+                                    node.attr)
+
+    def _EvalMethodCall(self, node, attr):
+        # type: (expr.FuncCall, Attribute) -> value_t
+        """o->method(args) or o => f(args)
+
+        Like evaluating the Attribute and then calling it, but without
+        allocating a value.BoundFunc.
+        """
+        o = self._EvalExpr(attr.obj)
+
+        to_call = None  # type: value_t
+        vm_callable = self._BuiltinMethod(o, attr.attr_name)
+        if not vm_callable:
+            to_call = self._ChainedFunc(o, attr)
+
+        pos_args, named_args = func_proc._EvalArgList(self, node.args, me=o)
+        rd = typed_args.Reader(pos_args,
+                               named_args,
+                               None,
+                               node.args,
+                               is_bound=True)
+
+        if vm_callable:
+            return vm_callable.Call(rd)
+        return self._CallFunc(to_call, rd)
+
     def _EvalAttribute(self, node):
         # type: (Attribute) -> value_t
 
         o = self._EvalExpr(node.obj)
-        UP_o = o
 
         with switch(node.op.id) as case:
             # Right now => is a synonym for ->
             # Later we may enforce that => is pure, and -> is for mutation and
             # I/O.
             if case(Id.Expr_RArrow, Id.Expr_RDArrow):
-                name = node.attr_name
                 # Look up builtin methods
-                type_methods = self.methods.get(o.tag())
-                vm_callable = (type_methods.get(name)
-                               if type_methods is not None else None)
+                vm_callable = self._BuiltinMethod(o, node.attr_name)
                 if vm_callable:
                     func_val = value.BuiltinFunc(vm_callable)
                     return value.BoundFunc(o, func_val)
 
-                # If the operator is ->, fail because we don't have any
-                # user-defined methods
-                if node.op.id == Id.Expr_RArrow:
-                    raise error.TypeErrVerbose(
-                        'Method %r does not exist on type %s' %
-                        (name, ui.ValType(o)), node.attr)
-
-                # Operator is =>, so try function chaining.
-
-                # Instead of str(f()) => upper()
-                #         or str(f()).upper() as in Pythohn
-                #
-                # It's more natural to write
-                #     f() => str() => upper()
-
-                # Could improve error message: may give "Undefined variable"
-                val = self._LookupVar(name, node.attr)
-
-                with tagswitch(val) as case2:
-                    if case2(value_e.Func, value_e.BuiltinFunc):
-                        return value.BoundFunc(o, val)
-                    else:
-                        raise error.TypeErr(
-                            val, 'Fat arrow => expects method or function',
-                            node.attr)
+                return value.BoundFunc(o, self._ChainedFunc(o, node))
 
             elif case(Id.Expr_Dot):  # d.key is like d['key']
                 return self._EvalDot(node, o)
@@ -1010,6 +1071,10 @@ class ExprEvaluator(object):
 
             elif case(expr_e.Var):
                 node = cast(expr.Var, UP_node)
+                if node.slot != -1:
+                    cell = self.mem.GetSlotCell(node.slot, node.name)
+                    if cell and cell.val.tag() != value_e.Undef:
+                        return cell.val
                 return self._LookupVar(node.name, node.left)
 
             elif case(expr_e.Place):
@@ -1209,17 +1274,70 @@ class ExprEvaluator(object):
             else:
                 raise NotImplementedError(node.__class__.__name__)
 
+    def _EggexCacheValid(self, cache):
+        # type: (EggexCache) -> bool
+        """Do the splices of a cached eggex hold the same values?
+
+        Comparing value.Eggex.spliced by identity is enough, because an eggex
+        that shares it has the same flags and conversion funcs.
+        """
+        for i, var_name in enumerate(cache.splice_vars):
+            val = LookupVar(self.mem, var_name, scope_e.LocalOrGlobal,
+                            cache.splice_locs[i])
+            UP_val = val
+            with tagswitch(val) as case:
+                if case(value_e.Str):
+                    val = cast(value.Str, UP_val)
+                    if val.s is not cache.str_keys[i]:
+                        return False
+
+                elif case(value_e.Eggex):
+                    val = cast(value.Eggex, UP_val)
+                    if val.spliced is not cache.eggex_keys[i]:
+                        return False
+
+                else:
+                    return False
+        return True
+
     def EvalEggex(self, node):
         # type: (Eggex) -> value.Eggex
 
+        cache = node.cache
+        if cache is not None and self._EggexCacheValid(cache):
+            # Cached eggexes have no conversion funcs
+            no_func = None  # type: Optional[value_t]
+            convert_funcs = [no_func] * len(cache.convert_toks)
+            # as_ere is None if the ERE translation failed.  The error is
+            # reported when the eggex is used.
+            if cache.as_ere is None:
+                return value.Eggex(cache.spliced, node.canonical_flags,
+                                   convert_funcs, cache.convert_toks, None, [])
+            return value.Eggex(cache.spliced, node.canonical_flags,
+                               convert_funcs, cache.convert_toks,
+                               cache.as_ere, cache.capture_names)
+
         # Splice, check flags consistency, and accumulate convert_funcs indexed
         # by capture group
         ev = EggexEvaluator(self.mem, node.canonical_flags)
         spliced = ev.EvalE(node.regex)
 
         # as_ere and capture_names filled by ~ operator or Str method
-        return value.Eggex(spliced, node.canonical_flags, ev.convert_funcs,
-                           ev.convert_toks, None, [])
+        eggex_val = value.Eggex(spliced, node.canonical_flags,
+                                ev.convert_funcs, ev.convert_toks, None, [])
+        if not ev.cacheable:
+            return eggex_val
+
+        as_ere = None  # type: Optional[str]
+        if node.canonical_flags is not None:  # it's translated to ERE
+            try:
+                as_ere = regex_translate.AsPosixEre(eggex_val)
+            except error.FatalRuntime:
+                eggex_val.capture_names = []
+        node.cache = EggexCache(spliced, as_ere, eggex_val.capture_names,
+                                ev.convert_toks, ev.splice_vars,
+                                ev.splice_locs, ev.str_keys, ev.eggex_keys)
+        return eggex_val
 
 
 class EggexEvaluator(object):
@@ -1231,6 +1349,20 @@ class EggexEvaluator(object):
         self.convert_funcs = []  # type: List[Optional[value_t]]
         self.convert_toks = []  # type: List[Optional[Token]]
 
+        # For EggexCache
+        self.cacheable = True
+        self.splice_vars = []  # type: List[str]
+        self.splice_locs = []  # type: List[Token]
+        self.str_keys = []  # type: List[Optional[str]]
+        self.eggex_keys = []  # type: List[Optional[re_t]]
+
+    def _RecordSplice(self, var_name, var_tok, s, spliced):
+        # type: (str, Token, Optional[str], Optional[re_t]) -> None
+        self.splice_vars.append(var_name)
+        self.splice_locs.append(var_tok)
+        self.str_keys.append(s)
+        self.eggex_keys.append(spliced)
+
     def _LookupVar(self, name, var_loc):
         # type: (str, loc_t) -> value_t
         """
@@ -1284,6 +1416,7 @@ class EggexEvaluator(object):
                 s = val_ops.ToStr(val, 'Eggex char class splice expected Str',
                                   term.name)
                 char_code_tok = term.name
+                self._RecordSplice(term.var_name, term.name, s, None)
 
         assert s is not None, term
         for ch in s:
@@ -1335,6 +1468,8 @@ class EggexEvaluator(object):
                 convert_func = None  # type: Optional[value_t]
                 convert_tok = None  # type: Optional[Token]
                 if node.func_name:
+                    # The func is looked up by name each time
+                    self.cacheable = False
                     func_name = lexer.LazyStr(node.func_name)
                     func_val = self.mem.GetValue(func_name)
                     with tagswitch(func_val) as case:
@@ -1378,6 +1513,8 @@ class EggexEvaluator(object):
                         val = cast(value.Str, UP_val)
                         to_splice = re.LiteralChars(node.name,
                                                     val.s)  # type: re_t
+                        self._RecordSplice(node.var_name, node.name, val.s,
+                                           None)
 
                     elif case(value_e.Eggex):
                         val = cast(value.Eggex, UP_val)
@@ -1396,6 +1533,12 @@ class EggexEvaluator(object):
                                 (self.canonical_flags, val.canonical_flags),
                                 node.name)
 
+                        for func in val.convert_funcs:
+                            if func is not None:
+                                self.cacheable = False
+                        self._RecordSplice(node.var_name, node.name, None,
+                                           val.spliced)
+
                     else:
                         raise error.TypeErr(
                             val, 'Eggex splice expected Str or Eggex',
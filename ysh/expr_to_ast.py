@@ -26,6 +26,7 @@ from _devbuild.gen.syntax_asdl import (
     PosixClass,
     PerlClass,
     NameType,
+    y_lhs,
     y_lhs_t,
     Comprehension,
     Subscript,
@@ -385,7 +386,7 @@ class Transformer(object):
                       parent.GetChild(2).tok)
 
             name_tok = parent.GetChild(1).tok
-            return expr.Place(name_tok, lexer.TokenVal(name_tok), [])
+            return expr.Place(name_tok, lexer.InternedTokenVal(name_tok), [])
 
         if id_ == Id.Expr_Func:
             # STUB.  This should really be a Func, not Lambda.
@@ -419,7 +420,8 @@ class Transformer(object):
         if n == 3:
             typ = self._TypeExpr(p_node.GetChild(2))
 
-        return NameType(name_tok, lexer.TokenVal(name_tok), typ)
+        return NameType(name_tok, lexer.InternedTokenVal(name_tok), typ,
+                        -1)
 
     def _NameTypeList(self, p_node):
         # type: (PNode) -> List[NameType]
@@ -706,7 +708,7 @@ class Transformer(object):
 
         tok = pnode.tok
         if typ == Id.Expr_Name:
-            return expr.Var(tok, lexer.TokenVal(tok))
+            return expr.Var(tok, lexer.InternedTokenVal(tok), -1)
 
         # Everything else is an expr.Const
         tok_str = lexer.TokenVal(tok)
@@ -824,7 +826,7 @@ class Transformer(object):
             with tagswitch(e) as case:
                 if case(expr_e.Var):
                     e = cast(expr.Var, UP_e)
-                    lhs_list.append(e.left)
+                    lhs_list.append(y_lhs.Var(e.left, e.name, e.slot))
 
                 elif case(expr_e.Subscript):
                     e = cast(Subscript, UP_e)
@@ -932,7 +934,7 @@ class Transformer(object):
         else:
             canonical_flags = None
 
-        return Eggex(left, regex, flags, trans_pref, canonical_flags)
+        return Eggex(left, regex, flags, trans_pref, canonical_flags, None)
 
     def YshCasePattern(self, pnode):
         # type: (PNode) -> pat_t
@@ -1174,7 +1176,8 @@ class Transformer(object):
             type_ = self._TypeExpr(pnode.GetChild(1))
             default_val = self.Expr(pnode.GetChild(3))
 
-        return Param(name_tok, lexer.TokenVal(name_tok), type_, default_val)
+        return Param(name_tok, lexer.InternedTokenVal(name_tok), type_,
+                     default_val)
 
     def _ParamGroup(self, p_node):
         # type: (PNode) -> ParamGroup
@@ -1197,7 +1200,7 @@ class Transformer(object):
 
             elif child.typ == Id.Expr_Ellipsis:
                 tok = p_node.GetChild(i + 1).tok
-                rest_of = RestParam(tok, lexer.TokenVal(tok))
+                rest_of = RestParam(tok, lexer.InternedTokenVal(tok))
 
             i += 2
 
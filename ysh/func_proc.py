@@ -12,6 +12,7 @@ from _devbuild.gen.syntax_asdl import (proc_sig, proc_sig_e, Param, ParamGroup,
 from _devbuild.gen.value_asdl import (value, value_e, value_t, ProcDefaults,
                                       LeftName)
 
+from core import dev
 from core import error
 from core.error import e_die
 from core import state
@@ -556,14 +557,15 @@ def CallUserFunc(
     with state.ctx_FuncCall(mem, func):
         _BindFuncArgs(func, rd, mem)
 
-        try:
-            cmd_ev._Execute(func.parsed.body)
+        with dev.ctx_Profile(cmd_ev.profiler, func.name):
+            try:
+                cmd_ev._Execute(func.parsed.body)
 
-            return value.Null  # implicit return
-        except vm.ValueControlFlow as e:
-            return e.value
-        except vm.IntControlFlow as e:
-            raise AssertionError('IntControlFlow in func')
+                return value.Null  # implicit return
+            except vm.ValueControlFlow as e:
+                return e.value
+            except vm.IntControlFlow as e:
+                raise AssertionError('IntControlFlow in func')
 
     raise AssertionError('unreachable')
 
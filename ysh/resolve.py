@@ -0,0 +1,488 @@
+#!/usr/bin/env python2
+"""resolve.py - Give the locals of YSH procs and funcs slots.
+
+Proc and func frames are a Dict[str, Cell], like shell function frames.
+But unlike shell functions, procs and funcs don't use dynamic scope, and
+their params and 'var' declarations are known when they're parsed:
+
+    proc p(x; y) {
+      var z = x + y  # x, y, and z are locals 0, 1, 2
+      setvar z += 1
+    }
+
+This pass numbers those names, and stores the number in expr.Var, y_lhs.Var,
+and NameType nodes.  At runtime, state.Mem caches the local's Cell in that
+slot of the frame, so later reads and writes don't hash the name.
+
+The slot is only a cache of what's in the frame Dict, and -1 means "look it up
+by name".  So this pass doesn't have to visit every node.  It leaves these
+alone:
+
+- Blocks and ^() ^[] literals, which may be evaluated in another frame.
+- Default param values, which are evaluated when the proc is defined.
+- Names that state.Mem computes, like _status.
+"""
+from __future__ import print_function
+
+from _devbuild.gen.id_kind_asdl import Id
+from _devbuild.gen.syntax_asdl import (
+    ArgList,
+    BraceGroup,
+    Attribute,
+    CaseArm,
+    CommandSub,
+    CompoundWord,
+    DoubleQuoted,
+    Func,
+    ParamGroup,
+    Proc,
+    ShArrayLiteral,
+    Subscript,
+    command,
+    command_e,
+    command_t,
+    condition,
+    condition_e,
+    condition_t,
+    case_arg,
+    case_arg_e,
+    expr,
+    expr_e,
+    expr_t,
+    for_iter,
+    for_iter_e,
+    pat,
+    pat_e,
+    proc_sig,
+    proc_sig_e,
+    word_e,
+    word_part,
+    word_part_e,
+    word_part_t,
+    word_t,
+    y_lhs,
+    y_lhs_e,
+    y_lhs_t,
+)
+from core import state
+from mycpp.mylib import log, tagswitch
+
+from typing import Dict, List, Optional, cast
+
+_ = log
+
+
+class _Resolver(object):
+    """Numbers the locals of one proc or func."""
+
+    def __init__(self):
+        # type: () -> None
+        self.slots = {}  # type: Dict[str, int]
+
+    def Declare(self, name):
+        # type: (str) -> int
+        """Return the slot for a param, 'var', or loop variable."""
+        if name in state.COMPUTED_VARS:
+            return -1
+        slot = self.slots.get(name, -1)
+        if slot == -1:
+            slot = len(self.slots)
+            self.slots[name] = slot
+        return slot
+
+    def DeclareParams(self, group):
+        # type: (Optional[ParamGroup]) -> None
+        if group is None:
+            return
+        for param in group.params:
+            self.Declare(param.name)
+        if group.rest_of:
+            self.Declare(group.rest_of.name)
+
+    def DeclareBody(self, node):
+        # type: (command_t) -> None
+        """Declare 'var' and loop variables before resolving uses.
+
+        A use in a loop may come before the declaration in the source.
+        """
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(command_e.VarDecl):
+                node = cast(command.VarDecl, UP_node)
+                if node.keyword is not None:  # not Hay
+                    for lhs in node.lhs:
+                        self.Declare(lhs.name)
+
+            elif case(command_e.ForEach):
+                node = cast(command.ForEach, UP_node)
+                for name in node.iter_names:
+                    self.Declare(name)
+                self.DeclareBody(node.body)
+
+            elif case(command_e.WhileUntil):
+                node = cast(command.WhileUntil, UP_node)
+                self.DeclareBody(node.body)
+
+            elif case(command_e.If):
+                node = cast(command.If, UP_node)
+                for if_arm in node.arms:
+                    self._DeclareList(if_arm.action)
+                self._DeclareList(node.else_action)
+
+            elif case(command_e.Case):
+                node = cast(command.Case, UP_node)
+                for case_arm in node.arms:
+                    self._DeclareList(case_arm.action)
+
+            elif case(command_e.BraceGroup):
+                node = cast(BraceGroup, UP_node)
+                self._DeclareList(node.children)
+
+            elif case(command_e.DoGroup):
+                node = cast(command.DoGroup, UP_node)
+                self._DeclareList(node.children)
+
+            elif case(command_e.CommandList):
+                node = cast(command.CommandList, UP_node)
+                self._DeclareList(node.children)
+
+            elif case(command_e.Sentence):
+                node = cast(command.Sentence, UP_node)
+                self.DeclareBody(node.child)
+
+            else:
+                # Other commands, including subshells and pipelines, don't
+                # declare locals in this frame.
+                pass
+
+    def _DeclareList(self, children):
+        # type: (List[command_t]) -> None
+        for child in children:
+            self.DeclareBody(child)
+
+    #
+    # Uses
+    #
+
+    def _Slot(self, name):
+        # type: (str) -> int
+        return self.slots.get(name, -1)
+
+    def Command(self, node):
+        # type: (command_t) -> None
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(command_e.Simple):
+                node = cast(command.Simple, UP_node)
+                self._Words(node.words)
+                if node.typed_args:
+                    self._ArgList(node.typed_args)
+                # node.block is skipped
+
+            elif case(command_e.Sentence):
+                node = cast(command.Sentence, UP_node)
+                self.Command(node.child)
+
+            elif case(command_e.Retval):
+                node = cast(command.Retval, UP_node)
+                self.Expr(node.val)
+
+            elif case(command_e.Expr):
+                node = cast(command.Expr, UP_node)
+                self.Expr(node.e)
+
+            elif case(command_e.VarDecl):
+                node = cast(command.VarDecl, UP_node)
+                if node.keyword is not None:  # not Hay
+                    for name_type in node.lhs:
+                        name_type.slot = self._Slot(name_type.name)
+                if node.rhs:
+                    self.Expr(node.rhs)
+
+            elif case(command_e.Mutation):
+                node = cast(command.Mutation, UP_node)
+                # setglobal x never refers to a local
+                if node.keyword.id == Id.KW_SetVar:
+                    for lhs in node.lhs:
+                        self._Lhs(lhs)
+                self.Expr(node.rhs)
+
+            elif case(command_e.Pipeline):
+                node = cast(command.Pipeline, UP_node)
+                self._CommandList(node.children)
+
+            elif case(command_e.AndOr):
+                node = cast(command.AndOr, UP_node)
+                self._CommandList(node.children)
+
+            elif case(command_e.DoGroup):
+                node = cast(command.DoGroup, UP_node)
+                self._CommandList(node.children)
+
+            elif case(command_e.BraceGroup):
+                node = cast(BraceGroup, UP_node)
+                self._CommandList(node.children)
+
+            elif case(command_e.CommandList):
+                node = cast(command.CommandList, UP_node)
+                self._CommandList(node.children)
+
+            elif case(command_e.Subshell):
+                node = cast(command.Subshell, UP_node)
+                self.Command(node.child)
+
+            elif case(command_e.ForEach):
+                node = cast(command.ForEach, UP_node)
+                iterable = node.iterable
+                UP_iterable = iterable
+                with tagswitch(iterable) as case2:
+                    if case2(for_iter_e.Words):
+                        iterable = cast(for_iter.Words, UP_iterable)
+                        self._Words(iterable.words)
+                    elif case2(for_iter_e.YshExpr):
+                        iterable = cast(for_iter.YshExpr, UP_iterable)
+                        self.Expr(iterable.e)
+                self.Command(node.body)
+
+            elif case(command_e.WhileUntil):
+                node = cast(command.WhileUntil, UP_node)
+                self._Condition(node.cond)
+                self.Command(node.body)
+
+            elif case(command_e.If):
+                node = cast(command.If, UP_node)
+                for if_arm in node.arms:
+                    self._Condition(if_arm.cond)
+                    self._CommandList(if_arm.action)
+                self._CommandList(node.else_action)
+
+            elif case(command_e.Case):
+                node = cast(command.Case, UP_node)
+                to_match = node.to_match
+                UP_to_match = to_match
+                with tagswitch(to_match) as case2:
+                    if case2(case_arg_e.Word):
+                        to_match = cast(case_arg.Word, UP_to_match)
+                        self._Word(to_match.w)
+                    elif case2(case_arg_e.YshExpr):
+                        to_match = cast(case_arg.YshExpr, UP_to_match)
+                        self.Expr(to_match.e)
+
+                for case_arm in node.arms:
+                    self._CaseArm(case_arm)
+
+            else:
+                # e.g. command.ShAssignment, command.DParen don't have YSH
+                # expressions
+                pass
+
+    def _CommandList(self, children):
+        # type: (List[command_t]) -> None
+        for child in children:
+            self.Command(child)
+
+    def _Condition(self, cond):
+        # type: (condition_t) -> None
+        UP_cond = cond
+        with tagswitch(cond) as case:
+            if case(condition_e.Shell):
+                cond = cast(condition.Shell, UP_cond)
+                self._CommandList(cond.commands)
+            elif case(condition_e.YshExpr):
+                cond = cast(condition.YshExpr, UP_cond)
+                self.Expr(cond.e)
+
+    def _CaseArm(self, arm):
+        # type: (CaseArm) -> None
+        pattern = arm.pattern
+        UP_pattern = pattern
+        with tagswitch(pattern) as case:
+            if case(pat_e.Words):
+                pattern = cast(pat.Words, UP_pattern)
+                self._Words(pattern.words)
+            elif case(pat_e.YshExprs):
+                pattern = cast(pat.YshExprs, UP_pattern)
+                for e in pattern.exprs:
+                    self.Expr(e)
+        self._CommandList(arm.action)
+
+    def _Lhs(self, lhs):
+        # type: (y_lhs_t) -> None
+        UP_lhs = lhs
+        with tagswitch(lhs) as case:
+            if case(y_lhs_e.Var):
+                lhs = cast(y_lhs.Var, UP_lhs)
+                lhs.slot = self._Slot(lhs.name)
+            elif case(y_lhs_e.Subscript):
+                lhs = cast(Subscript, UP_lhs)
+                self.Expr(lhs.obj)
+                self.Expr(lhs.index)
+            elif case(y_lhs_e.Attribute):
+                lhs = cast(Attribute, UP_lhs)
+                self.Expr(lhs.obj)
+
+    def _Words(self, words):
+        # type: (List[word_t]) -> None
+        for w in words:
+            self._Word(w)
+
+    def _Word(self, w):
+        # type: (word_t) -> None
+        if w.tag() == word_e.Compound:
+            cw = cast(CompoundWord, w)
+            self._WordParts(cw.parts)
+
+    def _WordParts(self, parts):
+        # type: (List[word_part_t]) -> None
+        for part in parts:
+            UP_part = part
+            with tagswitch(part) as case:
+                if case(word_part_e.ExprSub):
+                    part = cast(word_part.ExprSub, UP_part)
+                    self.Expr(part.child)
+                elif case(word_part_e.DoubleQuoted):
+                    part = cast(DoubleQuoted, UP_part)
+                    self._WordParts(part.parts)
+                elif case(word_part_e.CommandSub):
+                    part = cast(CommandSub, UP_part)
+                    self._CommandSub(part)
+
+    def _CommandSub(self, node):
+        # type: (CommandSub) -> None
+        # ^(echo hi) is a value.Command
+        if node.left_token.id != Id.Left_CaretParen:
+            self.Command(node.child)
+
+    def _ArgList(self, args):
+        # type: (ArgList) -> None
+        # p [x + 1] passes a value.Expr
+        if args.left.id == Id.Op_LBracket:
+            return
+        for e in args.pos_args:
+            self.Expr(e)
+        for named in args.named_args:
+            self.Expr(named.value)
+        # args.block_expr is like a block
+
+    def Expr(self, node):
+        # type: (expr_t) -> None
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(expr_e.Var):
+                node = cast(expr.Var, UP_node)
+                node.slot = self._Slot(node.name)
+
+            elif case(expr_e.Unary):
+                node = cast(expr.Unary, UP_node)
+                self.Expr(node.child)
+
+            elif case(expr_e.Binary):
+                node = cast(expr.Binary, UP_node)
+                self.Expr(node.left)
+                self.Expr(node.right)
+
+            elif case(expr_e.Compare):
+                node = cast(expr.Compare, UP_node)
+                self.Expr(node.left)
+                for e in node.comparators:
+                    self.Expr(e)
+
+            elif case(expr_e.FuncCall):
+                node = cast(expr.FuncCall, UP_node)
+                self.Expr(node.func)
+                self._ArgList(node.args)
+
+            elif case(expr_e.IfExp):
+                node = cast(expr.IfExp, UP_node)
+                self.Expr(node.test)
+                self.Expr(node.body)
+                self.Expr(node.orelse)
+
+            elif case(expr_e.Tuple):
+                node = cast(expr.Tuple, UP_node)
+                for e in node.elts:
+                    self.Expr(e)
+
+            elif case(expr_e.List):
+                node = cast(expr.List, UP_node)
+                for e in node.elts:
+                    self.Expr(e)
+
+            elif case(expr_e.Dict):
+                node = cast(expr.Dict, UP_node)
+                for e in node.keys:
+                    self.Expr(e)
+                for e in node.values:
+                    self.Expr(e)
+
+            elif case(expr_e.Range):
+                node = cast(expr.Range, UP_node)
+                self.Expr(node.lower)
+                self.Expr(node.upper)
+
+            elif case(expr_e.Slice):
+                node = cast(expr.Slice, UP_node)
+                if node.lower:
+                    self.Expr(node.lower)
+                if node.upper:
+                    self.Expr(node.upper)
+
+            elif case(expr_e.Subscript):
+                node = cast(Subscript, UP_node)
+                self.Expr(node.obj)
+                self.Expr(node.index)
+
+            elif case(expr_e.Attribute):
+                node = cast(Attribute, UP_node)
+                self.Expr(node.obj)
+
+            elif case(expr_e.Spread):
+                node = cast(expr.Spread, UP_node)
+                self.Expr(node.child)
+
+            elif case(expr_e.ShArrayLiteral):
+                node = cast(ShArrayLiteral, UP_node)
+                self._Words(node.words)
+
+            elif case(expr_e.DoubleQuoted):
+                node = cast(DoubleQuoted, UP_node)
+                self._WordParts(node.parts)
+
+            elif case(expr_e.CommandSub):
+                node = cast(CommandSub, UP_node)
+                self._CommandSub(node)
+
+            else:
+                # expr.Literal and expr.Lambda are evaluated later, and
+                # comprehensions bind their own names.  Eggex splices are
+                # looked up by name.
+                pass
+
+
+def ResolveProc(node):
+    # type: (Proc) -> None
+    r = _Resolver()
+
+    if node.sig.tag() == proc_sig_e.Closed:
+        sig = cast(proc_sig.Closed, node.sig)
+        r.DeclareParams(sig.word)
+        r.DeclareParams(sig.positional)
+        r.DeclareParams(sig.named)
+        if sig.block_param:
+            r.Declare(sig.block_param.name)
+
+    r.DeclareBody(node.body)
+    r.Command(node.body)
+    node.num_slots = len(r.slots)
+
+
+def ResolveFunc(node):
+    # type: (Func) -> None
+    r = _Resolver()
+
+    r.DeclareParams(node.positional)
+    r.DeclareParams(node.named)
+
+    r.DeclareBody(node.body)
+    r.Command(node.body)
+    node.num_slots = len(r.slots)
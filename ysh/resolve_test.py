@@ -0,0 +1,111 @@
+#!/usr/bin/env python2
+"""resolve_test.py: Tests for resolve.py."""
+from __future__ import print_function
+
+import unittest
+
+from _devbuild.gen.syntax_asdl import command_e
+from core import pyutil
+from core import state
+from core import test_lib
+from ysh import resolve  # module under test
+
+_ = resolve
+
+
+def _Parse(code_str):
+    arena = test_lib.MakeArena('resolve_test.py')
+    mem = state.Mem('', [], arena, [])
+    parse_opts, _, mutable_opts = state.MakeOpts(mem, None)
+    mutable_opts.SetAnyOption('ysh:all', True)
+
+    ysh_grammar = pyutil.LoadYshGrammar(pyutil.GetResourceLoader())
+    parse_ctx = test_lib.InitParseContext(arena=arena,
+                                          ysh_grammar=ysh_grammar,
+                                          parse_opts=parse_opts)
+    line_reader, _ = test_lib.InitLexer(code_str, arena)
+    c_parser = parse_ctx.MakeOshParser(line_reader)
+    return c_parser.ParseLogicalLine()
+
+
+class ResolveTest(unittest.TestCase):
+
+    def testProc(self):
+        node = _Parse('''
+proc p(w; x, ...rest; n=3; b) {
+  var y = x + g
+  setvar y += x
+  setglobal g = y
+  for i in (rest) {
+    echo $[i]
+  }
+}
+''')
+        self.assertEqual(command_e.Proc, node.tag())
+        # w x rest n b y i
+        self.assertEqual(7, node.num_slots)
+
+        children = node.body.children
+        decl = children[0]
+        self.assertEqual(5, decl.lhs[0].slot)  # y
+        self.assertEqual(1, decl.rhs.left.slot)  # x
+        self.assertEqual(-1, decl.rhs.right.slot)  # g is global
+
+        mut = children[1]
+        self.assertEqual(5, mut.lhs[0].slot)
+        self.assertEqual(1, mut.rhs.slot)
+
+        # setglobal never uses a slot
+        self.assertEqual(-1, children[2].lhs[0].slot)
+        self.assertEqual(5, children[2].rhs.slot)
+
+    def testSkipped(self):
+        node = _Parse('''
+func f(x) {
+  var _status = 0
+  cd / {
+    echo $[x]
+  }
+  call g([x], ^[x])
+  p [x]
+  return (x)
+}
+''')
+        self.assertEqual(command_e.Func, node.tag())
+        self.assertEqual(1, node.num_slots)  # _status is computed
+
+        children = node.body.children
+        self.assertEqual(-1, children[0].lhs[0].slot)
+
+        # Blocks aren't resolved
+        block_cmd = children[1].block.brace_group.children[0]
+        self.assertEqual(-1, block_cmd.words[1].parts[0].child.slot)
+
+        # [x] is a List, but ^[x] is evaluated later
+        args = children[2].e.args.pos_args
+        self.assertEqual(0, args[0].elts[0].slot)
+        self.assertEqual(-1, args[1].inner.slot)
+
+        # p [x] is a lazy arg list
+        self.assertEqual(-1, children[3].typed_args.pos_args[0].slot)
+
+        self.assertEqual(0, children[4].val.slot)
+
+    def testComputedVars(self):
+        # Mem.GetValue() computes these, so locals with these names don't get
+        # slots
+        for name in state.COMPUTED_VARS:
+            node = _Parse('proc p {\n  var %s = 0\n  echo $[%s]\n}' %
+                          (name, name))
+            self.assertEqual(0, node.num_slots, name)
+
+            children = node.body.children
+            self.assertEqual(-1, children[0].lhs[0].slot)
+            self.assertEqual(-1, children[1].words[1].parts[0].child.slot)
+
+        node = _Parse('proc p { var STATUS = 0 }')
+        self.assertEqual(1, node.num_slots)
+
+
+if __name__ == '__main__':
+    unittest.main()
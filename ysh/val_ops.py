@@ -7,6 +7,7 @@ from __future__ import print_function
 from _devbuild.gen.syntax_asdl import loc, loc_t, command_t
 from _devbuild.gen.value_asdl import (value, value_e, value_t, eggex_ops,
                                       eggex_ops_t, regex_match, RegexMatch)
+from core import bash_impl
 from core import error
 from core import ui
 from mycpp import mops
@@ -18,6 +19,7 @@ from typing import TYPE_CHECKING, cast, Dict, List, Optional
 import libc
 
 if TYPE_CHECKING:
+    from core import num
     from core import state
 
 
@@ -165,6 +167,10 @@ def ToShellArray(val, blame_loc, prefix=''):
             val = cast(value.BashArray, UP_val)
             strs = val.strs
 
+        elif case2(value_e.SparseArray):
+            val = cast(value.SparseArray, UP_val)
+            strs = bash_impl.SparseArray_Values(val)
+
         else:
             raise error.TypeErr(val, "%sexpected List" % prefix, blame_loc)
 
@@ -222,10 +228,11 @@ class ArrayIter(_ContainerIter):
 class RangeIterator(_ContainerIter):
     """ for x in (m:n) { """
 
-    def __init__(self, val):
-        # type: (value.Range) -> None
+    def __init__(self, val, small_ints):
+        # type: (value.Range, num.SmallInts) -> None
         _ContainerIter.__init__(self)
         self.val = val
+        self.small_ints = small_ints
 
     def Done(self):
         # type: () -> int
@@ -235,7 +242,7 @@ class RangeIterator(_ContainerIter):
         # type: () -> value_t
 
         # TODO: range should be BigInt too
-        return value.Int(mops.IntWiden(self.val.lower + self.i))
+        return self.small_ints.FromInt(self.val.lower + self.i)
 
 
 class ListIterator(_ContainerIter):
@@ -306,6 +313,10 @@ def ToBool(val):
             val = cast(value.BashArray, UP_val)
             return len(val.strs) != 0
 
+        elif case(value_e.SparseArray):
+            val = cast(value.SparseArray, UP_val)
+            return bash_impl.SparseArray_Length(val) != 0
+
         elif case(value_e.BashAssoc):
             val = cast(value.BashAssoc, UP_val)
             return len(val.d) != 0
@@ -381,6 +392,18 @@ def ExactlyEqual(left, right, blame_loc):
 
             return True
 
+        elif case(value_e.SparseArray):
+            left = cast(value.SparseArray, UP_left)
+            right = cast(value.SparseArray, UP_right)
+            if len(left.d) != len(right.d):
+                return False
+
+            for index in left.d.keys():
+                if right.d.get(index) != left.d[index]:
+                    return False
+
+            return True
+
         elif case(value_e.List):
             left = cast(value.List, UP_left)
             right = cast(value.List, UP_right)